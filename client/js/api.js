@@ -44,6 +44,7 @@ export const api = {
 
   /**
    * Busca transações filtradas (Filtros Avançados).
+   * Com `limit`/`cursor` o backend responde { itens, proximo_cursor }.
    */
   getInboxFiltrado: async (params) => {
     Object.keys(params).forEach(
@@ -283,4 +284,29 @@ export const api = {
     }
     return response.json();
   },
+
+  previewImportacao: async (formData) => {
+    const response = await fetch(`${API_URL}/transacoes/importacao/preview`, {
+      method: "POST",
+      body: formData,
+    });
+    if (!response.ok) {
+      const erro = await response
+        .json()
+        .catch(() => ({ erro: "Erro na pré-visualização" }));
+      throw new Error(erro.erro || "Falha ao pré-visualizar o arquivo");
+    }
+    return response.json();
+  },
+
+  getTarefa: async (idTarefa) => {
+    const response = await fetch(`${API_URL}/tarefas/${idTarefa}`);
+    if (!response.ok) {
+      const erro = await response
+        .json()
+        .catch(() => ({ erro: "Erro ao consultar a tarefa" }));
+      throw new Error(erro.erro || "Falha ao consultar a tarefa");
+    }
+    return response.json();
+  },
 };
@@ -14,6 +14,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const btnAbrirMassa = document.getElementById("btn-abrir-massa");
   const btnImportarExtrato = document.getElementById("btn-importar-extrato");
   const searchInput = document.getElementById("filtro-descricao-rapido");
+  const btnCarregarMais = document.getElementById("btn-carregar-mais");
 
   // (Modais e Formulários)
   const modalFiltros = document.getElementById("modal-filtros-backdrop");
@@ -114,22 +115,53 @@ document.addEventListener("DOMContentLoaded", () => {
   let mapeamentosSalvosCache = [];
   let mappingSelecionadoAtual = null;
 
+  // (Paginação por cursor)
+  const LIMITE_PAGINA = 50;
+  // Intervalo entre consultas ao status da importação em segundo plano
+  const INTERVALO_STATUS_IMPORTACAO_MS = 1000;
+  // Bytes do começo do CSV enviados para a pré-visualização
+  const TAMANHO_PREVIEW_IMPORTACAO_BYTES = 64 * 1024;
+  // Compactados vão direto para o servidor: o começo do arquivo não dá
+  // preview (use um mapeamento salvo ou o detectado pelo cabeçalho)
+  const EXTENSOES_COMPACTADAS = ["gz", "zip", "zst"];
+  let filtrosAtuais = {};
+  let proximoCursor = null;
+
   /**
-   * Renderiza a tabela da Inbox
+   * Renderiza a tabela da Inbox (primeira página dos filtros informados)
    */
   async function carregarInbox(params = {}) {
+    filtrosAtuais = { ...params };
+    proximoCursor = null;
+    transacoesCache = [];
+    btnCarregarMais.classList.add("hidden");
     tableBody.innerHTML = `<tr><td colspan="8" style="text-align: center;">Carregando...</td></tr>`;
 
+    await carregarPagina();
+  }
+
+  /**
+   * Busca a próxima página e adiciona as linhas ao final da tabela
+   */
+  async function carregarPagina() {
     try {
-      const transacoes = await api.getInboxFiltrado(params);
-      transacoesCache = transacoes;
+      const pagina = await api.getInboxFiltrado({
+        ...filtrosAtuais,
+        limit: LIMITE_PAGINA,
+        cursor: proximoCursor,
+      });
+      const primeiraPagina = transacoesCache.length === 0;
+      const transacoes = pagina.itens;
+      transacoesCache = transacoesCache.concat(transacoes);
+      proximoCursor = pagina.proximo_cursor;
+      btnCarregarMais.classList.toggle("hidden", !proximoCursor);
 
-      if (transacoes.length === 0) {
+      if (primeiraPagina && transacoes.length === 0) {
         tableBody.innerHTML = `<tr><td colspan="8" style="text-align: center;">Nenhuma transação encontrada.</td></tr>`;
         return;
       }
 
-      tableBody.innerHTML = "";
+      if (primeiraPagina) tableBody.innerHTML = "";
       transacoes.forEach((t) => {
         const tr = document.createElement("tr");
         tr.dataset.id = t.id;
@@ -261,6 +293,11 @@ document.addEventListener("DOMContentLoaded", () => {
     carregarInbox();
   });
   btnImportarExtrato.addEventListener("click", () => abrirModalImportacao());
+  btnCarregarMais.addEventListener("click", async () => {
+    btnCarregarMais.disabled = true;
+    await carregarPagina();
+    btnCarregarMais.disabled = false;
+  });
   formFiltros.addEventListener("submit", (e) => {
     e.preventDefault();
     const statusRadio = document.querySelector(
@@ -596,7 +633,10 @@ document.addEventListener("DOMContentLoaded", () => {
       return;
     }
     ultimoArquivoExtensao = getFileExtension(file);
-    if (ultimoArquivoExtensao === "ofx") {
+    if (
+      ultimoArquivoExtensao === "ofx" ||
+      EXTENSOES_COMPACTADAS.includes(ultimoArquivoExtensao)
+    ) {
       limparPreviewImportacao();
       btnSubmitImportacao.disabled = false;
       return;
@@ -607,12 +647,34 @@ document.addEventListener("DOMContentLoaded", () => {
       return;
     }
 
-    const reader = new FileReader();
-    reader.onload = (e) => {
-      const texto = e.target.result || "";
-      prepararPreviewCSV(texto);
-    };
-    reader.readAsText(file);
+    carregarPreviewCSV(file);
+  }
+
+  async function carregarPreviewCSV(file) {
+    // O servidor detecta o dialeto e separa as colunas; basta o começo do
+    // arquivo para montar a tabela de mapeamento
+    const formData = new FormData();
+    formData.append(
+      "arquivo",
+      file.slice(0, TAMANHO_PREVIEW_IMPORTACAO_BYTES),
+      file.name
+    );
+    formData.append("sem_cabecalho", "true");
+    formData.append("linhas", "6");
+    try {
+      const preview = await api.previewImportacao(formData);
+      // Ignora a resposta se outro arquivo foi escolhido nesse meio tempo
+      if (inputArquivoImport.files[0] !== file) return;
+      prepararPreviewCSV(preview.linhas);
+      // Extrato com o mesmo cabeçalho de um mapeamento salvo: já o seleciona
+      if (preview.mapeamento_detectado && !selectMapeamento.value) {
+        selectMapeamento.value = preview.mapeamento_detectado.id;
+        handleSelecaoMapeamentoChange();
+      }
+    } catch (error) {
+      limparPreviewImportacao();
+      alert(error.message);
+    }
   }
 
   function limparPreviewImportacao() {
@@ -631,23 +693,13 @@ document.addEventListener("DOMContentLoaded", () => {
     atualizarEstadoSalvarMapeamento();
   }
 
-  function prepararPreviewCSV(texto) {
-    const linhas = texto
-      .split(/\r?\n/)
-      .map((linha) => linha.trim())
-      .filter((linha) => linha.length > 0);
-
-    if (linhas.length === 0) {
+  function prepararPreviewCSV(linhasSeparadas) {
+    if (!linhasSeparadas.length) {
       limparPreviewImportacao();
       alert("Arquivo CSV sem dados.");
       return;
     }
 
-    const delimitador = detectarDelimitador(linhas[0]);
-    const linhasSeparadas = linhas.map((linha) =>
-      linha.split(delimitador).map((c) => c.replace(/"/g, "").trim())
-    );
-
     const totalColunas = Math.max(...linhasSeparadas.map((r) => r.length));
     colunasCSVDetectadas = Array.from({ length: totalColunas }, (_, index) => ({
       key: `__col_${index}`,
@@ -666,12 +718,6 @@ document.addEventListener("DOMContentLoaded", () => {
     renderMappingTable();
   }
 
-  function detectarDelimitador(linha) {
-    if (linha.includes(";")) return ";";
-    if (linha.includes("\t")) return "\t";
-    return ",";
-  }
-
   function renderMappingTable() {
     mappingTableHead.innerHTML = "";
     mappingTableBody.innerHTML = "";
@@ -847,6 +893,30 @@ document.addEventListener("DOMContentLoaded", () => {
     return partes.pop().toLowerCase();
   }
 
+  // A importação roda em segundo plano: consulta a tarefa até ela terminar
+  async function acompanharImportacao(idTarefa) {
+    const textoOriginal = btnSubmitImportacao.textContent;
+    btnSubmitImportacao.disabled = true;
+    try {
+      while (true) {
+        const tarefa = await api.getTarefa(idTarefa);
+        if (tarefa.status === "CONCLUIDA") return tarefa.resultado;
+        if (tarefa.status === "FALHOU") {
+          throw new Error(tarefa.erro || "Erro ao importar extrato.");
+        }
+        btnSubmitImportacao.textContent = `Importando... ${Math.round(
+          tarefa.progresso * 100
+        )}%`;
+        await new Promise((resolve) =>
+          setTimeout(resolve, INTERVALO_STATUS_IMPORTACAO_MS)
+        );
+      }
+    } finally {
+      btnSubmitImportacao.textContent = textoOriginal;
+      btnSubmitImportacao.disabled = false;
+    }
+  }
+
   async function handleImportacaoExtrato(event) {
     event.preventDefault();
     const arquivo = inputArquivoImport.files[0];
@@ -858,6 +928,8 @@ document.addEventListener("DOMContentLoaded", () => {
     const ext = getFileExtension(arquivo);
     const formData = new FormData();
     formData.append("arquivo", arquivo);
+    // Linhas inválidas ficam em quarentena em vez de abortar a importação
+    formData.append("tolerante", "true");
 
     const mapeamentoSelecionado = selectMapeamento.value;
     if (mapeamentoSelecionado) {
@@ -884,14 +956,27 @@ document.addEventListener("DOMContentLoaded", () => {
     }
 
     try {
-      const resultado = await api.importarExtrato(formData);
-      alert(
-        `Importação concluída! ${resultado.total_importadas} transações foram enviadas para a Inbox.`
-      );
+      const tarefa = await api.importarExtrato(formData);
+      const resultado = await acompanharImportacao(tarefa.id_tarefa);
+      let mensagem = `Importação concluída! ${resultado.total_importadas} transações foram enviadas para a Inbox.`;
+      if (resultado.total_ignoradas) {
+        mensagem += ` ${resultado.total_ignoradas} já tinham sido importadas e foram ignoradas.`;
+      }
+      if (resultado.total_rejeitadas) {
+        const motivos = (resultado.erros || [])
+          .slice(0, 3)
+          .map((erro) => {
+            const linhas = erro.linhas.length ? ` (linhas ${erro.linhas.join(", ")})` : "";
+            return `- ${erro.motivo}: ${erro.quantidade}${linhas}`;
+          })
+          .join("\n");
+        mensagem += `\n\n${resultado.total_rejeitadas} linhas não puderam ser lidas e ficaram em quarentena:\n${motivos}`;
+      }
+      alert(mensagem);
       fecharModais();
       carregarInbox();
       notificarAtualizacaoDashboard();
-      if (resultado.mapeamento_salvo_id) {
+      if (tarefa.mapeamento_salvo_id) {
         await carregarMapeamentosSalvos();
       }
     } catch (error) {
@@ -1,7 +1,7 @@
 import os
 import sys
 
-from flask import Flask, jsonify, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory
 from flask_cors import CORS
 
 # Garante que os módulos das pastas irmãs sejam encontrados
@@ -9,12 +9,25 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from domain.transacao import TipoTransacao
-    from infra.db.database import Session, init_db
+    from infra.db.database import ReadSession, Session, init_db
     from infra.db.models import Categoria, Perfil
+    from infra.http.corpo_compactado import LIMITE_CORPO_BYTES, DescompactarCorpoGzip
+    from infra.tarefas.executor_tarefas import executor_tarefas
+    from infra.tarefas.importacao import (
+        executar_importacao,
+        executar_reprocessamento,
+    )
+    from use_cases.importacao_use_cases import (
+        TIPO_TAREFA_IMPORTACAO,
+        TIPO_TAREFA_REPROCESSAMENTO,
+    )
 
+    from app.routes.dashboard_routes import dashboard_bp
     from app.routes.data_routes import data_bp
     from app.routes.meta_routes import meta_bp
+    from app.routes.regra_routes import regra_bp
     from app.routes.reserva_routes import reserva_bp
+    from app.routes.tarefa_routes import tarefa_bp
     from app.routes.transacao_routes import transacao_bp
 
 except ImportError as e:
@@ -173,11 +186,45 @@ app = Flask(__name__)
 
 CORS(app)
 
+# Corpos maiores que o limite (comprimidos ou não) são recusados com 413
+app.config["MAX_CONTENT_LENGTH"] = LIMITE_CORPO_BYTES
+
+# Uploads enviados com Content-Encoding: gzip chegam às rotas descompactados
+app.wsgi_app = DescompactarCorpoGzip(app.wsgi_app, LIMITE_CORPO_BYTES)
+
 # Registro dos Blueprints (rotas)
 app.register_blueprint(transacao_bp, url_prefix="/api/transacoes")
 app.register_blueprint(meta_bp, url_prefix="/api/metas")
 app.register_blueprint(reserva_bp, url_prefix="/api/reservas")
 app.register_blueprint(data_bp, url_prefix="/api/data")
+app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
+app.register_blueprint(tarefa_bp, url_prefix="/api/tarefas")
+app.register_blueprint(regra_bp, url_prefix="/api/regras-categorizacao")
+
+# --- Tarefas em segundo plano ---
+executor_tarefas.registrar(TIPO_TAREFA_IMPORTACAO, executar_importacao)
+executor_tarefas.registrar(TIPO_TAREFA_REPROCESSAMENTO, executar_reprocessamento)
+
+
+@app.before_request
+def iniciar_executor_tarefas():
+    """
+    Sobe o executor no primeiro request, no processo que atende a API (com o
+    reloader do modo debug, o processo pai nunca recebe requests). Tarefas
+    pendentes de uma execução anterior são retomadas a partir daí.
+    """
+    executor_tarefas.iniciar()
+
+
+@app.before_request
+def carregar_formulario():
+    """
+    Lê o formulário antes da rota: um corpo acima do limite vira 413 aqui,
+    em vez de cair no 'except Exception' da rota como erro 500.
+    """
+    if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+        # O acesso faz o parse do corpo (e a contagem do limite)
+        request.form
 
 
 # Isso permite que o navegador acesse http://localhost:5000/uploads/nome-do-arquivo.jpg
@@ -191,8 +238,9 @@ def uploaded_file(filename):
 # --- Gerenciamento de Sessão (Teardown) ---
 @app.teardown_appcontext
 def shutdown_session(exception=None):
-    """Remove a sessão do SQLAlchemy ao final de cada request."""
+    """Remove as sessões do SQLAlchemy ao final de cada request."""
     Session.remove()
+    ReadSession.remove()
 
 
 # --- Rota Raiz (Health Check) ---
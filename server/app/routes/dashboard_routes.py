@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify, request
+from infra.cache.dashboard_cache_memoria import dashboard_cache
+from infra.db.database import get_db_read_session
+from infra.repositories.resumo_mensal_repository_sqlite import (
+    ResumoMensalRepositorySqlite,
+)
+from use_cases.dashboard_use_cases import ObterAnaliseFinanceira
+
+dashboard_bp = Blueprint("dashboard_bp", __name__)
+
+
+@dashboard_bp.route("/analise", methods=["GET"])
+def analise_route():
+    """
+    Totais por período/categoria/perfil/tipo a partir do resumo mensal.
+    Ex: /analise?mes_de=2024-01&mes_ate=2024-12&agrupar_por=mes,id_categoria
+    """
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+
+    try:
+        args = request.args
+        agrupar_por = [
+            g.strip() for g in args.get("agrupar_por", "").split(",") if g.strip()
+        ]
+
+        use_case = ObterAnaliseFinanceira(ResumoMensalRepositorySqlite(db_session))
+        resultado = use_case.execute(
+            id_usuario=id_usuario,
+            mes_de=args.get("mes_de"),
+            mes_ate=args.get("mes_ate"),
+            agrupar_por=agrupar_por or None,
+            id_categoria=args.get("id_categoria"),
+            id_perfil=args.get("id_perfil"),
+            tipo=args.get("tipo"),
+        )
+        return jsonify(resultado), 200
+
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@dashboard_bp.route("/cache", methods=["GET"])
+def cache_stats_route():
+    """Contadores de hit/miss do cache dos cards do Dashboard."""
+    return jsonify(dashboard_cache.estatisticas()), 200
@@ -1,6 +1,6 @@
 from domain.transacao import TipoTransacao
 from flask import Blueprint, jsonify, request
-from infra.db.database import get_db_session
+from infra.db.database import get_db_read_session
 from infra.db.models import Categoria, Perfil, Meta as MetaModel
 
 data_bp = Blueprint("data_bp", __name__)
@@ -12,7 +12,7 @@ def get_categorias_route():
     id_usuario = "usuario_mock_id"
     tipo_filtro = request.args.get("tipo")
 
-    db_session = get_db_session()
+    db_session = get_db_read_session()
     try:
         query = db_session.query(Categoria).filter_by(id_usuario=id_usuario)
 
@@ -38,7 +38,7 @@ def get_categorias_route():
 def get_perfis_route():
     """Retorna a lista de perfis cadastrados."""
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
     try:
         perfis = db_session.query(Perfil).filter_by(id_usuario=id_usuario).all()
         perfis_json = [{"id": p.id, "nome": p.nome} for p in perfis]
@@ -53,7 +53,7 @@ def get_perfis_route():
 def get_metas_route():
     """Retorna a lista de metas do usuário."""
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
     
     try:
         metas = db_session.query(MetaModel).filter_by(id_usuario=id_usuario).all()
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify, request
-from infra.db.database import get_db_session
+from infra.db.database import get_db_read_session, get_db_session
 from infra.repositories.meta_repository_sqlite import MetaRepositorySqlite
 from infra.repositories.meta_uso_repository_sqlite import MetaUsoRepositorySqlite
 from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
@@ -317,7 +317,7 @@ def liberar_saldo_meta_route(id_meta):
 @meta_bp.route("/meta/<id_meta>/detalhes", methods=["GET"])
 def detalhes_meta_route(id_meta):
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
 
     try:
         meta_repo = MetaRepositorySqlite(db_session)
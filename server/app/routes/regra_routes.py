@@ -0,0 +1,104 @@
+from domain.regra_categorizacao import RegraCategorizacao
+from flask import Blueprint, jsonify, request
+from infra.db.database import get_db_read_session, get_db_session
+from infra.repositories.regra_categorizacao_repository_sqlite import (
+    RegraCategorizacaoRepositorySqlite,
+)
+from use_cases.regra_categorizacao_use_cases import (
+    CriarRegraCategorizacao,
+    DeletarRegraCategorizacao,
+    ListarRegrasCategorizacao,
+)
+
+regra_bp = Blueprint("regra_bp", __name__)
+
+
+def _serialize_regra(regra: RegraCategorizacao) -> dict:
+    return {
+        "id": regra.id,
+        "nome": regra.nome,
+        "id_categoria": regra.id_categoria,
+        "id_perfil": regra.id_perfil,
+        "palavras_chave": regra.palavras_chave,
+        "padrao_regex": regra.padrao_regex,
+        "valor_minimo": regra.valor_minimo,
+        "valor_maximo": regra.valor_maximo,
+        "tipo": regra.tipo.value if regra.tipo else None,
+        "prioridade": regra.prioridade,
+        "ativa": regra.ativa,
+    }
+
+
+@regra_bp.route("/", methods=["GET"])
+def listar_regras_route():
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+    try:
+        use_case = ListarRegrasCategorizacao(
+            RegraCategorizacaoRepositorySqlite(db_session)
+        )
+        regras = use_case.execute(id_usuario)
+        return jsonify([_serialize_regra(r) for r in regras]), 200
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@regra_bp.route("/", methods=["POST"])
+def criar_regra_route():
+    """Cria uma regra aplicada nas próximas importações de extrato."""
+    id_usuario = "usuario_mock_id"
+    payload = request.json or {}
+    db_session = get_db_session()
+
+    try:
+        use_case = CriarRegraCategorizacao(
+            RegraCategorizacaoRepositorySqlite(db_session)
+        )
+        regra = use_case.execute(
+            id_usuario=id_usuario,
+            nome=payload.get("nome"),
+            id_categoria=payload.get("id_categoria"),
+            id_perfil=payload.get("id_perfil"),
+            palavras_chave=payload.get("palavras_chave"),
+            padrao_regex=payload.get("padrao_regex"),
+            valor_minimo=payload.get("valor_minimo"),
+            valor_maximo=payload.get("valor_maximo"),
+            tipo=payload.get("tipo"),
+            prioridade=payload.get("prioridade", 0),
+            ativa=payload.get("ativa", True),
+        )
+        db_session.commit()
+        return jsonify(_serialize_regra(regra)), 201
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@regra_bp.route("/<id_regra>", methods=["DELETE"])
+def deletar_regra_route(id_regra: str):
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_session()
+
+    try:
+        use_case = DeletarRegraCategorizacao(
+            RegraCategorizacaoRepositorySqlite(db_session)
+        )
+        use_case.execute(id_usuario=id_usuario, id_regra=id_regra)
+        db_session.commit()
+        return jsonify({"mensagem": "Regra removida."}), 200
+    except (ValueError, PermissionError) as e:
+        db_session.rollback()
+        status_code = 403 if isinstance(e, PermissionError) else 400
+        return jsonify({"erro": str(e)}), status_code
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
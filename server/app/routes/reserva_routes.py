@@ -1,7 +1,7 @@
 from flask import Blueprint, jsonify, request
 from domain.meta import Meta
 from domain.reserva import Reserva
-from infra.db.database import get_db_session
+from infra.db.database import get_db_read_session, get_db_session
 from infra.repositories.meta_repository_sqlite import MetaRepositorySqlite
 from infra.repositories.reserva_repository_sqlite import ReservaRepositorySqlite
 from use_cases.reserva_use_cases import (
@@ -154,7 +154,7 @@ def excluir_reserva_route(reserva_id: str):
 @reserva_bp.route("/metas-disponiveis", methods=["GET"])
 def listar_metas_disponiveis_route():
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
 
     try:
         meta_repo = MetaRepositorySqlite(db_session)
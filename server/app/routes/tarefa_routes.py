@@ -0,0 +1,46 @@
+from domain.tarefa import Tarefa
+from flask import Blueprint, jsonify
+from infra.db.database import get_db_read_session
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+from use_cases.tarefa_use_cases import ObterTarefa
+
+tarefa_bp = Blueprint("tarefa_bp", __name__)
+
+
+def serialize_tarefa(t: Tarefa) -> dict:
+    """Converte uma Tarefa em dicionário para JSON (sem o payload interno)."""
+    return {
+        "id": t.id,
+        "tipo": t.tipo,
+        "status": t.status.value,
+        "progresso": round(t.progresso, 4),
+        "tentativas": t.tentativas,
+        "max_tentativas": t.max_tentativas,
+        "resultado": t.resultado,
+        "erro": t.erro,
+        "finalizada": t.finalizada,
+        "criado_em": t.criado_em.isoformat(),
+        "iniciado_em": t.iniciado_em.isoformat() if t.iniciado_em else None,
+        "finalizado_em": t.finalizado_em.isoformat() if t.finalizado_em else None,
+    }
+
+
+@tarefa_bp.route("/<id_tarefa>", methods=["GET"])
+def obter_tarefa_route(id_tarefa):
+    """Status e progresso de uma tarefa em segundo plano (ex: importação)."""
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+
+    try:
+        use_case = ObterTarefa(TarefaRepositorySqlite(db_session))
+        tarefa = use_case.execute(id_usuario, id_tarefa)
+        return jsonify(serialize_tarefa(tarefa)), 200
+
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 404
+    except PermissionError as e:
+        return jsonify({"erro": str(e)}), 403
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
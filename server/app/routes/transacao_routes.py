@@ -1,22 +1,51 @@
 import io
 import json
 from datetime import date, datetime
+from typing import Iterator, List
 
 from domain.anexo import Anexo
 from domain.transacao import StatusTransacao, Transacao
-from flask import Blueprint, jsonify, request
-from infra.db.database import get_db_session
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from infra.cache.dashboard_cache_memoria import dashboard_cache
+from infra.cache.mapeamento_csv_cache_memoria import indice_mapeamentos_csv
+from infra.db.database import get_db_read_session, get_db_session
+from infra.parsers.registro_parsers import registro_parsers
 from infra.repositories.anexo_repository_sqlite import AnexoRepositorySqlite
+from infra.repositories.extrato_arquivado_repository_sqlite import (
+    ExtratoArquivadoRepositorySqlite,
+)
+from infra.repositories.linha_quarentena_repository_sqlite import (
+    LinhaQuarentenaRepositorySqlite,
+)
 from infra.repositories.mapeamento_csv_repository_sqlite import (
     MapeamentoCSVRepositorySqlite,
 )
+from infra.repositories.regra_categorizacao_repository_sqlite import (
+    RegraCategorizacaoRepositorySqlite,
+)
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
 from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
 from infra.storage.anexo_storage_local import AnexoStorageLocal
-from use_cases.importacao_use_cases import (
-    ImportarExtratoBancario,
+from infra.storage.importacao_storage_local import ImportacaoStorageLocal
+from infra.tarefas.executor_tarefas import executor_tarefas
+from infra.tarefas.importacao import IMPORTACAO_TAMANHO_LOTE
+from use_cases.importacao_tarefas_use_cases import (
+    EnfileirarImportacaoExtrato,
+    EnfileirarReprocessamentoExtratos,
+    ListarExtratosArquivados,
+)
+from use_cases.importacao_use_cases import DesfazerImportacao, ImportarExtratoBancario
+from use_cases.mapeamento_csv_use_cases import (
     ListarMapeamentosCSV,
+    PreviewImportacaoCSV,
     SalvarMapeamentoCSV,
 )
+from use_cases.paginacao import PaginaTransacoes
+from use_cases.quarentena_use_cases import (
+    DescartarQuarentena,
+    ListarQuarentena,
+    ReprocessarQuarentena,
+)
 from use_cases.transacao_use_cases import (
     AnexarReciboTransacao,
     AtualizarTransacao,
@@ -45,6 +74,60 @@ def serialize_transacao(t: Transacao) -> dict:
     }
 
 
+def serialize_pagina(pagina: PaginaTransacoes) -> dict:
+    """Envelope usado pelas listagens paginadas por cursor."""
+    return {
+        "itens": [serialize_transacao(t) for t in pagina.itens],
+        "proximo_cursor": pagina.proximo_cursor,
+    }
+
+
+def _parse_paginacao(args) -> tuple[bool, str | None, int | None]:
+    """
+    Lê 'cursor' e 'limit' da query string. A paginação só é ativada quando
+    um deles é enviado, mantendo a resposta em lista para clientes antigos.
+    """
+    cursor = args.get("cursor") or None
+    limit_str = args.get("limit")
+    if cursor is None and limit_str is None:
+        return False, None, None
+    try:
+        limite = int(limit_str) if limit_str else None
+    except ValueError:
+        raise ValueError("O parâmetro 'limit' deve ser um número inteiro.")
+    return True, cursor, limite
+
+
+def stream_transacoes_json(lotes: Iterator[List[Transacao]], db_session) -> Response:
+    """
+    Envia um array JSON em partes, um lote por vez, sem montar a lista inteira.
+    A sessão só é fechada quando o último lote for enviado.
+    """
+
+    def gerar():
+        try:
+            yield "["
+            primeiro = True
+            for lote in lotes:
+                if not lote:
+                    continue
+                chunk = ",".join(
+                    json.dumps(serialize_transacao(t), separators=(",", ":"))
+                    for t in lote
+                )
+                yield chunk if primeiro else "," + chunk
+                primeiro = False
+            yield "]"
+        finally:
+            db_session.close()
+
+    return Response(stream_with_context(gerar()), mimetype="application/json")
+
+
+def _is_stream(args) -> bool:
+    return args.get("stream", "false").lower() == "true"
+
+
 def serialize_anexo(a: Anexo) -> dict:
     """Converte um objeto Anexo em um dicionário para JSON."""
     return {
@@ -188,7 +271,7 @@ def anexar_recibo_route(id_transacao: str):
 @transacao_bp.route("/<id_transacao>/anexos", methods=["GET"])
 def get_anexos_route(id_transacao: str):
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
     try:
         anexo_repo = AnexoRepositorySqlite(db_session)
 
@@ -284,11 +367,19 @@ def importar_extrato_route():
         mapping_id = request.form.get("id_mapeamento") or None
         salvar_nome = request.form.get("salvar_mapeamento_nome") or None
         sem_cabecalho = True
-
-        conteudo = arquivo.read()
+        # Linhas inválidas vão para a quarentena em vez de abortar o arquivo
+        tolerante = request.form.get("tolerante", "").lower() == "true"
+        # Retoma uma importação interrompida (as linhas já gravadas são puladas)
+        id_importacao = request.form.get("id_importacao") or None
 
         transacao_repo = TransacaoRepositorySqlite(db_session)
         mapeamento_repo = MapeamentoCSVRepositorySqlite(db_session)
+        importador = ImportarExtratoBancario(
+            transacao_repo,
+            mapeamento_repo,
+            indice_mapeamentos_csv,
+            registro=registro_parsers,
+        )
 
         saved_mapping_id = None
         if salvar_nome:
@@ -296,6 +387,12 @@ def importar_extrato_route():
                 return jsonify(
                     {"erro": "Para salvar o mapeamento informe as colunas."}
                 ), 400
+            # O cabeçalho do arquivo identifica os próximos extratos do banco
+            importador.validar_arquivo(arquivo.filename, arquivo.stream)
+            assinatura = importador.assinatura_do_arquivo(
+                arquivo.stream, arquivo.filename, mapping
+            )
+            arquivo.stream.seek(0)
             salvar_uc = SalvarMapeamentoCSV(mapeamento_repo)
             salvo = salvar_uc.execute(
                 id_usuario=id_usuario,
@@ -303,25 +400,42 @@ def importar_extrato_route():
                 coluna_data=mapping.get("data"),
                 coluna_valor=mapping.get("valor"),
                 coluna_descricao=mapping.get("descricao"),
+                assinatura_cabecalho=assinatura,
             )
             saved_mapping_id = salvo.id
             mapping_id = saved_mapping_id
-
-        use_case = ImportarExtratoBancario(transacao_repo, mapeamento_repo)
-        resultado = use_case.execute(
+            # Confirma já: a gravação do mapeamento pegou o lock de escrita, e
+            # ele ficaria preso enquanto o upload inteiro é copiado para o storage
+            db_session.commit()
+
+        # O parse e a gravação rodam no executor de tarefas: a requisição só
+        # salva o arquivo e devolve o id para acompanhar em /api/tarefas/<id>
+        use_case = EnfileirarImportacaoExtrato(
+            TarefaRepositorySqlite(db_session),
+            ImportacaoStorageLocal(),
+            importador,
+        )
+        tarefa = use_case.execute(
             id_usuario=id_usuario,
-            file_bytes=conteudo,
+            file_stream=arquivo.stream,
             file_name=arquivo.filename,
             column_mapping=mapping,
             mapping_id=mapping_id,
             sem_cabecalho=sem_cabecalho,
+            tolerante=tolerante,
+            id_importacao=id_importacao,
         )
+        db_session.commit()
+        executor_tarefas.notificar()
 
+        resposta = {
+            "id_tarefa": tarefa.id,
+            "status": tarefa.status.value,
+            "url_status": f"/api/tarefas/{tarefa.id}",
+        }
         if saved_mapping_id:
-            resultado["mapeamento_salvo_id"] = saved_mapping_id
-
-        db_session.commit()
-        return jsonify(resultado), 201
+            resposta["mapeamento_salvo_id"] = saved_mapping_id
+        return jsonify(resposta), 202, {"Location": resposta["url_status"]}
 
     except ValueError as e:
         db_session.rollback()
@@ -333,10 +447,59 @@ def importar_extrato_route():
         db_session.close()
 
 
+@transacao_bp.route("/importacao/preview", methods=["POST"])
+def preview_importacao_route():
+    """
+    Pré-visualiza as primeiras linhas de um CSV (o cliente pode enviar só o
+    começo do arquivo): dialeto, cabeçalho, mapeamento resolvido, formatos
+    detectados e as linhas convertidas. Nada é gravado.
+    """
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+
+    try:
+        arquivo = request.files.get("arquivo")
+        if not arquivo or not arquivo.filename:
+            return jsonify({"erro": "Nenhum arquivo enviado."}), 400
+
+        try:
+            mapping_payload = request.form.get("mapeamento_colunas")
+            mapping = json.loads(mapping_payload) if mapping_payload else None
+        except json.JSONDecodeError:
+            return jsonify({"erro": "Mapeamento de colunas inválido."}), 400
+
+        try:
+            linhas = request.form.get("linhas")
+            linhas = int(linhas) if linhas else None
+        except ValueError:
+            return jsonify({"erro": "Parâmetro 'linhas' inválido."}), 400
+
+        use_case = PreviewImportacaoCSV(
+            MapeamentoCSVRepositorySqlite(db_session), indice_mapeamentos_csv
+        )
+        resultado = use_case.execute(
+            id_usuario=id_usuario,
+            file_stream=arquivo.stream,
+            file_name=arquivo.filename,
+            column_mapping=mapping,
+            mapping_id=request.form.get("id_mapeamento") or None,
+            sem_cabecalho=request.form.get("sem_cabecalho", "").lower() == "true",
+            linhas=linhas,
+        )
+        return jsonify(resultado), 200
+
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
 @transacao_bp.route("/importacao/mapeamentos", methods=["GET"])
 def listar_mapeamentos_route():
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
     try:
         repo = MapeamentoCSVRepositorySqlite(db_session)
         use_case = ListarMapeamentosCSV(repo)
@@ -358,28 +521,255 @@ def listar_mapeamentos_route():
         db_session.close()
 
 
+def _serialize_linha_quarentena(linha) -> dict:
+    return {
+        "id": linha.id,
+        "arquivo": linha.arquivo,
+        "formato": linha.formato,
+        "numero_linha": linha.numero_linha,
+        "motivo": linha.motivo,
+        "conteudo": linha.conteudo,
+    }
+
+
+@transacao_bp.route("/importacao/quarentena/<id_importacao>", methods=["GET"])
+def listar_quarentena_route(id_importacao: str):
+    """Linhas rejeitadas por uma importação tolerante."""
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+    try:
+        use_case = ListarQuarentena(LinhaQuarentenaRepositorySqlite(db_session))
+        linhas = use_case.execute(id_usuario, id_importacao)
+        return jsonify([_serialize_linha_quarentena(linha) for linha in linhas]), 200
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 404
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@transacao_bp.route(
+    "/importacao/quarentena/<id_importacao>/reprocessar", methods=["POST"]
+)
+def reprocessar_quarentena_route(id_importacao: str):
+    """
+    Importa de novo as linhas da quarentena, opcionalmente com outro
+    mapeamento ('mapeamento_colunas' ou 'id_mapeamento'), sem reenviar o
+    arquivo.
+    """
+    id_usuario = "usuario_mock_id"
+    payload = request.json or {}
+    db_session = get_db_session()
+
+    try:
+        quarentena_repo = LinhaQuarentenaRepositorySqlite(db_session)
+        importador = ImportarExtratoBancario(
+            TransacaoRepositorySqlite(db_session),
+            MapeamentoCSVRepositorySqlite(db_session),
+            indice_mapeamentos_csv,
+            RegraCategorizacaoRepositorySqlite(db_session),
+            quarentena_repo,
+            registro=registro_parsers,
+        )
+        use_case = ReprocessarQuarentena(importador, quarentena_repo)
+        resultado = use_case.execute(
+            id_usuario=id_usuario,
+            id_importacao=id_importacao,
+            column_mapping=payload.get("mapeamento_colunas") or None,
+            mapping_id=payload.get("id_mapeamento") or None,
+        )
+        db_session.commit()
+        return jsonify(resultado), 200
+
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@transacao_bp.route("/importacao/quarentena/<id_importacao>", methods=["DELETE"])
+def descartar_quarentena_route(id_importacao: str):
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_session()
+
+    try:
+        use_case = DescartarQuarentena(LinhaQuarentenaRepositorySqlite(db_session))
+        removidas = use_case.execute(id_usuario, id_importacao)
+        db_session.commit()
+        return jsonify({"removidas": removidas}), 200
+
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"erro": str(e)}), 404
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@transacao_bp.route("/importacao/arquivo", methods=["GET"])
+def listar_extratos_arquivados_route():
+    """Extratos guardados no envio, disponíveis para reprocessar."""
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_read_session()
+    try:
+        use_case = ListarExtratosArquivados(
+            ExtratoArquivadoRepositorySqlite(db_session)
+        )
+        extratos = use_case.execute(
+            id_usuario, request.args.get("id_importacao") or None
+        )
+        return jsonify(
+            [
+                {
+                    "id": extrato.id,
+                    "id_importacao": extrato.id_importacao,
+                    "arquivo": extrato.arquivo,
+                    "tamanho_bytes": extrato.tamanho_bytes,
+                    "parametros": extrato.parametros,
+                    "criado_em": extrato.criado_em.isoformat(),
+                }
+                for extrato in extratos
+            ]
+        ), 200
+    except Exception as e:
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@transacao_bp.route("/importacao/arquivo/reprocessar", methods=["POST"])
+def reprocessar_extratos_arquivados_route():
+    """
+    Importa de novo, em segundo plano, os extratos arquivados das
+    importações em 'ids_importacao' (todas, se omitido), opcionalmente com
+    outro mapeamento ('mapeamento_colunas' ou 'id_mapeamento'). Com
+    'substituir', as transações gravadas por elas são removidas antes,
+    inclusive as já revisadas, depois de validado o novo mapeamento.
+    """
+    id_usuario = "usuario_mock_id"
+    payload = request.json or {}
+    db_session = get_db_session()
+
+    try:
+        tolerante = payload.get("tolerante")
+        use_case = EnfileirarReprocessamentoExtratos(
+            TarefaRepositorySqlite(db_session),
+            ExtratoArquivadoRepositorySqlite(db_session),
+            ImportarExtratoBancario(
+                TransacaoRepositorySqlite(db_session),
+                MapeamentoCSVRepositorySqlite(db_session),
+                registro=registro_parsers,
+            ),
+        )
+        tarefa = use_case.execute(
+            id_usuario=id_usuario,
+            ids_importacao=payload.get("ids_importacao") or None,
+            column_mapping=payload.get("mapeamento_colunas") or None,
+            mapping_id=payload.get("id_mapeamento") or None,
+            tolerante=None if tolerante is None else bool(tolerante),
+            substituir=bool(payload.get("substituir")),
+        )
+        db_session.commit()
+        executor_tarefas.notificar()
+
+        resposta = {
+            "id_tarefa": tarefa.id,
+            "status": tarefa.status.value,
+            "url_status": f"/api/tarefas/{tarefa.id}",
+            "ids_importacao": tarefa.payload["ids_importacao"],
+        }
+        return jsonify(resposta), 202, {"Location": resposta["url_status"]}
+
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
+@transacao_bp.route("/importacao/<id_importacao>", methods=["DELETE"])
+def desfazer_importacao_route(id_importacao: str):
+    """
+    Remove as transações e a quarentena de uma importação. O commit é feito
+    a cada lote removido, para não prender o lock de escrita do SQLite.
+    """
+    id_usuario = "usuario_mock_id"
+    db_session = get_db_session()
+
+    try:
+        use_case = DesfazerImportacao(
+            TransacaoRepositorySqlite(db_session),
+            LinhaQuarentenaRepositorySqlite(db_session),
+            TarefaRepositorySqlite(db_session),
+            tamanho_lote=IMPORTACAO_TAMANHO_LOTE,
+        )
+        resultado = use_case.execute(
+            id_usuario, id_importacao, ao_remover_lote=lambda _: db_session.commit()
+        )
+        db_session.commit()
+        return jsonify(resultado), 200
+
+    except ValueError as e:
+        db_session.rollback()
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        db_session.rollback()
+        return jsonify({"erro": f"Erro interno: {e}"}), 500
+    finally:
+        db_session.close()
+
+
 @transacao_bp.route("/inbox", methods=["GET"])
 def get_inbox_route():
     # --- Inbox padrão agora usa Filtros ---
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
+    streaming = False
     try:
+        paginado, cursor, limite = _parse_paginacao(request.args)
+
         transacao_repo = TransacaoRepositorySqlite(db_session)
         use_case = FiltrarTransacoes(transacao_repo)
+
+        if _is_stream(request.args):
+            lotes = use_case.execute_stream(id_usuario=id_usuario)
+            streaming = True
+            return stream_transacoes_json(lotes, db_session)
+
+        if paginado:
+            pagina = use_case.execute_paginado(
+                id_usuario=id_usuario, cursor=cursor, limite=limite
+            )
+            return jsonify(serialize_pagina(pagina)), 200
+
         transacoes = use_case.execute(id_usuario=id_usuario)
 
         transacoes_json = [serialize_transacao(t) for t in transacoes]
         return jsonify(transacoes_json), 200
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
     except Exception as e:
         return jsonify({"erro": f"Erro interno: {e}"}), 500
     finally:
-        db_session.close()
+        if not streaming:
+            db_session.close()
 
 
 @transacao_bp.route("/inbox/filtrar", methods=["GET"])
 def filtrar_inbox_route():
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
+    streaming = False
 
     try:
         args = request.args
@@ -418,9 +808,25 @@ def filtrar_inbox_route():
             "sem_perfil": sem_perfil,
         }
 
+        paginado, cursor, limite = _parse_paginacao(args)
+
         transacao_repo = TransacaoRepositorySqlite(db_session)
         use_case = FiltrarTransacoes(transacao_repo)
 
+        # Busca ranqueada (ex: /filtrar?descricao=mercado&ordenar=relevancia)
+        if args.get("ordenar") == "relevancia":
+            transacoes = use_case.execute_por_relevancia(limite=limite, **params)
+            return jsonify([serialize_transacao(t) for t in transacoes]), 200
+
+        if _is_stream(args):
+            lotes = use_case.execute_stream(**params)
+            streaming = True
+            return stream_transacoes_json(lotes, db_session)
+
+        if paginado:
+            pagina = use_case.execute_paginado(cursor=cursor, limite=limite, **params)
+            return jsonify(serialize_pagina(pagina)), 200
+
         transacoes = use_case.execute(**params)
 
         transacoes_json = [serialize_transacao(t) for t in transacoes]
@@ -431,7 +837,8 @@ def filtrar_inbox_route():
     except Exception as e:
         return jsonify({"erro": f"Erro interno: {e}"}), 500
     finally:
-        db_session.close()
+        if not streaming:
+            db_session.close()
 
 
 @transacao_bp.route("/inbox/categorizar", methods=["POST"])
@@ -475,12 +882,12 @@ def categorizar_em_lote_route():
 @transacao_bp.route("/dashboard/stats", methods=["GET"])
 def get_dashboard_stats_route():
     id_usuario = "usuario_mock_id"
-    db_session = get_db_session()
+    db_session = get_db_read_session()
 
     try:
         transacao_repo = TransacaoRepositorySqlite(db_session)
 
-        use_case = ObterEstatisticasDashboard(transacao_repo)
+        use_case = ObterEstatisticasDashboard(transacao_repo, dashboard_cache)
         estatisticas = use_case.execute(id_usuario=id_usuario)
 
         return jsonify(estatisticas), 200
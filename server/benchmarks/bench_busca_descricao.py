@@ -0,0 +1,126 @@
+"""
+Benchmark da busca por descrição: LIKE '%termo%' x índice FTS5 (trigram).
+
+Popula um banco temporário com transações de descrições variadas e mede a
+latência do filtro 'descricao' nos dois modos, além da busca ranqueada.
+
+Uso:
+    python server/benchmarks/bench_busca_descricao.py --linhas 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, TipoTransacao
+from infra.db.database import Base, create_sqlite_engine
+from infra.db.migrations import aplicar_migracoes
+from infra.db.models import Transacao as ModelTransacao
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+ID_USUARIO = "usuario_bench"
+ESTABELECIMENTOS = [
+    "SUPERMERCADO EXTRA", "PADARIA PAO QUENTE", "POSTO SHELL", "UBER TRIP",
+    "IFOOD RESTAURANTE", "FARMACIA DROGASIL", "NETFLIX.COM", "PIX RECEBIDO",
+    "AMAZON MARKETPLACE", "MERCADO LIVRE", "CINEMARK", "ACADEMIA SMART FIT",
+]
+TERMOS = ["drogasil", "smart fit 12", "quente 0042", "xyz-inexistente"]
+
+
+def _linhas(qtd: int, semente: int = 42):
+    rnd = random.Random(semente)
+    base = datetime(2020, 1, 1)
+    for i in range(qtd):
+        yield {
+            "id": str(uuid.uuid4()),
+            "valor": round(rnd.uniform(1, 500), 2),
+            "tipo": TipoTransacao.DESPESA,
+            "data": base + timedelta(minutes=i),
+            "status": StatusTransacao.PROCESSADO,
+            "id_usuario": ID_USUARIO,
+            "descricao": f"{rnd.choice(ESTABELECIMENTOS)} {rnd.randint(1, 9999):04d}",
+        }
+
+
+def _medir(funcao, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        aplicar_migracoes(engine)
+
+        inicio = time.perf_counter()
+        lote = []
+        with engine.begin() as conn:
+            for linha in _linhas(args.linhas):
+                lote.append(linha)
+                if len(lote) == 10_000:
+                    conn.execute(insert(ModelTransacao), lote)
+                    lote = []
+            if lote:
+                conn.execute(insert(ModelTransacao), lote)
+        print(
+            f"{args.linhas} linhas inseridas (com triggers FTS) em "
+            f"{time.perf_counter() - inicio:.1f}s"
+        )
+
+        session = sessionmaker(bind=engine)()
+        repo = TransacaoRepositorySqlite(session)
+        like = ModelTransacao.descricao.like
+
+        print(f"{'termo':<18} {'LIKE':>10} {'FTS':>10} {'ranqueada':>10}")
+        for termo in TERMOS:
+
+            def por_like():
+                return (
+                    repo._query_by_filters(ID_USUARIO)
+                    .filter(like(f"%{termo}%"))
+                    .limit(args.limite)
+                    .all()
+                )
+
+            def por_fts():
+                return repo.get_by_filters(
+                    ID_USUARIO, descricao=termo, limite=args.limite
+                )
+
+            def ranqueada():
+                return repo.search_by_descricao(ID_USUARIO, termo, args.limite)
+
+            tempos = [
+                _medir(f, args.repeticoes) for f in (por_like, por_fts, ranqueada)
+            ]
+            print(
+                f"{termo:<18} {tempos[0]:>8.1f}ms {tempos[1]:>8.1f}ms "
+                f"{tempos[2]:>8.1f}ms"
+            )
+
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark do decodificador de linhas do CSV: custo por linha do parse.
+
+Compara o decodificador compilado por arquivo (formato da data e convenção
+do valor detectados numa amostra, colunas acessadas por posição) com o
+caminho genérico anterior (um dict por linha, strptime tentando os formatos
+em sequência e a cadeia de replace no valor). Mede só o parse, sem banco.
+
+Uso:
+    python server/benchmarks/bench_decodificador_csv.py --tamanhos 100000,1000000
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from itertools import islice
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from bench_importacao import gerar_csv
+from use_cases.parsers.csv import CsvExtratoParser
+
+
+class _DecodificadorGenerico(CsvExtratoParser):
+    """Reproduz o decodificador anterior: dict por linha e parse genérico."""
+
+    def _compilar_decodificador(self, fieldnames, mapping, amostra):
+        def decodificar(row):
+            row_dict = {
+                fieldnames[idx]: row[idx].strip() if idx < len(row) else ""
+                for idx in range(len(fieldnames))
+            }
+            data_str = (row_dict.get(mapping["data"]) or "").strip()
+            valor_raw = (row_dict.get(mapping["valor"]) or "").strip()
+            descricao = (row_dict.get(mapping["descricao"]) or "").strip()
+            valor, tipo = self._parse_valor(valor_raw)
+            return {
+                "data": self._parse_date(data_str),
+                "valor": valor,
+                "tipo": tipo,
+                "descricao": descricao or None,
+            }
+
+        return decodificar
+
+
+def _medir(parser: CsvExtratoParser, conteudo: bytes) -> tuple[int, float, float]:
+    """Retorna (linhas, segundos só do decodificador, segundos do parse todo)."""
+    fieldnames = ["Data", "Valor", "Descricao"]
+    mapping = {"data": "Data", "valor": "Valor", "descricao": "Descricao"}
+    linhas = [
+        linha.rstrip("\n").split(";")
+        for linha in islice(io.StringIO(conteudo.decode("utf-8")), 1, None)
+    ]
+
+    inicio = time.perf_counter()
+    decodificar = parser._compilar_decodificador(
+        fieldnames, mapping, linhas[: parser.AMOSTRA_DECODIFICADOR]
+    )
+    for row in linhas:
+        decodificar(row)
+    so_decodificador = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    total = sum(1 for _ in parser._iter_csv(io.BytesIO(conteudo), None))
+    parse_completo = time.perf_counter() - inicio
+    return total, so_decodificador, parse_completo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", default="100000,1000000")
+    args = parser.parse_args()
+
+    print(
+        f"{'linhas':>10} {'decodificador':<14} "
+        f"{'us/linha (dec)':>15} {'us/linha (parse)':>17}"
+    )
+    for qtd in (int(t) for t in args.tamanhos.split(",")):
+        conteudo = gerar_csv(qtd)
+        for nome, parser_csv in (
+            ("genérico", _DecodificadorGenerico(None)),
+            ("compilado", CsvExtratoParser(None)),
+        ):
+            total, dec, completo = _medir(parser_csv, conteudo)
+            print(
+                f"{total:>10} {nome:<14} "
+                f"{dec / total * 1e6:>15.2f} {completo / total * 1e6:>17.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark da importação de extratos: linhas por segundo do ImportarExtratoBancario.
+
+Gera extratos CSV sintéticos com o tamanho pedido e importa cada um em um
+banco temporário (com as migrações aplicadas, como em produção), medindo
+parse + inserção + commit. Com --comparar, mede também o caminho antigo
+(um repo.add por linha) para os tamanhos até 100 mil linhas.
+
+Uso:
+    python server/benchmarks/bench_importacao.py --tamanhos 10000,100000,1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, Transacao
+from infra.db.database import Base, create_sqlite_engine
+from infra.db.migrations import aplicar_migracoes
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from sqlalchemy.orm import sessionmaker
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+from use_cases.parsers.csv import CsvExtratoParser
+
+ID_USUARIO = "usuario_bench"
+LIMITE_COMPARACAO = 100_000
+
+
+def gerar_csv(qtd: int, semente: int = 42) -> bytes:
+    rnd = random.Random(semente)
+    base = datetime(2020, 1, 1)
+    linhas = ["Data;Valor;Descricao"]
+    for i in range(qtd):
+        data = (base + timedelta(hours=i)).strftime("%d/%m/%Y")
+        centavos = rnd.randint(1, 90_000) * rnd.choice((1, -1))
+        valor = f"{centavos / 100:.2f}".replace(".", ",")
+        linhas.append(f"{data};{valor};COMPRA CARTAO {rnd.randint(1, 99999):05d}")
+    return ("\n".join(linhas) + "\n").encode("utf-8")
+
+
+class _ImportacaoLinhaALinha(ImportarExtratoBancario):
+    """Reproduz o caminho anterior ao add_many: um repo.add por transação."""
+
+    def execute(self, id_usuario, file_bytes, file_name, **kwargs):
+        transacoes = CsvExtratoParser(None).parse(
+            id_usuario=id_usuario, file_bytes=file_bytes, file_name=file_name
+        )
+        for dados in transacoes:
+            self.transacao_repo.add(
+                Transacao(
+                    id_usuario=id_usuario,
+                    valor=dados["valor"],
+                    tipo=dados["tipo"],
+                    data=dados["data"],
+                    descricao=dados.get("descricao"),
+                    status=StatusTransacao.PENDENTE,
+                )
+            )
+        return {"total_importadas": len(transacoes)}
+
+
+def _importar(caso_de_uso, conteudo: bytes) -> tuple[int, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        aplicar_migracoes(engine)
+        session = sessionmaker(bind=engine, autoflush=False)()
+
+        use_case = caso_de_uso(TransacaoRepositorySqlite(session))
+        inicio = time.perf_counter()
+        resultado = use_case.execute(
+            id_usuario=ID_USUARIO, file_bytes=conteudo, file_name="extrato.csv"
+        )
+        session.commit()
+        decorrido = time.perf_counter() - inicio
+
+        session.close()
+        engine.dispose()
+    return resultado["total_importadas"], decorrido
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", default="10000,100000,1000000")
+    parser.add_argument("--comparar", action="store_true")
+    args = parser.parse_args()
+
+    resultados = []
+    for qtd in (int(t) for t in args.tamanhos.split(",")):
+        conteudo = gerar_csv(qtd)
+        modos = [("add_many", ImportarExtratoBancario)]
+        if args.comparar and qtd <= LIMITE_COMPARACAO:
+            modos.append(("add por linha", _ImportacaoLinhaALinha))
+        for nome, caso_de_uso in modos:
+            # Silencia os prints do repositório (um por linha no caminho antigo)
+            with open(os.devnull, "w") as nulo:
+                stdout, sys.stdout = sys.stdout, nulo
+                try:
+                    total, segundos = _importar(caso_de_uso, conteudo)
+                finally:
+                    sys.stdout = stdout
+            resultados.append((qtd, nome, total, segundos))
+
+    print(f"{'linhas':>10} {'modo':<14} {'segundos':>10} {'linhas/s':>12}")
+    for qtd, nome, total, segundos in resultados:
+        print(f"{qtd:>10} {nome:<14} {segundos:>10.2f} {total / segundos:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
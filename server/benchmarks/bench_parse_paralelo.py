@@ -0,0 +1,89 @@
+"""
+Benchmark do parse paralelo de um CSV grande: linhas por segundo por número de processos.
+
+Gera um extrato sintético em disco (variante com descrições entre aspas) e
+faz o parse com CsvExtratoParser usando 1, 2, 4... processos, conferindo
+que a saída paralela é idêntica à sequencial. Mede só o parse, sem banco.
+O ganho depende dos núcleos da máquina: com um núcleo, só aparece o custo
+do pool.
+
+Uso:
+    python server/benchmarks/bench_parse_paralelo.py --linhas 5000000 --processos 1,2,4,8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from gerador_extratos import VARIANTES_CSV, gerar_csv
+from use_cases.parsers.csv import CsvExtratoParser
+
+
+def _parsear(caminho: str, variante: str, processos: int) -> tuple[list, float]:
+    column_mapping = VARIANTES_CSV[variante].column_mapping()
+    inicio = time.perf_counter()
+    with open(caminho, "rb") as arquivo:
+        registros = [
+            registro
+            for lote in CsvExtratoParser(None).parse_stream(
+                id_usuario=None,
+                file_stream=arquivo,
+                file_name=os.path.basename(caminho),
+                column_mapping=column_mapping,
+                sem_cabecalho=column_mapping is not None,
+                processos=processos,
+            )
+            for registro in lote
+        ]
+    return registros, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--processos", default="1,2,4,8")
+    parser.add_argument("--variante", default="br_virgula_aspas")
+    parser.add_argument(
+        "--trecho-mb",
+        type=float,
+        default=None,
+        help="Tamanho do trecho de cada processo (padrão do parser: 16 MB)",
+    )
+    args = parser.parse_args()
+
+    if args.trecho_mb:
+        CsvExtratoParser.TAMANHO_TRECHO = int(args.trecho_mb * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "extrato.csv")
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(gerar_csv(args.linhas, args.variante))
+        tamanho_mb = os.path.getsize(caminho) / 1024 / 1024
+        print(
+            f"{args.linhas} linhas, {tamanho_mb:.1f} MB, "
+            f"trecho {CsvExtratoParser.TAMANHO_TRECHO / 1024 / 1024:.1f} MB, "
+            f"{os.cpu_count()} núcleos"
+        )
+
+        print(f"{'processos':>9} {'segundos':>9} {'linhas/s':>12} {'ganho':>6}")
+        referencia, base = None, None
+        for processos in (int(p) for p in args.processos.split(",")):
+            registros, segundos = _parsear(caminho, args.variante, processos)
+            if referencia is None:
+                referencia, base = registros, segundos
+            elif registros != referencia:
+                raise SystemExit(f"Saída com {processos} processos difere da sequencial")
+            print(
+                f"{processos:>9} {segundos:>9.2f} "
+                f"{len(registros) / segundos:>12,.0f} {base / segundos:>5.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark de concorrência leitura/escrita no SQLite.
+
+Compara o perfil "legado" (rollback journal, sem busy_timeout) com o perfil
+"producao" (WAL, cache, mmap, busy_timeout). Um escritor insere transações em
+lotes (simulando um importar_extrato) enquanto leitores executam a agregação
+do dashboard em paralelo.
+
+Uso:
+    python server/benchmarks/bench_sqlite_concorrencia.py --segundos 5 --leitores 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, TipoTransacao
+from infra.db.database import Base, create_sqlite_engine, get_engine_profile
+from infra.db.models import Transacao as ModelTransacao
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+ID_USUARIO = "usuario_bench"
+
+
+def _linhas(qtd: int):
+    base = datetime(2024, 1, 1)
+    for i in range(qtd):
+        yield {
+            "id": str(uuid.uuid4()),
+            "valor": float(i % 500 + 1),
+            "tipo": TipoTransacao.DESPESA if i % 3 else TipoTransacao.RECEITA,
+            "data": base + timedelta(minutes=i),
+            "status": StatusTransacao.PROCESSADO,
+            "id_usuario": ID_USUARIO,
+            "descricao": f"Lançamento {i}",
+        }
+
+
+def _executar(nome_perfil: str, segundos: float, leitores: int, lote: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_sqlite_engine(
+            url, get_engine_profile(nome_perfil), pool_size=leitores + 1
+        )
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(ModelTransacao), list(_linhas(20_000)))
+
+        valor = case(
+            (ModelTransacao.tipo == TipoTransacao.RECEITA, ModelTransacao.valor),
+            else_=-ModelTransacao.valor,
+        )
+        consulta = select(func.sum(valor)).where(
+            ModelTransacao.id_usuario == ID_USUARIO,
+            ModelTransacao.status == StatusTransacao.PROCESSADO,
+        )
+
+        parar = threading.Event()
+        contadores = {"leituras": 0, "escritas": 0, "erros_lock": 0}
+        latencias: list[float] = []
+        trava = threading.Lock()
+
+        def escritor():
+            while not parar.is_set():
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(ModelTransacao), list(_linhas(lote)))
+                        # Segura o lock de escrita como um import grande faria
+                        time.sleep(0.05)
+                    with trava:
+                        contadores["escritas"] += lote
+                except OperationalError:
+                    with trava:
+                        contadores["erros_lock"] += 1
+
+        def leitor():
+            while not parar.is_set():
+                inicio = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(consulta).scalar()
+                    with trava:
+                        contadores["leituras"] += 1
+                        latencias.append(time.perf_counter() - inicio)
+                except OperationalError:
+                    with trava:
+                        contadores["erros_lock"] += 1
+
+        threads = [threading.Thread(target=escritor)]
+        threads += [threading.Thread(target=leitor) for _ in range(leitores)]
+        for t in threads:
+            t.start()
+        time.sleep(segundos)
+        parar.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    latencias.sort()
+    p95 = latencias[int(len(latencias) * 0.95)] if latencias else 0.0
+    return {
+        "perfil": nome_perfil,
+        "leituras_por_s": contadores["leituras"] / segundos,
+        "linhas_escritas_por_s": contadores["escritas"] / segundos,
+        "erros_lock": contadores["erros_lock"],
+        "p95_leitura_ms": p95 * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--segundos", type=float, default=5.0)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--lote", type=int, default=2_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'perfil':<10} {'leituras/s':>12} {'escritas/s':>12} "
+        f"{'p95 leitura':>12} {'erros lock':>11}"
+    )
+    for nome in ("legado", "producao"):
+        r = _executar(nome, args.segundos, args.leitores, args.lote)
+        print(
+            f"{r['perfil']:<10} {r['leituras_por_s']:>12.1f} "
+            f"{r['linhas_escritas_por_s']:>12.1f} {r['p95_leitura_ms']:>10.1f}ms "
+            f"{r['erros_lock']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
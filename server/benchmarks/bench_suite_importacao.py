@@ -0,0 +1,222 @@
+"""
+Suíte de benchmarks da importação: todas as variantes de extrato x tamanhos.
+
+Para cada variante do gerador_extratos (CSV com delimitadores, formatos de
+data e decimais diferentes, com e sem cabeçalho; OFX SGML e XML) e cada
+tamanho, importa o arquivo com o ImportarExtratoBancario em um banco
+temporário e mede linhas/s do parse, linhas/s da inserção (com commit) e o
+pico de memória (RSS). Cada caso roda em um processo novo, para o pico de
+RSS ser só dele. Os resultados podem ser salvos em JSON e comparados com os
+de outro commit.
+
+Uso:
+    python server/benchmarks/bench_suite_importacao.py --tamanhos 10000,100000 --saida atual.json [--comparar-com anterior.json]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from gerador_extratos import VARIANTES, VARIANTES_CSV, gerar_extrato
+
+try:
+    import resource
+except ImportError:  # Windows: o pico de RSS não é medido
+    resource = None
+
+ID_USUARIO = "usuario_bench"
+
+
+def _pico_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return pico / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _cronometrar(lotes: Iterator[List[Any]], tempos: Dict[str, float]) -> Iterator:
+    """Soma em tempos['parse'] o tempo gasto produzindo cada lote."""
+    while True:
+        inicio = time.perf_counter()
+        try:
+            lote = next(lotes)
+        except StopIteration:
+            tempos["parse"] += time.perf_counter() - inicio
+            return
+        tempos["parse"] += time.perf_counter() - inicio
+        yield lote
+
+
+def _medir_caso(caminho: str, variante: str) -> Dict[str, Any]:
+    """Executado em um processo novo: importa o arquivo e devolve as medidas."""
+    from infra.db.database import Base, create_sqlite_engine
+    from infra.db.migrations import aplicar_migracoes
+    from infra.repositories.transacao_repository_sqlite import (
+        TransacaoRepositorySqlite,
+    )
+    from sqlalchemy.orm import sessionmaker
+    from use_cases.importacao_use_cases import ImportarExtratoBancario
+
+    rss_inicial = _pico_rss_mb()
+    column_mapping = None
+    if variante in VARIANTES_CSV:
+        column_mapping = VARIANTES_CSV[variante].column_mapping()
+
+    # Silencia os prints das migrações e do repositório (um por lote)
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as nulo:
+        engine = create_sqlite_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with redirect_stdout(nulo):
+            aplicar_migracoes(engine)
+        session = sessionmaker(bind=engine, autoflush=False)()
+        importador = ImportarExtratoBancario(TransacaoRepositorySqlite(session))
+        parser = importador.get_parser(caminho)
+
+        tempos = {"parse": 0.0}
+        with open(caminho, "rb") as arquivo, redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            lotes = parser.parse_stream(
+                id_usuario=ID_USUARIO,
+                file_stream=arquivo,
+                file_name=os.path.basename(caminho),
+                column_mapping=column_mapping,
+                sem_cabecalho=column_mapping is not None,
+                tamanho_lote=importador.TAMANHO_LOTE,
+            )
+            resultado = importador.gravar_lotes(ID_USUARIO, _cronometrar(lotes, tempos))
+            session.commit()
+            total = time.perf_counter() - inicio
+
+        session.close()
+        engine.dispose()
+
+    linhas = resultado["total_importadas"]
+    insercao = total - tempos["parse"]
+    pico_rss = _pico_rss_mb()
+    return {
+        "linhas_importadas": linhas,
+        "segundos_parse": round(tempos["parse"], 4),
+        "segundos_insercao": round(insercao, 4),
+        "parse_linhas_s": round(linhas / tempos["parse"]) if tempos["parse"] else None,
+        "insercao_linhas_s": round(linhas / insercao) if insercao else None,
+        "total_linhas_s": round(linhas / total) if total else None,
+        "rss_inicial_mb": round(rss_inicial, 1) if rss_inicial else None,
+        "pico_rss_mb": round(pico_rss, 1) if pico_rss else None,
+    }
+
+
+def executar_caso(variante: str, linhas: int, pasta: str) -> Dict[str, Any]:
+    conteudo, nome = gerar_extrato(linhas, variante)
+    caminho = os.path.join(pasta, nome)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(conteudo)
+    del conteudo
+
+    caso = {
+        "variante": variante,
+        "formato": os.path.splitext(nome)[1][1:],
+        "linhas": linhas,
+        "bytes": os.path.getsize(caminho),
+        "erro": None,
+    }
+    # spawn: o processo filho não herda a memória (nem o pico) deste
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(1) as pool:
+        try:
+            caso.update(pool.apply(_medir_caso, (caminho, variante)))
+        except Exception as e:
+            caso["erro"] = str(e)
+    os.remove(caminho)
+    return caso
+
+
+def _commit_atual() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _imprimir(resultados: List[Dict[str, Any]], anteriores: Dict[tuple, Dict]) -> None:
+    print(
+        f"{'variante':<22} {'linhas':>9} {'parse/s':>10} {'inserção/s':>11} "
+        f"{'total/s':>10} {'pico RSS':>9} {'vs. anterior':>13}"
+    )
+    for caso in resultados:
+        if caso["erro"]:
+            print(f"{caso['variante']:<22} {caso['linhas']:>9} ERRO: {caso['erro']}")
+            continue
+        comparacao = ""
+        anterior = anteriores.get((caso["variante"], caso["linhas"]))
+        if anterior and anterior.get("total_linhas_s"):
+            variacao = caso["total_linhas_s"] / anterior["total_linhas_s"] - 1
+            comparacao = f"{variacao:+.1%}"
+        pico = f"{caso['pico_rss_mb']:.0f} MB" if caso["pico_rss_mb"] else "-"
+        print(
+            f"{caso['variante']:<22} {caso['linhas']:>9} "
+            f"{caso['parse_linhas_s']:>10} {caso['insercao_linhas_s']:>11} "
+            f"{caso['total_linhas_s']:>10} {pico:>9} {comparacao:>13}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanhos", default="10000,100000")
+    parser.add_argument("--variantes", default=",".join(VARIANTES))
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados")
+    parser.add_argument(
+        "--comparar-com", help="JSON de uma execução anterior (ex: outro commit)"
+    )
+    args = parser.parse_args()
+
+    anteriores = {}
+    if args.comparar_com:
+        with open(args.comparar_com, encoding="utf-8") as arquivo:
+            for caso in json.load(arquivo)["resultados"]:
+                anteriores[(caso["variante"], caso["linhas"])] = caso
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in (int(t) for t in args.tamanhos.split(",")):
+            for variante in args.variantes.split(","):
+                resultados.append(executar_caso(variante, linhas, pasta))
+
+    _imprimir(resultados, anteriores)
+
+    if args.saida:
+        relatorio = {
+            "gerado_em": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit_atual(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "resultados": resultados,
+        }
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        print(f"Resultados gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Gerador determinístico de extratos sintéticos (CSV e OFX) para benchmarks.
+
+A mesma semente gera sempre os mesmos lançamentos; cada variante só muda a
+forma de escrevê-los: delimitador, formato de data, convenção decimal
+(1.234,56 ou 1,234.56), presença de cabeçalho e ordem das colunas, ou OFX
+1.x (SGML, cp1252) e 2.x (XML).
+
+Uso:
+    python server/benchmarks/gerador_extratos.py PASTA --linhas 100000 [--variantes br_ponto_virgula,ofx_xml]
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape
+
+ESTABELECIMENTOS = [
+    "SUPERMERCADO EXTRA", "PADARIA PÃO QUENTE", "POSTO SHELL", "UBER *TRIP",
+    "IFOOD *RESTAURANTE", "FARMÁCIA DROGASIL", "NETFLIX.COM", "AMAZON MARKETPLACE",
+    "MERCADO LIVRE", "CINEMARK", "ACADEMIA SMART FIT", "AÇOUGUE SÃO JOSÉ",
+]
+RECEITAS = ["PIX RECEBIDO", "TED RECEBIDA", "SALÁRIO", "RENDIMENTO POUPANÇA"]
+TARIFAS = ["TARIFA PACOTE SERVIÇOS", "IOF", "JUROS CHEQUE ESPECIAL"]
+
+
+@dataclass(frozen=True)
+class Lancamento:
+    data: datetime
+    centavos: int  # negativo para despesas
+    descricao: str
+    fitid: str
+
+
+@dataclass(frozen=True)
+class VarianteCSV:
+    delimitador: str
+    formato_data: str
+    decimal_virgula: bool
+    cabecalho: List[str] | None  # None: arquivo sem cabeçalho
+    # Posição de cada campo na linha
+    ordem: tuple[str, str, str] = ("data", "valor", "descricao")
+    # Prefixo "R$ " e separador de milhar nos valores
+    moeda: bool = False
+
+    def column_mapping(self) -> Dict[str, str] | None:
+        """Mapeamento por posição exigido pelos arquivos sem cabeçalho."""
+        if self.cabecalho is not None:
+            return None
+        return {campo: f"__col_{idx}" for idx, campo in enumerate(self.ordem)}
+
+
+VARIANTES_CSV: Dict[str, VarianteCSV] = {
+    "br_ponto_virgula": VarianteCSV(
+        ";", "%d/%m/%Y", True, ["Data", "Descrição", "Valor"],
+        ordem=("data", "descricao", "valor"), moeda=True,
+    ),
+    "br_virgula_aspas": VarianteCSV(
+        ",", "%d/%m/%Y", True, ["Data", "Valor", "Descricao"]
+    ),
+    "br_tab_sem_cabecalho": VarianteCSV("\t", "%d-%m-%Y", True, None),
+    "us_virgula": VarianteCSV(
+        ",", "%m/%d/%Y", False, ["Date", "Description", "Amount"],
+        ordem=("data", "descricao", "valor"), moeda=True,
+    ),
+    "us_sem_cabecalho": VarianteCSV(",", "%m/%d/%Y", False, None),
+    "iso_ponto_virgula": VarianteCSV(";", "%Y-%m-%d", False, ["Data", "Valor", "Memo"]),
+    "iso_tab": VarianteCSV("\t", "%Y-%m-%d", True, ["Dt", "Vl", "History"]),
+}
+VARIANTES_OFX = ("ofx_sgml", "ofx_xml")
+VARIANTES = list(VARIANTES_CSV) + list(VARIANTES_OFX)
+
+
+def gerar_lancamentos(qtd: int, semente: int = 42) -> Iterator[Lancamento]:
+    """
+    Lançamentos em ordem cronológica, de 5 a 40 por dia, com a proporção de
+    um extrato de conta corrente: muitas compras pequenas, poucas receitas.
+    """
+    rnd = random.Random(semente)
+    # Começa no dia 16: as primeiras linhas já distinguem dd/mm de mm/dd
+    dia = datetime(2023, 1, 16)
+    restantes_no_dia = rnd.randint(5, 40)
+    for i in range(qtd):
+        if restantes_no_dia == 0:
+            dia += timedelta(days=rnd.randint(1, 3))
+            restantes_no_dia = rnd.randint(5, 40)
+        restantes_no_dia -= 1
+
+        sorteio = rnd.random()
+        if sorteio < 0.08:
+            centavos = rnd.randint(10_000, 1_500_000)
+            descricao = f"{rnd.choice(RECEITAS)} {rnd.randint(1, 9999):04d}"
+        elif sorteio < 0.12:
+            centavos = -rnd.randint(50, 9_000)
+            descricao = rnd.choice(TARIFAS)
+        else:
+            centavos = -rnd.randint(100, 250_000)
+            descricao = f"{rnd.choice(ESTABELECIMENTOS)} {rnd.randint(1, 9999):04d}"
+        yield Lancamento(dia, centavos, descricao, f"{dia:%Y%m%d}{i:09d}")
+
+
+def formatar_valor(centavos: int, decimal_virgula: bool, moeda: bool) -> str:
+    sinal = "-" if centavos < 0 else ""
+    inteiro, resto = divmod(abs(centavos), 100)
+    milhar, decimal = (".", ",") if decimal_virgula else (",", ".")
+    inteiro_txt = f"{inteiro:,}".replace(",", milhar) if moeda else str(inteiro)
+    prefixo = "R$ " if moeda and decimal_virgula else ""
+    return f"{sinal}{prefixo}{inteiro_txt}{decimal}{resto:02d}"
+
+
+def gerar_csv(
+    qtd: int, variante: VarianteCSV | str = "br_ponto_virgula", semente: int = 42
+) -> bytes:
+    if isinstance(variante, str):
+        variante = VARIANTES_CSV[variante]
+
+    saida = io.StringIO()
+    # O csv.writer põe entre aspas os campos que contêm o delimitador
+    escritor = csv.writer(saida, delimiter=variante.delimitador, lineterminator="\n")
+    if variante.cabecalho is not None:
+        escritor.writerow(variante.cabecalho)
+    for lancamento in gerar_lancamentos(qtd, semente):
+        campos = {
+            "data": lancamento.data.strftime(variante.formato_data),
+            "valor": formatar_valor(
+                lancamento.centavos, variante.decimal_virgula, variante.moeda
+            ),
+            "descricao": lancamento.descricao,
+        }
+        escritor.writerow([campos[campo] for campo in variante.ordem])
+    return saida.getvalue().encode("utf-8")
+
+
+def _stmttrn(lancamento: Lancamento) -> Dict[str, str]:
+    return {
+        "TRNTYPE": "CREDIT" if lancamento.centavos >= 0 else "DEBIT",
+        "DTPOSTED": f"{lancamento.data:%Y%m%d}120000[-3:BRT]",
+        "TRNAMT": f"{lancamento.centavos / 100:.2f}",
+        "FITID": lancamento.fitid,
+        "MEMO": lancamento.descricao,
+    }
+
+
+def gerar_ofx(qtd: int, versao: str = "ofx_sgml", semente: int = 42) -> bytes:
+    """OFX 1.x (SGML sem tags de fechamento, cp1252) ou 2.x (XML, utf-8)."""
+    lancamentos = gerar_lancamentos(qtd, semente)
+    if versao == "ofx_xml":
+        partes = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE"?>\n'
+            "<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        ]
+        for lancamento in lancamentos:
+            campos = "".join(
+                f"<{tag}>{escape(valor)}</{tag}>"
+                for tag, valor in _stmttrn(lancamento).items()
+            )
+            partes.append(f"<STMTTRN>{campos}</STMTTRN>\n")
+        partes.append("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+        return "".join(partes).encode("utf-8")
+
+    partes = [
+        "OFXHEADER:100\r\nDATA:OFXSGML\r\nVERSION:102\r\nCHARSET:1252\r\n\r\n"
+        "<OFX>\r\n<BANKMSGSRSV1>\r\n<STMTTRNRS>\r\n<STMTRS>\r\n<BANKTRANLIST>\r\n"
+    ]
+    for lancamento in lancamentos:
+        campos = "".join(
+            f"<{tag}>{escape(valor)}\r\n" for tag, valor in _stmttrn(lancamento).items()
+        )
+        partes.append(f"<STMTTRN>\r\n{campos}</STMTTRN>\r\n")
+    partes.append(
+        "</BANKTRANLIST>\r\n</STMTRS>\r\n</STMTTRNRS>\r\n</BANKMSGSRSV1>\r\n</OFX>\r\n"
+    )
+    return "".join(partes).encode("cp1252")
+
+
+def gerar_extrato(qtd: int, variante: str, semente: int = 42) -> tuple[bytes, str]:
+    """Conteúdo e nome do arquivo (a extensão escolhe o parser)."""
+    if variante in VARIANTES_OFX:
+        return gerar_ofx(qtd, variante, semente), f"{variante}.ofx"
+    return gerar_csv(qtd, variante, semente), f"{variante}.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pasta", help="Pasta onde os extratos serão gravados")
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--variantes", default=",".join(VARIANTES))
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    for variante in args.variantes.split(","):
+        conteudo, nome = gerar_extrato(args.linhas, variante, args.semente)
+        caminho = os.path.join(args.pasta, nome)
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(conteudo)
+        print(f"{caminho}: {args.linhas} lançamentos, {len(conteudo) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
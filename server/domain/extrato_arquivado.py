@@ -0,0 +1,35 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+
+
+@dataclass
+class ExtratoArquivado:
+    """
+    Arquivo de extrato guardado como foi enviado, ligado à importação que o
+    gravou. Permite importá-lo de novo (ex: com outro mapeamento ou depois
+    de corrigir um parser) sem pedir o arquivo ao usuário.
+    """
+
+    id_usuario: str
+    id_importacao: str
+    # Nome enviado pelo usuário (ex: 'extrato.csv', 'extratos.zip')
+    arquivo: str
+    # SHA-256 dos bytes enviados: arquivos iguais dividem o mesmo conteúdo
+    hash_conteudo: str
+    tamanho_bytes: int
+    caminho_storage: str
+    # Compactação aplicada pelo arquivo ('.zst' ou '.gz'); vazia quando o
+    # envio já era compactado e foi guardado como veio
+    compressao: str = ""
+    # Parâmetros da importação original, usados de novo por padrão:
+    # column_mapping, mapping_id, sem_cabecalho e tolerante
+    parametros: Dict[str, Any] = field(default_factory=dict)
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    criado_em: datetime = field(default_factory=datetime.now)
+
+    @property
+    def nome_arquivado(self) -> str:
+        """Nome com a compactação do arquivo ('extrato.csv.zst')."""
+        return self.arquivo + self.compressao
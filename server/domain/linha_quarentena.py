@@ -0,0 +1,25 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+
+
+@dataclass
+class LinhaQuarentena:
+    """
+    Linha de extrato rejeitada numa importação tolerante. Guarda o conteúdo
+    bruto para ser reprocessada (ex: depois de corrigir o mapeamento) sem
+    reenviar o arquivo.
+    """
+
+    id_usuario: str
+    id_importacao: str
+    arquivo: str
+    # Linha do arquivo (CSV) ou posição do registro STMTTRN (OFX)
+    numero_linha: int
+    motivo: str
+    # CSV: {"cabecalho", "colunas", "mapeamento"}; OFX: campos do STMTTRN
+    conteudo: Dict[str, Any]
+    formato: str = "csv"
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    criado_em: datetime = field(default_factory=datetime.now)
@@ -1,5 +1,6 @@
 import uuid
 from dataclasses import dataclass, field
+from typing import Dict
 
 
 @dataclass
@@ -10,3 +11,22 @@ class MapeamentoCSV:
     coluna_valor: str
     coluna_descricao: str
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # Hash do cabeçalho do arquivo usado ao salvar: identifica os próximos
+    # extratos do mesmo banco (None se o arquivo não tinha cabeçalho)
+    assinatura_cabecalho: str | None = None
+
+    @property
+    def sem_cabecalho(self) -> bool:
+        """Arquivos sem cabeçalho são mapeados por posição (__col_0, __col_1...)."""
+        return all(
+            coluna.startswith("__col_")
+            for coluna in [self.coluna_data, self.coluna_valor, self.coluna_descricao]
+        )
+
+    def column_mapping(self) -> Dict[str, str]:
+        """Campo da transação -> coluna do CSV, no formato aceito pelos parsers."""
+        return {
+            "data": self.coluna_data,
+            "valor": self.coluna_valor,
+            "descricao": self.coluna_descricao,
+        }
@@ -0,0 +1,28 @@
+import uuid
+from dataclasses import dataclass, field
+from typing import List
+
+from domain.transacao import TipoTransacao
+
+
+@dataclass
+class RegraCategorizacao:
+    """
+    Regra do usuário que categoriza transações importadas. As condições
+    preenchidas precisam valer todas juntas (palavras-chave: basta uma
+    aparecer na descrição); a regra aplica a categoria e/ou o perfil.
+    """
+
+    id_usuario: str
+    nome: str
+    id_categoria: str | None = None
+    id_perfil: str | None = None
+    palavras_chave: List[str] = field(default_factory=list)
+    padrao_regex: str | None = None
+    valor_minimo: float | None = None
+    valor_maximo: float | None = None
+    tipo: TipoTransacao | None = None
+    # Entre regras que casam com a mesma transação, vence a maior prioridade
+    prioridade: int = 0
+    ativa: bool = True
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
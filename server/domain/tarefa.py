@@ -0,0 +1,39 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict
+
+
+class StatusTarefa(Enum):
+    PENDENTE = "PENDENTE"
+    EXECUTANDO = "EXECUTANDO"
+    CONCLUIDA = "CONCLUIDA"
+    FALHOU = "FALHOU"
+
+
+@dataclass
+class Tarefa:
+    """Trabalho demorado executado em segundo plano (ex: importar um extrato)."""
+
+    id_usuario: str
+    tipo: str
+    # Parâmetros do trabalho; precisa ser serializável em JSON
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: StatusTarefa = StatusTarefa.PENDENTE
+    tentativas: int = 0
+    max_tentativas: int = 3
+    progresso: float = 0.0
+    resultado: Dict[str, Any] | None = None
+    erro: str | None = None
+    criado_em: datetime = field(default_factory=datetime.now)
+    iniciado_em: datetime | None = None
+    finalizado_em: datetime | None = None
+    # Última vez que o executor deu sinal de vida enquanto rodava a tarefa
+    heartbeat_em: datetime | None = None
+
+    @property
+    def finalizada(self) -> bool:
+        return self.status in (StatusTarefa.CONCLUIDA, StatusTarefa.FALHOU)
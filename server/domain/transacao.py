@@ -27,6 +27,10 @@ class Transacao:
     id_categoria: str | None = None
     id_perfil: str | None = None
     id_projeto: str | None = None
+    # Identifica a linha do extrato de origem, para não importá-la duas vezes
+    fingerprint_importacao: str | None = None
+    # Importação que criou a transação (permite retomá-la ou desfazê-la)
+    id_importacao: str | None = None
 
     def __post_init__(self):
         if self.valor <= 0:
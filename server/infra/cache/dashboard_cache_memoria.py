@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from use_cases.cache_interface import IDashboardCache
+
+# Tempo máximo de vida de uma entrada, mesmo sem escritas. Cobre alterações
+# feitas fora deste processo (ex: manage.py rebuild-resumo) e a virada do mês.
+DASHBOARD_CACHE_TTL = float(os.environ.get("PLANO_DASHBOARD_CACHE_TTL", "60"))
+
+# Chave em Session.info com os usuários alterados na transação corrente
+USUARIOS_ALTERADOS = "usuarios_alterados"
+
+
+class DashboardCacheMemoria(IDashboardCache):
+    """
+    Implementação em memória (dicionário por processo) do cache do Dashboard.
+    Um hit custa uma busca no dicionário, sem abrir conexão com o banco.
+    """
+
+    def __init__(
+        self,
+        ttl_segundos: float = DASHBOARD_CACHE_TTL,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._versoes: Dict[str, int] = {}
+        # id_usuario -> (versao, expira_em, valor)
+        self._entradas: Dict[str, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def versao(self, id_usuario: str) -> int:
+        return self._versoes.get(id_usuario, 0)
+
+    def get(self, id_usuario: str) -> Dict[str, Any] | None:
+        with self._lock:
+            entrada = self._entradas.get(id_usuario)
+            if entrada:
+                versao, expira_em, valor = entrada
+                if versao == self.versao(id_usuario) and self._relogio() < expira_em:
+                    self.hits += 1
+                    return dict(valor)
+                del self._entradas[id_usuario]
+            self.misses += 1
+            return None
+
+    def set(self, id_usuario: str, valor: Dict[str, Any], versao: int) -> None:
+        with self._lock:
+            # Uma escrita aconteceu durante o cálculo: o valor já nasceu velho
+            if versao != self.versao(id_usuario):
+                return
+            expira_em = self._relogio() + self.ttl_segundos
+            self._entradas[id_usuario] = (versao, expira_em, dict(valor))
+
+    def invalidar(self, id_usuario: str) -> None:
+        with self._lock:
+            self._versoes[id_usuario] = self.versao(id_usuario) + 1
+            self._entradas.pop(id_usuario, None)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores de hit/miss para acompanhamento."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+                "entradas": len(self._entradas),
+                "ttl_segundos": self.ttl_segundos,
+            }
+
+
+# Instância única do processo, compartilhada pelas rotas
+dashboard_cache = DashboardCacheMemoria()
+
+
+def marcar_usuario_alterado(db_session: Session, id_usuario: str) -> None:
+    """
+    Registra na sessão que o usuário teve transações alteradas. A versão só é
+    incrementada no commit, para que nenhum leitor grave no cache um valor
+    calculado antes da escrita ficar visível.
+    """
+    db_session.info.setdefault(USUARIOS_ALTERADOS, set()).add(id_usuario)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(db_session: Session) -> None:
+    # Também disparado ao liberar um savepoint: espera o commit de verdade
+    if db_session.in_nested_transaction():
+        return
+    for id_usuario in db_session.info.pop(USUARIOS_ALTERADOS, ()):
+        dashboard_cache.invalidar(id_usuario)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_apos_rollback(db_session: Session) -> None:
+    # Voltar a um savepoint não desfaz as escritas dos lotes anteriores
+    if db_session.in_nested_transaction():
+        return
+    db_session.info.pop(USUARIOS_ALTERADOS, None)
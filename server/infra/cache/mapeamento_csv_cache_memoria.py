@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from domain.mapeamento_csv import MapeamentoCSV
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+
+# Cobre mapeamentos salvos por outro processo da aplicação
+MAPEAMENTO_CACHE_TTL = float(os.environ.get("PLANO_MAPEAMENTO_CACHE_TTL", "300"))
+
+# Chave em Session.info com os usuários que salvaram mapeamentos na transação
+USUARIOS_MAPEAMENTOS_ALTERADOS = "usuarios_mapeamentos_alterados"
+
+
+class IndiceMapeamentosCSVMemoria(IIndiceMapeamentosCSV):
+    """
+    Índice em memória (por processo) dos mapeamentos salvos de cada usuário.
+    Com o índice carregado, escolher o mapeamento de um CSV é uma busca no
+    dicionário, sem consulta ao banco.
+    """
+
+    def __init__(
+        self,
+        ttl_segundos: float = MAPEAMENTO_CACHE_TTL,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_segundos = ttl_segundos
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._versoes: Dict[str, int] = {}
+        # id_usuario -> (versao, expira_em, indice)
+        self._entradas: Dict[str, tuple] = {}
+
+    def indice(
+        self, id_usuario: str, carregar: Callable[[], Dict[str, MapeamentoCSV]]
+    ) -> Dict[str, MapeamentoCSV]:
+        with self._lock:
+            versao = self._versoes.get(id_usuario, 0)
+            entrada = self._entradas.get(id_usuario)
+            if entrada and entrada[0] == versao and self._relogio() < entrada[1]:
+                return entrada[2]
+
+        # A carga roda fora do lock: só consulta o banco quem teve miss
+        indice = carregar()
+        with self._lock:
+            # Um mapeamento salvo durante a carga deixa o índice desatualizado
+            if versao == self._versoes.get(id_usuario, 0):
+                expira_em = self._relogio() + self.ttl_segundos
+                self._entradas[id_usuario] = (versao, expira_em, indice)
+        return indice
+
+    def invalidar(self, id_usuario: str) -> None:
+        with self._lock:
+            self._versoes[id_usuario] = self._versoes.get(id_usuario, 0) + 1
+            self._entradas.pop(id_usuario, None)
+
+
+# Instância única do processo, compartilhada pelas rotas e pelas tarefas
+indice_mapeamentos_csv = IndiceMapeamentosCSVMemoria()
+
+
+def marcar_mapeamentos_alterados(db_session: Session, id_usuario: str) -> None:
+    """O índice do usuário é descartado só quando a transação for confirmada."""
+    db_session.info.setdefault(USUARIOS_MAPEAMENTOS_ALTERADOS, set()).add(id_usuario)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_apos_commit(db_session: Session) -> None:
+    # Também disparado ao liberar um savepoint: espera o commit de verdade
+    if db_session.in_nested_transaction():
+        return
+    for id_usuario in db_session.info.pop(USUARIOS_MAPEAMENTOS_ALTERADOS, ()):
+        indice_mapeamentos_csv.invalidar(id_usuario)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_apos_rollback(db_session: Session) -> None:
+    # Voltar a um savepoint não desfaz as escritas dos lotes anteriores
+    if db_session.in_nested_transaction():
+        return
+    db_session.info.pop(USUARIOS_MAPEAMENTOS_ALTERADOS, None)
@@ -0,0 +1,266 @@
+"""
+Migrações versionadas do schema SQLite.
+
+O `Base.metadata.create_all` só cria tabelas que ainda não existem: ele não
+adiciona índices nem colunas a um `plano.db` já criado. Cada migração abaixo
+é idempotente e fica registrada na tabela `schema_migracao`, permitindo
+atualizar bancos existentes no lugar, sem recriá-los.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+TABELA_VERSAO = "schema_migracao"
+# Tabela virtual FTS5 usada na busca por descrição
+TABELA_BUSCA = "transacao_busca"
+
+
+@dataclass(frozen=True)
+class Migracao:
+    """Passo de evolução do schema, aplicado uma única vez por banco."""
+
+    versao: int
+    descricao: str
+    comandos: tuple[str, ...] = ()
+    # Para migrações que precisam de lógica além de SQL puro
+    funcao: Callable[[Connection], None] | None = field(default=None, compare=False)
+
+    def aplicar(self, conn: Connection) -> None:
+        for comando in self.comandos:
+            conn.execute(text(comando))
+        if self.funcao:
+            self.funcao(conn)
+
+
+MIGRACOES: List[Migracao] = [
+    Migracao(
+        versao=1,
+        descricao="Índices de cobertura para inbox, filtros, reservas, usos e anexos",
+        comandos=(
+            "CREATE INDEX IF NOT EXISTS ix_transacao_usuario_status_data "
+            "ON transacao (id_usuario, status, data, tipo, valor)",
+            "CREATE INDEX IF NOT EXISTS ix_reserva_meta_valor "
+            "ON reserva (id_meta, valor)",
+            "CREATE INDEX IF NOT EXISTS ix_meta_uso_meta_valor "
+            "ON meta_uso (id_meta, valor)",
+            "CREATE INDEX IF NOT EXISTS ix_anexo_id_transacao "
+            "ON anexo (id_transacao)",
+            "CREATE INDEX IF NOT EXISTS ix_meta_usuario_data_limite "
+            "ON meta (id_usuario, data_limite)",
+        ),
+    ),
+    Migracao(
+        versao=2,
+        descricao="Popula o resumo mensal com as transações já existentes",
+        funcao=lambda conn: _reconstruir_resumo_mensal(conn),
+    ),
+    Migracao(
+        versao=3,
+        descricao="Índice FTS5 (trigram) para a busca por descrição",
+        comandos=(
+            # Tabela de conteúdo externo: o texto continua só em 'transacao';
+            # o FTS guarda apenas o índice de trigramas, ligado pelo rowid
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_BUSCA} USING fts5("
+            "descricao, content='transacao', content_rowid='rowid', "
+            "tokenize='trigram')",
+            "CREATE TRIGGER IF NOT EXISTS transacao_busca_ai "
+            "AFTER INSERT ON transacao BEGIN "
+            f"INSERT INTO {TABELA_BUSCA} (rowid, descricao) "
+            "VALUES (new.rowid, new.descricao); END",
+            "CREATE TRIGGER IF NOT EXISTS transacao_busca_ad "
+            "AFTER DELETE ON transacao BEGIN "
+            f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}, rowid, descricao) "
+            "VALUES ('delete', old.rowid, old.descricao); END",
+            "CREATE TRIGGER IF NOT EXISTS transacao_busca_au "
+            "AFTER UPDATE OF descricao ON transacao BEGIN "
+            f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}, rowid, descricao) "
+            "VALUES ('delete', old.rowid, old.descricao); "
+            f"INSERT INTO {TABELA_BUSCA} (rowid, descricao) "
+            "VALUES (new.rowid, new.descricao); END",
+        ),
+        funcao=lambda conn: reconstruir_indice_busca(conn),
+    ),
+    Migracao(
+        versao=4,
+        descricao="Fingerprint de importação (único por usuário) em transacao",
+        funcao=lambda conn: _adicionar_fingerprint_importacao(conn),
+    ),
+    Migracao(
+        versao=5,
+        descricao="Assinatura do cabeçalho em mapeamento_csv",
+        funcao=lambda conn: _adicionar_coluna(
+            conn, "mapeamento_csv", "assinatura_cabecalho", "VARCHAR"
+        ),
+    ),
+    Migracao(
+        versao=6,
+        descricao="Identificador da importação em transacao",
+        funcao=lambda conn: _adicionar_id_importacao(conn),
+    ),
+    Migracao(
+        versao=7,
+        descricao="Índice FTS da descrição ligado a uma chave inteira estável",
+        funcao=lambda conn: _chavear_busca_por_id_busca(conn),
+    ),
+    Migracao(
+        versao=8,
+        descricao="Índice da inbox na ordem da paginação (data e id decrescentes)",
+        comandos=(
+            # A paginação ordena por (status, data desc, id desc): sem o id e
+            # sem as direções no índice, o SQLite ordenava numa B-tree temporária
+            "DROP INDEX IF EXISTS ix_transacao_usuario_status_data",
+            "CREATE INDEX ix_transacao_usuario_status_data ON transacao "
+            "(id_usuario, status, data DESC, id DESC, tipo, valor)",
+        ),
+    ),
+]
+
+
+def _adicionar_fingerprint_importacao(conn: Connection) -> None:
+    _adicionar_coluna(conn, "transacao", "fingerprint_importacao", "VARCHAR")
+    # NULLs não conflitam no índice único: lançamentos manuais ficam livres
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_transacao_usuario_fingerprint "
+            "ON transacao (id_usuario, fingerprint_importacao)"
+        )
+    )
+
+
+def _adicionar_id_importacao(conn: Connection) -> None:
+    _adicionar_coluna(conn, "transacao", "id_importacao", "VARCHAR")
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_transacao_usuario_importacao "
+            "ON transacao (id_usuario, id_importacao)"
+        )
+    )
+
+
+def _chavear_busca_por_id_busca(conn: Connection) -> None:
+    """
+    O FTS da migração 3 se liga ao rowid de 'transacao', que um VACUUM pode
+    renumerar (a PK é texto). A ligação passa para 'id_busca', uma coluna
+    inteira comum, que o VACUUM preserva. O trigger de INSERT numera as linhas
+    novas a partir do maior 'id_busca' (e não do rowid, que depois de um
+    VACUUM pode repetir um número já usado).
+    """
+    _adicionar_coluna(conn, "transacao", "id_busca", "INTEGER")
+    conn.execute(text("UPDATE transacao SET id_busca = rowid WHERE id_busca IS NULL"))
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_transacao_id_busca "
+            "ON transacao (id_busca)"
+        )
+    )
+    for gatilho in ("ai", "ad", "au"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS transacao_busca_{gatilho}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABELA_BUSCA}"))
+    for comando in (
+        f"CREATE VIRTUAL TABLE {TABELA_BUSCA} USING fts5("
+        "descricao, content='transacao', content_rowid='id_busca', "
+        "tokenize='trigram')",
+        "CREATE TRIGGER transacao_busca_ai AFTER INSERT ON transacao BEGIN "
+        "UPDATE transacao SET id_busca = "
+        "(SELECT COALESCE(MAX(id_busca), 0) + 1 FROM transacao) "
+        "WHERE rowid = new.rowid AND new.id_busca IS NULL; "
+        f"INSERT INTO {TABELA_BUSCA} (rowid, descricao) "
+        "SELECT id_busca, descricao FROM transacao WHERE rowid = new.rowid; END",
+        "CREATE TRIGGER transacao_busca_ad AFTER DELETE ON transacao BEGIN "
+        f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}, rowid, descricao) "
+        "VALUES ('delete', old.id_busca, old.descricao); END",
+        "CREATE TRIGGER transacao_busca_au "
+        "AFTER UPDATE OF descricao ON transacao BEGIN "
+        f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}, rowid, descricao) "
+        "VALUES ('delete', old.id_busca, old.descricao); "
+        f"INSERT INTO {TABELA_BUSCA} (rowid, descricao) "
+        "VALUES (new.id_busca, new.descricao); END",
+    ):
+        conn.execute(text(comando))
+    reconstruir_indice_busca(conn)
+
+
+def _adicionar_coluna(conn: Connection, tabela: str, coluna: str, tipo: str) -> None:
+    """ALTER TABLE ADD COLUMN idempotente (o create_all já cria em bancos novos)."""
+    colunas = {row[1] for row in conn.execute(text(f"PRAGMA table_info({tabela})"))}
+    if coluna not in colunas:
+        conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}"))
+
+
+def reconstruir_indice_busca(conn: Connection) -> None:
+    """
+    Recria o índice FTS a partir da tabela 'transacao' (ex: se o índice foi
+    apagado ou ficou fora de sincronia com a tabela).
+    """
+    conn.execute(
+        text(f"INSERT INTO {TABELA_BUSCA} ({TABELA_BUSCA}) VALUES ('rebuild')")
+    )
+
+
+def _reconstruir_resumo_mensal(conn: Connection) -> None:
+    # Import tardio: o repositório depende dos models, que dependem da Base
+    from infra.repositories.resumo_mensal_repository_sqlite import (
+        ResumoMensalRepositorySqlite,
+    )
+
+    ResumoMensalRepositorySqlite(conn).rebuild()
+
+
+def _garantir_tabela_versao(conn: Connection) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {TABELA_VERSAO} ("
+            "versao INTEGER PRIMARY KEY, "
+            "descricao TEXT NOT NULL, "
+            "aplicada_em TEXT NOT NULL)"
+        )
+    )
+
+
+def versao_atual(engine: Engine) -> int:
+    """Retorna a maior versão de migração já aplicada (0 se nenhuma)."""
+    with engine.begin() as conn:
+        _garantir_tabela_versao(conn)
+        versao = conn.execute(
+            text(f"SELECT COALESCE(MAX(versao), 0) FROM {TABELA_VERSAO}")
+        ).scalar()
+    return int(versao or 0)
+
+
+def aplicar_migracoes(
+    engine: Engine, migracoes: List[Migracao] | None = None
+) -> List[int]:
+    """
+    Aplica, em ordem, as migrações com versão maior que a atual.
+    Cada migração roda na sua própria transação junto com o registro de versão.
+    Retorna as versões aplicadas nesta chamada.
+    """
+    migracoes = sorted(migracoes or MIGRACOES, key=lambda m: m.versao)
+    atual = versao_atual(engine)
+    aplicadas = []
+
+    for migracao in migracoes:
+        if migracao.versao <= atual:
+            continue
+
+        with engine.begin() as conn:
+            migracao.aplicar(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {TABELA_VERSAO} (versao, descricao, aplicada_em) "
+                    "VALUES (:versao, :descricao, :aplicada_em)"
+                ),
+                {
+                    "versao": migracao.versao,
+                    "descricao": migracao.descricao,
+                    "aplicada_em": datetime.now().isoformat(),
+                },
+            )
+        print(f"Migração {migracao.versao} aplicada: {migracao.descricao}")
+        aplicadas.append(migracao.versao)
+
+    return aplicadas
@@ -1,6 +1,20 @@
+from domain.tarefa import StatusTarefa
 from domain.transacao import StatusTransacao, TipoTransacao
 from infra.db.database import Base
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    JSON,
+    PrimaryKeyConstraint,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -33,10 +47,39 @@ class Transacao(Base):
     id_categoria = Column(String, ForeignKey("categoria.id"), nullable=True)
     id_perfil = Column(String, ForeignKey("perfil.id"), nullable=True)
     id_projeto = Column(String, nullable=True)
+    # Hash da linha do extrato de origem (NULL para lançamentos manuais)
+    fingerprint_importacao = Column(String, nullable=True)
+    # Importação que gravou a transação (NULL para lançamentos manuais)
+    id_importacao = Column(String, nullable=True)
+    # Chave do índice FTS da descrição, numerada por trigger (migração 7). O
+    # rowid não serve: a PK é texto e um VACUUM pode renumerá-lo
+    id_busca = Column(Integer, nullable=True)
 
     categoria = relationship("Categoria")
     perfil = relationship("Perfil")
 
+    # Índices também criados pelas migrações 1, 4, 6, 7 e 8 (infra/db/migrations.py)
+    # em bancos já existentes. Os nomes precisam ser os mesmos nos dois lugares.
+    __table_args__ = (
+        Index(
+            "ix_transacao_usuario_status_data",
+            "id_usuario",
+            "status",
+            data.desc(),
+            id.desc(),
+            "tipo",
+            "valor",
+        ),
+        Index(
+            "ux_transacao_usuario_fingerprint",
+            "id_usuario",
+            "fingerprint_importacao",
+            unique=True,
+        ),
+        Index("ix_transacao_usuario_importacao", "id_usuario", "id_importacao"),
+        Index("ux_transacao_id_busca", "id_busca", unique=True),
+    )
+
 
 class Meta(Base):
     __tablename__ = "meta"
@@ -64,6 +107,10 @@ class Meta(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        Index("ix_meta_usuario_data_limite", "id_usuario", "data_limite"),
+    )
+
 
 class Anexo(Base):
     __tablename__ = "anexo"
@@ -79,6 +126,8 @@ class Anexo(Base):
 
     transacao = relationship("Transacao")
 
+    __table_args__ = (Index("ix_anexo_id_transacao", "id_transacao"),)
+
 
 class Reserva(Base):
     __tablename__ = "reserva"
@@ -96,6 +145,8 @@ class Reserva(Base):
     meta = relationship("Meta", back_populates="reservas")
     transacao = relationship("Transacao", backref="reservas")
 
+    __table_args__ = (Index("ix_reserva_meta_valor", "id_meta", "valor"),)
+
 
 class MetaUso(Base):
     __tablename__ = "meta_uso"
@@ -110,6 +161,8 @@ class MetaUso(Base):
     meta = relationship("Meta", back_populates="usos")
     transacao = relationship("Transacao")
 
+    __table_args__ = (Index("ix_meta_uso_meta_valor", "id_meta", "valor"),)
+
 
 class MapeamentoCSV(Base):
     __tablename__ = "mapeamento_csv"
@@ -119,4 +172,116 @@ class MapeamentoCSV(Base):
     coluna_data = Column(String, nullable=False)
     coluna_valor = Column(String, nullable=False)
     coluna_descricao = Column(String, nullable=False)
-    criado_em = Column(DateTime, nullable=False, server_default=func.now())
\ No newline at end of file
+    assinatura_cabecalho = Column(String, nullable=True)
+    criado_em = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class RegraCategorizacao(Base):
+    """Regras de categorização automática aplicadas na importação."""
+
+    __tablename__ = "regra_categorizacao"
+    id = Column(String, primary_key=True)
+    id_usuario = Column(String, nullable=False)
+    nome = Column(String, nullable=False)
+    id_categoria = Column(String, ForeignKey("categoria.id"), nullable=True)
+    id_perfil = Column(String, ForeignKey("perfil.id"), nullable=True)
+    palavras_chave = Column(JSON, nullable=False)
+    padrao_regex = Column(String, nullable=True)
+    valor_minimo = Column(Float, nullable=True)
+    valor_maximo = Column(Float, nullable=True)
+    tipo = Column(Enum(TipoTransacao), nullable=True)
+    prioridade = Column(Integer, nullable=False, default=0)
+    ativa = Column(Boolean, nullable=False, default=True)
+    criado_em = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (Index("ix_regra_categorizacao_usuario", "id_usuario"),)
+
+
+class LinhaQuarentena(Base):
+    """Linhas rejeitadas por importações tolerantes, aguardando reprocessamento."""
+
+    __tablename__ = "linha_quarentena"
+    id = Column(String, primary_key=True)
+    id_usuario = Column(String, nullable=False)
+    id_importacao = Column(String, nullable=False)
+    arquivo = Column(String, nullable=False)
+    formato = Column(String, nullable=False)
+    numero_linha = Column(Integer, nullable=False)
+    motivo = Column(Text, nullable=False)
+    conteudo = Column(JSON, nullable=False)
+    criado_em = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_linha_quarentena_usuario_importacao",
+            "id_usuario",
+            "id_importacao",
+            "numero_linha",
+        ),
+    )
+
+
+class ExtratoArquivado(Base):
+    """Extratos enviados, guardados para reprocessar sem reenvio."""
+
+    __tablename__ = "extrato_arquivado"
+    id = Column(String, primary_key=True)
+    id_usuario = Column(String, nullable=False)
+    id_importacao = Column(String, nullable=False)
+    arquivo = Column(String, nullable=False)
+    hash_conteudo = Column(String, nullable=False)
+    tamanho_bytes = Column(Integer, nullable=False)
+    caminho_storage = Column(String, nullable=False)
+    compressao = Column(String, nullable=False, default="")
+    parametros = Column(JSON, nullable=False)
+    criado_em = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_extrato_arquivado_usuario_importacao", "id_usuario", "id_importacao"
+        ),
+    )
+
+
+class ResumoMensal(Base):
+    """
+    Rollup mensal das transações PROCESSADAS, mantido pelo repositório de
+    transações na mesma transação de cada escrita. Categoria e perfil ausentes
+    são gravados como "" para fazer parte da chave primária.
+    """
+
+    __tablename__ = "resumo_mensal"
+    id_usuario = Column(String, nullable=False)
+    mes = Column(String(7), nullable=False)  # "YYYY-MM"
+    id_categoria = Column(String, nullable=False, default="")
+    id_perfil = Column(String, nullable=False, default="")
+    tipo = Column(Enum(TipoTransacao), nullable=False)
+    total = Column(Float, nullable=False, default=0.0)
+    quantidade = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id_usuario", "mes", "id_categoria", "id_perfil", "tipo"),
+    )
+
+
+class Tarefa(Base):
+    """Fila persistente de tarefas em segundo plano (ver infra/tarefas)."""
+
+    __tablename__ = "tarefa"
+    id = Column(String, primary_key=True)
+    id_usuario = Column(String, nullable=False)
+    tipo = Column(String, nullable=False)
+    status = Column(Enum(StatusTarefa), nullable=False)
+    payload = Column(JSON, nullable=False)
+    tentativas = Column(Integer, nullable=False, default=0)
+    max_tentativas = Column(Integer, nullable=False, default=3)
+    progresso = Column(Float, nullable=False, default=0.0)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(Text, nullable=True)
+    criado_em = Column(DateTime, nullable=False)
+    iniciado_em = Column(DateTime, nullable=True)
+    finalizado_em = Column(DateTime, nullable=True)
+    heartbeat_em = Column(DateTime, nullable=True)
+
+    # Reserva da próxima PENDENTE (FIFO) e busca das EXECUTANDO expiradas
+    __table_args__ = (Index("ix_tarefa_status_criado_em", "status", "criado_em"),)
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.orm import Session
+from use_cases.repository_interfaces import IUnidadeTrabalho
+
+
+class UnidadeTrabalhoSqlAlchemy(IUnidadeTrabalho):
+    """Savepoints (SAVEPOINT/ROLLBACK TO) sobre a transação da Session."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    @contextmanager
+    def savepoint(self) -> Iterator[None]:
+        # begin_nested libera o savepoint no fim do bloco ou volta a ele se o
+        # bloco falhar; a transação externa (e o que ela já gravou) continua
+        with self.db.begin_nested():
+            yield
@@ -0,0 +1,78 @@
+import gzip
+import json
+import os
+import zlib
+
+from use_cases.extratos_compactados import LeitorLimitado
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.wsgi import get_input_stream
+
+# Codificações do corpo da requisição que o servidor descompacta
+CODIFICACOES_GZIP = {"gzip", "x-gzip"}
+
+# Tamanho máximo do corpo da requisição, contado depois de descompactado
+LIMITE_CORPO_BYTES = int(os.environ.get("PLANO_LIMITE_UPLOAD_MB", "256")) * 1024 * 1024
+
+
+class DescompactarCorpoGzip:
+    """
+    Middleware WSGI para uploads com 'Content-Encoding: gzip' (o Werkzeug
+    não decodifica o corpo da requisição). O corpo passa a ser descompactado
+    sob demanda, conforme a aplicação o lê: o parse do formulário grava o
+    arquivo descompactado em disco sem inflá-lo na memória. O tamanho final
+    não é conhecido, então o Content-Length sai e o stream termina com o
+    gzip. Passar de 'limite_bytes' descompactados vira 413: uma bomba de
+    descompactação para no limite. Outras codificações são recusadas com 415.
+    """
+
+    def __init__(self, app, limite_bytes: int | None = LIMITE_CORPO_BYTES):
+        self.app = app
+        self.limite_bytes = limite_bytes
+
+    def __call__(self, environ, start_response):
+        codificacao = environ.get("HTTP_CONTENT_ENCODING", "").strip().lower()
+        if not codificacao or codificacao == "identity":
+            return self.app(environ, start_response)
+        if codificacao not in CODIFICACOES_GZIP:
+            return _recusar(start_response, codificacao)
+
+        corpo = get_input_stream(environ)
+        environ["wsgi.input"] = _CorpoGzip(
+            gzip.GzipFile(fileobj=corpo, mode="rb"), self.limite_bytes
+        )
+        environ["wsgi.input_terminated"] = True
+        environ.pop("CONTENT_LENGTH", None)
+        del environ["HTTP_CONTENT_ENCODING"]
+        return self.app(environ, start_response)
+
+
+class _CorpoGzip(LeitorLimitado):
+    """
+    Corpo gzip corrompido ou truncado vira ValueError (resposta 400); mais
+    de 'limite_bytes' descompactados vira RequestEntityTooLarge (413).
+    """
+
+    def __init__(self, stream: gzip.GzipFile, limite_bytes: int | None):
+        super().__init__(
+            stream,
+            limite_bytes,
+            (gzip.BadGzipFile, EOFError, zlib.error),
+            invalido=lambda exc: ValueError(f"Corpo gzip inválido: {exc}"),
+            excedido=lambda: RequestEntityTooLarge(
+                f"O corpo descompactado passa do limite de {limite_bytes} bytes."
+            ),
+        )
+
+    def readline(self, tamanho: int | None = -1) -> bytes:
+        return self._ler(self._stream.readline, tamanho)
+
+
+def _recusar(start_response, codificacao: str):
+    corpo = json.dumps(
+        {"erro": f"Content-Encoding não suportado: {codificacao}. Use gzip."}
+    ).encode("utf-8")
+    start_response(
+        "415 Unsupported Media Type",
+        [("Content-Type", "application/json"), ("Content-Length", str(len(corpo)))],
+    )
+    return [corpo]
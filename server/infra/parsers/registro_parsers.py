@@ -0,0 +1,19 @@
+import os
+
+from use_cases.registro_parsers import FORMATOS_PADRAO, RegistroParsers
+
+# Grupo de entry points em que pacotes instalados publicam formatos de
+# extrato: cada entry point aponta para um FormatoExtrato
+GRUPO_ENTRY_POINTS = "plano.parsers_extrato"
+# Formatos extras sem empacotamento: 'pacote.modulo:FORMATO' separados por vírgula
+PARSERS_EXTRATO = [
+    caminho.strip()
+    for caminho in os.environ.get("PLANO_PARSERS_EXTRATO", "").split(",")
+    if caminho.strip()
+]
+
+# Registro do processo. Os plugins são descobertos na primeira importação e
+# cada parser é importado quando chega o primeiro arquivo do formato
+registro_parsers = RegistroParsers(
+    FORMATOS_PADRAO, grupo_entry_points=GRUPO_ENTRY_POINTS, plugins=PARSERS_EXTRATO
+)
@@ -0,0 +1,68 @@
+from typing import List
+
+from domain.extrato_arquivado import ExtratoArquivado as DomainExtrato
+from infra.db.models import ExtratoArquivado as ModelExtrato
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from use_cases.repository_interfaces import IExtratoArquivadoRepository
+
+TABELA = ModelExtrato.__table__
+
+
+class ExtratoArquivadoRepositorySqlite(IExtratoArquivadoRepository):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def add(self, extrato: DomainExtrato) -> DomainExtrato:
+        self.db.execute(
+            insert(TABELA).values(
+                id=extrato.id,
+                id_usuario=extrato.id_usuario,
+                id_importacao=extrato.id_importacao,
+                arquivo=extrato.arquivo,
+                hash_conteudo=extrato.hash_conteudo,
+                tamanho_bytes=extrato.tamanho_bytes,
+                caminho_storage=extrato.caminho_storage,
+                compressao=extrato.compressao,
+                parametros=extrato.parametros,
+                criado_em=extrato.criado_em,
+            )
+        )
+        print(f"Repositório (SQLAlchemy): Extrato {extrato.arquivo} arquivado.")
+        return extrato
+
+    def get_by_importacao(
+        self, id_usuario: str, id_importacao: str
+    ) -> List[DomainExtrato]:
+        return self._listar(
+            select(TABELA)
+            .where(
+                TABELA.c.id_usuario == id_usuario,
+                TABELA.c.id_importacao == id_importacao,
+            )
+            .order_by(TABELA.c.criado_em)
+        )
+
+    def list_by_usuario(self, id_usuario: str) -> List[DomainExtrato]:
+        return self._listar(
+            select(TABELA)
+            .where(TABELA.c.id_usuario == id_usuario)
+            .order_by(TABELA.c.criado_em.desc())
+        )
+
+    def _listar(self, consulta) -> List[DomainExtrato]:
+        return [
+            DomainExtrato(
+                id=row["id"],
+                id_usuario=row["id_usuario"],
+                id_importacao=row["id_importacao"],
+                arquivo=row["arquivo"],
+                hash_conteudo=row["hash_conteudo"],
+                tamanho_bytes=row["tamanho_bytes"],
+                caminho_storage=row["caminho_storage"],
+                compressao=row["compressao"],
+                parametros=row["parametros"],
+                criado_em=row["criado_em"],
+            )
+            for row in self.db.execute(consulta).mappings()
+        ]
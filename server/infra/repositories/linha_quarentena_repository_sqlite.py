@@ -0,0 +1,84 @@
+from typing import Dict, List
+
+from domain.linha_quarentena import LinhaQuarentena as DomainLinha
+from infra.db.models import LinhaQuarentena as ModelLinha
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session
+from use_cases.repository_interfaces import ILinhaQuarentenaRepository
+
+# Como no add_many das transações, as escritas usam a tabela (Core)
+TABELA = ModelLinha.__table__
+# Ids por DELETE ... IN: fica abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE_DELETE = 10000
+
+
+class LinhaQuarentenaRepositorySqlite(ILinhaQuarentenaRepository):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def add_many(self, linhas: List[DomainLinha]) -> int:
+        if not linhas:
+            return 0
+        self.db.execute(
+            insert(TABELA),
+            [
+                {
+                    "id": linha.id,
+                    "id_usuario": linha.id_usuario,
+                    "id_importacao": linha.id_importacao,
+                    "arquivo": linha.arquivo,
+                    "formato": linha.formato,
+                    "numero_linha": linha.numero_linha,
+                    "motivo": linha.motivo,
+                    "conteudo": linha.conteudo,
+                    "criado_em": linha.criado_em,
+                }
+                for linha in linhas
+            ],
+        )
+        print(f"Repositório (SQLAlchemy): {len(linhas)} linhas em quarentena.")
+        return len(linhas)
+
+    def get_by_importacao(
+        self, id_usuario: str, id_importacao: str
+    ) -> List[DomainLinha]:
+        rows = self.db.execute(
+            select(TABELA)
+            .where(
+                TABELA.c.id_usuario == id_usuario,
+                TABELA.c.id_importacao == id_importacao,
+            )
+            .order_by(TABELA.c.numero_linha)
+        ).mappings()
+        return [
+            DomainLinha(
+                id=row["id"],
+                id_usuario=row["id_usuario"],
+                id_importacao=row["id_importacao"],
+                arquivo=row["arquivo"],
+                formato=row["formato"],
+                numero_linha=row["numero_linha"],
+                motivo=row["motivo"],
+                conteudo=row["conteudo"],
+                criado_em=row["criado_em"],
+            )
+            for row in rows
+        ]
+
+    def atualizar_motivos(self, motivos: Dict[str, str]) -> None:
+        if not motivos:
+            return
+        self.db.execute(
+            update(TABELA)
+            .where(TABELA.c.id == bindparam("b_id"))
+            .values(motivo=bindparam("b_motivo")),
+            [{"b_id": id_linha, "b_motivo": m} for id_linha, m in motivos.items()],
+        )
+
+    def delete_many(self, ids_linha: List[str]) -> None:
+        if not ids_linha:
+            return
+        print(f"Repositório (SQLAlchemy): Removendo {len(ids_linha)} da quarentena.")
+        for inicio in range(0, len(ids_linha), TAMANHO_LOTE_DELETE):
+            lote = ids_linha[inicio : inicio + TAMANHO_LOTE_DELETE]
+            self.db.execute(delete(TABELA).where(TABELA.c.id.in_(lote)))
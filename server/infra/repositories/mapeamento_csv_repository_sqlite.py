@@ -1,4 +1,5 @@
 from domain.mapeamento_csv import MapeamentoCSV as DomainMapeamento
+from infra.cache.mapeamento_csv_cache_memoria import marcar_mapeamentos_alterados
 from infra.db.models import MapeamentoCSV as ModelMapeamento
 from sqlalchemy.orm import Session
 from use_cases.repository_interfaces import IMapeamentoCSVRepository
@@ -18,6 +19,7 @@ class MapeamentoCSVRepositorySqlite(IMapeamentoCSVRepository):
             coluna_data=model.coluna_data,
             coluna_valor=model.coluna_valor,
             coluna_descricao=model.coluna_descricao,
+            assinatura_cabecalho=model.assinatura_cabecalho,
         )
 
     def add(self, mapeamento: DomainMapeamento) -> DomainMapeamento:
@@ -28,9 +30,11 @@ class MapeamentoCSVRepositorySqlite(IMapeamentoCSVRepository):
             coluna_data=mapeamento.coluna_data,
             coluna_valor=mapeamento.coluna_valor,
             coluna_descricao=mapeamento.coluna_descricao,
+            assinatura_cabecalho=mapeamento.assinatura_cabecalho,
         )
         self.db.add(model)
         self.db.flush()
+        marcar_mapeamentos_alterados(self.db, mapeamento.id_usuario)
         return mapeamento
 
     def get_by_usuario(self, id_usuario: str) -> list[DomainMapeamento]:
@@ -56,3 +60,14 @@ class MapeamentoCSVRepositorySqlite(IMapeamentoCSVRepository):
             .first()
             is not None
         )
+
+    def get_by_nome(self, id_usuario: str, nome: str) -> DomainMapeamento | None:
+        model = (
+            self.db.query(ModelMapeamento)
+            .filter(
+                ModelMapeamento.id_usuario == id_usuario,
+                ModelMapeamento.nome == nome,
+            )
+            .first()
+        )
+        return self._model_to_domain(model)
@@ -0,0 +1,66 @@
+from domain.regra_categorizacao import RegraCategorizacao as DomainRegra
+from infra.db.models import RegraCategorizacao as ModelRegra
+from sqlalchemy.orm import Session
+from use_cases.repository_interfaces import IRegraCategorizacaoRepository
+
+
+class RegraCategorizacaoRepositorySqlite(IRegraCategorizacaoRepository):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def _model_to_domain(self, model: ModelRegra) -> DomainRegra | None:
+        if not model:
+            return None
+        return DomainRegra(
+            id=model.id,
+            id_usuario=model.id_usuario,
+            nome=model.nome,
+            id_categoria=model.id_categoria,
+            id_perfil=model.id_perfil,
+            palavras_chave=list(model.palavras_chave or []),
+            padrao_regex=model.padrao_regex,
+            valor_minimo=model.valor_minimo,
+            valor_maximo=model.valor_maximo,
+            tipo=model.tipo,
+            prioridade=model.prioridade,
+            ativa=model.ativa,
+        )
+
+    def add(self, regra: DomainRegra) -> DomainRegra:
+        print(f"Repositório (SQLAlchemy): Salvando regra {regra.id}.")
+        self.db.add(
+            ModelRegra(
+                id=regra.id,
+                id_usuario=regra.id_usuario,
+                nome=regra.nome,
+                id_categoria=regra.id_categoria,
+                id_perfil=regra.id_perfil,
+                palavras_chave=regra.palavras_chave,
+                padrao_regex=regra.padrao_regex,
+                valor_minimo=regra.valor_minimo,
+                valor_maximo=regra.valor_maximo,
+                tipo=regra.tipo,
+                prioridade=regra.prioridade,
+                ativa=regra.ativa,
+            )
+        )
+        self.db.flush()
+        return regra
+
+    def get_by_usuario(
+        self, id_usuario: str, somente_ativas: bool = False
+    ) -> list[DomainRegra]:
+        query = self.db.query(ModelRegra).filter(ModelRegra.id_usuario == id_usuario)
+        if somente_ativas:
+            query = query.filter(ModelRegra.ativa.is_(True))
+        rows = query.order_by(ModelRegra.prioridade.desc(), ModelRegra.nome.asc())
+        return [self._model_to_domain(row) for row in rows.all()]
+
+    def get_by_id(self, id_regra: str) -> DomainRegra | None:
+        model = self.db.query(ModelRegra).filter_by(id=id_regra).first()
+        return self._model_to_domain(model)
+
+    def delete(self, id_regra: str) -> None:
+        print(f"Repositório (SQLAlchemy): Removendo regra {id_regra}.")
+        self.db.query(ModelRegra).filter_by(id=id_regra).delete()
+        self.db.flush()
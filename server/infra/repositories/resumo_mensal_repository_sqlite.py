@@ -0,0 +1,188 @@
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from domain.transacao import StatusTransacao, TipoTransacao
+from infra.db.models import ResumoMensal as ResumoModel
+from infra.db.models import Transacao as ModelTransacao
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from use_cases.repository_interfaces import IResumoMensalRepository
+
+CHAVE_RESUMO = ("id_usuario", "mes", "id_categoria", "id_perfil", "tipo")
+
+
+class DeltasResumo:
+    """
+    Acumula as variações (total, quantidade) por chave do rollup antes de
+    gravá-las, para que um lote de escritas gere um único upsert por chave.
+    Apenas transações PROCESSADAS contam no resumo.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[tuple, List] = defaultdict(lambda: [0.0, 0])
+
+    def registrar(self, transacao: Any, sinal: int) -> None:
+        """Soma (+1) ou subtrai (-1) a contribuição de uma transação/model."""
+        if transacao is None or transacao.status != StatusTransacao.PROCESSADO:
+            return
+        chave = (
+            transacao.id_usuario,
+            transacao.data.strftime("%Y-%m"),
+            transacao.id_categoria or "",
+            transacao.id_perfil or "",
+            transacao.tipo,
+        )
+        delta = self._deltas[chave]
+        delta[0] += sinal * transacao.valor
+        delta[1] += sinal
+
+    def linhas(self) -> List[Dict[str, Any]]:
+        return [
+            {**dict(zip(CHAVE_RESUMO, chave)), "total": total, "quantidade": qtd}
+            for chave, (total, qtd) in self._deltas.items()
+            if qtd != 0 or total != 0
+        ]
+
+
+class ResumoMensalRepositorySqlite(IResumoMensalRepository):
+    """
+    Repositório do rollup mensal. Aceita uma Session ou uma Connection, para
+    poder ser usado também pelas migrações.
+    """
+
+    def __init__(self, db_session):
+        self.db = db_session
+
+    def aplicar_deltas(self, deltas: DeltasResumo) -> None:
+        """Grava as variações acumuladas com INSERT ... ON CONFLICT DO UPDATE."""
+        linhas = deltas.linhas()
+        if not linhas:
+            return
+
+        stmt = sqlite_insert(ResumoModel)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(CHAVE_RESUMO),
+            set_={
+                "total": ResumoModel.total + stmt.excluded.total,
+                "quantidade": ResumoModel.quantidade + stmt.excluded.quantidade,
+            },
+        )
+        self.db.execute(stmt, linhas)
+
+        if any(linha["quantidade"] < 0 for linha in linhas):
+            usuarios = {linha["id_usuario"] for linha in linhas}
+            self.db.execute(
+                delete(ResumoModel).where(
+                    ResumoModel.id_usuario.in_(usuarios),
+                    ResumoModel.quantidade <= 0,
+                )
+            )
+
+    def rebuild(self, id_usuario: str | None = None) -> int:
+        """Recalcula o resumo a partir da tabela de transações."""
+        alvo = id_usuario or "todos os usuários"
+        print(f"Repositório (SQLAlchemy): Reconstruindo resumo mensal de {alvo}.")
+
+        apagar = delete(ResumoModel)
+        if id_usuario:
+            apagar = apagar.where(ResumoModel.id_usuario == id_usuario)
+        self.db.execute(apagar)
+
+        mes = func.strftime("%Y-%m", ModelTransacao.data)
+        id_categoria = func.coalesce(ModelTransacao.id_categoria, "")
+        id_perfil = func.coalesce(ModelTransacao.id_perfil, "")
+        origem = select(
+            ModelTransacao.id_usuario,
+            mes,
+            id_categoria,
+            id_perfil,
+            ModelTransacao.tipo,
+            func.sum(ModelTransacao.valor),
+            func.count(),
+        ).where(ModelTransacao.status == StatusTransacao.PROCESSADO)
+        if id_usuario:
+            origem = origem.where(ModelTransacao.id_usuario == id_usuario)
+        origem = origem.group_by(
+            ModelTransacao.id_usuario,
+            mes,
+            id_categoria,
+            id_perfil,
+            ModelTransacao.tipo,
+        )
+
+        result = self.db.execute(
+            insert(ResumoModel).from_select(
+                [*CHAVE_RESUMO, "total", "quantidade"], origem
+            )
+        )
+        return result.rowcount or 0
+
+    def get_resumo(
+        self,
+        id_usuario: str,
+        agrupar_por: List[str],
+        mes_de: str | None = None,
+        mes_ate: str | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        tipo: TipoTransacao | None = None,
+    ) -> List[Dict[str, Any]]:
+        colunas = [getattr(ResumoModel, nome) for nome in agrupar_por]
+        query = select(
+            *colunas,
+            func.sum(ResumoModel.total),
+            func.sum(ResumoModel.quantidade),
+        ).where(ResumoModel.id_usuario == id_usuario)
+
+        if mes_de:
+            query = query.where(ResumoModel.mes >= mes_de)
+        if mes_ate:
+            query = query.where(ResumoModel.mes <= mes_ate)
+        if id_categoria is not None:
+            query = query.where(ResumoModel.id_categoria == id_categoria)
+        if id_perfil is not None:
+            query = query.where(ResumoModel.id_perfil == id_perfil)
+        if tipo:
+            query = query.where(ResumoModel.tipo == tipo)
+
+        if colunas:
+            query = query.group_by(*colunas).order_by(*colunas)
+
+        resultado = []
+        for row in self.db.execute(query):
+            item = {}
+            for nome, valor in zip(agrupar_por, row):
+                if nome == "tipo":
+                    valor = valor.value
+                elif nome in ("id_categoria", "id_perfil"):
+                    valor = valor or None
+                item[nome] = valor
+            total, quantidade = row[len(agrupar_por):]
+            item["total"] = round(total or 0.0, 2)
+            item["quantidade"] = int(quantidade or 0)
+            resultado.append(item)
+        return resultado
+
+    def get_dashboard_totais(
+        self, id_usuario: str, mes_atual: str
+    ) -> Dict[str, float]:
+        """Saldo total e receitas/despesas a partir do mês informado."""
+        receita = ResumoModel.tipo == TipoTransacao.RECEITA
+        despesa = ResumoModel.tipo == TipoTransacao.DESPESA
+        no_mes = ResumoModel.mes >= mes_atual
+
+        saldo_mensal = case((receita, ResumoModel.total), else_=-ResumoModel.total)
+
+        saldo, receitas, despesas = self.db.execute(
+            select(
+                func.sum(saldo_mensal),
+                func.sum(case((receita & no_mes, ResumoModel.total), else_=0)),
+                func.sum(case((despesa & no_mes, ResumoModel.total), else_=0)),
+            ).where(ResumoModel.id_usuario == id_usuario)
+        ).one()
+
+        return {
+            "saldo_atual": saldo or 0.0,
+            "receitas_mes": receitas or 0.0,
+            "despesas_mes": despesas or 0.0,
+        }
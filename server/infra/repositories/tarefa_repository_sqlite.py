@@ -0,0 +1,169 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from domain.tarefa import StatusTarefa
+from domain.tarefa import Tarefa as DomainTarefa
+from infra.db.models import Tarefa as ModelTarefa
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from use_cases.repository_interfaces import ITarefaRepository
+
+# As escritas da fila usam a tabela (Core), sem carregar objetos na sessão
+TABELA = ModelTarefa.__table__
+
+
+class TarefaRepositorySqlite(ITarefaRepository):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def _model_to_domain(self, model: ModelTarefa) -> DomainTarefa | None:
+        if not model:
+            return None
+        return DomainTarefa(
+            id=model.id,
+            id_usuario=model.id_usuario,
+            tipo=model.tipo,
+            payload=model.payload or {},
+            status=model.status,
+            tentativas=model.tentativas,
+            max_tentativas=model.max_tentativas,
+            progresso=model.progresso,
+            resultado=model.resultado,
+            erro=model.erro,
+            criado_em=model.criado_em,
+            iniciado_em=model.iniciado_em,
+            finalizado_em=model.finalizado_em,
+            heartbeat_em=model.heartbeat_em,
+        )
+
+    def add(self, tarefa: DomainTarefa) -> DomainTarefa:
+        print(f"Repositório (SQLAlchemy): Enfileirando tarefa {tarefa.id}.")
+        self.db.add(
+            ModelTarefa(
+                id=tarefa.id,
+                id_usuario=tarefa.id_usuario,
+                tipo=tarefa.tipo,
+                status=tarefa.status,
+                payload=tarefa.payload,
+                tentativas=tarefa.tentativas,
+                max_tentativas=tarefa.max_tentativas,
+                progresso=tarefa.progresso,
+                criado_em=tarefa.criado_em,
+            )
+        )
+        self.db.flush()
+        return tarefa
+
+    def get_by_id(self, id_tarefa: str) -> DomainTarefa | None:
+        model = self.db.get(ModelTarefa, id_tarefa, populate_existing=True)
+        return self._model_to_domain(model)
+
+    def list_ativas(self, id_usuario: str) -> List[DomainTarefa]:
+        models = (
+            self.db.query(ModelTarefa)
+            .filter(
+                ModelTarefa.id_usuario == id_usuario,
+                ModelTarefa.status.in_(
+                    [StatusTarefa.PENDENTE, StatusTarefa.EXECUTANDO]
+                ),
+            )
+            .order_by(ModelTarefa.criado_em)
+            .populate_existing()
+            .all()
+        )
+        return [self._model_to_domain(model) for model in models]
+
+    def reservar_proxima(self, tipos: Iterable[str]) -> DomainTarefa | None:
+        agora = datetime.now()
+        proxima = (
+            select(TABELA.c.id)
+            .where(
+                TABELA.c.status == StatusTarefa.PENDENTE,
+                TABELA.c.tipo.in_(list(tipos)),
+            )
+            .order_by(TABELA.c.criado_em)
+            .limit(1)
+            .scalar_subquery()
+        )
+        # Um único UPDATE: duas threads (ou processos) nunca pegam a mesma
+        # tarefa, porque o SQLite serializa as escritas
+        id_tarefa = self.db.execute(
+            update(TABELA)
+            .where(TABELA.c.id == proxima, TABELA.c.status == StatusTarefa.PENDENTE)
+            .values(
+                status=StatusTarefa.EXECUTANDO,
+                tentativas=TABELA.c.tentativas + 1,
+                iniciado_em=agora,
+                heartbeat_em=agora,
+                erro=None,
+            )
+            .returning(TABELA.c.id)
+        ).scalar()
+        if id_tarefa is None:
+            return None
+
+        print(f"Repositório (SQLAlchemy): Tarefa {id_tarefa} reservada.")
+        return self.get_by_id(id_tarefa)
+
+    def registrar_progresso(self, id_tarefa: str, progresso: float) -> None:
+        self.db.execute(
+            update(TABELA)
+            .where(TABELA.c.id == id_tarefa)
+            .values(
+                progresso=min(max(progresso, 0.0), 1.0), heartbeat_em=datetime.now()
+            )
+        )
+
+    def registrar_heartbeat(self, id_tarefa: str) -> None:
+        self.db.execute(
+            update(TABELA)
+            .where(
+                TABELA.c.id == id_tarefa, TABELA.c.status == StatusTarefa.EXECUTANDO
+            )
+            .values(heartbeat_em=datetime.now())
+        )
+
+    def concluir(self, id_tarefa: str, resultado: Dict[str, Any]) -> None:
+        print(f"Repositório (SQLAlchemy): Tarefa {id_tarefa} concluída.")
+        self.db.execute(
+            update(TABELA)
+            .where(TABELA.c.id == id_tarefa)
+            .values(
+                status=StatusTarefa.CONCLUIDA,
+                progresso=1.0,
+                resultado=resultado,
+                erro=None,
+                finalizado_em=datetime.now(),
+            )
+        )
+
+    def falhar(self, id_tarefa: str, erro: str, repetir: bool) -> None:
+        print(f"Repositório (SQLAlchemy): Tarefa {id_tarefa} falhou: {erro}")
+        tarefa = self.db.get(ModelTarefa, id_tarefa, populate_existing=True)
+        if not tarefa:
+            return
+        tarefa.erro = erro
+        if repetir and tarefa.tentativas < tarefa.max_tentativas:
+            tarefa.status = StatusTarefa.PENDENTE
+        else:
+            tarefa.status = StatusTarefa.FALHOU
+            tarefa.finalizado_em = datetime.now()
+        self.db.flush()
+
+    def recuperar_expiradas(self, limite_heartbeat: datetime) -> int:
+        expiradas = (
+            self.db.query(ModelTarefa)
+            .filter(
+                ModelTarefa.status == StatusTarefa.EXECUTANDO,
+                ModelTarefa.heartbeat_em < limite_heartbeat,
+            )
+            .all()
+        )
+        for tarefa in expiradas:
+            print(f"Repositório (SQLAlchemy): Recuperando tarefa {tarefa.id}.")
+            self.falhar(
+                tarefa.id,
+                "Execução interrompida (o processo parou durante a tarefa).",
+                repetir=True,
+            )
+        return len(expiradas)
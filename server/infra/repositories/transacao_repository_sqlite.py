@@ -1,23 +1,54 @@
 from datetime import date, datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Set
 
 # Entidades de Domínio (o "contrato" do repositório)
-from domain.transacao import StatusTransacao, TipoTransacao
+from domain.transacao import StatusTransacao
 from domain.transacao import Transacao as DomainTransacao
 
+from infra.cache.dashboard_cache_memoria import marcar_usuario_alterado
+
 # Models de Infra (a tabela do banco)
 from infra.db.models import Transacao as ModelTransacao
-from sqlalchemy import case, delete, func
-from sqlalchemy.orm import Session
+from infra.repositories.resumo_mensal_repository_sqlite import (
+    DeltasResumo,
+    ResumoMensalRepositorySqlite,
+)
+from infra.db.migrations import TABELA_BUSCA
+from sqlalchemy import (
+    and_,
+    column,
+    delete,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy.orm import Query, Session
+from use_cases.paginacao import CursorTransacao
 
 # Interfaces (para garantir conformidade)
 from use_cases.repository_interfaces import ITransacaoRepository
 
+# Índice FTS5 (trigram) da descrição, criado pela migração 3 e chaveado pela
+# coluna transacao.id_busca desde a migração 7
+TransacaoBusca = table(TABELA_BUSCA, column("rowid"), column("rank"))
+# Com o tokenizer trigram, termos menores que 3 caracteres não usam o índice
+TAMANHO_MINIMO_BUSCA = 3
+
+
+def _termo_fts(descricao: str) -> str:
+    """Transforma o texto digitado em uma frase FTS5 (busca por substring)."""
+    return '"' + descricao.replace('"', '""') + '"'
+
 
 class TransacaoRepositorySqlite(ITransacaoRepository):
     def __init__(self, db_session: Session):
         # Recebemos a SESSÃO do SQLAlchemy, não a conexão
         self.db: Session = db_session
+        # O rollup mensal é atualizado na mesma sessão (mesma transação)
+        self.resumo = ResumoMensalRepositorySqlite(db_session)
 
     # --- Funções Auxiliares de Mapeamento ---
     # O Repositório é o tradutor oficial entre o Domínio e a Infra
@@ -37,6 +68,8 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
             id_categoria=t_model.id_categoria,
             id_perfil=t_model.id_perfil,
             id_projeto=t_model.id_projeto,
+            fingerprint_importacao=t_model.fingerprint_importacao,
+            id_importacao=t_model.id_importacao,
         )
 
     def _map_domain_to_model(self, t_domain: DomainTransacao) -> ModelTransacao:
@@ -53,8 +86,41 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
             id_categoria=t_domain.id_categoria,
             id_perfil=t_domain.id_perfil,
             id_projeto=t_domain.id_projeto,
+            fingerprint_importacao=t_domain.fingerprint_importacao,
+            id_importacao=t_domain.id_importacao,
         )
 
+    def _apply_keyset(
+        self,
+        query: Query,
+        cursor: CursorTransacao | None,
+        limite: int | None,
+        status_fixo: bool = False,
+    ) -> Query:
+        """
+        Aplica a ordenação (status, data desc, id desc) e a paginação keyset.
+        Quando o status é fixo, a comparação fica só em (data, id), o que
+        permite ao SQLite percorrer o índice a partir do cursor.
+        """
+        if cursor:
+            chave = tuple_(ModelTransacao.data, ModelTransacao.id)
+            depois_do_cursor = chave < tuple_(cursor.data, cursor.id)
+            if not status_fixo:
+                depois_do_cursor = or_(
+                    ModelTransacao.status > cursor.status,
+                    and_(ModelTransacao.status == cursor.status, depois_do_cursor),
+                )
+            query = query.filter(depois_do_cursor)
+
+        query = query.order_by(
+            ModelTransacao.status.asc(),
+            ModelTransacao.data.desc(),
+            ModelTransacao.id.desc(),
+        )
+        if limite is not None:
+            query = query.limit(limite)
+        return query
+
     # --- Implementação da Interface ---
 
     def add(self, transacao: DomainTransacao) -> None:
@@ -65,38 +131,156 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
         # 2. Usar a sessão do SQLAlchemy
         self.db.add(transacao_model)
 
+        deltas = DeltasResumo()
+        deltas.registrar(transacao, +1)
+        self.resumo.aplicar_deltas(deltas)
+        marcar_usuario_alterado(self.db, transacao.id_usuario)
+
         # O commit será feito na camada de Rota
         print(f"Repositório (SQLAlchemy): Adicionando transação {transacao.id}.")
 
+    def add_many(self, transacoes: List[DomainTransacao]) -> int:
+        """
+        INSERT em lote com o Core (um executemany), sem criar Models nem
+        passar pela unit of work do ORM. O resumo mensal recebe um único
+        upsert por chave para o lote inteiro.
+        """
+        if not transacoes:
+            return 0
+
+        deltas = DeltasResumo()
+        usuarios = set()
+        linhas = []
+        for t in transacoes:
+            linhas.append(
+                {
+                    "id": t.id,
+                    "valor": t.valor,
+                    "tipo": t.tipo,
+                    "data": t.data,
+                    "status": t.status,
+                    "id_usuario": t.id_usuario,
+                    "descricao": t.descricao,
+                    "id_categoria": t.id_categoria,
+                    "id_perfil": t.id_perfil,
+                    "id_projeto": t.id_projeto,
+                    "fingerprint_importacao": t.fingerprint_importacao,
+                    "id_importacao": t.id_importacao,
+                }
+            )
+            deltas.registrar(t, +1)
+            usuarios.add(t.id_usuario)
+
+        self.db.execute(insert(ModelTransacao.__table__), linhas)
+        self.resumo.aplicar_deltas(deltas)
+        for id_usuario in usuarios:
+            marcar_usuario_alterado(self.db, id_usuario)
+
+        print(f"Repositório (SQLAlchemy): Inserindo {len(linhas)} transações em lote.")
+        return len(linhas)
+
+    def get_fingerprints_existentes(
+        self, id_usuario: str, fingerprints: Iterable[str]
+    ) -> Set[str]:
+        """Quais destes fingerprints já existem (consulta pelo índice único)."""
+        fingerprints = list(fingerprints)
+        if not fingerprints:
+            return set()
+        rows = self.db.execute(
+            select(ModelTransacao.fingerprint_importacao).where(
+                ModelTransacao.id_usuario == id_usuario,
+                ModelTransacao.fingerprint_importacao.in_(fingerprints),
+            )
+        )
+        return {fingerprint for (fingerprint,) in rows}
+
+    def delete_por_importacao(
+        self, id_usuario: str, id_importacao: str, limite: int
+    ) -> int:
+        """
+        DELETE de um lote da importação (pelo índice usuário+importação).
+        Lê antes as colunas do rollup para descontar as PROCESSADAS do resumo.
+        """
+        rows = self.db.execute(
+            select(
+                ModelTransacao.id,
+                ModelTransacao.id_usuario,
+                ModelTransacao.valor,
+                ModelTransacao.tipo,
+                ModelTransacao.data,
+                ModelTransacao.status,
+                ModelTransacao.id_categoria,
+                ModelTransacao.id_perfil,
+            )
+            .where(
+                ModelTransacao.id_usuario == id_usuario,
+                ModelTransacao.id_importacao == id_importacao,
+            )
+            .limit(limite)
+        ).all()
+        if not rows:
+            return 0
+
+        deltas = DeltasResumo()
+        for row in rows:
+            deltas.registrar(row, -1)
+        self.db.execute(
+            delete(ModelTransacao).where(
+                ModelTransacao.id.in_([row.id for row in rows])
+            )
+        )
+        self.resumo.aplicar_deltas(deltas)
+        marcar_usuario_alterado(self.db, id_usuario)
+        print(
+            f"Repositório (SQLAlchemy): Removendo {len(rows)} transações "
+            f"da importação {id_importacao}."
+        )
+        return len(rows)
+
     def update(self, transacao: DomainTransacao) -> None:
         """Atualiza uma transação usando merge."""
+        # Estado anterior (antes do merge) para ajustar o resumo mensal
+        deltas = DeltasResumo()
+        deltas.registrar(self.db.get(ModelTransacao, transacao.id), -1)
+        deltas.registrar(transacao, +1)
+
         # O merge é ideal pois ele insere ou atualiza baseado na PK
         transacao_model = self._map_domain_to_model(transacao)
         self.db.merge(transacao_model)
+        self.resumo.aplicar_deltas(deltas)
+        marcar_usuario_alterado(self.db, transacao.id_usuario)
         print(f"Repositório (SQLAlchemy): Atualizando transação {transacao.id}.")
 
     def delete(self, id_transacao: str) -> None:
         """Deleta uma transação pelo ID."""
+        deltas = DeltasResumo()
+        anterior = self.db.get(ModelTransacao, id_transacao)
+        deltas.registrar(anterior, -1)
+        if anterior:
+            marcar_usuario_alterado(self.db, anterior.id_usuario)
+
         # Cria a instrução de delete
         stmt = delete(ModelTransacao).where(ModelTransacao.id == id_transacao)
         self.db.execute(stmt)
+        self.resumo.aplicar_deltas(deltas)
         print(f"Repositório (SQLAlchemy): Deletando transação {id_transacao}.")
 
-    def get_pendentes_by_usuario(self, id_usuario: str) -> List[DomainTransacao]:
+    def get_pendentes_by_usuario(
+        self,
+        id_usuario: str,
+        cursor: CursorTransacao | None = None,
+        limite: int | None = None,
+    ) -> List[DomainTransacao]:
         """Implementa o SELECT (Listar Inbox)."""
         print(
             f"Repositório (SQLAlchemy): Buscando transações pendentes para {id_usuario}."
         )
 
-        rows_model = (
-            self.db.query(ModelTransacao)
-            .filter(
-                ModelTransacao.id_usuario == id_usuario,
-                ModelTransacao.status == StatusTransacao.PENDENTE,
-            )
-            .order_by(ModelTransacao.data.desc())
-            .all()
+        query = self.db.query(ModelTransacao).filter(
+            ModelTransacao.id_usuario == id_usuario,
+            ModelTransacao.status == StatusTransacao.PENDENTE,
         )
+        rows_model = self._apply_keyset(query, cursor, limite, status_fixo=True).all()
 
         # Mapeia os Models (Infra) de volta para Entidades (Domínio)
         return [self._map_model_to_domain(row) for row in rows_model]
@@ -121,72 +305,59 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
         if not transacoes:
             return
 
+        deltas = DeltasResumo()
+        anteriores = (
+            self.db.query(ModelTransacao)
+            .filter(ModelTransacao.id.in_([t.id for t in transacoes]))
+            .all()
+        )
+        for t_model in anteriores:
+            deltas.registrar(t_model, -1)
+
         for t_domain in transacoes:
+            deltas.registrar(t_domain, +1)
+            marcar_usuario_alterado(self.db, t_domain.id_usuario)
             # O 'merge' atualiza um objeto existente na sessão (baseado na PK)
             t_model = self._map_domain_to_model(t_domain)
             self.db.merge(t_model)
 
+        self.resumo.aplicar_deltas(deltas)
+
     def get_dashboard_stats(self, id_usuario: str) -> Dict[str, Any]:
-        """Implementa a agregação SQL para os cards do Dashboard."""
+        """
+        Cards do Dashboard, lidos do resumo mensal: o custo depende do número
+        de meses com movimento, e não do número de transações.
+        """
         print(f"Repositório (SQLAlchemy): Calculando estatísticas para {id_usuario}.")
 
-        today = datetime.now()
-        start_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-        # Expressão de valor (positivo para receita, negativo para despesa)
-        valor_calculado = case(
-            (ModelTransacao.tipo == TipoTransacao.RECEITA, ModelTransacao.valor),
-            else_=-ModelTransacao.valor,
-        )
-
-        # Filtros base
-        query_base = self.db.query(ModelTransacao).filter(
-            ModelTransacao.id_usuario == id_usuario,
-            ModelTransacao.status == StatusTransacao.PROCESSADO,
-        )
-
-        # Saldo total (sem filtro de data)
-        saldo_atual = query_base.with_entities(func.sum(valor_calculado)).scalar()
-
-        # Filtros de data (apenas para estatísticas do mês)
-        query_mes_atual = query_base.filter(ModelTransacao.data >= start_of_month)
-
-        receitas_mes = query_mes_atual.with_entities(
-            func.sum(
-                case(
-                    (
-                        ModelTransacao.tipo == TipoTransacao.RECEITA,
-                        ModelTransacao.valor,
-                    ),
-                    else_=0,
-                )
-            )
-        ).scalar()
-
-        despesas_mes = query_mes_atual.with_entities(
-            func.sum(
-                case(
-                    (
-                        ModelTransacao.tipo == TipoTransacao.DESPESA,
-                        ModelTransacao.valor,
-                    ),
-                    else_=0,
-                )
-            )
-        ).scalar()
-
-        return {
-            "saldo_atual": saldo_atual or 0.0,
-            "receitas_mes": receitas_mes or 0.0,
-            "despesas_mes": despesas_mes or 0.0,
-        }
+        mes_atual = datetime.now().strftime("%Y-%m")
+        return self.resumo.get_dashboard_totais(id_usuario, mes_atual)
 
     def get_by_id(self, id_transacao: str) -> DomainTransacao | None:
         """Busca uma transação única pelo seu ID."""
         model = self.db.query(ModelTransacao).filter_by(id=id_transacao).first()
         return self._map_model_to_domain(model)
 
-    def get_by_filters(
+    def _busca_fts(self, descricao: str):
+        """Subconsulta (rowid = id_busca, rank) das transações que contêm o termo."""
+        return (
+            select(TransacaoBusca.c.rowid, TransacaoBusca.c.rank)
+            .where(literal_column(TABELA_BUSCA).op("MATCH")(_termo_fts(descricao)))
+            .subquery()
+        )
+
+    def _filtrar_descricao(self, query: Query, descricao: str) -> Query:
+        """
+        Filtro de substring na descrição. Quando o termo tem trigramas, a
+        consulta parte do índice FTS (custo proporcional aos resultados, e não
+        ao histórico do usuário); termos curtos continuam no LIKE.
+        """
+        if len(descricao) < TAMANHO_MINIMO_BUSCA:
+            return query.filter(ModelTransacao.descricao.like(f"%{descricao}%"))
+        busca = self._busca_fts(descricao)
+        return query.join(busca, busca.c.rowid == ModelTransacao.id_busca)
+
+    def _query_by_filters(
         self,
         id_usuario: str,
         data_de: date | None = None,
@@ -199,9 +370,8 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
         id_perfil: str | None = None,
         sem_categoria: bool = False,
         sem_perfil: bool = False,
-    ) -> List[DomainTransacao]:
-        print("Repositório (SQLAlchemy): Buscando transações com filtros avançados.")
-
+    ) -> Query:
+        """Monta a consulta com os filtros avançados (sem ordenação)."""
         query = self.db.query(ModelTransacao).filter(
             ModelTransacao.id_usuario == id_usuario
         )
@@ -224,7 +394,7 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
             query = query.filter(ModelTransacao.valor <= valor_max)
 
         if descricao:
-            query = query.filter(ModelTransacao.descricao.like(f"%{descricao}%"))
+            query = self._filtrar_descricao(query, descricao)
 
         if id_categoria:
             query = query.filter(ModelTransacao.id_categoria == id_categoria)
@@ -236,7 +406,121 @@ class TransacaoRepositorySqlite(ITransacaoRepository):
         elif sem_perfil:
             query = query.filter(ModelTransacao.id_perfil == None)
 
-        rows_model = query.order_by(
-            ModelTransacao.status.asc(), ModelTransacao.data.desc()
+        return query
+
+    def get_by_filters(
+        self,
+        id_usuario: str,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        descricao: str | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+        cursor: CursorTransacao | None = None,
+        limite: int | None = None,
+    ) -> List[DomainTransacao]:
+        print("Repositório (SQLAlchemy): Buscando transações com filtros avançados.")
+
+        query = self._query_by_filters(
+            id_usuario=id_usuario,
+            data_de=data_de,
+            data_ate=data_ate,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            descricao=descricao,
+            status=status,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            sem_categoria=sem_categoria,
+            sem_perfil=sem_perfil,
+        )
+
+        rows_model = self._apply_keyset(
+            query, cursor, limite, status_fixo=status is not None
         ).all()
         return [self._map_model_to_domain(row) for row in rows_model]
+
+    def iter_by_filters(
+        self,
+        id_usuario: str,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        descricao: str | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+        tamanho_lote: int = 500,
+    ) -> Iterator[List[DomainTransacao]]:
+        """
+        Percorre o resultado em lotes com yield_per: apenas um lote de models
+        (e de entidades de domínio) fica em memória por vez.
+        """
+        print("Repositório (SQLAlchemy): Percorrendo transações em lotes.")
+
+        query = self._query_by_filters(
+            id_usuario=id_usuario,
+            data_de=data_de,
+            data_ate=data_ate,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            descricao=descricao,
+            status=status,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            sem_categoria=sem_categoria,
+            sem_perfil=sem_perfil,
+        )
+        stmt = self._apply_keyset(query, None, None).statement.execution_options(
+            yield_per=tamanho_lote
+        )
+
+        for lote in self.db.scalars(stmt).partitions():
+            yield [self._map_model_to_domain(row) for row in lote]
+
+    def search_by_descricao(
+        self,
+        id_usuario: str,
+        descricao: str,
+        limite: int,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+    ) -> List[DomainTransacao]:
+        """Busca no índice FTS ordenando pelo rank (bm25) do SQLite."""
+        print(f"Repositório (SQLAlchemy): Buscando '{descricao}' por relevância.")
+
+        query = self._query_by_filters(
+            id_usuario=id_usuario,
+            data_de=data_de,
+            data_ate=data_ate,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            status=status,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            sem_categoria=sem_categoria,
+            sem_perfil=sem_perfil,
+        )
+        busca = self._busca_fts(descricao)
+        rows_model = (
+            query.join(busca, busca.c.rowid == ModelTransacao.id_busca)
+            .order_by(busca.c.rank, ModelTransacao.data.desc(), ModelTransacao.id)
+            .limit(limite)
+            .all()
+        )
+        return [self._map_model_to_domain(row) for row in rows_model]
@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Callable
+
+from use_cases.storage_interface import ConteudoArquivado, IArquivoExtratosStorage
+
+# Fora de 'uploads', que é servida publicamente pela rota /uploads
+ARQUIVO_EXTRATOS_FOLDER = "arquivo_extratos"
+# Compactações que o arquivo pode ter gravado (a primeira é a preferida)
+COMPRESSOES = (".zst", ".gz")
+TAMANHO_BLOCO = 1024 * 1024
+NIVEL_ZSTD = 3
+NIVEL_GZIP = 6
+
+
+class ArquivoExtratosLocal(IArquivoExtratosStorage):
+    """
+    Extratos enviados, guardados em disco local com o nome igual ao SHA-256
+    do conteúdo original ('ab/abcd...ef.zst'). Compacta com zstd quando o
+    pacote 'zstandard' está instalado e com gzip caso contrário.
+    """
+
+    def __init__(self, pasta: str = ARQUIVO_EXTRATOS_FOLDER):
+        self.pasta = pasta
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def arquivar(self, file_stream: BinaryIO, compactar: bool) -> ConteudoArquivado:
+        compressao, compactador = _compactador() if compactar else ("", None)
+        hash_conteudo = hashlib.sha256()
+        tamanho = 0
+
+        # Grava num temporário da mesma pasta e só então move para o nome
+        # final (o hash só é conhecido no fim da cópia)
+        descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "wb") as destino:
+                saida = compactador(destino) if compactador else destino
+                with saida:
+                    while bloco := file_stream.read(TAMANHO_BLOCO):
+                        hash_conteudo.update(bloco)
+                        tamanho += len(bloco)
+                        saida.write(bloco)
+
+            hash_hex = hash_conteudo.hexdigest()
+            existente = self._existente(hash_hex)
+            if existente:
+                os.remove(temporario)
+                caminho, compressao = existente
+            else:
+                caminho = self._caminho(hash_hex, compressao)
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                os.replace(temporario, caminho)
+            return ConteudoArquivado(hash_hex, tamanho, caminho, compressao)
+        except Exception as e:
+            print(f"Erro ao arquivar extrato: {e}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise IOError("Não foi possível arquivar o extrato.")
+
+    def open(self, caminho_storage: str) -> BinaryIO:
+        return open(caminho_storage, "rb")
+
+    def _caminho(self, hash_hex: str, compressao: str) -> str:
+        return os.path.join(self.pasta, hash_hex[:2], hash_hex + compressao)
+
+    def _existente(self, hash_hex: str) -> tuple[str, str] | None:
+        """Conteúdo já guardado, com qualquer compactação: (caminho, compressao)."""
+        for compressao in COMPRESSOES + ("",):
+            caminho = self._caminho(hash_hex, compressao)
+            if os.path.exists(caminho):
+                return caminho, compressao
+        return None
+
+
+def _compactador() -> tuple[str, Callable[[BinaryIO], BinaryIO]]:
+    try:
+        import zstandard
+    except ImportError:
+        return ".gz", lambda destino: gzip.GzipFile(
+            fileobj=destino, mode="wb", compresslevel=NIVEL_GZIP, mtime=0
+        )
+    compressor = zstandard.ZstdCompressor(level=NIVEL_ZSTD)
+    return ".zst", lambda destino: compressor.stream_writer(destino, closefd=False)
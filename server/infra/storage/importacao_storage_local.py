@@ -0,0 +1,41 @@
+import os
+import shutil
+import uuid
+from typing import BinaryIO
+
+from use_cases.storage_interface import IImportacaoStorage
+from werkzeug.utils import secure_filename
+
+# Fora de 'uploads', que é servida publicamente pela rota /uploads
+IMPORTACOES_FOLDER = "importacoes"
+
+
+class ImportacaoStorageLocal(IImportacaoStorage):
+    """Extratos aguardando importação, salvos em disco local."""
+
+    def __init__(self, pasta: str = IMPORTACOES_FOLDER):
+        self.pasta = pasta
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def save(self, file_stream: BinaryIO, file_name: str) -> str:
+        ext = os.path.splitext(file_name)[1].lstrip(".").lower()
+        nome = str(uuid.uuid4()) + ("." + secure_filename(ext) if ext else "")
+        caminho = os.path.join(self.pasta, nome)
+
+        try:
+            # Cópia em blocos: o upload não é carregado inteiro na memória
+            with open(caminho, "wb") as destino:
+                shutil.copyfileobj(file_stream, destino)
+            return caminho
+        except Exception as e:
+            print(f"Erro ao salvar extrato para importação: {e}")
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            raise IOError(f"Não foi possível salvar o arquivo: {file_name}")
+
+    def open(self, caminho_storage: str) -> BinaryIO:
+        return open(caminho_storage, "rb")
+
+    def delete(self, caminho_storage: str) -> None:
+        if os.path.exists(caminho_storage):
+            os.remove(caminho_storage)
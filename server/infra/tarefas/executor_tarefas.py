@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from domain.tarefa import Tarefa
+from infra.db.database import session_factory
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+from sqlalchemy.orm import Session, sessionmaker
+from use_cases.repository_interfaces import ITarefaRepository
+
+# Threads que executam tarefas. Com SQLite só um escritor grava por vez, então
+# mais de uma thread só ajuda quando as tarefas não disputam escrita.
+TAREFAS_WORKERS = int(os.environ.get("PLANO_TAREFAS_WORKERS", "1"))
+# Segundos sem heartbeat até uma tarefa EXECUTANDO ser considerada órfã (o
+# processo morreu) e voltar para a fila
+TAREFAS_LEASE = float(os.environ.get("PLANO_TAREFAS_LEASE", "120"))
+# Espera entre consultas à fila quando ela está vazia
+INTERVALO_POLL = 1.0
+# Heartbeats por lease: alguns podem falhar (banco ocupado) sem perder a tarefa
+HEARTBEATS_POR_LEASE = 4
+
+
+class ContextoTarefa:
+    """Entregue ao handler: a sessão de escrita da tarefa e os checkpoints."""
+
+    def __init__(
+        self, tarefa: Tarefa, db_session: Session, tarefa_repo: ITarefaRepository
+    ):
+        self.tarefa = tarefa
+        self.db_session = db_session
+        self.tarefa_repo = tarefa_repo
+
+    def registrar_progresso(self, progresso: float) -> None:
+        """
+        Grava progresso e heartbeat e confirma (commit) o trabalho feito até
+        aqui. O SQLite só libera o lock de escrita no commit: é o que deixa o
+        progresso visível para a rota de status.
+        """
+        self.tarefa_repo.registrar_progresso(self.tarefa.id, progresso)
+        self.db_session.commit()
+
+
+class _Heartbeat:
+    """
+    Mantém o heartbeat da tarefa em dia enquanto o handler roda, numa thread
+    e numa sessão próprias (transações curtas), sem depender dos commits do
+    handler: copiar o arquivo ou gravar um lote pode levar mais que o lease,
+    e outro processo devolveria à fila uma tarefa que ainda está viva.
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker, id_tarefa: str, intervalo: float
+    ):
+        self._session_factory = session_factory
+        self._id_tarefa = id_tarefa
+        self._intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name=f"heartbeat-{id_tarefa[:8]}", daemon=True
+        )
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._parar.set()
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._parar.wait(self._intervalo):
+            db_session = self._session_factory()
+            try:
+                TarefaRepositorySqlite(db_session).registrar_heartbeat(
+                    self._id_tarefa
+                )
+                db_session.commit()
+            except Exception as e:
+                # Ex: o lote do handler segurou o lock além do busy_timeout;
+                # o próximo heartbeat tenta de novo
+                db_session.rollback()
+                print(f"Heartbeat da tarefa {self._id_tarefa} falhou: {e}")
+            finally:
+                db_session.close()
+
+
+Handler = Callable[[Tarefa, ContextoTarefa], Dict[str, Any]]
+
+
+class ExecutorTarefas:
+    """
+    Pool de threads que consome a fila persistente (tabela 'tarefa'). Cada
+    tipo de tarefa tem um handler registrado; o retorno do handler vira o
+    'resultado' da tarefa. ValueError encerra a tarefa como FALHOU; outros
+    erros a devolvem para a fila até esgotar as tentativas.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        workers: int = TAREFAS_WORKERS,
+        lease_segundos: float = TAREFAS_LEASE,
+        intervalo: float = INTERVALO_POLL,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        self._session_factory = session_factory
+        self.workers = workers
+        self.lease_segundos = lease_segundos
+        self.intervalo = intervalo
+        self._relogio = relogio
+        self._handlers: Dict[str, Handler] = {}
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._proxima_recuperacao = 0.0
+
+    def registrar(self, tipo: str, handler: Handler) -> None:
+        self._handlers[tipo] = handler
+
+    def iniciar(self) -> None:
+        """Sobe as threads (idempotente)."""
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._parar.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._loop, name=f"tarefas-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+            print(f"Executor de tarefas iniciado com {self.workers} thread(s).")
+
+    def parar(self, timeout: float | None = None) -> None:
+        with self._lock:
+            self._parar.set()
+            self._acordar.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def notificar(self) -> None:
+        """Acorda as threads ociosas (ex: logo depois de enfileirar)."""
+        self._acordar.set()
+
+    def executar_proxima(self) -> bool:
+        """Executa uma tarefa da fila. Retorna False se a fila estava vazia."""
+        db_session = self._session_factory()
+        try:
+            tarefa_repo = TarefaRepositorySqlite(db_session)
+            self._recuperar_expiradas(tarefa_repo)
+            tarefa = tarefa_repo.reservar_proxima(self._handlers)
+            db_session.commit()
+            if tarefa is None:
+                return False
+
+            handler = self._handlers[tarefa.tipo]
+            heartbeat = _Heartbeat(
+                self._session_factory,
+                tarefa.id,
+                self.lease_segundos / HEARTBEATS_POR_LEASE,
+            )
+            try:
+                with heartbeat:
+                    resultado = handler(
+                        tarefa, ContextoTarefa(tarefa, db_session, tarefa_repo)
+                    )
+                tarefa_repo.concluir(tarefa.id, resultado or {})
+                db_session.commit()
+            except ValueError as e:
+                db_session.rollback()
+                tarefa_repo.falhar(tarefa.id, str(e), repetir=False)
+                db_session.commit()
+            except Exception as e:
+                db_session.rollback()
+                tarefa_repo.falhar(tarefa.id, f"Erro inesperado: {e}", repetir=True)
+                db_session.commit()
+            return True
+        finally:
+            db_session.close()
+
+    def _recuperar_expiradas(self, tarefa_repo: TarefaRepositorySqlite) -> None:
+        # Não precisa rodar a cada consulta: o lease é bem maior que o poll
+        agora = self._relogio()
+        if agora < self._proxima_recuperacao:
+            return
+        self._proxima_recuperacao = agora + self.lease_segundos / 4
+        limite = datetime.now() - timedelta(seconds=self.lease_segundos)
+        tarefa_repo.recuperar_expiradas(limite)
+
+    def _loop(self) -> None:
+        while not self._parar.is_set():
+            try:
+                executou = self.executar_proxima()
+            except Exception as e:
+                print(f"Erro no executor de tarefas: {e}")
+                executou = False
+            if not executou:
+                self._acordar.wait(self.intervalo)
+                self._acordar.clear()
+
+
+# Instância única do processo, iniciada pela aplicação Flask
+executor_tarefas = ExecutorTarefas(session_factory)
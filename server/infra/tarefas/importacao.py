@@ -0,0 +1,130 @@
+import os
+from dataclasses import asdict
+from typing import Any, Dict
+
+from domain.tarefa import Tarefa
+from infra.cache.mapeamento_csv_cache_memoria import indice_mapeamentos_csv
+from infra.db.unidade_trabalho_sqlalchemy import UnidadeTrabalhoSqlAlchemy
+from infra.parsers.registro_parsers import registro_parsers
+from infra.repositories.extrato_arquivado_repository_sqlite import (
+    ExtratoArquivadoRepositorySqlite,
+)
+from infra.repositories.linha_quarentena_repository_sqlite import (
+    LinhaQuarentenaRepositorySqlite,
+)
+from infra.repositories.mapeamento_csv_repository_sqlite import (
+    MapeamentoCSVRepositorySqlite,
+)
+from infra.repositories.regra_categorizacao_repository_sqlite import (
+    RegraCategorizacaoRepositorySqlite,
+)
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from infra.storage.arquivo_extratos_local import ArquivoExtratosLocal
+from infra.storage.importacao_storage_local import ImportacaoStorageLocal
+from infra.tarefas.executor_tarefas import ContextoTarefa
+from sqlalchemy.orm import Session
+from use_cases.importacao_tarefas_use_cases import (
+    ArquivarExtrato,
+    ProcessarImportacaoEnfileirada,
+    ReprocessarExtratosArquivados,
+)
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+
+# Transações gravadas (e confirmadas) por lote: o lock de escrita do SQLite
+# fica preso no máximo pelo tempo de um lote
+IMPORTACAO_TAMANHO_LOTE = int(
+    os.environ.get("PLANO_IMPORTACAO_LOTE", ImportarExtratoBancario.TAMANHO_LOTE)
+)
+# Processos para o parse de um CSV grande (1 = parse sequencial, no worker)
+IMPORTACAO_PROCESSOS = int(os.environ.get("PLANO_IMPORTACAO_PROCESSOS", "1"))
+# Teto de bytes descompactados por extrato de um .gz/.zst/.zip
+IMPORTACAO_LIMITE_DESCOMPACTADO = int(
+    os.environ.get(
+        "PLANO_IMPORTACAO_LIMITE_MB",
+        ImportarExtratoBancario.LIMITE_DESCOMPACTADO // (1024 * 1024),
+    )
+) * (1024 * 1024)
+
+
+def executar_importacao(tarefa: Tarefa, contexto: ContextoTarefa) -> Dict[str, Any]:
+    """
+    Handler das tarefas de importação. Cada lote gravado é um checkpoint
+    (commit): se o processo cair, a nova tentativa pula pelo fingerprint as
+    linhas que já tinham sido gravadas. Um lote que falha volta ao seu
+    savepoint, sem desfazer os anteriores.
+    """
+    db_session = contexto.db_session
+    arquivador = ArquivarExtrato(
+        ExtratoArquivadoRepositorySqlite(db_session), ArquivoExtratosLocal()
+    )
+    use_case = ProcessarImportacaoEnfileirada(
+        criar_importador(db_session), ImportacaoStorageLocal(), arquivador
+    )
+    return use_case.execute(tarefa, contexto.registrar_progresso)
+
+
+def executar_reprocessamento(
+    tarefa: Tarefa, contexto: ContextoTarefa
+) -> Dict[str, Any]:
+    """
+    Handler das tarefas de reprocessamento do arquivo de extratos. Cada lote
+    é um checkpoint, como na importação; uma importação que falha volta ao
+    último checkpoint e a tarefa segue com as próximas.
+    """
+    db_session = contexto.db_session
+    payload = tarefa.payload
+    use_case = ReprocessarExtratosArquivados(
+        criar_importador(db_session),
+        ExtratoArquivadoRepositorySqlite(db_session),
+        ArquivoExtratosLocal(),
+        TarefaRepositorySqlite(db_session),
+    )
+
+    importacoes = []
+    ids_importacao = payload["ids_importacao"]
+    for indice, resultado in enumerate(
+        use_case.execute(
+            id_usuario=tarefa.id_usuario,
+            ids_importacao=ids_importacao,
+            column_mapping=payload.get("column_mapping"),
+            mapping_id=payload.get("mapping_id"),
+            tolerante=payload.get("tolerante"),
+            substituir=payload.get("substituir", False),
+            registrar_progresso=contexto.registrar_progresso,
+            id_tarefa=tarefa.id,
+        ),
+        start=1,
+    ):
+        if resultado.erro:
+            db_session.rollback()
+        contexto.registrar_progresso(indice / len(ids_importacao))
+        importacoes.append(asdict(resultado))
+
+    totais = (
+        "total_importadas",
+        "total_ignoradas",
+        "total_categorizadas",
+        "total_rejeitadas",
+        "total_removidas",
+    )
+    return {
+        **{total: sum(i[total] for i in importacoes) for total in totais},
+        "total_erros": sum(1 for i in importacoes if i["erro"]),
+        "importacoes": importacoes,
+    }
+
+
+def criar_importador(db_session: Session) -> ImportarExtratoBancario:
+    return ImportarExtratoBancario(
+        TransacaoRepositorySqlite(db_session),
+        MapeamentoCSVRepositorySqlite(db_session),
+        indice_mapeamentos_csv,
+        RegraCategorizacaoRepositorySqlite(db_session),
+        LinhaQuarentenaRepositorySqlite(db_session),
+        UnidadeTrabalhoSqlAlchemy(db_session),
+        tamanho_lote=IMPORTACAO_TAMANHO_LOTE,
+        processos_parse=IMPORTACAO_PROCESSOS,
+        registro=registro_parsers,
+        limite_descompactado=IMPORTACAO_LIMITE_DESCOMPACTADO,
+    )
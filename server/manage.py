@@ -0,0 +1,312 @@
+"""
+Comandos de manutenção executados fora do servidor web.
+
+Uso (a partir da pasta /server):
+    python manage.py rebuild-resumo [--usuario ID]
+    python manage.py rebuild-busca
+    python manage.py importar-pasta PASTA [--mapeamento NOME] [--processos N] [--tolerante]
+    python manage.py reprocessar-extratos [--importacao ID ...] [--mapeamento NOME]
+        [--tolerante] [--substituir]
+"""
+
+import argparse
+import os
+import sys
+
+# Garante que os módulos das pastas irmãs sejam encontrados
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from infra.cache.mapeamento_csv_cache_memoria import indice_mapeamentos_csv
+from infra.db.database import engine, get_db_read_session, get_db_session, init_db
+from infra.db.migrations import reconstruir_indice_busca
+from infra.db.unidade_trabalho_sqlalchemy import UnidadeTrabalhoSqlAlchemy
+from infra.parsers.registro_parsers import registro_parsers
+from infra.repositories.extrato_arquivado_repository_sqlite import (
+    ExtratoArquivadoRepositorySqlite,
+)
+from infra.repositories.linha_quarentena_repository_sqlite import (
+    LinhaQuarentenaRepositorySqlite,
+)
+from infra.repositories.mapeamento_csv_repository_sqlite import (
+    MapeamentoCSVRepositorySqlite,
+)
+from infra.repositories.regra_categorizacao_repository_sqlite import (
+    RegraCategorizacaoRepositorySqlite,
+)
+from infra.repositories.resumo_mensal_repository_sqlite import (
+    ResumoMensalRepositorySqlite,
+)
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from infra.storage.arquivo_extratos_local import ArquivoExtratosLocal
+from infra.tarefas.importacao import IMPORTACAO_TAMANHO_LOTE
+from use_cases.dashboard_use_cases import ReconstruirResumoMensal
+from use_cases.importacao_pasta_use_cases import ImportarPastaExtratos
+from use_cases.importacao_tarefas_use_cases import (
+    ReprocessarExtratosArquivados,
+    resolver_importacoes_arquivadas,
+)
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+
+# Mesmo usuário fixo usado pelas rotas
+USUARIO_PADRAO = "usuario_mock_id"
+
+
+def cmd_rebuild_resumo(args: argparse.Namespace) -> int:
+    """Recalcula o resumo mensal a partir das transações."""
+    db_session = get_db_session()
+    try:
+        use_case = ReconstruirResumoMensal(ResumoMensalRepositorySqlite(db_session))
+        linhas = use_case.execute(args.usuario)
+        db_session.commit()
+        print(f"Resumo mensal reconstruído: {linhas} linhas.")
+        return 0
+    except Exception as e:
+        db_session.rollback()
+        print(f"ERRO: {e}")
+        return 1
+    finally:
+        db_session.close()
+
+
+def cmd_rebuild_busca(args: argparse.Namespace) -> int:
+    """Recria o índice FTS da descrição a partir da tabela transacao."""
+    with engine.begin() as conn:
+        reconstruir_indice_busca(conn)
+    print("Índice de busca por descrição reconstruído.")
+    return 0
+
+
+def cmd_importar_pasta(args: argparse.Namespace) -> int:
+    """
+    Importa todos os CSV/OFX da pasta. O commit é feito a cada lote, como no
+    servidor: o lock de escrita do SQLite não fica preso o arquivo inteiro.
+    Um arquivo com erro mantém os lotes já gravados e informa o id da
+    importação, para desfazê-la ou retomá-la (as linhas já gravadas são
+    ignoradas numa nova execução); os demais arquivos seguem.
+    """
+    db_session = get_db_session()
+    # Os mapeamentos só são lidos: a sessão de leitura não pega o lock de escrita
+    leitura_session = get_db_read_session()
+    try:
+        mapeamento_repo = MapeamentoCSVRepositorySqlite(leitura_session)
+        importador = ImportarExtratoBancario(
+            TransacaoRepositorySqlite(db_session),
+            mapeamento_repo,
+            indice_mapeamentos_csv,
+            RegraCategorizacaoRepositorySqlite(db_session),
+            LinhaQuarentenaRepositorySqlite(db_session),
+            UnidadeTrabalhoSqlAlchemy(db_session),
+            tamanho_lote=IMPORTACAO_TAMANHO_LOTE,
+            registro=registro_parsers,
+        )
+        use_case = ImportarPastaExtratos(importador, mapeamento_repo)
+
+        resultados = []
+        for resultado in use_case.execute(
+            id_usuario=args.usuario,
+            pasta=args.pasta,
+            nome_mapeamento=args.mapeamento,
+            processos=args.processos,
+            recursivo=args.recursivo,
+            tolerante=args.tolerante,
+            ao_gravar_lote=lambda _: db_session.commit(),
+        ):
+            nome = os.path.relpath(resultado.arquivo, args.pasta)
+            if resultado.erro:
+                db_session.rollback()
+                print(f"[ERRO] {nome}: {resultado.erro}")
+                if resultado.total_importadas or resultado.total_rejeitadas:
+                    print(
+                        f"       {resultado.total_importadas} transações e "
+                        f"{resultado.total_rejeitadas} linhas em quarentena já "
+                        f"gravadas (importação {resultado.id_importacao}): "
+                        "rode de novo para retomar ou desfaça com "
+                        f"DELETE /api/transacoes/importacao/{resultado.id_importacao}"
+                    )
+            else:
+                print(
+                    f"[OK]   {nome}: {resultado.total_importadas} transações, "
+                    f"{resultado.total_ignoradas} já importadas, "
+                    f"{resultado.total_categorizadas} categorizadas "
+                    f"(parse {resultado.segundos_parse:.2f}s, "
+                    f"gravação {resultado.segundos_gravacao:.2f}s, "
+                    f"{resultado.linhas_por_segundo:.0f} linhas/s)"
+                )
+                if resultado.total_rejeitadas:
+                    print(
+                        f"       {resultado.total_rejeitadas} linhas em quarentena "
+                        f"(importação {resultado.id_importacao})"
+                    )
+            resultados.append(resultado)
+
+        erros = sum(1 for r in resultados if r.erro)
+        total = sum(r.total_importadas for r in resultados)
+        ignoradas = sum(r.total_ignoradas for r in resultados)
+        categorizadas = sum(r.total_categorizadas for r in resultados)
+        print(
+            f"{len(resultados)} arquivos, {total} transações importadas "
+            f"({categorizadas} categorizadas por regras), "
+            f"{ignoradas} ignoradas (já importadas), {erros} com erro."
+        )
+        return 1 if erros else 0
+    except ValueError as e:
+        db_session.rollback()
+        print(f"ERRO: {e}")
+        return 1
+    finally:
+        leitura_session.close()
+        db_session.close()
+
+
+def cmd_reprocessar_extratos(args: argparse.Namespace) -> int:
+    """
+    Importa de novo os extratos do arquivo, sem reenvio (ex: depois de
+    corrigir um mapeamento). O commit é feito a cada lote; uma importação
+    com erro não desfaz as demais.
+    """
+    db_session = get_db_session()
+    try:
+        mapeamento_repo = MapeamentoCSVRepositorySqlite(db_session)
+        arquivo_repo = ExtratoArquivadoRepositorySqlite(db_session)
+        importador = ImportarExtratoBancario(
+            TransacaoRepositorySqlite(db_session),
+            mapeamento_repo,
+            indice_mapeamentos_csv,
+            RegraCategorizacaoRepositorySqlite(db_session),
+            LinhaQuarentenaRepositorySqlite(db_session),
+            UnidadeTrabalhoSqlAlchemy(db_session),
+            tamanho_lote=IMPORTACAO_TAMANHO_LOTE,
+            registro=registro_parsers,
+        )
+        mapping_id = None
+        if args.mapeamento:
+            mapeamento = mapeamento_repo.get_by_nome(args.usuario, args.mapeamento)
+            if not mapeamento:
+                raise ValueError(f"Mapeamento '{args.mapeamento}' não encontrado.")
+            mapping_id = mapeamento.id
+
+        ids_importacao = resolver_importacoes_arquivadas(
+            arquivo_repo, args.usuario, args.importacao
+        )
+        use_case = ReprocessarExtratosArquivados(
+            importador,
+            arquivo_repo,
+            ArquivoExtratosLocal(),
+            TarefaRepositorySqlite(db_session),
+        )
+
+        erros = 0
+        for resultado in use_case.execute(
+            id_usuario=args.usuario,
+            ids_importacao=ids_importacao,
+            mapping_id=mapping_id,
+            tolerante=True if args.tolerante else None,
+            substituir=args.substituir,
+            registrar_progresso=lambda _: db_session.commit(),
+        ):
+            arquivos = ", ".join(resultado.arquivos)
+            if resultado.erro:
+                db_session.rollback()
+                erros += 1
+                print(
+                    f"[ERRO] {resultado.id_importacao} ({arquivos}): {resultado.erro}"
+                )
+                continue
+            db_session.commit()
+            print(
+                f"[OK]   {resultado.id_importacao} ({arquivos}): "
+                f"{resultado.total_importadas} transações, "
+                f"{resultado.total_ignoradas} já importadas, "
+                f"{resultado.total_removidas} removidas, "
+                f"{resultado.total_rejeitadas} em quarentena"
+            )
+
+        print(f"{len(ids_importacao)} importações reprocessadas, {erros} com erro.")
+        return 1 if erros else 0
+    except ValueError as e:
+        db_session.rollback()
+        print(f"ERRO: {e}")
+        return 1
+    finally:
+        db_session.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Manutenção do Plano Financeiro")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    rebuild = subparsers.add_parser(
+        "rebuild-resumo", help="Reconstrói o resumo mensal (rollup do dashboard)"
+    )
+    rebuild.add_argument("--usuario", help="Reconstrói apenas este usuário")
+    rebuild.set_defaults(func=cmd_rebuild_resumo)
+
+    busca = subparsers.add_parser(
+        "rebuild-busca", help="Reconstrói o índice FTS da busca por descrição"
+    )
+    busca.set_defaults(func=cmd_rebuild_busca)
+
+    importar = subparsers.add_parser(
+        "importar-pasta", help="Importa todos os extratos CSV/OFX de uma pasta"
+    )
+    importar.add_argument("pasta", help="Pasta com os arquivos .csv/.ofx")
+    importar.add_argument("--usuario", default=USUARIO_PADRAO)
+    importar.add_argument(
+        "--mapeamento", help="Nome de um mapeamento CSV salvo para usar nos CSVs"
+    )
+    importar.add_argument(
+        "--processos",
+        type=int,
+        default=1,
+        help="Processos de parse em paralelo (padrão: 1, sem paralelismo)",
+    )
+    importar.add_argument(
+        "--recursivo", action="store_true", help="Inclui as subpastas"
+    )
+    importar.add_argument(
+        "--tolerante",
+        action="store_true",
+        help="Importa as linhas válidas e põe as inválidas em quarentena",
+    )
+    importar.set_defaults(func=cmd_importar_pasta)
+
+    reprocessar = subparsers.add_parser(
+        "reprocessar-extratos",
+        help="Importa de novo os extratos arquivados, sem reenviar os arquivos",
+    )
+    reprocessar.add_argument(
+        "--importacao",
+        action="append",
+        help="Id da importação a reprocessar (repetível; padrão: todas)",
+    )
+    reprocessar.add_argument("--usuario", default=USUARIO_PADRAO)
+    reprocessar.add_argument(
+        "--mapeamento", help="Nome do mapeamento CSV salvo a usar no lugar do original"
+    )
+    reprocessar.add_argument(
+        "--tolerante",
+        action="store_true",
+        help="Põe as linhas inválidas em quarentena (padrão: como no envio)",
+    )
+    reprocessar.add_argument(
+        "--substituir",
+        action="store_true",
+        help=(
+            "Remove antes as transações gravadas pelas importações, inclusive "
+            "as já revisadas (voltam como pendentes)"
+        ),
+    )
+    reprocessar.set_defaults(func=cmd_reprocessar_extratos)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    init_db()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import ast
+import os
+import sys
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+ROTAS = os.path.join(PROJECT_ROOT, "app", "routes")
+
+
+def _rotas_get() -> list[tuple[str, ast.FunctionDef]]:
+    """(arquivo, função) de cada rota que atende GET, lidas do código-fonte."""
+    rotas = []
+    for arquivo in sorted(os.listdir(ROTAS)):
+        if not arquivo.endswith("_routes.py"):
+            continue
+        with open(os.path.join(ROTAS, arquivo), encoding="utf-8") as fonte:
+            modulo = ast.parse(fonte.read())
+        for funcao in ast.walk(modulo):
+            if isinstance(funcao, ast.FunctionDef) and any(
+                _atende_get(decorador) for decorador in funcao.decorator_list
+            ):
+                rotas.append((arquivo, funcao))
+    return rotas
+
+
+def _atende_get(decorador: ast.expr) -> bool:
+    if not (
+        isinstance(decorador, ast.Call)
+        and isinstance(decorador.func, ast.Attribute)
+        and decorador.func.attr == "route"
+    ):
+        return False
+    metodos = [k.value for k in decorador.keywords if k.arg == "methods"]
+    if not metodos:
+        return True  # o Flask atende só GET quando 'methods' é omitido
+    return "GET" in ast.literal_eval(metodos[0])
+
+
+def _chamadas(funcao: ast.FunctionDef) -> set[str]:
+    return {
+        no.func.id
+        for no in ast.walk(funcao)
+        if isinstance(no, ast.Call) and isinstance(no.func, ast.Name)
+    }
+
+
+ROTAS_GET = _rotas_get()
+
+
+def test_ha_rotas_get():
+    assert len(ROTAS_GET) >= 10
+
+
+@pytest.mark.parametrize(
+    "arquivo, funcao", ROTAS_GET, ids=[f.name for _, f in ROTAS_GET]
+)
+def test_rotas_get_usam_a_sessao_de_leitura(arquivo, funcao):
+    chamadas = _chamadas(funcao)
+
+    assert "get_db_session" not in chamadas, f"{arquivo}:{funcao.lineno}"
+    if any(nome.endswith("RepositorySqlite") for nome in chamadas):
+        assert "get_db_read_session" in chamadas, f"{arquivo}:{funcao.lineno}"
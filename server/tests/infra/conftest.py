@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import infra.db.models  # noqa: F401 (registra os models na Base)
+from infra.db.database import Base, create_sqlite_engine
+from infra.db.migrations import aplicar_migracoes
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def migrar() -> bool:
+    """
+    Aplica as migrações depois do create_all (índices FTS, etc). Os módulos
+    que precisam delas sobrescrevem esta fixture devolvendo True.
+    """
+    return False
+
+
+@pytest.fixture
+def engine(tmp_path, migrar):
+    """Banco SQLite novo em tmp_path, com o perfil de PRAGMAs padrão."""
+    engine = create_sqlite_engine(f"sqlite:///{tmp_path / 'plano.db'}")
+    Base.metadata.create_all(bind=engine)
+    if migrar:
+        aplicar_migracoes(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def fabrica(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db_session(fabrica):
+    session = fabrica()
+    yield session
+    session.close()
@@ -0,0 +1,55 @@
+import gzip
+import hashlib
+import io
+import os
+import sys
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from infra.storage.arquivo_extratos_local import ArquivoExtratosLocal
+
+
+def _descompactar(caminho: str, compressao: str) -> bytes:
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    if compressao == ".zst":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompressobj().decompress(dados)
+    return gzip.decompress(dados) if compressao == ".gz" else dados
+
+
+def test_arquivar_compacta_e_endereca_pelo_conteudo(tmp_path):
+    storage = ArquivoExtratosLocal(str(tmp_path))
+    conteudo = "".join(f"01/02/2024;{i},00;Compra {i}\n" for i in range(3000)).encode()
+    hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+
+    arquivado = storage.arquivar(io.BytesIO(conteudo), compactar=True)
+
+    assert arquivado.hash_conteudo == hash_conteudo
+    assert arquivado.tamanho_bytes == len(conteudo)
+    assert arquivado.compressao in (".zst", ".gz")
+    assert arquivado.caminho_storage == os.path.join(
+        str(tmp_path), hash_conteudo[:2], hash_conteudo + arquivado.compressao
+    )
+    assert os.path.getsize(arquivado.caminho_storage) < len(conteudo) / 4
+    assert _descompactar(arquivado.caminho_storage, arquivado.compressao) == conteudo
+
+    # O mesmo conteúdo de novo reaproveita o arquivo e não deixa temporários
+    de_novo = storage.arquivar(io.BytesIO(conteudo), compactar=True)
+    assert de_novo == arquivado
+    assert os.listdir(tmp_path) == [hash_conteudo[:2]]
+
+
+def test_arquivar_sem_compactar_guarda_como_veio(tmp_path):
+    storage = ArquivoExtratosLocal(str(tmp_path))
+    conteudo = gzip.compress(b"Data;Valor;Descricao\n01/02/2024;1,00;Pix\n")
+
+    arquivado = storage.arquivar(io.BytesIO(conteudo), compactar=False)
+
+    assert arquivado.compressao == ""
+    with storage.open(arquivado.caminho_storage) as arquivo:
+        assert arquivo.read() == conteudo
@@ -0,0 +1,141 @@
+import gzip
+import io
+import os
+import sys
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from flask import Flask, jsonify, request
+from infra.http.corpo_compactado import DescompactarCorpoGzip
+
+
+def _criar_cliente(**kwargs):
+    app = Flask(__name__)
+
+    @app.route("/upload", methods=["POST"])
+    def upload():
+        arquivo = request.files.get("arquivo")
+        if arquivo is None:
+            return jsonify({"erro": "Nenhum arquivo enviado."}), 400
+        return jsonify(
+            {
+                "nome": arquivo.filename,
+                "conteudo": arquivo.read().decode(),
+                "tolerante": request.form.get("tolerante"),
+            }
+        )
+
+    app.wsgi_app = DescompactarCorpoGzip(app.wsgi_app, **kwargs)
+    return app.test_client()
+
+
+@pytest.fixture
+def cliente():
+    return _criar_cliente()
+
+
+def _multipart(conteudo: bytes) -> tuple[bytes, str]:
+    fronteira = "fronteira123"
+    corpo = (
+        f"--{fronteira}\r\n"
+        'Content-Disposition: form-data; name="tolerante"\r\n\r\ntrue\r\n'
+        f"--{fronteira}\r\n"
+        'Content-Disposition: form-data; name="arquivo"; filename="extrato.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode() + conteudo + f"\r\n--{fronteira}--\r\n".encode()
+    return corpo, f"multipart/form-data; boundary={fronteira}"
+
+
+def test_upload_com_content_encoding_gzip_chega_descompactado(cliente):
+    csv = "".join(f"01/02/2024;{i},00;Compra {i}\n" for i in range(5000)).encode()
+    corpo, tipo = _multipart(csv)
+
+    resposta = cliente.post(
+        "/upload",
+        input_stream=io.BytesIO(gzip.compress(corpo)),
+        content_type=tipo,
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    assert resposta.status_code == 200
+    assert resposta.json["nome"] == "extrato.csv"
+    assert resposta.json["conteudo"] == csv.decode()
+    assert resposta.json["tolerante"] == "true"
+
+
+def test_upload_sem_content_encoding_continua_igual(cliente):
+    corpo, tipo = _multipart(b"01/02/2024;1,00;Pix\n")
+
+    resposta = cliente.post("/upload", data=corpo, content_type=tipo)
+
+    assert resposta.status_code == 200
+    assert resposta.json["conteudo"] == "01/02/2024;1,00;Pix\n"
+
+
+def test_upload_com_outra_codificacao_e_recusado(cliente):
+    corpo, tipo = _multipart(b"x")
+
+    resposta = cliente.post(
+        "/upload", data=corpo, content_type=tipo, headers={"Content-Encoding": "br"}
+    )
+
+    assert resposta.status_code == 415
+    assert "br" in resposta.json["erro"]
+
+
+def test_upload_gzip_corrompido_nao_chega_a_rota(cliente):
+    corpo, tipo = _multipart(b"01/02/2024;1,00;Pix\n")
+
+    resposta = cliente.post(
+        "/upload",
+        data=gzip.compress(corpo)[:-20],
+        content_type=tipo,
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    assert resposta.status_code == 400
+
+
+def test_upload_gzip_acima_do_limite_descompactado_e_recusado():
+    cliente = _criar_cliente(limite_bytes=64 * 1024)
+    # ~1 MiB de zeros que viram ~1 KiB comprimidos
+    corpo, tipo = _multipart(bytes(1024 * 1024))
+    lidos = []
+    gzip_read = gzip.GzipFile.read
+
+    def espiar_read(self, tamanho=-1):
+        dados = gzip_read(self, tamanho)
+        lidos.append(len(dados))
+        return dados
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(gzip.GzipFile, "read", espiar_read)
+        resposta = cliente.post(
+            "/upload",
+            input_stream=io.BytesIO(gzip.compress(corpo)),
+            content_type=tipo,
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    assert resposta.status_code == 413
+    # A descompactação parou no limite, sem inflar o resto do corpo
+    assert 0 < sum(lidos) <= 64 * 1024 + 1
+
+
+def test_upload_gzip_dentro_do_limite_passa():
+    cliente = _criar_cliente(limite_bytes=64 * 1024)
+    corpo, tipo = _multipart(b"01/02/2024;1,00;Pix\n")
+
+    resposta = cliente.post(
+        "/upload",
+        input_stream=io.BytesIO(gzip.compress(corpo)),
+        content_type=tipo,
+        headers={"Content-Encoding": "gzip"},
+    )
+
+    assert resposta.status_code == 200
@@ -0,0 +1,87 @@
+import os
+import sys
+from datetime import datetime
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from infra.cache.dashboard_cache_memoria import DashboardCacheMemoria, dashboard_cache
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+
+STATS = {"saldo_atual": 10.0, "receitas_mes": 10.0, "despesas_mes": 0.0}
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_hit_ate_a_proxima_escrita():
+    cache = DashboardCacheMemoria(ttl_segundos=60)
+    assert cache.get("u1") is None
+
+    cache.set("u1", STATS, cache.versao("u1"))
+    assert cache.get("u1") == STATS
+    assert cache.get("u2") is None
+
+    cache.invalidar("u1")
+    assert cache.get("u1") is None
+    assert cache.estatisticas()["hits"] == 1
+    assert cache.estatisticas()["misses"] == 3
+
+
+def test_valor_calculado_antes_de_uma_escrita_e_descartado():
+    cache = DashboardCacheMemoria()
+    versao = cache.versao("u1")
+    cache.invalidar("u1")  # escrita concorrente durante o cálculo
+
+    cache.set("u1", STATS, versao)
+    assert cache.get("u1") is None
+
+
+def test_entrada_expira_pelo_ttl():
+    relogio = RelogioFalso()
+    cache = DashboardCacheMemoria(ttl_segundos=30, relogio=relogio)
+    cache.set("u1", STATS, cache.versao("u1"))
+
+    relogio.agora = 29.0
+    assert cache.get("u1") == STATS
+    relogio.agora = 30.0
+    assert cache.get("u1") is None
+
+
+def _transacao():
+    return Transacao(
+        valor=10.0,
+        tipo=TipoTransacao.RECEITA,
+        data=datetime.now(),
+        status=StatusTransacao.PROCESSADO,
+        id_usuario="u_cache",
+    )
+
+
+def test_commit_do_repositorio_incrementa_versao(db_session):
+    repo = TransacaoRepositorySqlite(db_session)
+    versao = dashboard_cache.versao("u_cache")
+
+    repo.add(_transacao())
+    # Antes do commit a escrita ainda não é visível: a versão não muda
+    assert dashboard_cache.versao("u_cache") == versao
+    db_session.commit()
+    assert dashboard_cache.versao("u_cache") == versao + 1
+
+
+def test_rollback_nao_incrementa_versao(db_session):
+    repo = TransacaoRepositorySqlite(db_session)
+    versao = dashboard_cache.versao("u_cache")
+
+    repo.add(_transacao())
+    db_session.rollback()
+    db_session.commit()
+    assert dashboard_cache.versao("u_cache") == versao
@@ -0,0 +1,139 @@
+import os
+import sys
+from dataclasses import replace
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from infra.db.database import (
+    create_sqlite_engine,
+    get_db_read_session,
+    get_engine_profile,
+    read_engine,
+)
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+
+def _pragmas(engine) -> dict:
+    nomes = (
+        "journal_mode",
+        "synchronous",
+        "cache_size",
+        "mmap_size",
+        "temp_store",
+        "busy_timeout",
+        "query_only",
+    )
+    with engine.connect() as conn:
+        return {nome: conn.execute(text(f"PRAGMA {nome}")).scalar() for nome in nomes}
+
+
+@pytest.fixture
+def criar_engine(tmp_path):
+    engines = []
+
+    def criar(url=None, profile=None, **kwargs):
+        url = url or f"sqlite:///{tmp_path / 'plano.db'}"
+        engines.append(create_sqlite_engine(url, profile, **kwargs))
+        return engines[-1]
+
+    yield criar
+    for engine in engines:
+        engine.dispose()
+
+
+def test_perfil_producao_aplicado_em_cada_conexao(criar_engine):
+    pragmas = _pragmas(criar_engine(profile=get_engine_profile("producao")))
+
+    assert pragmas == {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": 0,  # DEFAULT
+        "busy_timeout": 5000,
+        "query_only": 0,
+    }
+
+
+def test_perfil_legado_mantem_os_padroes_do_sqlite(criar_engine):
+    pragmas = _pragmas(criar_engine(profile=get_engine_profile("legado")))
+
+    assert pragmas["journal_mode"] == "delete"
+    assert pragmas["synchronous"] == 2  # FULL
+    assert pragmas["cache_size"] == -2000
+    assert pragmas["mmap_size"] == 0
+    assert pragmas["temp_store"] == 0  # DEFAULT
+    # O busy_timeout padrão vem do driver sqlite3 (timeout=5.0)
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["query_only"] == 0
+
+
+def test_perfil_vale_para_as_conexoes_novas_do_pool(criar_engine):
+    engine = criar_engine(profile=get_engine_profile("producao"), pool_size=2)
+
+    # Conexões cruas (sem BEGIN): as duas ficam abertas ao mesmo tempo
+    conexoes = [engine.raw_connection(), engine.raw_connection()]
+    try:
+        for conn in conexoes:
+            cursor = conn.cursor()
+            assert cursor.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+            assert cursor.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        for conn in conexoes:
+            conn.close()
+
+
+def test_sessao_de_leitura_recusa_escritas(criar_engine, tmp_path):
+    escrita = criar_engine()
+    with escrita.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+    perfil = get_engine_profile("producao").somente_leitura()
+
+    # Mesmo formato de URL da read_engine: arquivo aberto com mode=ro
+    somente_ro = criar_engine(
+        f"sqlite:///file:{tmp_path / 'plano.db'}?mode=ro&uri=true", perfil
+    )
+    # query_only barra a escrita mesmo num arquivo aberto para escrita
+    somente_query_only = criar_engine(profile=perfil)
+
+    for engine in (somente_ro, somente_query_only):
+        session = sessionmaker(bind=engine)()
+        try:
+            assert session.execute(text("SELECT count(*) FROM t")).scalar() == 0
+            with pytest.raises(OperationalError, match="readonly"):
+                session.execute(text("INSERT INTO t (id) VALUES (1)"))
+        finally:
+            session.close()
+
+
+def test_get_db_read_session_usa_a_engine_somente_leitura():
+    session = get_db_read_session()
+    try:
+        assert session.get_bind() is read_engine
+        assert read_engine.url.query["mode"] == "ro"
+    finally:
+        session.close()
+
+
+def test_transacao_de_escrita_pega_o_lock_no_begin(criar_engine):
+    perfil = replace(get_engine_profile("producao"), busy_timeout_ms=50)
+    primeira = criar_engine(profile=perfil)
+    segunda = criar_engine(profile=perfil)
+    leitura = criar_engine(profile=perfil.somente_leitura())
+
+    with primeira.begin() as conn:
+        conn.execute(text("SELECT 1"))
+        # Só leu, mas já segura o lock de escrita: o outro escritor espera
+        with pytest.raises(OperationalError, match="locked"):
+            with segunda.begin() as outra:
+                outra.execute(text("SELECT 1"))
+        # Leitores (BEGIN DEFERRED) seguem livres
+        with leitura.connect() as conn_leitura:
+            assert conn_leitura.execute(text("SELECT 1")).scalar() == 1
@@ -0,0 +1,183 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.tarefa import StatusTarefa, Tarefa
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from infra.tarefas.executor_tarefas import ExecutorTarefas
+
+
+# Schema completo, com o que só as migrações criam (índices, busca FTS)
+@pytest.fixture
+def migrar():
+    return True
+
+
+@pytest.fixture
+def executor(fabrica):
+    executor = ExecutorTarefas(fabrica, workers=0, intervalo=0.01)
+    yield executor
+    executor.parar(timeout=5)
+
+
+def _enfileirar(fabrica, tipo="teste", **kwargs) -> str:
+    session = fabrica()
+    tarefa = Tarefa(id_usuario="u1", tipo=tipo, payload={"n": 3}, **kwargs)
+    TarefaRepositorySqlite(session).add(tarefa)
+    session.commit()
+    session.close()
+    return tarefa.id
+
+
+def _obter(fabrica, id_tarefa) -> Tarefa:
+    session = fabrica()
+    try:
+        return TarefaRepositorySqlite(session).get_by_id(id_tarefa)
+    finally:
+        session.close()
+
+
+def test_executar_proxima_grava_resultado_do_handler(fabrica, executor):
+    executor.registrar(
+        "teste", lambda tarefa, contexto: {"dobro": tarefa.payload["n"] * 2}
+    )
+    id_tarefa = _enfileirar(fabrica)
+
+    assert executor.executar_proxima() is True
+    assert executor.executar_proxima() is False
+
+    tarefa = _obter(fabrica, id_tarefa)
+    assert tarefa.status == StatusTarefa.CONCLUIDA
+    assert tarefa.resultado == {"dobro": 6}
+
+
+def test_tipo_sem_handler_fica_na_fila(fabrica, executor):
+    id_tarefa = _enfileirar(fabrica, tipo="desconhecido")
+
+    assert executor.executar_proxima() is False
+    assert _obter(fabrica, id_tarefa).status == StatusTarefa.PENDENTE
+
+
+def test_value_error_falha_sem_repetir(fabrica, executor):
+    def handler(tarefa, contexto):
+        raise ValueError("Arquivo CSV inválido")
+
+    executor.registrar("teste", handler)
+    id_tarefa = _enfileirar(fabrica)
+
+    executor.executar_proxima()
+
+    tarefa = _obter(fabrica, id_tarefa)
+    assert tarefa.status == StatusTarefa.FALHOU
+    assert tarefa.erro == "Arquivo CSV inválido"
+    assert tarefa.tentativas == 1
+
+
+def test_erro_inesperado_repete_ate_o_limite(fabrica, executor):
+    chamadas = []
+
+    def handler(tarefa, contexto):
+        chamadas.append(tarefa.tentativas)
+        raise RuntimeError("disco cheio")
+
+    executor.registrar("teste", handler)
+    id_tarefa = _enfileirar(fabrica, max_tentativas=2)
+
+    while executor.executar_proxima():
+        pass
+
+    assert chamadas == [1, 2]
+    tarefa = _obter(fabrica, id_tarefa)
+    assert tarefa.status == StatusTarefa.FALHOU
+    assert "disco cheio" in tarefa.erro
+
+
+def test_erro_desfaz_o_que_nao_passou_por_checkpoint(fabrica, executor):
+    def handler(tarefa, contexto):
+        repo = TransacaoRepositorySqlite(contexto.db_session)
+        for i in range(2):
+            repo.add(
+                Transacao(
+                    valor=10.0,
+                    tipo=TipoTransacao.DESPESA,
+                    data=datetime(2024, 1, 1),
+                    status=StatusTransacao.PENDENTE,
+                    id_usuario="u1",
+                    descricao=f"Lote {i}",
+                )
+            )
+            if i == 0:
+                contexto.registrar_progresso(0.5)
+        raise ValueError("falhou no segundo lote")
+
+    executor.registrar("teste", handler)
+    id_tarefa = _enfileirar(fabrica)
+
+    executor.executar_proxima()
+
+    session = fabrica()
+    gravadas = TransacaoRepositorySqlite(session).get_by_filters(id_usuario="u1")
+    session.close()
+    assert [t.descricao for t in gravadas] == ["Lote 0"]
+    assert _obter(fabrica, id_tarefa).progresso == 0.5
+
+
+def test_threads_consomem_a_fila(fabrica):
+    executor = ExecutorTarefas(fabrica, workers=2, intervalo=0.01)
+    executor.registrar("teste", lambda tarefa, contexto: {"ok": True})
+    ids = [_enfileirar(fabrica) for _ in range(5)]
+
+    executor.iniciar()
+    executor.iniciar()  # idempotente
+    try:
+        limite = time.monotonic() + 10
+        while time.monotonic() < limite:
+            if all(_obter(fabrica, i).finalizada for i in ids):
+                break
+            time.sleep(0.05)
+    finally:
+        executor.parar(timeout=5)
+
+    assert {_obter(fabrica, i).status for i in ids} == {StatusTarefa.CONCLUIDA}
+
+
+def test_tarefa_mais_lenta_que_o_lease_nao_volta_para_a_fila(fabrica):
+    # Dois executores no mesmo banco, como dois processos da aplicação
+    lease = 0.4
+    executores = [ExecutorTarefas(fabrica, workers=0, lease_segundos=lease)]
+    executores.append(ExecutorTarefas(fabrica, workers=0, lease_segundos=lease))
+    execucoes = []
+
+    def handler(tarefa, contexto):
+        # Sem checkpoint (commit) por mais de dois leases
+        execucoes.append(tarefa.tentativas)
+        time.sleep(lease * 2.5)
+        return {"ok": True}
+
+    for executor in executores:
+        executor.registrar("teste", handler)
+    id_tarefa = _enfileirar(fabrica)
+
+    lento = threading.Thread(target=executores[0].executar_proxima)
+    lento.start()
+    # Enquanto a tarefa roda, o outro executor procura tarefas expiradas
+    while lento.is_alive():
+        executores[1].executar_proxima()
+        time.sleep(lease / 8)
+    lento.join()
+
+    assert execucoes == [1]
+    tarefa = _obter(fabrica, id_tarefa)
+    assert tarefa.status == StatusTarefa.CONCLUIDA
+    assert tarefa.tentativas == 1
@@ -0,0 +1,48 @@
+import os
+import sys
+from datetime import datetime
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.extrato_arquivado import ExtratoArquivado
+from infra.repositories.extrato_arquivado_repository_sqlite import (
+    ExtratoArquivadoRepositorySqlite,
+)
+
+
+def _extrato(dia, id_importacao="imp1", id_usuario="u1"):
+    return ExtratoArquivado(
+        id_usuario=id_usuario,
+        id_importacao=id_importacao,
+        arquivo=f"extrato-{dia}.csv",
+        hash_conteudo=f"hash{dia}",
+        tamanho_bytes=100 * dia,
+        caminho_storage=f"arquivo_extratos/ha/hash{dia}.gz",
+        compressao=".gz",
+        parametros={"column_mapping": {"data": "__col_0"}, "tolerante": True},
+        criado_em=datetime(2024, 2, dia),
+    )
+
+
+def test_extratos_arquivados_por_importacao_e_por_usuario(db_session):
+    repo = ExtratoArquivadoRepositorySqlite(db_session)
+    for extrato in (
+        _extrato(3),
+        _extrato(1),
+        _extrato(2, id_importacao="imp2"),
+        _extrato(4, id_usuario="u2"),
+    ):
+        repo.add(extrato)
+    db_session.commit()
+
+    da_importacao = repo.get_by_importacao("u1", "imp1")
+    assert [e.arquivo for e in da_importacao] == ["extrato-1.csv", "extrato-3.csv"]
+    assert da_importacao[0].nome_arquivado == "extrato-1.csv.gz"
+    assert da_importacao[0].parametros["column_mapping"] == {"data": "__col_0"}
+
+    do_usuario = repo.list_by_usuario("u1")
+    assert [e.hash_conteudo for e in do_usuario] == ["hash3", "hash2", "hash1"]
+    assert repo.get_by_importacao("u2", "imp1")[0].tamanho_bytes == 400
@@ -0,0 +1,44 @@
+import os
+import sys
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.linha_quarentena import LinhaQuarentena
+from infra.repositories.linha_quarentena_repository_sqlite import (
+    LinhaQuarentenaRepositorySqlite,
+)
+
+
+def _linha(numero, id_importacao="imp1", id_usuario="u1"):
+    return LinhaQuarentena(
+        id_usuario=id_usuario,
+        id_importacao=id_importacao,
+        arquivo="extrato.csv",
+        numero_linha=numero,
+        motivo="Valor vazio.",
+        conteudo={"cabecalho": ["__col_0"], "colunas": [f"linha {numero}"]},
+    )
+
+
+def test_quarentena_grava_lista_atualiza_e_remove(db_session):
+    repo = LinhaQuarentenaRepositorySqlite(db_session)
+    linhas = [_linha(7), _linha(3), _linha(5, id_importacao="imp2")]
+    linhas.append(_linha(9, id_usuario="u2"))
+    assert repo.add_many(linhas) == 4
+    db_session.commit()
+
+    da_importacao = repo.get_by_importacao("u1", "imp1")
+    assert [linha.numero_linha for linha in da_importacao] == [3, 7]
+    assert da_importacao[0].conteudo["colunas"] == ["linha 3"]
+
+    repo.atualizar_motivos({da_importacao[0].id: "Formato de data inválido: x"})
+    repo.delete_many([da_importacao[1].id])
+    db_session.commit()
+
+    (restante,) = repo.get_by_importacao("u1", "imp1")
+    assert restante.motivo == "Formato de data inválido: x"
+    assert len(repo.get_by_importacao("u1", "imp2")) == 1
+    assert repo.get_by_importacao("u2", "imp2") == []
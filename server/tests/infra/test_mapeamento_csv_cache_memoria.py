@@ -0,0 +1,112 @@
+import os
+import sys
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.mapeamento_csv import MapeamentoCSV
+from infra.cache.mapeamento_csv_cache_memoria import (
+    IndiceMapeamentosCSVMemoria,
+    indice_mapeamentos_csv,
+)
+from infra.repositories.mapeamento_csv_repository_sqlite import (
+    MapeamentoCSVRepositorySqlite,
+)
+from use_cases.parsers.csv import CsvExtratoParser
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+class Carregador:
+    def __init__(self, indice):
+        self.indice = indice
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        return dict(self.indice)
+
+
+def test_indice_carregado_uma_vez_ate_invalidar():
+    cache = IndiceMapeamentosCSVMemoria()
+    carregar = Carregador({"abc": "mapeamento"})
+
+    assert cache.indice("u1", carregar) == {"abc": "mapeamento"}
+    assert cache.indice("u1", carregar) == {"abc": "mapeamento"}
+    assert carregar.chamadas == 1
+
+    cache.invalidar("u1")
+    cache.indice("u1", carregar)
+    assert carregar.chamadas == 2
+
+
+def test_indice_carregado_durante_invalidacao_nao_e_guardado():
+    cache = IndiceMapeamentosCSVMemoria()
+
+    def carregar_com_escrita_concorrente():
+        cache.invalidar("u1")
+        return {}
+
+    cache.indice("u1", carregar_com_escrita_concorrente)
+    carregar = Carregador({})
+    cache.indice("u1", carregar)
+    assert carregar.chamadas == 1
+
+
+def test_indice_expira_pelo_ttl():
+    relogio = RelogioFalso()
+    cache = IndiceMapeamentosCSVMemoria(ttl_segundos=30, relogio=relogio)
+    carregar = Carregador({})
+
+    cache.indice("u1", carregar)
+    relogio.agora = 29.0
+    cache.indice("u1", carregar)
+    assert carregar.chamadas == 1
+    relogio.agora = 30.0
+    cache.indice("u1", carregar)
+    assert carregar.chamadas == 2
+
+
+def _mapeamento(nome: str, assinatura: str) -> MapeamentoCSV:
+    return MapeamentoCSV(
+        id_usuario="u_indice",
+        nome=nome,
+        coluna_data="__col_0",
+        coluna_valor="__col_1",
+        coluna_descricao="__col_2",
+        assinatura_cabecalho=assinatura,
+    )
+
+
+def test_mapeamento_salvo_aparece_no_indice_apos_commit(db_session):
+    repo = MapeamentoCSVRepositorySqlite(db_session)
+    parser = CsvExtratoParser(repo, indice_mapeamentos_csv)
+    assert parser.mapeamentos_por_assinatura("u_indice") == {}
+
+    repo.add(_mapeamento("Banco X", "assinatura-x"))
+    # Antes do commit o índice em cache continua valendo
+    assert parser.mapeamentos_por_assinatura("u_indice") == {}
+    db_session.commit()
+
+    indice = parser.mapeamentos_por_assinatura("u_indice")
+    assert indice["assinatura-x"].nome == "Banco X"
+
+
+def test_rollback_mantem_o_indice(db_session):
+    repo = MapeamentoCSVRepositorySqlite(db_session)
+    parser = CsvExtratoParser(repo, indice_mapeamentos_csv)
+    repo.add(_mapeamento("Banco Y", "assinatura-y"))
+    db_session.commit()
+    assert "assinatura-y" in parser.mapeamentos_por_assinatura("u_indice")
+
+    repo.add(_mapeamento("Banco Z", "assinatura-z"))
+    db_session.rollback()
+    assert "assinatura-z" not in parser.mapeamentos_por_assinatura("u_indice")
@@ -0,0 +1,165 @@
+import os
+import sys
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import infra.db.models  # noqa: F401 (registra os models na Base)
+from infra.db.database import Base, create_sqlite_engine, get_engine_profile
+from infra.db.migrations import MIGRACOES, Migracao, aplicar_migracoes, versao_atual
+from sqlalchemy import text
+
+# Schema das tabelas como eram antes dos índices (banco "antigo")
+SCHEMA_LEGADO = [
+    "CREATE TABLE transacao (id VARCHAR PRIMARY KEY, valor FLOAT, tipo VARCHAR, "
+    "data DATETIME, status VARCHAR, id_usuario VARCHAR, descricao VARCHAR, "
+    "id_categoria VARCHAR, id_perfil VARCHAR, id_projeto VARCHAR)",
+    "CREATE TABLE meta (id VARCHAR PRIMARY KEY, id_usuario VARCHAR, "
+    "data_limite DATETIME)",
+    "CREATE TABLE reserva (id VARCHAR PRIMARY KEY, id_meta VARCHAR, valor FLOAT)",
+    "CREATE TABLE meta_uso (id VARCHAR PRIMARY KEY, id_meta VARCHAR, valor FLOAT)",
+    "CREATE TABLE anexo (id VARCHAR PRIMARY KEY, id_transacao VARCHAR)",
+]
+
+
+@pytest.fixture
+def engine_legado(tmp_path):
+    engine = create_sqlite_engine(
+        f"sqlite:///{tmp_path / 'plano.db'}", get_engine_profile("producao")
+    )
+    with engine.begin() as conn:
+        for comando in SCHEMA_LEGADO:
+            conn.execute(text(comando))
+        conn.execute(
+            text(
+                "INSERT INTO transacao (id, valor, tipo, data, status, id_usuario) "
+                "VALUES ('t1', 10, 'DESPESA', '2024-01-01', 'PENDENTE', 'u1'), "
+                "('t2', 30, 'DESPESA', '2024-01-05', 'PROCESSADO', 'u1'), "
+                "('t3', 20, 'DESPESA', '2024-01-20', 'PROCESSADO', 'u1'), "
+                "('t4', 99, 'RECEITA', '2024-02-01', 'PROCESSADO', 'u1')"
+            )
+        )
+    # Mesmo passo do init_db: cria apenas as tabelas que ainda não existem
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _indices(engine) -> set[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'index'")
+        ).all()
+    return {row[0] for row in rows}
+
+
+def test_aplicar_migracoes_cria_indices_em_banco_existente(engine_legado):
+    aplicadas = aplicar_migracoes(engine_legado)
+
+    assert aplicadas == [m.versao for m in MIGRACOES]
+    assert versao_atual(engine_legado) == MIGRACOES[-1].versao
+    assert {
+        "ix_transacao_usuario_status_data",
+        "ix_reserva_meta_valor",
+        "ix_meta_uso_meta_valor",
+        "ix_anexo_id_transacao",
+        "ix_meta_usuario_data_limite",
+    } <= _indices(engine_legado)
+
+    assert "ux_transacao_usuario_fingerprint" in _indices(engine_legado)
+
+    # Os dados existentes são preservados (upgrade no lugar)
+    with engine_legado.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM transacao")).scalar() == 4
+
+
+def test_migracao_popula_resumo_mensal_com_processadas(engine_legado):
+    aplicar_migracoes(engine_legado)
+
+    with engine_legado.connect() as conn:
+        linhas = conn.execute(
+            text(
+                "SELECT mes, tipo, total, quantidade FROM resumo_mensal "
+                "ORDER BY mes"
+            )
+        ).all()
+
+    assert [tuple(linha) for linha in linhas] == [
+        ("2024-01", "DESPESA", 50.0, 2),
+        ("2024-02", "RECEITA", 99.0, 1),
+    ]
+
+
+def test_aplicar_migracoes_e_idempotente(engine_legado):
+    aplicar_migracoes(engine_legado)
+
+    assert aplicar_migracoes(engine_legado) == []
+
+
+@pytest.mark.parametrize(
+    "filtro",
+    [
+        "id_usuario = 'u1'",
+        "id_usuario = 'u1' AND status = 'PENDENTE'",
+        "id_usuario = 'u1' AND status = 'PENDENTE' AND (data, id) < ('2024-02', 't9')",
+    ],
+)
+def test_inbox_usa_indice_apos_migracao(engine_legado, filtro):
+    aplicar_migracoes(engine_legado)
+
+    with engine_legado.connect() as conn:
+        plano = conn.execute(
+            text(
+                f"EXPLAIN QUERY PLAN SELECT * FROM transacao WHERE {filtro} "
+                "ORDER BY status, data DESC, id DESC LIMIT 50"
+            )
+        ).all()
+
+    detalhes = " ".join(str(row[-1]) for row in plano)
+    assert "ix_transacao_usuario_status_data" in detalhes
+    # A ordem da paginação sai do próprio índice, sem B-tree temporária
+    assert "TEMP B-TREE" not in detalhes
+
+
+def test_migracao_chaveia_busca_por_id_busca(engine_legado):
+    aplicar_migracoes(engine_legado)
+
+    with engine_legado.begin() as conn:
+        conn.execute(text("UPDATE transacao SET descricao = 'Mercado' WHERE id = 't2'"))
+        conn.execute(
+            text(
+                "INSERT INTO transacao (id, valor, tipo, data, status, id_usuario, "
+                "descricao) VALUES ('t5', 5, 'DESPESA', '2024-03-01', 'PENDENTE', "
+                "'u1', 'Supermercado')"
+            )
+        )
+        chaves = dict(conn.execute(text("SELECT id, id_busca FROM transacao")).all())
+        encontrados = conn.execute(
+            text(
+                "SELECT t.id FROM transacao_busca b "
+                "JOIN transacao t ON t.id_busca = b.rowid "
+                "WHERE transacao_busca MATCH 'mercado' ORDER BY t.id"
+            )
+        ).scalars()
+
+        # Linhas antigas herdam o rowid; as novas seguem a partir do maior
+        assert chaves == {"t1": 1, "t2": 2, "t3": 3, "t4": 4, "t5": 5}
+        assert list(encontrados) == ["t2", "t5"]
+
+
+def test_aplicar_migracoes_so_executa_versoes_novas(engine_legado):
+    executadas = []
+    migracoes = [
+        Migracao(versao=1, descricao="um", funcao=lambda c: executadas.append(1)),
+        Migracao(versao=2, descricao="dois", funcao=lambda c: executadas.append(2)),
+    ]
+
+    aplicar_migracoes(engine_legado, migracoes[:1])
+    aplicar_migracoes(engine_legado, migracoes)
+
+    assert executadas == [1, 2]
+    assert versao_atual(engine_legado) == 2
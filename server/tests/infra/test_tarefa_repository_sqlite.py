@@ -0,0 +1,152 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.tarefa import StatusTarefa, Tarefa
+from infra.repositories.tarefa_repository_sqlite import TarefaRepositorySqlite
+
+
+@pytest.fixture
+def repo(db_session):
+    return TarefaRepositorySqlite(db_session)
+
+
+def _enfileirar(repo, db_session, tipo="teste", minutos_atras=0, **kwargs):
+    tarefa = Tarefa(
+        id_usuario="u1",
+        tipo=tipo,
+        payload={"arquivo": "a.csv"},
+        criado_em=datetime.now() - timedelta(minutes=minutos_atras),
+        **kwargs,
+    )
+    repo.add(tarefa)
+    db_session.commit()
+    return tarefa
+
+
+def test_add_e_get_by_id_preservam_payload(repo, db_session):
+    tarefa = _enfileirar(repo, db_session)
+
+    salva = repo.get_by_id(tarefa.id)
+
+    assert salva.payload == {"arquivo": "a.csv"}
+    assert salva.status == StatusTarefa.PENDENTE
+    assert salva.tentativas == 0
+    assert repo.get_by_id("inexistente") is None
+
+
+def test_reservar_proxima_pega_a_mais_antiga_do_tipo(repo, db_session):
+    nova = _enfileirar(repo, db_session, minutos_atras=1)
+    antiga = _enfileirar(repo, db_session, minutos_atras=5)
+    _enfileirar(repo, db_session, tipo="outro", minutos_atras=10)
+
+    reservada = repo.reservar_proxima(["teste"])
+    db_session.commit()
+
+    assert reservada.id == antiga.id
+    assert reservada.status == StatusTarefa.EXECUTANDO
+    assert reservada.tentativas == 1
+    assert reservada.heartbeat_em is not None
+    assert repo.reservar_proxima(["teste"]).id == nova.id
+    assert repo.reservar_proxima(["teste"]) is None
+
+
+def test_reservar_proxima_nao_entrega_a_mesma_tarefa_duas_vezes(fabrica):
+    sessoes = [fabrica(), fabrica()]
+    repos = [TarefaRepositorySqlite(s) for s in sessoes]
+    _enfileirar(repos[0], sessoes[0])
+
+    primeira = repos[0].reservar_proxima(["teste"])
+    sessoes[0].commit()
+    segunda = repos[1].reservar_proxima(["teste"])
+    sessoes[1].commit()
+
+    assert primeira is not None
+    assert segunda is None
+    for sessao in sessoes:
+        sessao.close()
+
+
+def test_falhar_repete_ate_esgotar_as_tentativas(repo, db_session):
+    tarefa = _enfileirar(repo, db_session, max_tentativas=2)
+
+    for _ in range(2):
+        repo.reservar_proxima(["teste"])
+        repo.falhar(tarefa.id, "erro temporário", repetir=True)
+        db_session.commit()
+
+    salva = repo.get_by_id(tarefa.id)
+    assert salva.status == StatusTarefa.FALHOU
+    assert salva.tentativas == 2
+    assert salva.erro == "erro temporário"
+    assert salva.finalizado_em is not None
+
+
+def test_falhar_sem_repetir_encerra_na_hora(repo, db_session):
+    tarefa = _enfileirar(repo, db_session)
+    repo.reservar_proxima(["teste"])
+
+    repo.falhar(tarefa.id, "arquivo inválido", repetir=False)
+    db_session.commit()
+
+    assert repo.get_by_id(tarefa.id).status == StatusTarefa.FALHOU
+
+
+def test_concluir_grava_resultado(repo, db_session):
+    tarefa = _enfileirar(repo, db_session)
+    repo.reservar_proxima(["teste"])
+    repo.registrar_progresso(tarefa.id, 0.5)
+    db_session.commit()
+    assert repo.get_by_id(tarefa.id).progresso == 0.5
+
+    repo.concluir(tarefa.id, {"total_importadas": 3})
+    db_session.commit()
+
+    salva = repo.get_by_id(tarefa.id)
+    assert salva.status == StatusTarefa.CONCLUIDA
+    assert salva.finalizada
+    assert salva.progresso == 1.0
+    assert salva.resultado == {"total_importadas": 3}
+
+
+def test_recuperar_expiradas_devolve_a_fila(repo, db_session):
+    orfa = _enfileirar(repo, db_session)
+    repo.reservar_proxima(["teste"])
+    db_session.commit()
+
+    # Heartbeat recente: ainda pertence a quem está executando
+    assert repo.recuperar_expiradas(datetime.now() - timedelta(minutes=2)) == 0
+
+    assert repo.recuperar_expiradas(datetime.now() + timedelta(seconds=1)) == 1
+    db_session.commit()
+
+    salva = repo.get_by_id(orfa.id)
+    assert salva.status == StatusTarefa.PENDENTE
+    assert "interrompida" in salva.erro
+    assert repo.reservar_proxima(["teste"]).tentativas == 2
+
+
+def test_list_ativas_traz_pendentes_e_executando_do_usuario(repo, db_session):
+    rodando = _enfileirar(repo, db_session, minutos_atras=2)
+    pendente = _enfileirar(repo, db_session, minutos_atras=1)
+    concluida = _enfileirar(repo, db_session)
+    outra = Tarefa(id_usuario="u2", tipo="teste")
+    repo.add(outra)
+    assert repo.reservar_proxima(["teste"]).id == rodando.id
+    repo.concluir(concluida.id, {})
+    db_session.commit()
+
+    ativas = repo.list_ativas("u1")
+
+    assert [t.id for t in ativas] == [rodando.id, pendente.id]
+    assert [t.status for t in ativas] == [
+        StatusTarefa.EXECUTANDO,
+        StatusTarefa.PENDENTE,
+    ]
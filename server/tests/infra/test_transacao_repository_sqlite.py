@@ -0,0 +1,400 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+from use_cases.paginacao import CursorTransacao
+
+
+# Schema completo, com o que só as migrações criam (índices, busca FTS)
+@pytest.fixture
+def migrar():
+    return True
+
+
+@pytest.fixture
+def repo(db_session):
+    return TransacaoRepositorySqlite(db_session)
+
+
+def _add(repo, db_session, qtd, status=StatusTransacao.PENDENTE, data=None):
+    criadas = []
+    for i in range(qtd):
+        transacao = Transacao(
+            valor=10.0 + i,
+            tipo=TipoTransacao.DESPESA,
+            data=data or datetime(2025, 1, 1 + i % 28),
+            status=status,
+            id_usuario="u1",
+            descricao=f"Compra {i}",
+        )
+        repo.add(transacao)
+        criadas.append(transacao)
+    db_session.commit()
+    return criadas
+
+
+def _percorrer(buscar, tamanho):
+    vistos, cursor = [], None
+    while True:
+        pagina = buscar(cursor, tamanho)
+        vistos.extend(pagina)
+        if len(pagina) < tamanho:
+            return vistos
+        cursor = CursorTransacao.from_transacao(pagina[-1])
+
+
+def test_paginacao_pendentes_percorre_tudo_sem_repetir(repo, db_session):
+    # Várias transações na mesma data forçam o desempate pelo id
+    _add(repo, db_session, 7, data=datetime(2025, 3, 10))
+    _add(repo, db_session, 10)
+
+    vistos = _percorrer(
+        lambda c, n: repo.get_pendentes_by_usuario("u1", cursor=c, limite=n), 3
+    )
+
+    assert len(vistos) == 17
+    assert len({t.id for t in vistos}) == 17
+    assert vistos == repo.get_pendentes_by_usuario("u1")
+
+
+def test_paginacao_filtros_atravessa_status(repo, db_session):
+    _add(repo, db_session, 5, status=StatusTransacao.PENDENTE)
+    _add(repo, db_session, 5, status=StatusTransacao.PROCESSADO)
+
+    vistos = _percorrer(
+        lambda c, n: repo.get_by_filters("u1", cursor=c, limite=n), 4
+    )
+
+    assert [t.status for t in vistos] == [StatusTransacao.PENDENTE] * 5 + [
+        StatusTransacao.PROCESSADO
+    ] * 5
+    assert len({t.id for t in vistos}) == 10
+
+
+def test_iter_by_filters_entrega_lotes_na_ordem_da_listagem(repo, db_session):
+    _add(repo, db_session, 7, status=StatusTransacao.PENDENTE)
+    _add(repo, db_session, 3, status=StatusTransacao.PROCESSADO)
+
+    lotes = list(repo.iter_by_filters("u1", tamanho_lote=4))
+
+    assert [len(lote) for lote in lotes] == [4, 4, 2]
+    assert [t for lote in lotes for t in lote] == repo.get_by_filters("u1")
+
+
+def _resumo(db_session):
+    from infra.repositories.resumo_mensal_repository_sqlite import (
+        ResumoMensalRepositorySqlite,
+    )
+
+    return ResumoMensalRepositorySqlite(db_session).get_resumo(
+        "u1", ["mes", "id_categoria", "id_perfil", "tipo"]
+    )
+
+
+def test_resumo_mensal_acompanha_escritas_do_repositorio(repo, db_session):
+    from infra.repositories.resumo_mensal_repository_sqlite import (
+        ResumoMensalRepositorySqlite,
+    )
+
+    pendentes = _add(repo, db_session, 4)
+    processada = _add(repo, db_session, 1, status=StatusTransacao.PROCESSADO)[0]
+
+    # Categorização em lote move as pendentes para o resumo
+    for t in pendentes[:3]:
+        t.categorizar("cat_alimentacao", "perfil_pessoal")
+    repo.update_batch(pendentes[:3])
+    # Atualização individual e exclusão também ajustam o resumo
+    pendentes[3].categorizar("cat_lazer", "perfil_pj")
+    repo.update(pendentes[3])
+    repo.delete(processada.id)
+    db_session.commit()
+
+    incremental = _resumo(db_session)
+    ResumoMensalRepositorySqlite(db_session).rebuild()
+    db_session.commit()
+
+    assert incremental == _resumo(db_session)
+    assert sum(linha["quantidade"] for linha in incremental) == 4
+
+
+def test_dashboard_stats_lidos_do_resumo(repo, db_session):
+    agora = datetime.now()
+    for valor, tipo in [(100.0, TipoTransacao.RECEITA), (30.0, TipoTransacao.DESPESA)]:
+        repo.add(
+            Transacao(
+                valor=valor,
+                tipo=tipo,
+                data=agora,
+                status=StatusTransacao.PROCESSADO,
+                id_usuario="u1",
+            )
+        )
+    repo.add(
+        Transacao(
+            valor=500.0,
+            tipo=TipoTransacao.RECEITA,
+            data=datetime(2020, 1, 1),
+            status=StatusTransacao.PROCESSADO,
+            id_usuario="u1",
+        )
+    )
+    _add(repo, db_session, 2)  # pendentes não contam
+    db_session.commit()
+
+    assert repo.get_dashboard_stats("u1") == {
+        "saldo_atual": 570.0,
+        "receitas_mes": 100.0,
+        "despesas_mes": 30.0,
+    }
+
+
+def _com_descricoes(repo, db_session, descricoes):
+    criadas = []
+    for i, descricao in enumerate(descricoes):
+        transacao = Transacao(
+            valor=1.0,
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 1, 1 + i),
+            status=StatusTransacao.PENDENTE,
+            id_usuario="u1",
+            descricao=descricao,
+        )
+        repo.add(transacao)
+        criadas.append(transacao)
+    db_session.commit()
+    return criadas
+
+
+def test_filtro_de_descricao_usa_indice_fts(repo, db_session):
+    loja = 'Loja "Mercado" Central'
+    criadas = _com_descricoes(
+        repo,
+        db_session,
+        ["SUPERMERCADO EXTRA", "Padaria", "Mercado Livre", None, loja],
+    )
+
+    encontrados = {t.descricao for t in repo.get_by_filters("u1", descricao="mercado")}
+    assert encontrados == {"SUPERMERCADO EXTRA", "Mercado Livre", loja}
+    # Aspas no termo não quebram a sintaxe do MATCH
+    assert len(repo.get_by_filters("u1", descricao='"Mercad')) == 1
+    # Termos curtos (sem trigramas) continuam funcionando via LIKE
+    assert len(repo.get_by_filters("u1", descricao="pa")) == 1
+
+    # Triggers mantêm o índice em dia em updates e deletes
+    criadas[1].descricao = "Hipermercado"
+    repo.update(criadas[1])
+    repo.delete(criadas[0].id)
+    db_session.commit()
+
+    encontrados = {t.descricao for t in repo.get_by_filters("u1", descricao="mercado")}
+    assert encontrados == {"Hipermercado", "Mercado Livre", loja}
+
+
+def test_busca_nao_depende_do_rowid(repo, db_session, engine):
+    criadas = _com_descricoes(
+        repo, db_session, ["Aluguel", "Mercado Livre", "SUPERMERCADO"]
+    )
+    db_session.close()
+
+    # O que um VACUUM pode fazer numa tabela com PK texto: renumerar os rowids
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE transacao SET rowid = -rowid")
+        cursor.execute("UPDATE transacao SET rowid = 4 + rowid")
+    finally:
+        conn.close()
+
+    encontrados = {t.descricao for t in repo.get_by_filters("u1", descricao="mercado")}
+    assert encontrados == {"Mercado Livre", "SUPERMERCADO"}
+
+    # Linhas novas não reaproveitam a chave de uma linha existente, e os
+    # triggers de update/delete seguem achando a entrada certa
+    novas = _com_descricoes(repo, db_session, ["Mercadinho"])
+    criadas[1].descricao = "Feira"
+    repo.update(criadas[1])
+    repo.delete(criadas[2].id)
+    db_session.commit()
+    encontrados = {t.id for t in repo.get_by_filters("u1", descricao="mercad")}
+    assert encontrados == {novas[0].id}
+    assert [t.id for t in repo.get_by_filters("u1", descricao="feira")] == [
+        criadas[1].id
+    ]
+
+
+def test_busca_por_relevancia_ordena_pelo_rank(repo, db_session):
+    _com_descricoes(
+        repo,
+        db_session,
+        [
+            "Pagamento cartão mercado pago referente a compras diversas no mês",
+            "Mercado",
+            "Farmácia",
+        ],
+    )
+
+    resultado = repo.search_by_descricao("u1", "mercado", limite=10)
+
+    assert [t.descricao for t in resultado][0] == "Mercado"
+    assert len(resultado) == 2
+    assert repo.search_by_descricao("u2", "mercado", limite=10) == []
+
+
+def test_add_many_insere_lote_e_atualiza_resumo_e_busca(repo, db_session):
+    transacoes = [
+        Transacao(
+            valor=float(i + 1),
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 3, 1 + i),
+            status=StatusTransacao.PROCESSADO if i % 2 else StatusTransacao.PENDENTE,
+            id_usuario="u1",
+            descricao=f"Importada {i}",
+        )
+        for i in range(10)
+    ]
+
+    assert repo.add_many(transacoes) == 10
+    assert repo.add_many([]) == 0
+    db_session.commit()
+
+    assert len(repo.get_by_filters("u1", descricao="importada")) == 10
+    assert repo.get_by_id(transacoes[3].id).descricao == "Importada 3"
+    resumo = _resumo(db_session)
+    assert [(r["mes"], r["total"], r["quantidade"]) for r in resumo] == [
+        ("2025-03", 30.0, 5)
+    ]
+
+
+def test_fingerprints_existentes_e_unicos_por_usuario(repo, db_session):
+    from sqlalchemy.exc import IntegrityError
+
+    def _importada(id_usuario, fingerprint):
+        return Transacao(
+            valor=1.0,
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 1, 1),
+            status=StatusTransacao.PENDENTE,
+            id_usuario=id_usuario,
+            fingerprint_importacao=fingerprint,
+        )
+
+    repo.add_many([_importada("u1", "fp1"), _importada("u2", "fp2")])
+    # Lançamentos manuais (sem fingerprint) não conflitam entre si
+    _add(repo, db_session, 2)
+
+    assert repo.get_fingerprints_existentes("u1", ["fp1", "fp2", "fp3"]) == {"fp1"}
+    assert repo.get_fingerprints_existentes("u1", []) == set()
+
+    with pytest.raises(IntegrityError):
+        repo.add_many([_importada("u1", "fp1")])
+        db_session.flush()
+    db_session.rollback()
+
+
+def test_delete_por_importacao_remove_em_lotes_e_ajusta_resumo(repo, db_session):
+    def _importada(i, id_importacao, id_usuario="u1"):
+        return Transacao(
+            valor=10.0,
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 4, 1 + i),
+            status=StatusTransacao.PROCESSADO if i % 2 else StatusTransacao.PENDENTE,
+            id_usuario=id_usuario,
+            id_importacao=id_importacao,
+        )
+
+    repo.add_many([_importada(i, "imp1") for i in range(5)])
+    repo.add_many([_importada(0, "imp2"), _importada(1, "imp1", "u2")])
+    db_session.commit()
+    assert sum(r["quantidade"] for r in _resumo(db_session)) == 2
+
+    assert repo.delete_por_importacao("u1", "imp1", limite=3) == 3
+    assert repo.delete_por_importacao("u1", "imp1", limite=3) == 2
+    assert repo.delete_por_importacao("u1", "imp1", limite=3) == 0
+    db_session.commit()
+
+    assert [t.id_importacao for t in repo.get_by_filters("u1")] == ["imp2"]
+    assert len(repo.get_by_filters("u2")) == 1
+    # As PROCESSADAS removidas saem do resumo
+    assert _resumo(db_session) == []
+
+
+def _importacao_em_lotes(db_session, transacao_repo, commits):
+    from infra.db.unidade_trabalho_sqlalchemy import UnidadeTrabalhoSqlAlchemy
+    from use_cases.importacao_use_cases import ImportarExtratoBancario
+
+    conteudo = "Data;Valor;Descricao\n" + "".join(
+        f"0{d}/02/2024;-{d}.00;Compra {d}\n" for d in range(1, 6)
+    )
+    return ImportarExtratoBancario(
+        transacao_repo,
+        unidade_trabalho=UnidadeTrabalhoSqlAlchemy(db_session),
+        tamanho_lote=2,
+    ).execute(
+        id_usuario="u1",
+        file_bytes=conteudo.encode(),
+        file_name="extrato.csv",
+        id_importacao="imp1",
+        ao_gravar_lote=lambda totais: commits.append(db_session.commit()),
+    )
+
+
+class _FalhaAposInserir(TransacaoRepositorySqlite):
+    """Insere o lote e falha em seguida, a partir da chamada 'falhar_em'."""
+
+    def __init__(self, db_session, falhar_em, vezes):
+        super().__init__(db_session)
+        self.chamadas = 0
+        self.falhar_em = falhar_em
+        self.vezes = vezes
+
+    def add_many(self, transacoes):
+        total = super().add_many(transacoes)
+        self.chamadas += 1
+        if self.falhar_em <= self.chamadas < self.falhar_em + self.vezes:
+            raise RuntimeError("database is locked")
+        return total
+
+
+def test_importacao_volta_ao_savepoint_e_grava_o_lote_de_novo(repo, db_session):
+    commits = []
+    falha_uma_vez = _FalhaAposInserir(db_session, falhar_em=2, vezes=1)
+
+    resultado = _importacao_em_lotes(db_session, falha_uma_vez, commits)
+
+    # O INSERT da tentativa que falhou foi desfeito: nada contou como repetido
+    assert resultado["total_importadas"] == 5
+    assert resultado["total_ignoradas"] == 0
+    assert len(commits) == 3
+    assert len(repo.get_by_filters("u1")) == 5
+
+
+def test_importacao_interrompida_mantem_lotes_confirmados_e_retoma(
+    repo, db_session
+):
+    commits = []
+    sempre_falha = _FalhaAposInserir(db_session, falhar_em=2, vezes=10)
+
+    with pytest.raises(RuntimeError):
+        _importacao_em_lotes(db_session, sempre_falha, commits)
+    db_session.rollback()
+    assert len(commits) == 1
+    assert sorted(t.descricao for t in repo.get_by_filters("u1")) == [
+        "Compra 1",
+        "Compra 2",
+    ]
+
+    resultado = _importacao_em_lotes(db_session, repo, commits)
+
+    assert resultado["total_importadas"] == 3
+    assert resultado["total_ignoradas"] == 2
+    assert {t.id_importacao for t in repo.get_by_filters("u1")} == {"imp1"}
+    assert len(repo.get_by_filters("u1")) == 5
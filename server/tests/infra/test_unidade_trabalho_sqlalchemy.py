@@ -0,0 +1,92 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from infra.cache.dashboard_cache_memoria import dashboard_cache
+from infra.db.unidade_trabalho_sqlalchemy import UnidadeTrabalhoSqlAlchemy
+from infra.repositories.transacao_repository_sqlite import TransacaoRepositorySqlite
+
+
+# Schema completo, com o que só as migrações criam (índices, busca FTS)
+@pytest.fixture
+def migrar():
+    return True
+
+
+def _transacoes(qtd, inicio=0):
+    return [
+        Transacao(
+            valor=10.0 + i,
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 1, 1 + i % 28),
+            status=StatusTransacao.PENDENTE,
+            id_usuario="u1",
+            descricao=f"Compra {i}",
+        )
+        for i in range(inicio, inicio + qtd)
+    ]
+
+
+def _contar(engine) -> int:
+    # Conexão crua, em autocommit: um BEGIN IMMEDIATE esperaria a transação
+    # ainda aberta do teste
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        return cursor.execute("SELECT count(*) FROM transacao").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_rollback_externo_desfaz_savepoint_liberado(engine, db_session):
+    repo = TransacaoRepositorySqlite(db_session)
+    unidade = UnidadeTrabalhoSqlAlchemy(db_session)
+
+    with unidade.savepoint():
+        repo.add_many(_transacoes(3))
+    db_session.rollback()
+
+    assert _contar(engine) == 0
+
+
+def test_savepoint_com_erro_desfaz_so_o_proprio_lote(engine, db_session):
+    repo = TransacaoRepositorySqlite(db_session)
+    unidade = UnidadeTrabalhoSqlAlchemy(db_session)
+
+    with unidade.savepoint():
+        repo.add_many(_transacoes(2))
+    with pytest.raises(RuntimeError):
+        with unidade.savepoint():
+            repo.add_many(_transacoes(3, inicio=2))
+            raise RuntimeError("lote com erro")
+    # Nada foi confirmado antes do commit da Session
+    assert _contar(engine) == 0
+    db_session.commit()
+
+    assert _contar(engine) == 2
+
+
+def test_cache_do_dashboard_so_e_invalidado_no_commit_externo(db_session):
+    repo = TransacaoRepositorySqlite(db_session)
+    unidade = UnidadeTrabalhoSqlAlchemy(db_session)
+    versao = dashboard_cache.versao("u1")
+
+    with unidade.savepoint():
+        repo.add_many(_transacoes(1))
+    with pytest.raises(RuntimeError):
+        with unidade.savepoint():
+            repo.add_many(_transacoes(1, inicio=1))
+            raise RuntimeError("lote com erro")
+    # Liberar ou voltar a um savepoint não é commit
+    assert dashboard_cache.versao("u1") == versao
+    db_session.commit()
+
+    assert dashboard_cache.versao("u1") == versao + 1
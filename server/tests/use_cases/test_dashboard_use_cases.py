@@ -0,0 +1,71 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.transacao import TipoTransacao
+from use_cases.dashboard_use_cases import (
+    ObterAnaliseFinanceira,
+    ReconstruirResumoMensal,
+)
+from use_cases.repository_interfaces import IResumoMensalRepository
+
+
+@pytest.fixture
+def mock_resumo_repo():
+    return MagicMock(spec=IResumoMensalRepository)
+
+
+def test_analise_delega_ao_resumo_com_agrupamento_padrao(mock_resumo_repo):
+    mock_resumo_repo.get_resumo.return_value = [
+        {"mes": "2025-01", "tipo": "DESPESA", "total": 10.0, "quantidade": 1}
+    ]
+    use_case = ObterAnaliseFinanceira(mock_resumo_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1", mes_de="2025-01", mes_ate="2025-03", tipo="despesa"
+    )
+
+    assert resultado[0]["total"] == 10.0
+    mock_resumo_repo.get_resumo.assert_called_once_with(
+        id_usuario="u1",
+        agrupar_por=["mes", "tipo"],
+        mes_de="2025-01",
+        mes_ate="2025-03",
+        id_categoria=None,
+        id_perfil=None,
+        tipo=TipoTransacao.DESPESA,
+    )
+
+
+def test_analise_falha_agrupamento_invalido(mock_resumo_repo):
+    use_case = ObterAnaliseFinanceira(mock_resumo_repo)
+    with pytest.raises(ValueError, match="Agrupamento inválido"):
+        use_case.execute(id_usuario="u1", agrupar_por=["descricao"])
+    mock_resumo_repo.get_resumo.assert_not_called()
+
+
+def test_analise_falha_periodo_invertido(mock_resumo_repo):
+    use_case = ObterAnaliseFinanceira(mock_resumo_repo)
+    with pytest.raises(ValueError, match="mês final deve ser maior"):
+        use_case.execute(id_usuario="u1", mes_de="2025-05", mes_ate="2025-01")
+
+
+def test_analise_falha_mes_mal_formatado(mock_resumo_repo):
+    use_case = ObterAnaliseFinanceira(mock_resumo_repo)
+    with pytest.raises(ValueError, match="formato AAAA-MM"):
+        use_case.execute(id_usuario="u1", mes_de="01/2025")
+
+
+def test_reconstruir_resumo_mensal(mock_resumo_repo):
+    mock_resumo_repo.rebuild.return_value = 12
+    use_case = ReconstruirResumoMensal(mock_resumo_repo)
+
+    assert use_case.execute("u1") == 12
+    mock_resumo_repo.rebuild.assert_called_once_with("u1")
@@ -1,6 +1,11 @@
+import gzip
+import hashlib
+import io
 import os
 import sys
-from unittest.mock import MagicMock
+import zipfile
+from datetime import datetime
+from unittest.mock import ANY, MagicMock
 
 import pytest
 
@@ -8,18 +13,68 @@ import pytest
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
+# O gerador de extratos sintéticos fica junto dos benchmarks
+BENCHMARKS = os.path.join(PROJECT_ROOT, "benchmarks")
+if BENCHMARKS not in sys.path:
+    sys.path.insert(0, BENCHMARKS)
 
+from domain.linha_quarentena import LinhaQuarentena
 from domain.mapeamento_csv import MapeamentoCSV
-from use_cases.importacao_use_cases import ImportarExtratoBancario, SalvarMapeamentoCSV
+from domain.tarefa import StatusTarefa, Tarefa
+from gerador_extratos import (
+    VARIANTES,
+    VARIANTES_CSV,
+    gerar_extrato,
+    gerar_lancamentos,
+)
+import use_cases.parsers.csv as parser_csv
+from use_cases.extratos_compactados import extratos_do_arquivo
+from use_cases.importacao_pasta_use_cases import ImportarPastaExtratos
+from use_cases.importacao_tarefas_use_cases import (
+    ArquivarExtrato,
+    EnfileirarImportacaoExtrato,
+    EnfileirarReprocessamentoExtratos,
+    ProcessarImportacaoEnfileirada,
+    ReprocessarExtratosArquivados,
+)
+from use_cases.importacao_use_cases import (
+    TIPO_TAREFA_IMPORTACAO,
+    TIPO_TAREFA_REPROCESSAMENTO,
+    DesfazerImportacao,
+    ImportarExtratoBancario,
+    ResumoRejeicoes,
+)
+from use_cases.mapeamento_csv_use_cases import PreviewImportacaoCSV, SalvarMapeamentoCSV
+from use_cases.parsers.base import LinhaRejeitada
+from use_cases.parsers.csv import CsvExtratoParser, assinatura_cabecalho
+from use_cases.parsers.ofx import OfxExtratoParser
+from use_cases.quarentena_use_cases import ReprocessarQuarentena
 from use_cases.repository_interfaces import (
+    IExtratoArquivadoRepository,
+    ILinhaQuarentenaRepository,
     IMapeamentoCSVRepository,
+    ITarefaRepository,
     ITransacaoRepository,
 )
+from use_cases.storage_interface import (
+    ConteudoArquivado,
+    IArquivoExtratosStorage,
+    IImportacaoStorage,
+)
 
 
 @pytest.fixture
 def mock_repo():
-    return MagicMock(spec=ITransacaoRepository)
+    repo = MagicMock(spec=ITransacaoRepository)
+    repo.add_many.side_effect = lambda transacoes: len(transacoes)
+    repo.get_fingerprints_existentes.return_value = set()
+    return repo
+
+
+def _inseridas(mock_repo):
+    """Transações enviadas ao repositório em todas as chamadas de add_many."""
+    chamadas = mock_repo.add_many.call_args_list
+    return [t for chamada in chamadas for t in chamada.args[0]]
 
 
 @pytest.fixture
@@ -43,7 +98,8 @@ def test_importar_csv_com_mapeamento_sucesso(mock_repo):
     )
 
     assert resultado["total_importadas"] == 1
-    mock_repo.add.assert_called_once()
+    mock_repo.add_many.assert_called_once()
+    mock_repo.add.assert_not_called()
 
 
 def test_importar_ofx_sucesso(mock_repo):
@@ -67,7 +123,8 @@ def test_importar_ofx_sucesso(mock_repo):
     )
 
     assert resultado["total_importadas"] == 1
-    mock_repo.add.assert_called_once()
+    mock_repo.add_many.assert_called_once()
+    mock_repo.add.assert_not_called()
 
 
 def test_importar_formato_invalido(mock_repo):
@@ -78,7 +135,7 @@ def test_importar_formato_invalido(mock_repo):
             file_bytes=b"qualquer",
             file_name="extrato.pdf",
         )
-    mock_repo.add.assert_not_called()
+    mock_repo.add_many.assert_not_called()
 
 
 def test_importar_csv_sem_colunas_obrigatorias(mock_repo):
@@ -123,7 +180,8 @@ def test_importar_csv_com_mapeamento_salvo(mock_repo, mock_mapeamento_repo):
 
     assert resultado["total_importadas"] == 1
     mock_mapeamento_repo.get_by_id.assert_called_once_with("map1")
-    mock_repo.add.assert_called_once()
+    mock_repo.add_many.assert_called_once()
+    mock_repo.add.assert_not_called()
 
 
 def test_importar_csv_mapeamento_colunas_repetidas(mock_repo):
@@ -156,7 +214,7 @@ def test_importar_csv_sem_cabecalho(mock_repo):
     )
 
     assert resultado["total_importadas"] == 2
-    assert mock_repo.add.call_count == 2
+    assert len(_inseridas(mock_repo)) == 2
 
 
 def test_importar_csv_sem_cabecalho_sem_mapeamento(mock_repo):
@@ -194,6 +252,92 @@ def test_importar_csv_com_mapeamento_salvo_sem_cabecalho(
     mock_mapeamento_repo.get_by_id.assert_called_once_with("map2")
 
 
+def test_importar_csv_posicional_descarta_linha_de_cabecalho(mock_repo):
+    conteudo = "Data;Valor;Descricao\n01/02/2024;10.00;Padaria\n".encode()
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1",
+        file_bytes=conteudo,
+        file_name="extrato.csv",
+        column_mapping={"data": "__col_0", "valor": "__col_1", "descricao": "__col_2"},
+        sem_cabecalho=True,
+    )
+
+    assert resultado["total_importadas"] == 1
+    assert _inseridas(mock_repo)[0].descricao == "Padaria"
+
+
+def test_assinatura_cabecalho_normaliza_nomes():
+    assert assinatura_cabecalho(["Data", "Descrição ", "VALOR"]) == (
+        assinatura_cabecalho(["data", "descricao", "Valor"])
+    )
+    assert assinatura_cabecalho(["Data", "Valor"]) != assinatura_cabecalho(
+        ["Valor", "Data"]
+    )
+
+
+def _mapeamento_banco_x(**kwargs) -> MapeamentoCSV:
+    return MapeamentoCSV(
+        id_usuario="u1",
+        nome="Banco X",
+        coluna_data="__col_0",
+        coluna_valor="__col_2",
+        coluna_descricao="__col_1",
+        id="map3",
+        assinatura_cabecalho=assinatura_cabecalho(["Dt", "Historico", "Vl"]),
+        **kwargs,
+    )
+
+
+def test_importar_csv_sem_mapeamento_usa_mapeamento_pelo_cabecalho(
+    mock_repo, mock_mapeamento_repo
+):
+    mock_mapeamento_repo.get_by_usuario.return_value = [_mapeamento_banco_x()]
+    conteudo = "DT;Histórico;VL\n12/06/2025;mercado;-50.00\n".encode()
+
+    use_case = ImportarExtratoBancario(mock_repo, mock_mapeamento_repo)
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+
+    assert resultado["total_importadas"] == 1
+    transacao = _inseridas(mock_repo)[0]
+    assert (transacao.descricao, transacao.valor) == ("mercado", 50.0)
+    mock_mapeamento_repo.get_by_usuario.assert_called_once_with("u1")
+    mock_mapeamento_repo.get_by_id.assert_not_called()
+
+
+def test_importar_csv_cabecalho_desconhecido_usa_mapeamento_padrao(
+    mock_repo, mock_mapeamento_repo
+):
+    mock_mapeamento_repo.get_by_usuario.return_value = [_mapeamento_banco_x()]
+    conteudo = "Data;Valor;Descricao\n12/06/2025;-50.00;mercado\n".encode()
+
+    use_case = ImportarExtratoBancario(mock_repo, mock_mapeamento_repo)
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+
+    assert resultado["total_importadas"] == 1
+
+
+def test_assinatura_do_arquivo_ignora_arquivo_sem_cabecalho():
+    parser = CsvExtratoParser(None)
+    posicional = {"data": "__col_0", "valor": "__col_1", "descricao": "__col_2"}
+
+    assinatura = parser.assinatura_do_arquivo(
+        io.BytesIO(b"Data;Valor;Descricao\n01/02/2024;1.00;A\n"), posicional
+    )
+    assert assinatura == assinatura_cabecalho(["Data", "Valor", "Descricao"])
+    assert (
+        parser.assinatura_do_arquivo(
+            io.BytesIO(b"01/02/2024;1.00;A\n"), posicional
+        )
+        is None
+    )
+
+
 def test_salvar_mapeamento_csv_sucesso(mock_mapeamento_repo):
     mock_mapeamento_repo.exists_nome.return_value = False
     mock_mapeamento_repo.add.side_effect = lambda m: m
@@ -246,7 +390,1512 @@ def test_importar_csv_valor_negativo_determina_despesa(mock_repo):
         column_mapping={"data": "Data", "valor": "Valor", "descricao": "Descricao"},
     )
 
-    args, _ = mock_repo.add.call_args
-    transacao = args[0]
+    transacao = _inseridas(mock_repo)[0]
     assert transacao.tipo.name == "DESPESA"
     assert transacao.valor == 250.50
+
+
+def test_importar_csv_grande_envia_lotes_ao_repositorio(mock_repo, monkeypatch):
+    monkeypatch.setattr(ImportarExtratoBancario, "TAMANHO_LOTE", 2)
+    linhas = "".join(f"0{d}/02/2024;{d},00;Compra {d}\n" for d in range(1, 6))
+    conteudo = ("Data;Valor;Descricao\n" + linhas).encode()
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+
+    assert resultado["total_importadas"] == 5
+    assert [len(c.args[0]) for c in mock_repo.add_many.call_args_list] == [2, 2, 1]
+    assert {t.status.name for t in _inseridas(mock_repo)} == {"PENDENTE"}
+
+
+class _StreamContado(io.BytesIO):
+    """BytesIO que registra quantos bytes já foram lidos."""
+
+    def __init__(self, conteudo: bytes):
+        super().__init__(conteudo)
+        self.lidos = 0
+
+    def read(self, tamanho=-1):
+        bloco = super().read(tamanho)
+        self.lidos += len(bloco)
+        return bloco
+
+
+def test_parse_stream_csv_com_blocos_pequenos(monkeypatch):
+    # BOM e caracteres multibyte divididos entre blocos, campo com quebra de linha
+    monkeypatch.setattr(CsvExtratoParser, "TAMANHO_BLOCO", 3)
+    conteudo = (
+        "\ufeffData;Valor;Descricao\n"
+        '01/02/2024;-10,50;"Almoço\nno centro"\n'
+        "\n"
+        "02/02/2024;1.234,00;Salário ção\n"
+    ).encode("utf-8")
+    parser = CsvExtratoParser(None)
+
+    lotes = list(
+        parser.parse_stream(
+            id_usuario="u1",
+            file_stream=io.BytesIO(conteudo),
+            file_name="extrato.csv",
+            tamanho_lote=1,
+        )
+    )
+
+    assert [len(lote) for lote in lotes] == [1, 1]
+    assert lotes[0][0]["descricao"] == "Almoço\nno centro"
+    assert lotes[0][0]["tipo"].name == "DESPESA"
+    assert lotes[1][0]["valor"] == 1234.0
+    assert lotes[1][0]["descricao"] == "Salário ção"
+    # Mesmo resultado do parse em memória
+    assert [t for lote in lotes for t in lote] == parser.parse(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+
+
+def test_parse_stream_csv_le_o_arquivo_sob_demanda(monkeypatch):
+    monkeypatch.setattr(CsvExtratoParser, "TAMANHO_BLOCO", 1024)
+    linhas = "".join(f"01/02/2024;{i},00;Compra {i}\n" for i in range(1, 5001))
+    stream = _StreamContado(("Data;Valor;Descricao\n" + linhas).encode())
+
+    lotes = CsvExtratoParser(None).parse_stream(
+        id_usuario="u1", file_stream=stream, file_name="extrato.csv", tamanho_lote=10
+    )
+    primeiro = next(lotes)
+
+    assert len(primeiro) == 10
+    assert stream.lidos < 4 * 1024  # só o começo do arquivo foi lido
+
+    assert sum(len(lote) for lote in lotes) == 4990
+
+
+def _csv_com_campos_multilinha(linhas: int) -> str:
+    partes = ["\ufeffData;Valor;Descricao"]
+    for i in range(linhas):
+        if i % 3 == 0:
+            descricao = f'"Compra {i}\nem duas linhas"'
+        elif i == 151:
+            # Aspas soltas: a contagem de aspas erra os limites dali em diante
+            descricao = 'Monitor 27" loja'
+        else:
+            descricao = f"Compra {i}"
+        valor = "abc" if i % 17 == 5 else f"-{i + 1},50"
+        partes.append(f"01/02/2024;{valor};{descricao}")
+        if i % 11 == 0:
+            partes.append("")
+    return "\n".join(partes) + "\n"
+
+
+def _parse_arquivo(caminho, processos, **kwargs):
+    with open(caminho, "rb") as arquivo:
+        lotes = CsvExtratoParser(None).parse_stream(
+            id_usuario="u1",
+            file_stream=arquivo,
+            file_name="extrato.csv",
+            processos=processos,
+            tamanho_lote=7,
+            **kwargs,
+        )
+        return [registro for lote in lotes for registro in lote]
+
+
+def test_parse_paralelo_csv_igual_ao_sequencial(monkeypatch, tmp_path):
+    # Trechos pequenos: vários limites caem dentro de campos entre aspas, e
+    # depois das aspas soltas os trechos são refeitos em sequência
+    monkeypatch.setattr(CsvExtratoParser, "TAMANHO_TRECHO", 256)
+    trechos_usados = []
+    trechos_csv = parser_csv._trechos_csv
+
+    def registrar_trechos(*args):
+        trechos = trechos_csv(*args)
+        trechos_usados.extend(trechos)
+        return trechos
+
+    monkeypatch.setattr(parser_csv, "_trechos_csv", registrar_trechos)
+    caminho = tmp_path / "extrato.csv"
+    caminho.write_text(_csv_com_campos_multilinha(300), encoding="utf-8")
+
+    sequencial = _parse_arquivo(caminho, 1, tolerante=True)
+    paralelo = _parse_arquivo(caminho, 2, tolerante=True)
+
+    assert len(trechos_usados) > 10
+    assert paralelo == sequencial
+    rejeitadas = [r for r in paralelo if isinstance(r, LinhaRejeitada)]
+    assert len(rejeitadas) == 18
+    # Número da linha no arquivo todo, contando as quebras dentro das aspas
+    assert (rejeitadas[0].numero_linha, rejeitadas[-1].numero_linha) == (10, 422)
+    assert paralelo[0]["descricao"] == "Compra 0\nem duas linhas"
+    descricoes = {r["descricao"] for r in paralelo if isinstance(r, dict)}
+    assert 'Monitor 27" loja' in descricoes
+
+    with pytest.raises(ValueError) as erro_sequencial:
+        _parse_arquivo(caminho, 1)
+    with pytest.raises(ValueError) as erro_paralelo:
+        _parse_arquivo(caminho, 2)
+    assert str(erro_paralelo.value) == str(erro_sequencial.value)
+
+
+def test_parse_paralelo_csv_sem_cabecalho_e_com_escape(monkeypatch, tmp_path):
+    monkeypatch.setattr(CsvExtratoParser, "TAMANHO_TRECHO", 128)
+    mapping = {"data": "__col_0", "valor": "__col_1", "descricao": "__col_2"}
+    sem_cabecalho = tmp_path / "sem_cabecalho.csv"
+    sem_cabecalho.write_text(
+        "".join(f"01/02/2024;{i},00;Compra {i}\n" for i in range(1, 201))
+    )
+    # Aspas escapadas com barra invertida: volta ao parse sequencial
+    com_escape = tmp_path / "escape.csv"
+    com_escape.write_text(
+        "Data;Valor;Descricao\n"
+        + "".join(f'01/02/2024;{i},00;"Loja \\"{i}\\""\n' for i in range(1, 201))
+    )
+
+    for caminho, kwargs in (
+        (sem_cabecalho, {"column_mapping": mapping, "sem_cabecalho": True}),
+        (com_escape, {}),
+    ):
+        paralelo = _parse_arquivo(caminho, 2, **kwargs)
+        assert len(paralelo) == 200
+        assert paralelo == _parse_arquivo(caminho, 1, **kwargs)
+
+
+def test_importar_csv_por_stream(mock_repo):
+    conteudo = "Data;Valor;Descricao\n01/02/2024;123,45;Almoço\n".encode()
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1",
+        file_bytes=None,
+        file_name="extrato.csv",
+        file_stream=io.BytesIO(conteudo),
+    )
+
+    assert resultado["total_importadas"] == 1
+    assert _inseridas(mock_repo)[0].descricao == "Almoço"
+
+
+def test_importar_csv_stream_sem_dados(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    with pytest.raises(ValueError, match="Nenhuma transação válida"):
+        use_case.execute(
+            id_usuario="u1",
+            file_bytes=None,
+            file_name="extrato.csv",
+            file_stream=io.BytesIO("Data;Valor;Descricao\n".encode()),
+        )
+    mock_repo.add_many.assert_not_called()
+
+
+_CSV_FEV = "Data;Valor;Descricao\n01/02/2024;-5,00;Uber\n02/02/2024;7,00;Pix\n"
+_OFX_DEZ = "<STMTTRN>\n<DTPOSTED>20231201\n<TRNAMT>-3.00\n<MEMO>Cafe\n</STMTTRN>\n"
+
+
+def _zip(arquivos: dict) -> bytes:
+    conteudo = io.BytesIO()
+    with zipfile.ZipFile(conteudo, "w", zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for nome, texto in arquivos.items():
+            arquivo_zip.writestr(nome, texto)
+    return conteudo.getvalue()
+
+
+def test_importar_csv_gz_igual_ao_csv(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1",
+        file_bytes=None,
+        file_name="fev.csv.gz",
+        file_stream=io.BytesIO(gzip.compress(_CSV_FEV.encode())),
+    )
+
+    assert resultado["total_importadas"] == 2
+    assert [t.descricao for t in _inseridas(mock_repo)] == ["Uber", "Pix"]
+
+
+def test_extrato_gz_descompactado_sob_demanda(monkeypatch):
+    monkeypatch.setattr(CsvExtratoParser, "TAMANHO_BLOCO", 1024)
+    linhas = "".join(f"01/02/2024;{i},00;Compra {i:06d}\n" for i in range(1, 50001))
+    compactado = gzip.compress(("Data;Valor;Descricao\n" + linhas).encode())
+    stream = _StreamContado(compactado)
+
+    extratos = extratos_do_arquivo(stream, "extrato.csv.gz", [".csv"])
+    nome, descompactado = next(extratos)
+    lotes = CsvExtratoParser(None).parse_stream(
+        id_usuario="u1", file_stream=descompactado, file_name=nome, tamanho_lote=10
+    )
+
+    assert len(next(lotes)) == 10
+    assert stream.lidos < len(compactado) / 2
+    assert sum(len(lote) for lote in lotes) == 49990
+
+
+def test_importar_zip_grava_cada_extrato_na_mesma_importacao(mock_repo):
+    quarentena_repo = MagicMock(spec=ILinhaQuarentenaRepository)
+    conteudo = _zip(
+        {
+            "2024/fev.csv": _CSV_FEV + "03/02/2024;abc;Erro\n",
+            "2023/dez.ofx": _OFX_DEZ,
+            "leia-me.txt": "ignorado",
+            "__MACOSX/2024/._fev.csv": "lixo",
+        }
+    )
+    use_case = ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena_repo)
+
+    resultado = use_case.execute(
+        id_usuario="u1",
+        file_bytes=conteudo,
+        file_name="extratos.zip",
+        tolerante=True,
+        id_importacao="imp1",
+    )
+
+    assert resultado["total_importadas"] == 3
+    assert resultado["total_rejeitadas"] == 1
+    assert resultado["id_importacao"] == "imp1"
+    assert [(r["arquivo"], r["total_importadas"]) for r in resultado["arquivos"]] == [
+        ("2024/fev.csv", 2),
+        ("2023/dez.ofx", 1),
+    ]
+    assert {t.id_importacao for t in _inseridas(mock_repo)} == {"imp1"}
+    quarentenadas = quarentena_repo.add_many.call_args.args[0]
+    assert [linha.arquivo for linha in quarentenadas] == ["2024/fev.csv"]
+
+
+def test_importar_zip_erro_informa_o_extrato(mock_repo):
+    conteudo = _zip({"a.csv": _CSV_FEV, "b.csv": "Data;Valor;Descricao\n"})
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    with pytest.raises(ValueError, match="^b.csv: Nenhuma transação válida"):
+        use_case.execute(id_usuario="u1", file_bytes=conteudo, file_name="x.zip")
+    # O primeiro extrato foi gravado antes do erro
+    assert len(_inseridas(mock_repo)) == 2
+
+
+@pytest.mark.parametrize(
+    "nome, conteudo, mensagem",
+    [
+        ("x.zip", _zip({"leia-me.txt": "nada"}), "Nenhum extrato"),
+        ("x.zip", b"nao e zip", "Arquivo compactado inválido"),
+        ("x.csv.gz", gzip.compress(_CSV_FEV.encode())[:-12], "compactado inválido"),
+        ("x.pdf.gz", gzip.compress(b"%PDF"), "Formato de arquivo inválido"),
+    ],
+)
+def test_importar_compactado_invalido(mock_repo, nome, conteudo, mensagem):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    with pytest.raises(ValueError, match=mensagem):
+        use_case.execute(id_usuario="u1", file_bytes=conteudo, file_name=nome)
+    mock_repo.add_many.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "nome, compactar",
+    [
+        ("fev.csv.gz", gzip.compress),
+        ("lote.zip", lambda conteudo: _zip({"fev.csv": conteudo.decode()})),
+    ],
+)
+def test_importar_compactado_acima_do_limite(mock_repo, nome, compactar):
+    linhas = "".join(f"01/02/2024;-{i},00;Compra {i}\n" for i in range(2000))
+    conteudo = compactar(("Data;Valor;Descricao\n" + linhas).encode())
+    use_case = ImportarExtratoBancario(mock_repo, limite_descompactado=4096)
+
+    with pytest.raises(ValueError, match="grande demais.*4096 bytes"):
+        use_case.execute(id_usuario="u1", file_bytes=conteudo, file_name=nome)
+    mock_repo.add_many.assert_not_called()
+
+
+def test_extrato_descompactado_para_de_ler_no_limite():
+    linhas = "".join(f"01/02/2024;-{i},00;Compra {i}\n" for i in range(50000))
+    compactado = gzip.compress(linhas.encode())
+    stream = _StreamContado(compactado)
+
+    extratos = extratos_do_arquivo(
+        stream, "extrato.csv.gz", [".csv"], limite_bytes=4096
+    )
+    _, descompactado = next(extratos)
+
+    assert len(descompactado.read(4096)) == 4096
+    with pytest.raises(ValueError, match="grande demais"):
+        descompactado.read()
+    # Só o começo do arquivo comprimido foi lido
+    assert stream.lidos < len(compactado) / 2
+
+
+def test_importar_csv_zst(mock_repo):
+    zstandard = pytest.importorskip("zstandard")
+    conteudo = zstandard.ZstdCompressor().compress(_CSV_FEV.encode())
+
+    resultado = ImportarExtratoBancario(mock_repo).execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="fev.csv.zst"
+    )
+
+    assert resultado["total_importadas"] == 2
+
+
+def _pasta_extratos(tmp_path):
+    (tmp_path / "jan.csv").write_text(
+        "Data;Valor;Descricao\n01/01/2024;10,00;Padaria\n"
+    )
+    (tmp_path / "fev.csv").write_text(
+        "Data;Valor;Descricao\n01/02/2024;-5,00;Uber\n02/02/2024;7,00;Pix\n"
+    )
+    (tmp_path / "quebrado.csv").write_text("a;b\n1;2\n")
+    (tmp_path / "leia-me.txt").write_text("ignorado")
+    sub = tmp_path / "2023"
+    sub.mkdir()
+    (sub / "dez.ofx").write_text(
+        "<STMTTRN>\n<DTPOSTED>20231201\n<TRNAMT>-3.00\n<MEMO>Cafe\n</STMTTRN>\n"
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_importar_pasta_grava_cada_arquivo_e_reporta_erros(
+    mock_repo, tmp_path, processos
+):
+    pasta = _pasta_extratos(tmp_path)
+    use_case = ImportarPastaExtratos(ImportarExtratoBancario(mock_repo))
+
+    resultados = {
+        os.path.relpath(r.arquivo, pasta): r
+        for r in use_case.execute(
+            id_usuario="u1", pasta=str(pasta), processos=processos, recursivo=True
+        )
+    }
+
+    assert set(resultados) == {
+        "jan.csv",
+        "fev.csv",
+        "quebrado.csv",
+        os.path.join("2023", "dez.ofx"),
+    }
+    assert resultados["fev.csv"].total_importadas == 2
+    assert resultados[os.path.join("2023", "dez.ofx")].total_importadas == 1
+    assert "colunas esperadas" in resultados["quebrado.csv"].erro
+    assert len(_inseridas(mock_repo)) == 4
+    assert {t.id_usuario for t in _inseridas(mock_repo)} == {"u1"}
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_importar_pasta_com_extratos_compactados(mock_repo, tmp_path, processos):
+    (tmp_path / "fev.csv.gz").write_bytes(gzip.compress(_CSV_FEV.encode()))
+    (tmp_path / "lote.zip").write_bytes(_zip({"a.csv": _CSV_FEV, "b.ofx": _OFX_DEZ}))
+    (tmp_path / "notas.txt.gz").write_bytes(gzip.compress(b"ignorado"))
+    use_case = ImportarPastaExtratos(ImportarExtratoBancario(mock_repo))
+
+    resultados = {
+        os.path.basename(r.arquivo): r
+        for r in use_case.execute(
+            id_usuario="u1", pasta=str(tmp_path), processos=processos
+        )
+    }
+
+    assert set(resultados) == {"fev.csv.gz", "lote.zip"}
+    assert resultados["fev.csv.gz"].total_importadas == 2
+    assert resultados["lote.zip"].total_importadas == 3
+    assert resultados["lote.zip"].erro is None
+
+
+def test_importar_pasta_usa_mapeamento_salvo_pelo_nome(
+    mock_repo, mock_mapeamento_repo, tmp_path
+):
+    (tmp_path / "a.csv").write_text(
+        "12/06/2025,mercado,1000\n13/06/2025,padaria,50\n"
+    )
+    mock_mapeamento_repo.get_by_nome.return_value = MapeamentoCSV(
+        id_usuario="u1",
+        nome="Banco Sem Cabeçalho",
+        coluna_data="__col_0",
+        coluna_valor="__col_2",
+        coluna_descricao="__col_1",
+    )
+    use_case = ImportarPastaExtratos(
+        ImportarExtratoBancario(mock_repo), mock_mapeamento_repo
+    )
+
+    resultados = list(
+        use_case.execute(
+            id_usuario="u1",
+            pasta=str(tmp_path),
+            nome_mapeamento="Banco Sem Cabeçalho",
+        )
+    )
+
+    assert resultados[0].erro is None
+    assert resultados[0].total_importadas == 2
+    mock_mapeamento_repo.get_by_nome.assert_called_once_with(
+        "u1", "Banco Sem Cabeçalho"
+    )
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_importar_pasta_sem_mapeamento_usa_mapeamento_pelo_cabecalho(
+    mock_repo, mock_mapeamento_repo, tmp_path, processos
+):
+    for mes in ("jan", "fev"):
+        (tmp_path / f"{mes}.csv").write_text(
+            f"Dt;Historico;Vl\n12/06/2025;{mes};-10.00\n"
+        )
+    mock_mapeamento_repo.get_by_usuario.return_value = [_mapeamento_banco_x()]
+    use_case = ImportarPastaExtratos(
+        ImportarExtratoBancario(mock_repo), mock_mapeamento_repo
+    )
+
+    resultados = list(
+        use_case.execute(id_usuario="u1", pasta=str(tmp_path), processos=processos)
+    )
+
+    assert [r.erro for r in resultados] == [None, None]
+    assert sorted(t.descricao for t in _inseridas(mock_repo)) == ["fev", "jan"]
+    mock_mapeamento_repo.get_by_usuario.assert_called_once_with("u1")
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_importar_pasta_com_um_arquivo_grava_enquanto_faz_o_parse(
+    monkeypatch, mock_repo, tmp_path, processos
+):
+    linhas = "".join(f"0{1 + i % 9}/02/2024;-{i},50;Compra {i}\n" for i in range(30))
+    (tmp_path / "grande.csv").write_text("Data;Valor;Descricao\n" + linhas)
+    eventos = []
+    parse_stream = CsvExtratoParser.parse_stream
+
+    def espiar_parse(self, **kwargs):
+        for lote in parse_stream(self, **kwargs):
+            eventos.append("parse")
+            yield lote
+
+    monkeypatch.setattr(CsvExtratoParser, "parse_stream", espiar_parse)
+    mock_repo.add_many.side_effect = lambda t: eventos.append("grava") or len(t)
+    importador = ImportarExtratoBancario(mock_repo, tamanho_lote=10)
+    use_case = ImportarPastaExtratos(importador)
+
+    (resultado,) = use_case.execute(
+        id_usuario="u1", pasta=str(tmp_path), processos=processos
+    )
+
+    # Cada lote é gravado antes do parse do seguinte: o arquivo não é
+    # acumulado na memória
+    assert resultado.erro is None
+    assert resultado.total_importadas == 30
+    assert eventos == ["parse", "grava"] * 3
+
+
+def test_importar_pasta_sem_processos_nao_divide_o_arquivo(
+    monkeypatch, mock_repo, tmp_path
+):
+    (tmp_path / "extrato.csv").write_text(
+        "Data;Valor;Descricao\n01/02/2024;-1,50;Compra\n"
+    )
+    chamadas = []
+    parse_stream = CsvExtratoParser.parse_stream
+
+    def espiar_parse(self, **kwargs):
+        chamadas.append(kwargs["processos"])
+        return parse_stream(self, **kwargs)
+
+    monkeypatch.setattr(CsvExtratoParser, "parse_stream", espiar_parse)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    use_case = ImportarPastaExtratos(ImportarExtratoBancario(mock_repo))
+
+    (resultado,) = use_case.execute(id_usuario="u1", pasta=str(tmp_path))
+
+    # O parse em pedaços paralelos só liga com 'processos' explícito
+    assert resultado.total_importadas == 1
+    assert chamadas == [1]
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_importar_pasta_confirma_cada_lote_e_informa_a_importacao_com_erro(
+    mock_repo, tmp_path, processos
+):
+    linhas = "".join(f"0{1 + i % 9}/02/2024;-{i},50;Compra {i}\n" for i in range(30))
+    (tmp_path / "grande.csv").write_text("Data;Valor;Descricao\n" + linhas)
+    gravacoes = []
+
+    def add_many(transacoes):
+        if len(gravacoes) == 2:
+            raise RuntimeError("disco cheio")
+        gravacoes.append(transacoes)
+        return len(transacoes)
+
+    mock_repo.add_many.side_effect = add_many
+    commits = []
+    importador = ImportarExtratoBancario(mock_repo, tamanho_lote=10)
+    use_case = ImportarPastaExtratos(importador)
+
+    (resultado,) = use_case.execute(
+        id_usuario="u1",
+        pasta=str(tmp_path),
+        processos=processos,
+        ao_gravar_lote=lambda parcial: commits.append(parcial["total_importadas"]),
+    )
+
+    # Os dois lotes confirmados ficam, com o id da importação para desfazê-los
+    assert resultado.erro == "disco cheio"
+    assert commits == [10, 20]
+    assert resultado.total_importadas == 20
+    assert {t.id_importacao for lote in gravacoes for t in lote} == {
+        resultado.id_importacao
+    }
+
+
+def test_importar_pasta_mapeamento_inexistente(
+    mock_repo, mock_mapeamento_repo, tmp_path
+):
+    mock_mapeamento_repo.get_by_nome.return_value = None
+    use_case = ImportarPastaExtratos(
+        ImportarExtratoBancario(mock_repo), mock_mapeamento_repo
+    )
+
+    with pytest.raises(ValueError, match="Mapeamento 'X' não encontrado"):
+        list(
+            use_case.execute(id_usuario="u1", pasta=str(tmp_path), nome_mapeamento="X")
+        )
+
+
+def test_importar_ignora_linhas_ja_importadas(mock_repo):
+    conteudo = (
+        "Data;Valor;Descricao\n"
+        "01/02/2024;10,00;Café\n"
+        "01/02/2024;10,00;Café\n"  # repetida no mesmo extrato: não é duplicata
+        "02/02/2024;-5,00;Uber\n"
+    ).encode()
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    primeira = use_case.execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+    gravados = {t.fingerprint_importacao for t in _inseridas(mock_repo)}
+    assert primeira == {
+        "total_importadas": 3,
+        "total_ignoradas": 0,
+        "total_categorizadas": 0,
+        "total_rejeitadas": 0,
+        "id_importacao": ANY,
+    }
+    assert len(gravados) == 3
+    assert {t.id_importacao for t in _inseridas(mock_repo)} == {
+        primeira["id_importacao"]
+    }
+
+    # Reimportação com período sobreposto: só a linha nova entra
+    mock_repo.add_many.reset_mock()
+    mock_repo.get_fingerprints_existentes.side_effect = (
+        lambda id_usuario, fps: set(fps) & gravados
+    )
+    sobreposto = conteudo + "03/02/2024;7,00;Pix\n".encode()
+    segunda = use_case.execute(
+        id_usuario="u1", file_bytes=sobreposto, file_name="extrato.csv"
+    )
+
+    assert segunda == {
+        "total_importadas": 1,
+        "total_ignoradas": 3,
+        "total_categorizadas": 0,
+        "total_rejeitadas": 0,
+        "id_importacao": ANY,
+    }
+    assert [t.descricao for t in _inseridas(mock_repo)] == ["Pix"]
+
+
+def test_fingerprint_normaliza_descricao_e_usa_fitid():
+    from datetime import datetime
+
+    from domain.transacao import TipoTransacao
+    from use_cases.importacao_use_cases import fingerprint_importacao
+
+    base = {
+        "data": datetime(2024, 2, 1, 10, 30),
+        "valor": 10.0,
+        "tipo": TipoTransacao.DESPESA,
+        "descricao": "  PADARIA  São João ",
+    }
+    variacao = {**base, "data": datetime(2024, 2, 1), "descricao": "padaria sao joao"}
+    assert fingerprint_importacao(base) == fingerprint_importacao(variacao)
+    assert fingerprint_importacao(base) != fingerprint_importacao(
+        {**base, "valor": 10.01}
+    )
+
+    # No OFX o FITID prevalece sobre a descrição (que varia entre exportações)
+    ofx = {**base, "fitid": "ABC123"}
+    assert fingerprint_importacao(ofx) == fingerprint_importacao(
+        {**ofx, "descricao": "Outro texto"}
+    )
+
+
+def _parse_csv(conteudo: str):
+    return CsvExtratoParser(None).parse(
+        id_usuario="u1", file_bytes=conteudo.encode(), file_name="extrato.csv"
+    )
+
+
+def test_decodificador_csv_detecta_ponto_decimal_com_milhar():
+    transacoes = _parse_csv(
+        'Date,Amount,Description\n2024-02-01,"1,234.56",Salary\n'
+        '2024-02-02,-10.5,Coffee\n'
+    )
+
+    assert [t["valor"] for t in transacoes] == [1234.56, 10.5]
+    assert [t["tipo"].name for t in transacoes] == ["RECEITA", "DESPESA"]
+
+
+def test_decodificador_csv_detecta_virgula_decimal_e_moeda():
+    transacoes = _parse_csv(
+        "Data;Valor;Descricao\n01/02/2024;R$ 1.234,56;Salário\n"
+        "02/02/2024;-7,90;Café\n03/02/2024;15;Padaria\n"
+    )
+
+    assert [t["valor"] for t in transacoes] == [1234.56, 7.9, 15.0]
+    assert [t["data"] for t in transacoes] == [
+        datetime(2024, 2, 1),
+        datetime(2024, 2, 2),
+        datetime(2024, 2, 3),
+    ]
+
+
+@pytest.mark.parametrize(
+    "amostra, valores, esperados",
+    [
+        # Ponto decimal: a vírgula sozinha é milhar
+        (
+            ["-12.50", "1,234.56"],
+            ["1,500", "-1,234,567", "12.5"],
+            [1500, 1234567, 12.5],
+        ),
+        # Vírgula decimal: o ponto sozinho é milhar
+        (["1.234,56"], ["1.500", "-1.234.567", "7,90"], [1500, 1234567, 7.9]),
+        # Com os dois separadores, o último é o decimal em qualquer convenção
+        (["1.234,56"], ["1,234.56"], [1234.56]),
+        (["-12.50"], ["1.234,56"], [1234.56]),
+    ],
+)
+def test_decodificador_csv_milhar_sem_decimal(amostra, valores, esperados):
+    parse_valor = CsvExtratoParser(None)._compilar_valor(amostra)
+
+    assert [parse_valor(valor)[0] for valor in valores] == esperados
+
+
+def test_decodificador_csv_milhar_no_arquivo_todo():
+    transacoes = _parse_csv(
+        'Date,Amount,Description\n2024-02-01,-12.50,Coffee\n'
+        '2024-02-02,"1,500",Rent\n'
+    )
+    assert [t["valor"] for t in transacoes] == [12.5, 1500.0]
+
+    transacoes = _parse_csv(
+        "Data;Valor;Descricao\n01/02/2024;1.234,56;Salário\n02/02/2024;1.500;Aluguel\n"
+    )
+    assert [t["valor"] for t in transacoes] == [1234.56, 1500.0]
+
+
+def test_decodificador_csv_formato_de_data_unico_por_arquivo():
+    # 25/12 só é válido como dia/mês invertido: o arquivo todo é %m/%d/%Y
+    transacoes = _parse_csv(
+        "Data;Valor;Descricao\n12/25/2024;10,00;Natal\n01/02/2024;5,00;Ano novo\n"
+    )
+
+    assert [t["data"] for t in transacoes] == [
+        datetime(2024, 12, 25),
+        datetime(2024, 1, 2),
+    ]
+
+
+def test_decodificador_csv_linha_fora_do_padrao_usa_parse_generico(monkeypatch):
+    monkeypatch.setattr(CsvExtratoParser, "AMOSTRA_DECODIFICADOR", 1)
+    transacoes = _parse_csv(
+        "Data;Valor;Descricao\n01/02/2024;10,00;A\n2024-02-03;1.5;B\n1/3/2024;2;C\n"
+    )
+
+    assert [t["data"] for t in transacoes] == [
+        datetime(2024, 2, 1),
+        datetime(2024, 2, 3),
+        datetime(2024, 3, 1),
+    ]
+    assert [t["valor"] for t in transacoes] == [10.0, 1.5, 2.0]
+
+
+def test_decodificador_csv_erro_informa_a_linha():
+    with pytest.raises(ValueError, match="Linha: .*'Valor': 'abc'"):
+        _parse_csv("Data;Valor;Descricao\n01/02/2024;abc;Padaria\n")
+
+
+def test_preview_csv_mostra_dialeto_formatos_e_linhas():
+    conteudo = (
+        "Data;Valor;Descricao\n01/02/2024;-10.50;Padaria\n"
+        "xx;5.00;Linha ruim\n03/02/2024;1200.00;Salario\n"
+    ).encode()
+
+    preview = PreviewImportacaoCSV().execute(
+        id_usuario="u1", file_stream=io.BytesIO(conteudo), file_name="extrato.csv"
+    )
+
+    assert preview["dialeto"]["delimitador"] == ";"
+    assert preview["cabecalho"] == ["Data", "Valor", "Descricao"]
+    assert preview["linhas"][0] == ["01/02/2024", "-10.50", "Padaria"]
+    assert preview["mapeamento"] == {
+        "data": "Data",
+        "valor": "Valor",
+        "descricao": "Descricao",
+    }
+    # A data inválida não impede a detecção do formato nas demais
+    assert preview["formatos"] == {"data": "%d/%m/%Y", "separador_decimal": "."}
+    assert preview["erro_mapeamento"] is None
+
+    transacoes = preview["transacoes"]
+    assert transacoes[0] == {
+        "linha": 1,
+        "data": "2024-02-01",
+        "valor": 10.5,
+        "tipo": "DESPESA",
+        "descricao": "Padaria",
+    }
+    assert transacoes[1]["linha"] == 2 and "erro" in transacoes[1]
+    assert transacoes[2]["tipo"] == "RECEITA"
+
+
+def test_preview_csv_sem_cabecalho_sem_mapeamento_devolve_erro_e_linhas():
+    preview = PreviewImportacaoCSV().execute(
+        id_usuario="u1",
+        file_stream=io.BytesIO(b"01/02/2024;10.00;Padaria\n"),
+        file_name="extrato.csv",
+        sem_cabecalho=True,
+    )
+
+    assert preview["cabecalho"] == ["__col_0", "__col_1", "__col_2"]
+    assert preview["linhas"] == [["01/02/2024", "10.00", "Padaria"]]
+    assert "Mapeie manualmente" in preview["erro_mapeamento"]
+    assert preview["transacoes"] == []
+
+
+def test_preview_csv_informa_mapeamento_detectado(mock_mapeamento_repo):
+    mock_mapeamento_repo.get_by_usuario.return_value = [_mapeamento_banco_x()]
+
+    preview = PreviewImportacaoCSV(mock_mapeamento_repo).execute(
+        id_usuario="u1",
+        file_stream=io.BytesIO(b"Dt;Historico;Vl\n12/06/2025;mercado;10.00\n"),
+        file_name="extrato.csv",
+        sem_cabecalho=True,
+    )
+
+    assert preview["mapeamento_detectado"] == {"id": "map3", "nome": "Banco X"}
+    assert preview["linhas"] == [["12/06/2025", "mercado", "10.00"]]
+    assert preview["transacoes"][0]["descricao"] == "mercado"
+
+
+def test_preview_csv_le_apenas_as_primeiras_linhas():
+    linhas = "".join(f"01/02/2024;{i}.00;Linha {i}\n" for i in range(50000))
+    stream = _StreamContado(("Data;Valor;Descricao\n" + linhas).encode())
+
+    preview = PreviewImportacaoCSV().execute(
+        id_usuario="u1", file_stream=stream, file_name="extrato.csv", linhas=5
+    )
+
+    assert len(preview["transacoes"]) == 5
+    assert stream.lidos <= CsvExtratoParser.TAMANHO_BLOCO
+
+
+@pytest.mark.parametrize(
+    "nome, linhas, mensagem",
+    [
+        ("extrato.ofx", None, "apenas para CSV"),
+        ("extrato.csv", 0, "entre 1 e 200"),
+        ("extrato.csv", 201, "entre 1 e 200"),
+    ],
+)
+def test_preview_csv_parametros_invalidos(nome, linhas, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        PreviewImportacaoCSV().execute(
+            id_usuario="u1",
+            file_stream=io.BytesIO(b"Data;Valor;Descricao\n"),
+            file_name=nome,
+            linhas=linhas,
+        )
+
+
+@pytest.mark.parametrize("variante", VARIANTES)
+def test_importar_extratos_sinteticos_de_todas_as_variantes(mock_repo, variante):
+    conteudo, nome = gerar_extrato(300, variante, semente=7)
+    mapping = None
+    if variante in VARIANTES_CSV:
+        mapping = VARIANTES_CSV[variante].column_mapping()
+
+    resultado = ImportarExtratoBancario(mock_repo).execute(
+        id_usuario="u1",
+        file_bytes=conteudo,
+        file_name=nome,
+        column_mapping=mapping,
+        sem_cabecalho=mapping is not None,
+    )
+
+    assert resultado["total_importadas"] == 300
+    esperado = [
+        (lanc.data.date(), abs(lanc.centavos) / 100, lanc.descricao)
+        for lanc in gerar_lancamentos(300, semente=7)
+    ]
+    importado = [
+        (t.data.date(), t.valor, t.descricao) for t in _inseridas(mock_repo)
+    ]
+    assert importado == esperado
+
+
+def _parse_ofx(conteudo: bytes):
+    return OfxExtratoParser().parse(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.ofx"
+    )
+
+
+OFX_SGML_MINIFICADO = (
+    b"OFXHEADER:100\r\nDATA:OFXSGML\r\nVERSION:102\r\nCHARSET:1252\r\n\r\n"
+    b"<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+    b"<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105120000[-3:BRT]<TRNAMT>-42.90"
+    b"<FITID>A1<MEMO>P\xe3o &amp; Caf\xe9</STMTTRN>"
+    b"<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240106<TRNAMT>1500.00"
+    b"<FITID>A2<NAME>Sal\xe1rio</STMTTRN>"
+    b"</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"
+)
+
+
+def test_ofx_sgml_sem_quebras_de_linha():
+    transacoes = _parse_ofx(OFX_SGML_MINIFICADO)
+
+    assert [t["fitid"] for t in transacoes] == ["A1", "A2"]
+    assert [t["descricao"] for t in transacoes] == ["Pão & Café", "Salário"]
+    assert transacoes[0]["data"] == datetime(2024, 1, 5)
+    assert transacoes[0]["valor"] == 42.90
+    assert transacoes[0]["tipo"].name == "DESPESA"
+    assert transacoes[1]["tipo"].name == "RECEITA"
+
+
+def test_ofx_sgml_com_tags_divididas_entre_blocos(monkeypatch):
+    esperado = _parse_ofx(OFX_SGML_MINIFICADO)
+    monkeypatch.setattr(OfxExtratoParser, "TAMANHO_BLOCO", 7)
+
+    assert _parse_ofx(OFX_SGML_MINIFICADO) == esperado
+
+
+def test_ofx_xml_versao_2():
+    ofx = """<?xml version="1.0" encoding="UTF-8"?>
+<?OFX OFXHEADER="200" VERSION="211" SECURITY="NONE"?>
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+  <STMTTRN>
+    <TRNTYPE>DEBIT</TRNTYPE><DTPOSTED>20240201</DTPOSTED>
+    <TRNAMT>-10.00</TRNAMT><FITID>X9</FITID>
+    <PAYEE><NAME>Padaria</NAME></PAYEE>
+  </STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+""".encode()
+
+    transacoes = _parse_ofx(ofx)
+
+    assert len(transacoes) == 1
+    assert transacoes[0]["fitid"] == "X9"
+    assert transacoes[0]["descricao"] == "Padaria"
+    assert transacoes[0]["data"] == datetime(2024, 2, 1)
+
+
+def test_ofx_xml_malformado():
+    with pytest.raises(ValueError, match="Arquivo OFX inválido"):
+        _parse_ofx(b'<?xml version="1.0"?><OFX><STMTTRN></OFX>')
+
+
+def test_parse_stream_ofx_le_o_arquivo_sob_demanda(monkeypatch):
+    monkeypatch.setattr(OfxExtratoParser, "TAMANHO_BLOCO", 1024)
+    registros = "".join(
+        f"<STMTTRN><DTPOSTED>20240101<TRNAMT>-{i}.00<FITID>{i}</STMTTRN>"
+        for i in range(1, 2001)
+    )
+    stream = _StreamContado(f"<OFX><BANKTRANLIST>{registros}</OFX>".encode())
+
+    lotes = OfxExtratoParser().parse_stream(
+        id_usuario="u1", file_stream=stream, file_name="extrato.ofx", tamanho_lote=10
+    )
+    primeiro = next(lotes)
+
+    assert [t["fitid"] for t in primeiro] == [str(i) for i in range(1, 11)]
+    assert stream.lidos < 4 * 1024
+
+    assert sum(len(lote) for lote in lotes) == 1990
+
+
+class _StorageMemoria(IImportacaoStorage):
+    def __init__(self):
+        self.arquivos = {}
+
+    def save(self, file_stream, file_name):
+        caminho = f"mem/{len(self.arquivos)}-{file_name}"
+        self.arquivos[caminho] = file_stream.read()
+        return caminho
+
+    def open(self, caminho_storage):
+        return io.BytesIO(self.arquivos[caminho_storage])
+
+    def delete(self, caminho_storage):
+        self.arquivos.pop(caminho_storage, None)
+
+
+def test_enfileirar_importacao_salva_arquivo_e_cria_tarefa(mock_repo):
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    tarefa_repo.add.side_effect = lambda tarefa: tarefa
+    storage = _StorageMemoria()
+    use_case = EnfileirarImportacaoExtrato(
+        tarefa_repo, storage, ImportarExtratoBancario(mock_repo)
+    )
+
+    tarefa = use_case.execute(
+        id_usuario="u1",
+        file_stream=io.BytesIO(b"Data;Valor;Descricao\n"),
+        file_name="extrato.csv",
+        mapping_id="m1",
+    )
+
+    assert tarefa.tipo == TIPO_TAREFA_IMPORTACAO
+    assert tarefa.payload["file_name"] == "extrato.csv"
+    assert tarefa.payload["mapping_id"] == "m1"
+    assert storage.arquivos[tarefa.payload["caminho"]] == b"Data;Valor;Descricao\n"
+    mock_repo.add_many.assert_not_called()
+
+
+def test_enfileirar_importacao_rejeita_formato_antes_de_salvar(mock_repo):
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    storage = _StorageMemoria()
+    use_case = EnfileirarImportacaoExtrato(
+        tarefa_repo, storage, ImportarExtratoBancario(mock_repo)
+    )
+
+    with pytest.raises(ValueError, match="Formato de arquivo inválido"):
+        use_case.execute(
+            id_usuario="u1", file_stream=io.BytesIO(b"x"), file_name="extrato.pdf"
+        )
+
+    assert storage.arquivos == {}
+    tarefa_repo.add.assert_not_called()
+
+
+def _tarefa_importacao(storage, conteudo: bytes, **kwargs) -> Tarefa:
+    caminho = storage.save(io.BytesIO(conteudo), "extrato.csv")
+    return Tarefa(
+        id_usuario="u1",
+        tipo=TIPO_TAREFA_IMPORTACAO,
+        payload={"caminho": caminho, "file_name": "extrato.csv"},
+        **kwargs,
+    )
+
+
+def test_processar_importacao_reporta_progresso_e_remove_arquivo(
+    mock_repo, monkeypatch
+):
+    monkeypatch.setattr(ImportarExtratoBancario, "TAMANHO_LOTE", 2)
+    linhas = "".join(f"0{d}/02/2024;{d}.00;Compra {d}\n" for d in range(1, 6))
+    storage = _StorageMemoria()
+    tarefa = _tarefa_importacao(storage, ("Data;Valor;Descricao\n" + linhas).encode())
+    progresso = []
+
+    resultado = ProcessarImportacaoEnfileirada(
+        ImportarExtratoBancario(mock_repo), storage
+    ).execute(tarefa, progresso.append)
+
+    assert resultado["total_importadas"] == 5
+    assert resultado["arquivo"] == "extrato.csv"
+    # As novas tentativas da tarefa continuam a mesma importação
+    assert resultado["id_importacao"] == tarefa.id
+    assert {t.id_importacao for t in _inseridas(mock_repo)} == {tarefa.id}
+    assert len(progresso) == 3
+    assert progresso == sorted(progresso)
+    assert progresso[-1] == 1.0
+    assert storage.arquivos == {}
+
+
+def test_processar_importacao_mantem_arquivo_para_nova_tentativa(mock_repo):
+    mock_repo.add_many.side_effect = RuntimeError("database is locked")
+    storage = _StorageMemoria()
+    conteudo = b"Data;Valor;Descricao\n01/02/2024;1.00;A\n"
+    tarefa = _tarefa_importacao(storage, conteudo, tentativas=1)
+    use_case = ProcessarImportacaoEnfileirada(
+        ImportarExtratoBancario(mock_repo), storage
+    )
+
+    with pytest.raises(RuntimeError):
+        use_case.execute(tarefa, lambda progresso: None)
+    assert len(storage.arquivos) == 1
+
+    # Última tentativa: o arquivo não será mais usado
+    tarefa.tentativas = tarefa.max_tentativas
+    with pytest.raises(RuntimeError):
+        use_case.execute(tarefa, lambda progresso: None)
+    assert storage.arquivos == {}
+
+
+def test_processar_importacao_com_arquivo_invalido_remove_arquivo(mock_repo):
+    storage = _StorageMemoria()
+    tarefa = _tarefa_importacao(storage, b"Data;Valor;Descricao\n01/02/2024;abc;A\n")
+
+    with pytest.raises(ValueError):
+        ProcessarImportacaoEnfileirada(
+            ImportarExtratoBancario(mock_repo), storage
+        ).execute(tarefa, lambda progresso: None)
+
+    assert storage.arquivos == {}
+
+
+class _QuarentenaMemoria(ILinhaQuarentenaRepository):
+    def __init__(self):
+        self.linhas = {}
+
+    def add_many(self, linhas):
+        self.linhas.update((linha.id, linha) for linha in linhas)
+        return len(linhas)
+
+    def get_by_importacao(self, id_usuario, id_importacao):
+        return sorted(
+            (
+                linha
+                for linha in self.linhas.values()
+                if linha.id_usuario == id_usuario
+                and linha.id_importacao == id_importacao
+            ),
+            key=lambda linha: linha.numero_linha,
+        )
+
+    def atualizar_motivos(self, motivos):
+        for id_linha, motivo in motivos.items():
+            self.linhas[id_linha].motivo = motivo
+
+    def delete_many(self, ids_linha):
+        for id_linha in ids_linha:
+            del self.linhas[id_linha]
+
+
+def test_importar_csv_tolerante_poe_linhas_invalidas_em_quarentena(mock_repo):
+    quarentena = _QuarentenaMemoria()
+    conteudo = (
+        "Data;Valor;Descricao\n"
+        "01/02/2024;10,00;Café\n"
+        "\n"
+        "02/02/2024;abc;Linha quebrada\n"
+        "31/02/2024;-5,00;Data impossível\n"
+        "03/02/2024;0,00;Estorno zerado\n"
+        "04/02/2024;-7,50;Uber\n"
+    ).encode()
+    use_case = ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena)
+
+    resultado = use_case.execute(
+        id_usuario="u1",
+        file_bytes=conteudo,
+        file_name="extrato.csv",
+        tolerante=True,
+    )
+
+    assert resultado["total_importadas"] == 2
+    assert resultado["total_rejeitadas"] == 3
+    assert [t.descricao for t in _inseridas(mock_repo)] == ["Café", "Uber"]
+    linhas = quarentena.get_by_importacao("u1", resultado["id_importacao"])
+    # Números das linhas do arquivo (a linha em branco também conta)
+    assert [linha.numero_linha for linha in linhas] == [4, 5, 6]
+    assert linhas[0].arquivo == "extrato.csv"
+    assert linhas[0].conteudo["colunas"] == ["02/02/2024", "abc", "Linha quebrada"]
+    assert linhas[0].motivo == "Valor inválido: abc"
+    assert linhas[2].motivo == "O valor da transação deve ser positivo."
+    assert sum(erro["quantidade"] for erro in resultado["erros"]) == 3
+
+
+def test_importar_csv_tolerante_aborta_se_nenhuma_linha_e_valida(mock_repo):
+    quarentena = _QuarentenaMemoria()
+    conteudo = "Data;Valor;Descricao\nx;abc;A\ny;def;B\n".encode()
+
+    with pytest.raises(ValueError, match="Linha 2"):
+        ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena).execute(
+            id_usuario="u1",
+            file_bytes=conteudo,
+            file_name="extrato.csv",
+            tolerante=True,
+        )
+    assert quarentena.linhas == {}
+
+
+def test_ofx_tolerante_entrega_registros_invalidos_como_rejeitados():
+    conteudo = OFX_SGML_MINIFICADO.replace(b"<TRNAMT>1500.00", b"<TRNAMT>abc")
+
+    estrito = [
+        item
+        for lote in OfxExtratoParser().parse_stream(
+            id_usuario="u1", file_stream=io.BytesIO(conteudo), file_name="a.ofx"
+        )
+        for item in lote
+    ]
+    tolerante = [
+        item
+        for lote in OfxExtratoParser().parse_stream(
+            id_usuario="u1",
+            file_stream=io.BytesIO(conteudo),
+            file_name="a.ofx",
+            tolerante=True,
+        )
+        for item in lote
+    ]
+
+    assert [t["fitid"] for t in estrito] == ["A1"]
+    rejeitada = tolerante[1]
+    assert isinstance(rejeitada, LinhaRejeitada)
+    assert (rejeitada.numero_linha, rejeitada.formato) == (2, "ofx")
+    assert rejeitada.conteudo["FITID"] == "A2"
+
+
+_POSICIONAL = {"data": "__col_0", "valor": "__col_1", "descricao": "__col_2"}
+
+
+def test_reprocessar_quarentena_com_mapeamento_corrigido(mock_repo):
+    quarentena = _QuarentenaMemoria()
+    importador = ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena)
+    # Arquivo sem cabeçalho: as linhas com a data na terceira coluna falham
+    # no mapeamento original
+    conteudo = (
+        "01/02/2024;10,00;Café\n"
+        "Mercado;-20,00;02/02/2024\n"
+        "Padaria;-3,00;03/02/2024\n"
+        "Lixo;xyz;04/02/2024\n"
+    ).encode()
+    resultado = importador.execute(
+        id_usuario="u1",
+        file_bytes=conteudo,
+        file_name="extrato.csv",
+        column_mapping=_POSICIONAL,
+        sem_cabecalho=True,
+        tolerante=True,
+    )
+    assert resultado["total_rejeitadas"] == 3
+    mock_repo.add_many.reset_mock()
+
+    reprocessado = ReprocessarQuarentena(importador, quarentena).execute(
+        id_usuario="u1",
+        id_importacao=resultado["id_importacao"],
+        column_mapping={**_POSICIONAL, "data": "__col_2", "descricao": "__col_0"},
+    )
+
+    assert reprocessado["total_importadas"] == 2
+    assert reprocessado["total_rejeitadas"] == 1
+    assert [t.descricao for t in _inseridas(mock_repo)] == ["Mercado", "Padaria"]
+    (restante,) = quarentena.linhas.values()
+    assert restante.numero_linha == 4
+    assert "xyz" in restante.motivo
+
+
+def test_reprocessar_quarentena_inexistente():
+    with pytest.raises(ValueError, match="quarentena"):
+        ReprocessarQuarentena(
+            ImportarExtratoBancario(MagicMock(spec=ITransacaoRepository)),
+            _QuarentenaMemoria(),
+        ).execute(id_usuario="u1", id_importacao="nao-existe")
+
+
+def test_resumo_rejeicoes_limita_motivos_e_linhas():
+    resumo = ResumoRejeicoes()
+    for numero in range(1, 9):
+        resumo.registrar(numero, "Valor vazio.")
+    for numero in range(ResumoRejeicoes.MAX_MOTIVOS + 2):
+        resumo.registrar(100 + numero, f"Formato de data inválido: {numero}")
+
+    erros = resumo.como_lista()
+
+    assert resumo.total == 8 + ResumoRejeicoes.MAX_MOTIVOS + 2
+    assert erros[0] == {
+        "motivo": "Valor vazio.",
+        "quantidade": 8,
+        "linhas": [1, 2, 3, 4, 5],
+    }
+    assert len(erros) == ResumoRejeicoes.MAX_MOTIVOS + 1
+    assert erros[-1]["motivo"] == "Outros motivos"
+    assert erros[-1]["quantidade"] == 3
+
+
+def test_desfazer_importacao_remove_em_lotes_e_limpa_quarentena(mock_repo):
+    mock_repo.delete_por_importacao.side_effect = [2, 2, 1, 0]
+    quarentena = _QuarentenaMemoria()
+    quarentena.add_many(
+        [
+            LinhaQuarentena(
+                id_usuario="u1",
+                id_importacao="imp1",
+                arquivo="extrato.csv",
+                numero_linha=3,
+                motivo="Valor vazio.",
+                conteudo={},
+            )
+        ]
+    )
+    removidas_por_lote = []
+
+    resultado = DesfazerImportacao(mock_repo, quarentena, tamanho_lote=2).execute(
+        "u1", "imp1", ao_remover_lote=removidas_por_lote.append
+    )
+
+    assert resultado == {"total_removidas": 5, "total_quarentena_removidas": 1}
+    assert removidas_por_lote == [2, 4, 5]
+    mock_repo.delete_por_importacao.assert_called_with("u1", "imp1", 2)
+    assert quarentena.linhas == {}
+
+
+def test_desfazer_importacao_em_andamento_ou_inexistente(mock_repo):
+    mock_repo.delete_por_importacao.return_value = 0
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    tarefa_repo.list_ativas.return_value = [
+        Tarefa(
+            id="imp1",
+            id_usuario="u1",
+            tipo=TIPO_TAREFA_IMPORTACAO,
+            payload={},
+            status=StatusTarefa.EXECUTANDO,
+        )
+    ]
+    use_case = DesfazerImportacao(mock_repo, tarefa_repo=tarefa_repo)
+
+    with pytest.raises(ValueError, match="em andamento"):
+        use_case.execute("u1", "imp1")
+    mock_repo.delete_por_importacao.assert_not_called()
+    tarefa_repo.list_ativas.assert_called_with("u1")
+
+    tarefa_repo.list_ativas.return_value = []
+    with pytest.raises(ValueError, match="não encontrada"):
+        use_case.execute("u1", "imp1")
+
+
+def test_desfazer_importacao_retomada_em_andamento(mock_repo):
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    tarefa_repo.add.side_effect = lambda tarefa: tarefa
+    # Reenvio que retoma a 'imp1': a tarefa nova tem outro id
+    retomada = EnfileirarImportacaoExtrato(
+        tarefa_repo, _StorageMemoria(), ImportarExtratoBancario(mock_repo)
+    ).execute(
+        id_usuario="u1",
+        file_stream=io.BytesIO(b"Data;Valor;Descricao\n"),
+        file_name="extrato.csv",
+        id_importacao="imp1",
+    )
+    assert retomada.id != "imp1"
+    tarefa_repo.list_ativas.return_value = [retomada]
+    use_case = DesfazerImportacao(mock_repo, tarefa_repo=tarefa_repo)
+
+    with pytest.raises(ValueError, match="em andamento"):
+        use_case.execute("u1", "imp1")
+    mock_repo.delete_por_importacao.assert_not_called()
+
+    # Outra importação do usuário não é afetada
+    mock_repo.delete_por_importacao.side_effect = [1, 0]
+    assert use_case.execute("u1", "imp2")["total_removidas"] == 1
+
+
+def test_desfazer_importacao_com_reprocessamento_na_fila(mock_repo):
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    reprocessamento = Tarefa(
+        id_usuario="u1",
+        tipo=TIPO_TAREFA_REPROCESSAMENTO,
+        payload={"ids_importacao": ["imp0", "imp1"]},
+    )
+    tarefa_repo.list_ativas.return_value = [reprocessamento]
+    use_case = DesfazerImportacao(mock_repo, tarefa_repo=tarefa_repo)
+
+    with pytest.raises(ValueError, match="em andamento"):
+        use_case.execute("u1", "imp1")
+    # A própria tarefa de reprocessamento não se bloqueia
+    use_case.exigir_finalizada("u1", "imp1", id_tarefa_atual=reprocessamento.id)
+
+
+class _ExtratosArquivadosMemoria(IExtratoArquivadoRepository):
+    def __init__(self):
+        self.extratos = []
+
+    def add(self, extrato):
+        self.extratos.append(extrato)
+        return extrato
+
+    def get_by_importacao(self, id_usuario, id_importacao):
+        return [
+            extrato
+            for extrato in self.extratos
+            if extrato.id_usuario == id_usuario
+            and extrato.id_importacao == id_importacao
+        ]
+
+    def list_by_usuario(self, id_usuario):
+        return [e for e in reversed(self.extratos) if e.id_usuario == id_usuario]
+
+
+class _ArquivoMemoria(IArquivoExtratosStorage):
+    """Guarda pelo hash, compactando com gzip quando pedido."""
+
+    def __init__(self):
+        self.conteudos = {}
+
+    def arquivar(self, file_stream, compactar):
+        dados = file_stream.read()
+        hash_conteudo = hashlib.sha256(dados).hexdigest()
+        compressao = ".gz" if compactar else ""
+        caminho = f"mem/{hash_conteudo}{compressao}"
+        self.conteudos[caminho] = gzip.compress(dados) if compactar else dados
+        return ConteudoArquivado(hash_conteudo, len(dados), caminho, compressao)
+
+    def open(self, caminho_storage):
+        return io.BytesIO(self.conteudos[caminho_storage])
+
+
+def test_processar_importacao_arquiva_extrato_mesmo_com_conteudo_invalido(
+    mock_repo,
+):
+    storage = _StorageMemoria()
+    arquivo_repo, arquivo = _ExtratosArquivadosMemoria(), _ArquivoMemoria()
+    use_case = ProcessarImportacaoEnfileirada(
+        ImportarExtratoBancario(mock_repo),
+        storage,
+        ArquivarExtrato(arquivo_repo, arquivo),
+    )
+    conteudo = b"Data;Valor;Descricao\n01/02/2024;abc;A\n"
+    tarefa = _tarefa_importacao(storage, conteudo)
+    tarefa.payload["tolerante"] = False
+    progresso = []
+
+    with pytest.raises(ValueError):
+        use_case.execute(tarefa, progresso.append)
+
+    # O arquivamento é confirmado (checkpoint) antes do parse
+    assert progresso == [0.0]
+    (extrato,) = arquivo_repo.extratos
+    assert (extrato.id_importacao, extrato.arquivo) == (tarefa.id, "extrato.csv")
+    assert extrato.nome_arquivado == "extrato.csv.gz"
+    assert extrato.tamanho_bytes == len(conteudo)
+    assert extrato.parametros["tolerante"] is False
+    assert gzip.decompress(arquivo.conteudos[extrato.caminho_storage]) == conteudo
+
+    # A nova tentativa da mesma importação não arquiva o arquivo de novo
+    repetida = _tarefa_importacao(storage, conteudo, id=tarefa.id)
+    with pytest.raises(ValueError):
+        use_case.execute(repetida, lambda progresso: None)
+    assert len(arquivo_repo.extratos) == 1
+
+
+def test_reprocessar_extratos_arquivados_com_novo_mapeamento(mock_repo):
+    quarentena = _QuarentenaMemoria()
+    importador = ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena)
+    arquivo_repo, arquivo = _ExtratosArquivadosMemoria(), _ArquivoMemoria()
+    storage = _StorageMemoria()
+    # Mapeamento errado: a data está na terceira coluna
+    conteudo = "Mercado;-20,00;02/02/2024\nPadaria;-3,00;03/02/2024\n".encode()
+    tarefa = _tarefa_importacao(storage, conteudo)
+    tarefa.payload.update(
+        column_mapping=_POSICIONAL, sem_cabecalho=True, tolerante=True
+    )
+    with pytest.raises(ValueError, match="Nenhuma linha válida"):
+        ProcessarImportacaoEnfileirada(
+            importador, storage, ArquivarExtrato(arquivo_repo, arquivo)
+        ).execute(tarefa, lambda progresso: None)
+    assert storage.arquivos == {}
+    progresso = []
+
+    (resultado,) = ReprocessarExtratosArquivados(
+        importador, arquivo_repo, arquivo
+    ).execute(
+        "u1",
+        [tarefa.id],
+        column_mapping={**_POSICIONAL, "data": "__col_2", "descricao": "__col_0"},
+        registrar_progresso=progresso.append,
+    )
+
+    assert resultado.erro is None
+    assert (resultado.total_importadas, resultado.total_rejeitadas) == (2, 0)
+    assert resultado.arquivos == ["extrato.csv"]
+    inseridas = _inseridas(mock_repo)
+    assert [t.descricao for t in inseridas] == ["Mercado", "Padaria"]
+    assert {t.id_importacao for t in inseridas} == {tarefa.id}
+    assert quarentena.linhas == {}
+    assert progresso and progresso[-1] == 1.0
+    mock_repo.delete_por_importacao.assert_not_called()
+
+
+def test_reprocessar_extratos_substitui_e_segue_depois_de_um_erro(mock_repo):
+    mock_repo.delete_por_importacao.side_effect = [3, 0]
+    arquivo_repo, arquivo = _ExtratosArquivadosMemoria(), _ArquivoMemoria()
+    arquivador = ArquivarExtrato(arquivo_repo, arquivo)
+    arquivador.execute(
+        "u1", "imp1", io.BytesIO(b"Data;Valor;Descricao\n01/02/2024;abc;A\n"), "a.csv"
+    )
+    arquivador.execute(
+        "u1", "imp2", io.BytesIO(gzip.compress(_CSV_FEV.encode())), "fev.csv.gz"
+    )
+
+    quarentena = _QuarentenaMemoria()
+    quarentena.add_many(
+        [
+            LinhaQuarentena(
+                id_usuario="u1",
+                id_importacao="imp2",
+                arquivo="fev.csv",
+                numero_linha=2,
+                motivo="Valor vazio.",
+                conteudo={},
+            )
+        ]
+    )
+
+    ruim, fev = ReprocessarExtratosArquivados(
+        ImportarExtratoBancario(mock_repo, quarentena_repo=quarentena),
+        arquivo_repo,
+        arquivo,
+    ).execute("u1", ["imp1", "imp2"], substituir=True)
+
+    # O parse da amostra falhou antes da remoção: a importação ficou intacta
+    assert ruim.total_removidas == 0
+    assert "abc" in ruim.erro
+    assert fev.erro is None
+    assert (fev.total_removidas, fev.total_importadas) == (3, 2)
+    removidas = mock_repo.delete_por_importacao.call_args_list
+    assert {chamada.args[1] for chamada in removidas} == {"imp2"}
+    # O .gz enviado foi guardado como veio e é descompactado na leitura
+    assert arquivo_repo.extratos[1].compressao == ""
+    assert {t.id_importacao for t in _inseridas(mock_repo)} == {"imp2"}
+    # A quarentena da importação é refeita a partir do arquivo
+    assert quarentena.linhas == {}
+
+
+def test_reprocessar_substituindo_com_mapeamento_que_nao_serve(mock_repo):
+    arquivo_repo, arquivo = _ExtratosArquivadosMemoria(), _ArquivoMemoria()
+    conteudo = "Mercado;-20,00;02/02/2024\nPadaria;-3,00;03/02/2024\n"
+    ArquivarExtrato(arquivo_repo, arquivo).execute(
+        "u1",
+        "imp1",
+        io.BytesIO(_zip({"a.csv": conteudo})),
+        "lote.zip",
+        parametros={"sem_cabecalho": True, "tolerante": True},
+    )
+
+    # Tolerante: toda a amostra cai na quarentena com a data na coluna errada
+    (resultado,) = ReprocessarExtratosArquivados(
+        ImportarExtratoBancario(mock_repo), arquivo_repo, arquivo
+    ).execute("u1", ["imp1"], column_mapping=_POSICIONAL, substituir=True)
+
+    assert resultado.erro.startswith("a.csv: Nenhuma linha válida")
+    assert resultado.total_removidas == 0
+    mock_repo.delete_por_importacao.assert_not_called()
+    mock_repo.add_many.assert_not_called()
+
+
+def test_enfileirar_reprocessamento_resolve_importacoes(mock_repo):
+    tarefa_repo = MagicMock(spec=ITarefaRepository)
+    tarefa_repo.add.side_effect = lambda tarefa: tarefa
+    arquivo_repo = _ExtratosArquivadosMemoria()
+    arquivador = ArquivarExtrato(arquivo_repo, _ArquivoMemoria())
+    for id_importacao, conteudo in (("imp1", b"1"), ("imp2", b"2"), ("imp1", b"3")):
+        arquivador.execute("u1", id_importacao, io.BytesIO(conteudo), "a.csv")
+    use_case = EnfileirarReprocessamentoExtratos(
+        tarefa_repo, arquivo_repo, ImportarExtratoBancario(mock_repo)
+    )
+
+    tarefa = use_case.execute("u1", substituir=True)
+
+    assert tarefa.tipo == TIPO_TAREFA_REPROCESSAMENTO
+    # Sem ids: todas as importações arquivadas, da mais antiga à mais recente
+    assert tarefa.payload["ids_importacao"] == ["imp1", "imp2"]
+    assert tarefa.payload["substituir"] is True
+    with pytest.raises(ValueError, match="imp9"):
+        use_case.execute("u1", ids_importacao=["imp1", "imp9"])
+    with pytest.raises(ValueError, match="Nenhum extrato"):
+        use_case.execute("u2")
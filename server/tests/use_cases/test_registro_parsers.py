@@ -0,0 +1,278 @@
+import gzip
+import importlib
+import io
+import os
+import subprocess
+import sys
+import textwrap
+from unittest.mock import MagicMock
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import use_cases.registro_parsers as registro_parsers
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+from use_cases.parsers.ofx import OfxExtratoParser
+from use_cases.registro_parsers import (
+    FORMATOS_PADRAO,
+    FormatoExtrato,
+    RegistroParsers,
+    parece_csv,
+    parece_ofx,
+)
+from use_cases.repository_interfaces import ITransacaoRepository
+
+# Parser de QIF de brinquedo, importado só quando chega um .qif
+PLUGIN_QIF = '''
+from datetime import datetime
+
+from domain.transacao import TipoTransacao
+from use_cases.parsers.base import ExtratoParser
+from use_cases.registro_parsers import FormatoExtrato
+
+
+def parece_qif(amostra):
+    return amostra.lstrip().startswith(b"!Type:")
+
+
+class QifParser(ExtratoParser):
+    def parse(self, *, id_usuario, file_bytes, file_name, **kwargs):
+        transacoes = []
+        for registro in file_bytes.decode().split("^"):
+            campos = {l[:1]: l[1:] for l in registro.split() if l[:1] in "DTP"}
+            if "T" not in campos:
+                continue
+            valor = float(campos["T"])
+            transacoes.append({
+                "data": datetime.strptime(campos["D"], "%d/%m/%Y"),
+                "valor": abs(valor),
+                "tipo": TipoTransacao.RECEITA if valor >= 0 else TipoTransacao.DESPESA,
+                "descricao": campos.get("P"),
+            })
+        return transacoes
+
+
+FORMATO = FormatoExtrato(
+    nome="qif",
+    extensoes=(".qif",),
+    parser="{modulo}:QifParser",
+    reconhecer=parece_qif,
+)
+'''
+
+QIF = b"!Type:Bank\nD01/02/2024\nT-50.00\nPMercado\n^\nD02/02/2024\nT10\nPPix\n^\n"
+
+OFX = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKTRANLIST><STMTTRN><DTPOSTED>20240101<TRNAMT>-50.00<MEMO>Mercado
+</STMTTRN></BANKTRANLIST></OFX>
+"""
+
+CSV = "Data;Valor;Descricao\n01/02/2024;123,45;Almoço\n".encode()
+MAPEAMENTO = {"data": "Data", "valor": "Valor", "descricao": "Descricao"}
+
+
+@pytest.fixture
+def mock_repo():
+    repo = MagicMock(spec=ITransacaoRepository)
+    repo.add_many.side_effect = lambda transacoes: len(transacoes)
+    repo.get_fingerprints_existentes.return_value = set()
+    return repo
+
+
+@pytest.fixture
+def plugin_qif(tmp_path, monkeypatch):
+    """Módulo de plugin num diretório do sys.path; devolve o nome do módulo."""
+    modulo = f"plugin_qif_{tmp_path.name}"
+    (tmp_path / f"{modulo}.py").write_text(
+        textwrap.dedent(PLUGIN_QIF).replace("{modulo}", modulo)
+    )
+    (tmp_path / f"{modulo}_formato.py").write_text(
+        f"from {modulo} import FORMATO\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield modulo
+    for nome in (modulo, f"{modulo}_formato"):
+        sys.modules.pop(nome, None)
+
+
+def _formato_qif(modulo: str) -> FormatoExtrato:
+    return FormatoExtrato(
+        nome="qif",
+        extensoes=(".qif",),
+        parser=f"{modulo}:QifParser",
+    )
+
+
+def test_parser_so_e_importado_no_primeiro_arquivo_do_formato(mock_repo, plugin_qif):
+    registro = RegistroParsers(FORMATOS_PADRAO + (_formato_qif(plugin_qif),))
+    use_case = ImportarExtratoBancario(mock_repo, registro=registro)
+
+    use_case.validar_arquivo("extrato.qif")
+    assert ".qif" in registro.extensoes
+    assert plugin_qif not in sys.modules
+
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=QIF, file_name="extrato.qif"
+    )
+
+    assert plugin_qif in sys.modules
+    assert resultado["total_importadas"] == 2
+
+
+def test_formatos_padrao_nao_importam_plugins(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    with pytest.raises(ValueError, match="Use CSV ou OFX"):
+        use_case.validar_arquivo("extrato.qif")
+    assert isinstance(use_case.parser_do_formato("ofx"), OfxExtratoParser)
+
+
+def test_parsers_padrao_carregados_so_no_primeiro_arquivo():
+    # Processo novo: os testes deste arquivo já importaram os parsers
+    script = textwrap.dedent(
+        """
+        import sys
+        from use_cases.importacao_use_cases import ImportarExtratoBancario
+        import use_cases.importacao_pasta_use_cases
+        import use_cases.mapeamento_csv_use_cases
+
+        use_case = ImportarExtratoBancario(None)
+        use_case.validar_arquivo("extrato.csv")
+        print("use_cases.parsers.csv" in sys.modules)
+        use_case.parser_do_formato("csv")
+        print("use_cases.parsers.csv" in sys.modules)
+        print("use_cases.parsers.ofx" in sys.modules)
+        """
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+
+    assert saida == ["False", "True", "False"]
+
+
+def test_plugin_da_lista_de_configuracao(mock_repo, plugin_qif):
+    registro = RegistroParsers(
+        FORMATOS_PADRAO, plugins=[f"{plugin_qif}:FORMATO", "nao_existe:FORMATO"]
+    )
+    use_case = ImportarExtratoBancario(mock_repo, registro=registro)
+
+    # O plugin quebrado é ignorado; o QIF vale também para um .txt
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=QIF, file_name="extrato.txt"
+    )
+
+    assert resultado["total_importadas"] == 2
+    assert registro.extensoes == (".csv", ".ofx", ".qif")
+
+
+def test_plugin_publicado_por_entry_point(monkeypatch, mock_repo, plugin_qif):
+    entry_point = MagicMock(value=f"{plugin_qif}_formato:FORMATO")
+    entry_point.load.side_effect = lambda: importlib.import_module(
+        f"{plugin_qif}_formato"
+    ).FORMATO
+    quebrado = MagicMock(value="pacote.quebrado:FORMATO")
+    quebrado.load.return_value = "não é um formato"
+    grupos = []
+
+    def entry_points(group):
+        grupos.append(group)
+        return [quebrado, entry_point]
+
+    monkeypatch.setattr(registro_parsers, "entry_points", entry_points)
+    registro = RegistroParsers(FORMATOS_PADRAO, grupo_entry_points="plano.teste")
+
+    assert registro.por_extensao(".QIF").nome == "qif"
+    assert registro.por_nome("ofx") is not None
+    # A descoberta acontece uma vez só
+    registro.extensoes
+    assert grupos == ["plano.teste"]
+
+
+def test_plugin_substitui_formato_padrao(mock_repo, plugin_qif):
+    substituto = FormatoExtrato(
+        nome="ofx", extensoes=(".ofx",), parser=f"{plugin_qif}:QifParser"
+    )
+    registro = RegistroParsers(FORMATOS_PADRAO)
+    registro.registrar(substituto)
+    use_case = ImportarExtratoBancario(mock_repo, registro=registro)
+
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=QIF, file_name="extrato.ofx"
+    )
+
+    assert resultado["total_importadas"] == 2
+
+
+@pytest.mark.parametrize(
+    "conteudo, formato",
+    [(OFX, "ofx"), (b"\xef\xbb\xbf<?xml?><?OFX VERSION='200'?><OFX>", "ofx")],
+)
+def test_reconhece_ofx_pelo_conteudo(conteudo, formato):
+    assert RegistroParsers(FORMATOS_PADRAO).reconhecer(conteudo).nome == formato
+
+
+def test_sniffers():
+    assert parece_ofx(OFX)
+    assert not parece_ofx(CSV)
+    assert parece_csv(CSV)
+    assert parece_csv(b'data,valor,descricao\n2024-01-01,"1,50","Caf\xe9, p\xe3o"\n')
+    assert not parece_csv(b"uma linha so")
+    assert not parece_csv(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+
+def test_txt_com_conteudo_ofx_e_csv(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    ofx = use_case.execute(id_usuario="u1", file_bytes=OFX, file_name="extrato.txt")
+    csv = use_case.execute(
+        id_usuario="u1",
+        file_bytes=CSV,
+        file_name="extrato.txt",
+        column_mapping=MAPEAMENTO,
+    )
+
+    assert ofx["total_importadas"] == 1
+    assert csv["total_importadas"] == 1
+
+
+def test_conteudo_nao_reconhecido(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+
+    with pytest.raises(ValueError, match="Formato de arquivo inválido"):
+        use_case.validar_arquivo("extrato.txt", io.BytesIO(b"\x00\x01binario"))
+    with pytest.raises(ValueError, match="Formato de arquivo inválido"):
+        use_case.execute(
+            id_usuario="u1", file_bytes=b"\x00\x01binario", file_name="extrato.txt"
+        )
+
+
+def test_validar_arquivo_preserva_a_posicao_do_stream(mock_repo):
+    stream = io.BytesIO(b"xx" + OFX)
+    stream.seek(2)
+
+    ImportarExtratoBancario(mock_repo).validar_arquivo("extrato.txt", stream)
+
+    assert stream.tell() == 2
+
+
+def test_gz_sem_extensao_interna_reconhecido_na_importacao(mock_repo):
+    use_case = ImportarExtratoBancario(mock_repo)
+    # O conteúdo descompactado não aceita seek: a amostra é espiada
+    use_case.validar_arquivo("extrato.gz", io.BytesIO(gzip.compress(OFX)))
+
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=gzip.compress(OFX), file_name="extrato.gz"
+    )
+
+    assert resultado["total_importadas"] == 1
@@ -0,0 +1,207 @@
+import os
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.regra_categorizacao import RegraCategorizacao
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from use_cases.classificador_transacoes import AutomatoPalavras, ClassificadorTransacoes
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+from use_cases.regra_categorizacao_use_cases import (
+    CriarRegraCategorizacao,
+    DeletarRegraCategorizacao,
+)
+from use_cases.repository_interfaces import (
+    IRegraCategorizacaoRepository,
+    ITransacaoRepository,
+)
+
+
+def _transacao(descricao, valor=50.0, tipo=TipoTransacao.DESPESA):
+    return Transacao(
+        id_usuario="u1",
+        valor=valor,
+        tipo=tipo,
+        data=datetime(2024, 2, 1),
+        descricao=descricao,
+        status=StatusTransacao.PENDENTE,
+    )
+
+
+def _regra(nome, **kwargs):
+    return RegraCategorizacao(id_usuario="u1", nome=nome, **kwargs)
+
+
+def test_automato_encontra_palavras_sobrepostas_em_uma_passada():
+    automato = AutomatoPalavras(["he", "she", "his", "hers"])
+
+    encontradas = automato.buscar("ushers")
+
+    assert {automato.palavras[i] for i in encontradas} == {"he", "she", "hers"}
+    assert automato.buscar("xyz") == set()
+
+
+def test_classificador_ignora_caixa_e_acentos_e_marca_processado():
+    classificador = ClassificadorTransacoes(
+        [
+            _regra(
+                "Farmácia",
+                palavras_chave=["FARMACIA", "drogasil"],
+                id_categoria="cat_saude",
+                id_perfil="perfil_pessoal",
+            )
+        ]
+    )
+    transacao = _transacao("Farmácia  DROGASIL 0042")
+
+    assert classificador.classificar(transacao) is True
+    assert transacao.id_categoria == "cat_saude"
+    assert transacao.id_perfil == "perfil_pessoal"
+    assert transacao.status == StatusTransacao.PROCESSADO
+
+
+def test_classificador_respeita_prioridade_e_combina_regras_parciais():
+    classificador = ClassificadorTransacoes(
+        [
+            _regra("Uber geral", palavras_chave=["uber"], id_categoria="cat_lazer"),
+            _regra(
+                "Uber trabalho",
+                palavras_chave=["uber"],
+                valor_maximo=100,
+                id_categoria="cat_transporte",
+                prioridade=10,
+            ),
+            # Sem palavras-chave: candidata para todas as despesas
+            _regra("Despesas PJ", tipo=TipoTransacao.DESPESA, id_perfil="perfil_pj"),
+        ]
+    )
+    barata, cara = _transacao("UBER *TRIP", 30.0), _transacao("UBER *TRIP", 300.0)
+    receita = _transacao("UBER *TRIP", 30.0, TipoTransacao.RECEITA)
+
+    assert classificador.classificar_lote([barata, cara, receita]) == 2
+    assert (barata.id_categoria, barata.id_perfil) == ("cat_transporte", "perfil_pj")
+    assert (cara.id_categoria, cara.id_perfil) == ("cat_lazer", "perfil_pj")
+    # Só a categoria casou: continua na Inbox
+    assert receita.id_categoria == "cat_transporte"
+    assert receita.id_perfil is None
+    assert receita.status == StatusTransacao.PENDENTE
+
+
+def test_classificador_exige_todas_as_condicoes_da_regra():
+    classificador = ClassificadorTransacoes(
+        [
+            _regra(
+                "Aluguel",
+                palavras_chave=["pix"],
+                padrao_regex=r"imobili[aá]ria \d+",
+                valor_minimo=1000,
+                id_categoria="cat_moradia",
+                id_perfil="perfil_pessoal",
+            ),
+            _regra(
+                "Inativa",
+                palavras_chave=["pix"],
+                id_categoria="cat_lazer",
+                id_perfil="perfil_pj",
+                ativa=False,
+            ),
+        ]
+    )
+    aluguel = _transacao("PIX ENVIADO IMOBILIARIA 12", 1500.0)
+    pequeno = _transacao("PIX ENVIADO IMOBILIARIA 12", 50.0)
+    sem_regex = _transacao("PIX ENVIADO FULANO", 1500.0)
+
+    assert classificador.classificar_lote([aluguel, pequeno, sem_regex]) == 1
+    assert aluguel.id_categoria == "cat_moradia"
+    assert pequeno.id_categoria is None and sem_regex.id_categoria is None
+
+
+def test_importacao_aplica_regras_e_grava_processadas():
+    transacao_repo = MagicMock(spec=ITransacaoRepository)
+    transacao_repo.add_many.side_effect = lambda transacoes: len(transacoes)
+    transacao_repo.get_fingerprints_existentes.return_value = set()
+    regra_repo = MagicMock(spec=IRegraCategorizacaoRepository)
+    regra_repo.get_by_usuario.return_value = [
+        _regra(
+            "Mercado",
+            palavras_chave=["supermercado"],
+            id_categoria="cat_alimentacao",
+            id_perfil="perfil_pessoal",
+        )
+    ]
+    conteudo = (
+        "Data;Valor;Descricao\n"
+        "01/02/2024;-120,00;SUPERMERCADO EXTRA\n"
+        "02/02/2024;-5,00;Uber\n"
+    ).encode()
+
+    use_case = ImportarExtratoBancario(transacao_repo, regra_repo=regra_repo)
+    resultado = use_case.execute(
+        id_usuario="u1", file_bytes=conteudo, file_name="extrato.csv"
+    )
+
+    assert resultado["total_importadas"] == 2
+    assert resultado["total_categorizadas"] == 1
+    regra_repo.get_by_usuario.assert_called_once_with("u1", somente_ativas=True)
+    inseridas = {t.descricao: t for t in transacao_repo.add_many.call_args.args[0]}
+    assert inseridas["SUPERMERCADO EXTRA"].status == StatusTransacao.PROCESSADO
+    assert inseridas["SUPERMERCADO EXTRA"].id_categoria == "cat_alimentacao"
+    assert inseridas["Uber"].status == StatusTransacao.PENDENTE
+
+
+def test_criar_regra_valida_e_normaliza_campos():
+    repo = MagicMock(spec=IRegraCategorizacaoRepository)
+    repo.add.side_effect = lambda regra: regra
+    use_case = CriarRegraCategorizacao(repo)
+
+    regra = use_case.execute(
+        id_usuario="u1",
+        nome=" Transporte ",
+        id_categoria="cat_transporte",
+        palavras_chave=[" uber ", "", "99 taxi"],
+        valor_maximo="80",
+        tipo="DESPESA",
+        prioridade="5",
+    )
+
+    assert regra.nome == "Transporte"
+    assert regra.palavras_chave == ["uber", "99 taxi"]
+    assert regra.valor_maximo == 80.0
+    assert regra.tipo == TipoTransacao.DESPESA
+    assert regra.prioridade == 5
+    repo.add.assert_called_once_with(regra)
+
+
+@pytest.mark.parametrize(
+    "dados, mensagem",
+    [
+        ({"palavras_chave": ["uber"]}, "categoria ou um perfil"),
+        ({"id_categoria": "c"}, "ao menos uma condição"),
+        ({"id_categoria": "c", "padrao_regex": "("}, "Expressão regular"),
+        ({"id_categoria": "c", "valor_minimo": 10, "valor_maximo": 5}, "mínimo"),
+        ({"id_categoria": "c", "tipo": "OUTRO"}, "Tipo inválido"),
+        ({"id_categoria": "c", "palavras_chave": "uber"}, "lista de textos"),
+    ],
+)
+def test_criar_regra_rejeita_dados_invalidos(dados, mensagem):
+    repo = MagicMock(spec=IRegraCategorizacaoRepository)
+
+    with pytest.raises(ValueError, match=mensagem):
+        CriarRegraCategorizacao(repo).execute(id_usuario="u1", nome="Regra", **dados)
+    repo.add.assert_not_called()
+
+
+def test_deletar_regra_de_outro_usuario_e_proibido():
+    repo = MagicMock(spec=IRegraCategorizacaoRepository)
+    repo.get_by_id.return_value = _regra("Mercado", id_categoria="c")
+
+    with pytest.raises(PermissionError):
+        DeletarRegraCategorizacao(repo).execute(id_usuario="u2", id_regra="r1")
+    repo.delete.assert_not_called()
@@ -0,0 +1,40 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+# Garante que /server esteja no sys.path mesmo quando o arquivo é executado diretamente
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from domain.tarefa import Tarefa
+from use_cases.repository_interfaces import ITarefaRepository
+from use_cases.tarefa_use_cases import ObterTarefa
+
+
+@pytest.fixture
+def mock_repo():
+    return MagicMock(spec=ITarefaRepository)
+
+
+def test_obter_tarefa_do_usuario(mock_repo):
+    tarefa = Tarefa(id_usuario="u1", tipo="importacao_extrato")
+    mock_repo.get_by_id.return_value = tarefa
+
+    assert ObterTarefa(mock_repo).execute("u1", tarefa.id) is tarefa
+
+
+def test_obter_tarefa_inexistente(mock_repo):
+    mock_repo.get_by_id.return_value = None
+
+    with pytest.raises(ValueError, match="Tarefa não encontrada"):
+        ObterTarefa(mock_repo).execute("u1", "x")
+
+
+def test_obter_tarefa_de_outro_usuario(mock_repo):
+    mock_repo.get_by_id.return_value = Tarefa(id_usuario="u2", tipo="importacao")
+
+    with pytest.raises(PermissionError):
+        ObterTarefa(mock_repo).execute("u1", "x")
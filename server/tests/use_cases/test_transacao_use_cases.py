@@ -11,6 +11,7 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from use_cases.paginacao import CursorTransacao
 from use_cases.repository_interfaces import ITransacaoRepository
 from use_cases.transacao_use_cases import (
     AtualizarTransacao,
@@ -181,6 +182,95 @@ def test_filtrar_transacoes_falha_valor_invalido(mock_repo):
     mock_repo.get_by_filters.assert_not_called()
 
 
+# --- Testes (Paginação por cursor) ---
+
+
+def _transacoes_pendentes(qtd: int) -> list[Transacao]:
+    return [
+        Transacao(
+            valor=10.0 + i,
+            tipo=TipoTransacao.DESPESA,
+            data=datetime(2025, 1, 31 - i),
+            status=StatusTransacao.PENDENTE,
+            id_usuario="u1",
+        )
+        for i in range(qtd)
+    ]
+
+
+def test_filtrar_paginado_retorna_cursor_quando_ha_mais_paginas(mock_repo):
+    transacoes = _transacoes_pendentes(3)
+    mock_repo.get_by_filters.return_value = transacoes
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+
+    pagina = use_case.execute_paginado(id_usuario="u1", limite=2)
+
+    # Pede uma linha a mais para detectar a próxima página
+    assert mock_repo.get_by_filters.call_args.kwargs["limite"] == 3
+    assert pagina.itens == transacoes[:2]
+    cursor = CursorTransacao.decode(pagina.proximo_cursor)
+    assert cursor.id == transacoes[1].id
+    assert cursor.data == transacoes[1].data
+
+
+def test_filtrar_paginado_ultima_pagina_sem_cursor(mock_repo):
+    mock_repo.get_by_filters.return_value = _transacoes_pendentes(2)
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+
+    pagina = use_case.execute_paginado(id_usuario="u1", limite=2)
+
+    assert len(pagina.itens) == 2
+    assert pagina.proximo_cursor is None
+
+
+def test_filtrar_paginado_repassa_cursor_decodificado(mock_repo):
+    anterior = _transacoes_pendentes(1)[0]
+    token = CursorTransacao.from_transacao(anterior).encode()
+    mock_repo.get_by_filters.return_value = []
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+
+    use_case.execute_paginado(id_usuario="u1", cursor=token, limite=10)
+
+    kwargs = mock_repo.get_by_filters.call_args.kwargs
+    assert kwargs["cursor"] == CursorTransacao.from_transacao(anterior)
+    assert kwargs["limite"] == 11
+
+
+def test_filtrar_paginado_falha_cursor_invalido(mock_repo):
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+    with pytest.raises(ValueError, match="Cursor de paginação inválido"):
+        use_case.execute_paginado(id_usuario="u1", cursor="nao-e-um-cursor")
+    mock_repo.get_by_filters.assert_not_called()
+
+
+def test_filtrar_paginado_falha_limite_invalido(mock_repo):
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+    with pytest.raises(ValueError, match="O limite deve estar entre"):
+        use_case.execute_paginado(id_usuario="u1", limite=0)
+
+
+def test_filtrar_stream_delega_ao_repo_em_lotes(mock_repo):
+    lotes = [_transacoes_pendentes(2), _transacoes_pendentes(1)]
+    mock_repo.iter_by_filters.return_value = iter(lotes)
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+
+    resultado = list(
+        use_case.execute_stream(id_usuario="u1", descricao="Mercado", tamanho_lote=2)
+    )
+
+    assert resultado == lotes
+    kwargs = mock_repo.iter_by_filters.call_args.kwargs
+    assert kwargs["descricao"] == "Mercado"
+    assert kwargs["tamanho_lote"] == 2
+
+
+def test_filtrar_stream_valida_antes_de_consumir(mock_repo):
+    use_case = FiltrarTransacoes(transacao_repo=mock_repo)
+    with pytest.raises(ValueError, match="O valor 'Máximo' deve ser maior"):
+        use_case.execute_stream(id_usuario="u1", valor_min=100.0, valor_max=50.0)
+    mock_repo.iter_by_filters.assert_not_called()
+
+
 # --- Teste (Categorizar em Lote) ---
 
 
@@ -376,3 +466,38 @@ def test_obter_estatisticas_dashboard_sucesso(mock_repo):
     # 3. Assert
     mock_repo.get_dashboard_stats.assert_called_once_with(id_usuario_teste)
     assert resultado["saldo_atual"] == 12047.92
+
+
+def test_obter_estatisticas_dashboard_usa_cache(mock_repo):
+    from use_cases.cache_interface import IDashboardCache
+
+    cache = MagicMock(spec=IDashboardCache)
+    cache.versao.return_value = 3
+    cache.get.side_effect = [None, {"saldo_atual": 1.0}]
+    mock_repo.get_dashboard_stats.return_value = {"saldo_atual": 1.0}
+    use_case = ObterEstatisticasDashboard(transacao_repo=mock_repo, cache=cache)
+
+    assert use_case.execute(id_usuario="u1") == {"saldo_atual": 1.0}  # miss
+    assert use_case.execute(id_usuario="u1") == {"saldo_atual": 1.0}  # hit
+
+    mock_repo.get_dashboard_stats.assert_called_once_with("u1")
+    cache.set.assert_called_once_with("u1", {"saldo_atual": 1.0}, 3)
+
+
+def test_filtrar_por_relevancia_delega_busca_ao_repositorio(mock_repo):
+    mock_repo.search_by_descricao.return_value = []
+    use_case = FiltrarTransacoes(mock_repo)
+
+    use_case.execute_por_relevancia(id_usuario="u1", descricao="  mercado ")
+
+    kwargs = mock_repo.search_by_descricao.call_args.kwargs
+    assert kwargs["descricao"] == "mercado"
+    assert kwargs["limite"] == 50
+
+
+def test_filtrar_por_relevancia_exige_termo_com_tres_caracteres(mock_repo):
+    use_case = FiltrarTransacoes(mock_repo)
+
+    with pytest.raises(ValueError, match="ao menos 3 caracteres"):
+        use_case.execute_por_relevancia(id_usuario="u1", descricao="ab")
+    mock_repo.search_by_descricao.assert_not_called()
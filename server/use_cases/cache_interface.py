@@ -0,0 +1,51 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict
+
+from domain.mapeamento_csv import MapeamentoCSV
+
+
+class IDashboardCache(ABC):
+    """
+    Cache dos cards do Dashboard, por usuário. Cada usuário tem um contador
+    de versão de escrita: uma entrada só é válida se foi gravada na versão
+    atual (e dentro do TTL).
+    """
+
+    @abstractmethod
+    def versao(self, id_usuario: str) -> int:
+        """Versão de escrita atual do usuário."""
+        pass
+
+    @abstractmethod
+    def get(self, id_usuario: str) -> Dict[str, Any] | None:
+        """Retorna a entrada válida do usuário ou None (miss)."""
+        pass
+
+    @abstractmethod
+    def set(self, id_usuario: str, valor: Dict[str, Any], versao: int) -> None:
+        """Grava o valor calculado quando o usuário estava na 'versao'."""
+        pass
+
+    @abstractmethod
+    def invalidar(self, id_usuario: str) -> None:
+        """Incrementa a versão de escrita do usuário."""
+        pass
+
+
+class IIndiceMapeamentosCSV(ABC):
+    """
+    Mapeamentos CSV salvos de cada usuário, indexados pela assinatura do
+    cabeçalho (assinatura -> mapeamento).
+    """
+
+    @abstractmethod
+    def indice(
+        self, id_usuario: str, carregar: Callable[[], Dict[str, MapeamentoCSV]]
+    ) -> Dict[str, MapeamentoCSV]:
+        """Índice do usuário; 'carregar' só é chamado quando não há cache."""
+        pass
+
+    @abstractmethod
+    def invalidar(self, id_usuario: str) -> None:
+        """Descarta o índice do usuário (um mapeamento foi salvo)."""
+        pass
@@ -0,0 +1,159 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+from domain.regra_categorizacao import RegraCategorizacao
+from domain.transacao import StatusTransacao, Transacao
+from use_cases.texto import normalizar_texto
+
+
+class AutomatoPalavras:
+    """
+    Autômato de Aho-Corasick: encontra todas as palavras-chave presentes em
+    um texto em uma única passada, qualquer que seja a quantidade de
+    palavras. As palavras e o texto são comparados já normalizados.
+    """
+
+    def __init__(self, palavras: Iterable[str]):
+        # Estado 0 é a raiz; cada estado tem suas transições, o link de
+        # falha e os índices das palavras que terminam nele
+        self._transicoes: List[Dict[str, int]] = [{}]
+        self._falha: List[int] = [0]
+        self._saidas: List[Set[int]] = [set()]
+        self.palavras: List[str] = []
+
+        for palavra in palavras:
+            self._inserir(palavra)
+        self._construir_falhas()
+
+    def _inserir(self, palavra: str) -> None:
+        indice = len(self.palavras)
+        self.palavras.append(palavra)
+        estado = 0
+        for caractere in palavra:
+            proximo = self._transicoes[estado].get(caractere)
+            if proximo is None:
+                proximo = len(self._transicoes)
+                self._transicoes.append({})
+                self._falha.append(0)
+                self._saidas.append(set())
+                self._transicoes[estado][caractere] = proximo
+            estado = proximo
+        self._saidas[estado].add(indice)
+
+    def _construir_falhas(self) -> None:
+        # Busca em largura: o link de falha de um estado aponta para o maior
+        # sufixo dele que também é prefixo de alguma palavra
+        fila = deque(self._transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            for caractere, proximo in self._transicoes[estado].items():
+                fila.append(proximo)
+                falha = self._falha[estado]
+                while falha and caractere not in self._transicoes[falha]:
+                    falha = self._falha[falha]
+                destino = self._transicoes[falha].get(caractere, 0)
+                self._falha[proximo] = destino if destino != proximo else 0
+                self._saidas[proximo] |= self._saidas[self._falha[proximo]]
+
+    def buscar(self, texto: str) -> Set[int]:
+        """Índices (em 'palavras') das palavras que aparecem no texto."""
+        encontradas: Set[int] = set()
+        transicoes, falha, saidas = self._transicoes, self._falha, self._saidas
+        estado = 0
+        for caractere in texto:
+            while estado and caractere not in transicoes[estado]:
+                estado = falha[estado]
+            estado = transicoes[estado].get(caractere, 0)
+            if saidas[estado]:
+                encontradas |= saidas[estado]
+        return encontradas
+
+
+class ClassificadorTransacoes:
+    """
+    Compila as regras de categorização do usuário uma vez e classifica lotes
+    de transações. As palavras-chave de todas as regras formam um único
+    autômato: cada descrição é percorrida uma vez só, e as demais condições
+    (regex, faixa de valor, tipo) só são avaliadas nas regras candidatas.
+    """
+
+    def __init__(self, regras: Iterable[RegraCategorizacao]):
+        self.regras = sorted(
+            (regra for regra in regras if regra.ativa),
+            key=lambda regra: (-regra.prioridade, regra.nome),
+        )
+        self._regex = [
+            re.compile(regra.padrao_regex, re.IGNORECASE)
+            if regra.padrao_regex
+            else None
+            for regra in self.regras
+        ]
+
+        # Palavra normalizada -> posições (em self.regras) das regras que a usam
+        regras_por_palavra: Dict[str, Set[int]] = {}
+        self._sem_palavras: List[int] = []
+        for posicao, regra in enumerate(self.regras):
+            palavras = {normalizar_texto(p) for p in regra.palavras_chave} - {""}
+            if not palavras:
+                self._sem_palavras.append(posicao)
+            for palavra in palavras:
+                regras_por_palavra.setdefault(palavra, set()).add(posicao)
+
+        self._automato = AutomatoPalavras(regras_por_palavra)
+        self._regras_da_palavra = [
+            regras_por_palavra[palavra] for palavra in self._automato.palavras
+        ]
+
+    def classificar(self, transacao: Transacao) -> bool:
+        """
+        Preenche categoria e perfil ainda vazios com as regras de maior
+        prioridade que casam. Com os dois preenchidos a transação sai da
+        Inbox (PROCESSADO), como no lançamento manual completo.
+        """
+        candidatas = set(self._sem_palavras)
+        if self._automato.palavras and transacao.descricao:
+            descricao = normalizar_texto(transacao.descricao)
+            for indice in self._automato.buscar(descricao):
+                candidatas |= self._regras_da_palavra[indice]
+
+        alterada = False
+        for posicao in sorted(candidatas):
+            if transacao.id_categoria and transacao.id_perfil:
+                break
+            regra = self.regras[posicao]
+            if not self._casa(posicao, regra, transacao):
+                continue
+            if regra.id_categoria and not transacao.id_categoria:
+                transacao.id_categoria = regra.id_categoria
+                alterada = True
+            if regra.id_perfil and not transacao.id_perfil:
+                transacao.id_perfil = regra.id_perfil
+                alterada = True
+
+        if transacao.id_categoria and transacao.id_perfil:
+            transacao.status = StatusTransacao.PROCESSADO
+        return alterada
+
+    def classificar_lote(self, transacoes: Iterable[Transacao]) -> int:
+        """Classifica o lote e retorna quantas transações ficaram PROCESSADAS."""
+        if not self.regras:
+            return 0
+        processadas = 0
+        for transacao in transacoes:
+            self.classificar(transacao)
+            if transacao.status == StatusTransacao.PROCESSADO:
+                processadas += 1
+        return processadas
+
+    def _casa(
+        self, posicao: int, regra: RegraCategorizacao, transacao: Transacao
+    ) -> bool:
+        if regra.tipo is not None and transacao.tipo != regra.tipo:
+            return False
+        if regra.valor_minimo is not None and transacao.valor < regra.valor_minimo:
+            return False
+        if regra.valor_maximo is not None and transacao.valor > regra.valor_maximo:
+            return False
+        regex = self._regex[posicao]
+        return regex is None or bool(regex.search(transacao.descricao or ""))
@@ -0,0 +1,71 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from domain.transacao import TipoTransacao
+
+from use_cases.repository_interfaces import IResumoMensalRepository
+
+
+class ObterAnaliseFinanceira:
+    """
+    Caso de Uso: Análises por período, categoria e perfil.
+    Consulta o resumo mensal, então o custo cresce com o número de meses do
+    período e não com o número de transações.
+    """
+
+    AGRUPAMENTOS_VALIDOS = ("mes", "id_categoria", "id_perfil", "tipo")
+    AGRUPAMENTO_PADRAO = ["mes", "tipo"]
+
+    def __init__(self, resumo_repo: IResumoMensalRepository):
+        self.resumo_repo = resumo_repo
+
+    def execute(
+        self,
+        id_usuario: str,
+        mes_de: str | None = None,
+        mes_ate: str | None = None,
+        agrupar_por: List[str] | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        tipo: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        mes_de = self._validar_mes(mes_de, "mes_de")
+        mes_ate = self._validar_mes(mes_ate, "mes_ate")
+        if mes_de and mes_ate and mes_ate < mes_de:
+            raise ValueError("O mês final deve ser maior ou igual ao mês inicial.")
+
+        agrupar_por = agrupar_por or self.AGRUPAMENTO_PADRAO
+        invalidos = [g for g in agrupar_por if g not in self.AGRUPAMENTOS_VALIDOS]
+        if invalidos:
+            raise ValueError(
+                f"Agrupamento inválido: {', '.join(invalidos)}. "
+                f"Use: {', '.join(self.AGRUPAMENTOS_VALIDOS)}."
+            )
+
+        return self.resumo_repo.get_resumo(
+            id_usuario=id_usuario,
+            agrupar_por=list(dict.fromkeys(agrupar_por)),
+            mes_de=mes_de,
+            mes_ate=mes_ate,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            tipo=TipoTransacao(tipo.upper()) if tipo else None,
+        )
+
+    def _validar_mes(self, mes: str | None, campo: str) -> str | None:
+        if not mes:
+            return None
+        try:
+            return datetime.strptime(mes, "%Y-%m").strftime("%Y-%m")
+        except ValueError:
+            raise ValueError(f"O campo '{campo}' deve estar no formato AAAA-MM.")
+
+
+class ReconstruirResumoMensal:
+    """Caso de Uso: Recalcula o resumo mensal a partir das transações."""
+
+    def __init__(self, resumo_repo: IResumoMensalRepository):
+        self.resumo_repo = resumo_repo
+
+    def execute(self, id_usuario: str | None = None) -> int:
+        return self.resumo_repo.rebuild(id_usuario)
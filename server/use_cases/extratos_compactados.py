@@ -0,0 +1,195 @@
+import gzip
+import io
+import os
+import zipfile
+import zlib
+from typing import BinaryIO, Callable, Collection, Iterator
+
+# Contêineres aceitos no upload; o extrato é descompactado sob demanda,
+# conforme o parser lê, e nunca fica inteiro na memória
+EXTENSOES_COMPACTADAS = (".gz", ".zip", ".zst")
+
+# Teto de bytes descompactados por extrato: um arquivo pequeno que infla
+# sem fim (bomba de descompactação) para aqui, sem encher o disco ou a memória
+LIMITE_DESCOMPACTADO = 1024 * 1024 * 1024  # 1 GiB
+
+# Arquivo corrompido ou truncado: erro no conteúdo, não adianta repetir
+_ERROS_DESCOMPACTACAO = (gzip.BadGzipFile, EOFError, zlib.error, zipfile.BadZipFile)
+
+
+def formato_compactado(file_name: str | None) -> str | None:
+    """Extensão do contêiner (.gz, .zip, .zst) ou None para um arquivo puro."""
+    extensao = os.path.splitext(file_name or "")[1].lower()
+    return extensao if extensao in EXTENSOES_COMPACTADAS else None
+
+
+def nome_descompactado(file_name: str) -> str:
+    """'extrato.csv.gz' -> 'extrato.csv'. Um .zip não tem um nome só."""
+    if formato_compactado(file_name) in (".gz", ".zst"):
+        return os.path.splitext(file_name)[0]
+    return file_name
+
+
+def exigir_zstd():
+    """Módulo 'zstandard', importado só quando chega um .zst."""
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "Extratos .zst não são aceitos neste servidor (falta o pacote "
+            "'zstandard'). Envie o arquivo puro, .gz ou .zip."
+        )
+    return zstandard
+
+
+def extratos_do_arquivo(
+    file_stream: BinaryIO,
+    file_name: str,
+    extensoes: Collection[str],
+    limite_bytes: int | None = LIMITE_DESCOMPACTADO,
+) -> Iterator[tuple[str, BinaryIO]]:
+    """
+    Extratos contidos no arquivo enviado, como (nome, stream). Um arquivo
+    puro é o próprio extrato; .gz e .zst guardam um extrato; um .zip pode
+    guardar vários, e os membros sem uma das 'extensoes' (ou compactados)
+    são ignorados. Cada stream vale até o próximo extrato ser pedido. Um
+    extrato compactado que passa de 'limite_bytes' descompactados vira
+    ValueError durante a leitura (None: sem limite).
+    """
+    formato = formato_compactado(file_name)
+    if formato is None:
+        yield file_name, file_stream
+    elif formato == ".gz":
+        with gzip.GzipFile(fileobj=file_stream, mode="rb") as descompactado:
+            yield nome_descompactado(file_name), _StreamDescompactado(
+                descompactado, file_name, _ERROS_DESCOMPACTACAO, limite_bytes
+            )
+    elif formato == ".zst":
+        zstandard = exigir_zstd()
+        leitor = zstandard.ZstdDecompressor().stream_reader(
+            file_stream, read_across_frames=True, closefd=False
+        )
+        with leitor as descompactado:
+            yield nome_descompactado(file_name), _StreamDescompactado(
+                descompactado, file_name, (zstandard.ZstdError,), limite_bytes
+            )
+    else:
+        yield from _extratos_zip(file_stream, file_name, extensoes, limite_bytes)
+
+
+def _extratos_zip(
+    file_stream: BinaryIO,
+    file_name: str,
+    extensoes: Collection[str],
+    limite_bytes: int | None,
+) -> Iterator[tuple[str, BinaryIO]]:
+    # O índice do .zip fica no fim: o stream precisa aceitar seek (o upload
+    # do Flask e os arquivos em disco aceitam)
+    try:
+        arquivo_zip = zipfile.ZipFile(file_stream)
+    except zipfile.BadZipFile as exc:
+        raise ValueError(f"Arquivo compactado inválido ({file_name}): {exc}")
+
+    with arquivo_zip:
+        membros = [
+            membro
+            for membro in arquivo_zip.infolist()
+            if not membro.is_dir()
+            and not membro.filename.startswith("__MACOSX/")
+            and not os.path.basename(membro.filename).startswith(".")
+            and membro.filename.lower().endswith(tuple(extensoes))
+        ]
+        if not membros:
+            raise ValueError(
+                f"Nenhum extrato ({', '.join(sorted(extensoes))}) encontrado "
+                f"em {file_name}."
+            )
+        for membro in membros:
+            # O tamanho declarado no índice já barra o caso óbvio; a contagem
+            # na leitura barra um índice que mente
+            if limite_bytes is not None and membro.file_size > limite_bytes:
+                raise _limite_excedido(membro.filename, limite_bytes)
+            with arquivo_zip.open(membro) as descompactado:
+                yield membro.filename, _StreamDescompactado(
+                    descompactado, membro.filename, _ERROS_DESCOMPACTACAO, limite_bytes
+                )
+
+
+def _limite_excedido(nome: str, limite_bytes: int) -> ValueError:
+    return ValueError(
+        f"Extrato descompactado grande demais ({nome}): "
+        f"o limite é de {limite_bytes} bytes."
+    )
+
+
+class LeitorLimitado(io.RawIOBase):
+    """
+    Leitura de um stream descompactado sob demanda, com teto de bytes. Os
+    erros em 'erros' (conteúdo corrompido ou truncado) saem pela fábrica
+    'invalido', que recebe a exceção original; passar de 'limite_bytes'
+    sai pela fábrica 'excedido' (None: sem limite).
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        limite_bytes: int | None,
+        erros: tuple,
+        invalido: Callable[[Exception], Exception],
+        excedido: Callable[[], Exception],
+    ):
+        self._stream = stream
+        self._limite = limite_bytes
+        self._erros = erros
+        self._invalido = invalido
+        self._excedido = excedido
+        self._lidos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, tamanho: int | None = -1) -> bytes:
+        return self._ler(self._stream.read, tamanho)
+
+    def readinto(self, buffer) -> int:
+        dados = self.read(len(buffer))
+        buffer[: len(dados)] = dados
+        return len(dados)
+
+    def _ler(self, ler: Callable[[int], bytes], tamanho: int | None) -> bytes:
+        if self._limite is not None:
+            # Um byte além do que resta revela o excesso sem inflar o resto
+            restante = self._limite - self._lidos + 1
+            if tamanho is None or tamanho < 0:
+                tamanho = restante
+            else:
+                tamanho = min(tamanho, restante)
+        try:
+            dados = ler(tamanho)
+        except self._erros as exc:
+            raise self._invalido(exc) from exc
+        self._lidos += len(dados)
+        if self._limite is not None and self._lidos > self._limite:
+            raise self._excedido()
+        return dados
+
+
+class _StreamDescompactado(LeitorLimitado):
+    """
+    Extrato descompactado: erros de descompactação e o excesso sobre
+    'limite_bytes' saem como ValueError, como os erros de parse. Sem
+    'name', o parser não confunde o stream com o arquivo em disco.
+    """
+
+    def __init__(
+        self, stream: BinaryIO, nome: str, erros: tuple, limite_bytes: int | None
+    ):
+        super().__init__(
+            stream,
+            limite_bytes,
+            erros,
+            invalido=lambda exc: ValueError(
+                f"Arquivo compactado inválido ({nome}): {exc}"
+            ),
+            excedido=lambda: _limite_excedido(nome, limite_bytes),
+        )
@@ -0,0 +1,298 @@
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from domain.mapeamento_csv import MapeamentoCSV
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+from use_cases.extratos_compactados import EXTENSOES_COMPACTADAS, extratos_do_arquivo
+from use_cases.importacao_use_cases import ImportarExtratoBancario
+from use_cases.parsers.base import CONTEXTO_PROCESSOS, LinhaRejeitada
+from use_cases.registro_parsers import RegistroParsers
+from use_cases.repository_interfaces import IMapeamentoCSVRepository
+
+
+@dataclass
+class ResultadoArquivoImportado:
+    arquivo: str
+    total_importadas: int = 0
+    total_ignoradas: int = 0
+    total_categorizadas: int = 0
+    total_rejeitadas: int = 0
+    # Identifica as transações e as linhas em quarentena gravadas do arquivo
+    id_importacao: str | None = None
+    segundos_parse: float = 0.0
+    segundos_gravacao: float = 0.0
+    erro: str | None = None
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        segundos = self.segundos_parse + self.segundos_gravacao
+        linhas = self.total_importadas + self.total_ignoradas
+        return linhas / segundos if segundos else 0.0
+
+
+class _IndiceFixo(IIndiceMapeamentosCSV):
+    """Índice já carregado, enviado aos processos do pool (que não usam o banco)."""
+
+    def __init__(self, mapeamentos: Dict[str, MapeamentoCSV]):
+        self.mapeamentos = mapeamentos
+
+    def indice(
+        self, id_usuario: str, carregar: Callable[[], Dict[str, MapeamentoCSV]]
+    ) -> Dict[str, MapeamentoCSV]:
+        return self.mapeamentos
+
+    def invalidar(self, id_usuario: str) -> None:
+        pass
+
+
+def _lotes_do_arquivo(
+    caminho: str,
+    column_mapping: Dict[str, str] | None,
+    sem_cabecalho: bool,
+    tamanho_lote: int,
+    mapeamentos: Dict[str, MapeamentoCSV] | None = None,
+    registro: RegistroParsers | None = None,
+    tolerante: bool = False,
+    limite_descompactado: int | None = None,
+    processos: int = 1,
+) -> Iterator[List[Dict[str, Any] | LinhaRejeitada]]:
+    """
+    Só faz o parse (CPU), sem tocar no banco, entregando um lote por vez.
+    'processos' > 1 só é usado fora do pool de arquivos, para dividir o
+    parse de um arquivo grande.
+    """
+    importador = ImportarExtratoBancario(
+        transacao_repo=None,
+        indice_mapeamentos=_IndiceFixo(mapeamentos or {}),
+        registro=registro,
+        limite_descompactado=limite_descompactado,
+    )
+    importador.validar_arquivo(caminho)
+    with open(caminho, "rb") as arquivo:
+        # Os extratos de um .zip entram juntos, como um arquivo só
+        extratos = extratos_do_arquivo(
+            arquivo,
+            caminho,
+            importador.registro.extensoes,
+            importador.limite_descompactado,
+        )
+        for nome, stream in extratos:
+            parser, stream = importador.parser_do_extrato(nome, stream)
+            yield from parser.parse_stream(
+                id_usuario="",
+                file_stream=stream,
+                file_name=os.path.basename(nome),
+                column_mapping=column_mapping,
+                sem_cabecalho=sem_cabecalho,
+                tamanho_lote=tamanho_lote,
+                tolerante=tolerante,
+                processos=processos,
+            )
+
+
+def _parsear_arquivo(
+    caminho: str, *argumentos: Any
+) -> tuple[List[List[Dict[str, Any] | LinhaRejeitada]], float]:
+    """
+    Executado nos processos do pool de arquivos: o resultado volta inteiro
+    ao processo principal. Retorna os lotes parseados e o tempo gasto.
+    """
+    inicio = time.perf_counter()
+    lotes = list(_lotes_do_arquivo(caminho, *argumentos))
+    return lotes, time.perf_counter() - inicio
+
+
+def _cronometrar(
+    lotes: Iterable[List[Dict[str, Any] | LinhaRejeitada]],
+    resultado: "ResultadoArquivoImportado",
+) -> Iterator[List[Dict[str, Any] | LinhaRejeitada]]:
+    """Soma em 'segundos_parse' o tempo gasto para produzir cada lote."""
+    lotes = iter(lotes)
+    while True:
+        inicio = time.perf_counter()
+        lote = next(lotes, None)
+        resultado.segundos_parse += time.perf_counter() - inicio
+        if lote is None:
+            return
+        yield lote
+
+
+class ImportarPastaExtratos:
+    """
+    Importa todos os extratos (CSV/OFX, puros ou compactados) de uma pasta.
+    Com 'processos' > 1, o parse roda em um pool de processos; a gravação
+    fica neste processo, um arquivo por vez, para que o SQLite tenha um único
+    escritor. Com um arquivo só, os processos dividem o parse dele (CSV
+    grande). O padrão é 1: o paralelismo é opcional, como na importação em
+    segundo plano (PLANO_IMPORTACAO_PROCESSOS).
+    """
+
+    def __init__(
+        self,
+        importador: ImportarExtratoBancario,
+        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+    ):
+        self.importador = importador
+        self.mapeamento_repo = mapeamento_repo
+
+    def listar_arquivos(self, pasta: str, recursivo: bool = False) -> List[str]:
+        if not os.path.isdir(pasta):
+            raise ValueError(f"Pasta não encontrada: {pasta}")
+
+        extensoes = self.importador.registro.extensoes
+        # Compactados: .zip sempre; .gz e .zst se guardam um CSV/OFX
+        compactados = tuple(
+            extensao + compactacao
+            for extensao in extensoes
+            for compactacao in EXTENSOES_COMPACTADAS
+            if compactacao != ".zip"
+        ) + (".zip",)
+        if recursivo:
+            caminhos = (
+                os.path.join(raiz, nome)
+                for raiz, _, nomes in os.walk(pasta)
+                for nome in nomes
+            )
+        else:
+            caminhos = (os.path.join(pasta, nome) for nome in os.listdir(pasta))
+        return sorted(
+            caminho
+            for caminho in caminhos
+            if os.path.isfile(caminho)
+            and caminho.lower().endswith(extensoes + compactados)
+        )
+
+    def execute(
+        self,
+        id_usuario: str,
+        pasta: str,
+        nome_mapeamento: str | None = None,
+        processos: int = 1,
+        recursivo: bool = False,
+        tolerante: bool = False,
+        ao_gravar_lote: Callable[[Dict[str, Any]], None] | None = None,
+    ) -> Iterator[ResultadoArquivoImportado]:
+        """
+        Entrega um resultado por arquivo, logo depois de gravá-lo. Quem
+        consome decide o rollback do que sobrou se houver 'erro'.
+        'ao_gravar_lote' é repassado ao gravar_lotes: é o ponto de commit
+        de quem chama, para o lock de escrita não durar o arquivo inteiro.
+        Um arquivo com erro mantém os lotes já confirmados, identificados
+        pelo 'id_importacao' do resultado.
+        """
+        column_mapping, sem_cabecalho, mapeamentos = None, False, {}
+        if nome_mapeamento:
+            if not self.mapeamento_repo:
+                raise ValueError("Repositório de mapeamentos indisponível.")
+            mapeamento = self.mapeamento_repo.get_by_nome(id_usuario, nome_mapeamento)
+            if not mapeamento:
+                raise ValueError(f"Mapeamento '{nome_mapeamento}' não encontrado.")
+            column_mapping = mapeamento.column_mapping()
+            sem_cabecalho = mapeamento.sem_cabecalho
+        else:
+            # Cada CSV usa o mapeamento salvo cujo cabeçalho ele repete. O
+            # parser de CSV é importado aqui, não ao carregar o módulo
+            from use_cases.parsers.csv import CsvExtratoParser
+
+            parser = CsvExtratoParser(self.mapeamento_repo)
+            mapeamentos = parser.mapeamentos_por_assinatura(id_usuario)
+
+        arquivos = self.listar_arquivos(pasta, recursivo)
+        argumentos = (
+            column_mapping,
+            sem_cabecalho,
+            self.importador.tamanho_lote,
+            mapeamentos,
+            self.importador.registro,
+            tolerante,
+            self.importador.limite_descompactado,
+        )
+        if processos <= 1 or len(arquivos) <= 1:
+            # Parse neste processo, lote a lote junto com a gravação; com um
+            # arquivo só, os processos dividem o parse dele
+            argumentos += (processos,)
+            for caminho in arquivos:
+                yield self._gravar(
+                    id_usuario, caminho, _executar(caminho, argumentos), ao_gravar_lote
+                )
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=processos, mp_context=CONTEXTO_PROCESSOS
+        ) as pool:
+            # Janela limitada: no máximo 2 arquivos parseados por processo
+            # aguardando o escritor, para a memória não crescer com a pasta
+            janela = 2 * processos
+            pendentes = {}
+            fila = iter(arquivos)
+            for caminho in islice(fila, janela):
+                pendentes[pool.submit(_parsear_arquivo, caminho, *argumentos)] = caminho
+
+            while pendentes:
+                feitos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in feitos:
+                    caminho = pendentes.pop(futuro)
+                    yield self._gravar(id_usuario, caminho, futuro, ao_gravar_lote)
+                    for proximo in islice(fila, 1):
+                        pendentes[
+                            pool.submit(_parsear_arquivo, proximo, *argumentos)
+                        ] = proximo
+
+    def _gravar(
+        self,
+        id_usuario: str,
+        caminho: str,
+        futuro: Future,
+        ao_gravar_lote: Callable[[Dict[str, Any]], None] | None = None,
+    ) -> ResultadoArquivoImportado:
+        # O id vem antes da gravação: num erro, identifica os lotes já gravados
+        resultado = ResultadoArquivoImportado(
+            arquivo=caminho, id_importacao=str(uuid.uuid4())
+        )
+
+        def registrar_lote(parcial: Dict[str, Any]) -> None:
+            resultado.total_importadas = parcial["total_importadas"]
+            resultado.total_ignoradas = parcial["total_ignoradas"]
+            resultado.total_categorizadas = parcial["total_categorizadas"]
+            resultado.total_rejeitadas = parcial["total_rejeitadas"]
+            if ao_gravar_lote:
+                ao_gravar_lote(parcial)
+
+        try:
+            lotes, resultado.segundos_parse = futuro.result()
+            inicio = time.perf_counter()
+            parse_antes = resultado.segundos_parse
+            gravado = self.importador.gravar_lotes(
+                id_usuario,
+                _cronometrar(lotes, resultado),
+                ao_gravar_lote=registrar_lote,
+                file_name=os.path.basename(caminho),
+                id_importacao=resultado.id_importacao,
+            )
+            # Com o parse em streaming, o tempo dele sai do tempo de gravação
+            resultado.segundos_gravacao = (
+                time.perf_counter() - inicio - (resultado.segundos_parse - parse_antes)
+            )
+            resultado.total_importadas = gravado["total_importadas"]
+            resultado.total_ignoradas = gravado["total_ignoradas"]
+            resultado.total_categorizadas = gravado["total_categorizadas"]
+            resultado.total_rejeitadas = gravado["total_rejeitadas"]
+        except Exception as e:
+            resultado.erro = str(e)
+        return resultado
+
+
+def _executar(caminho: str, argumentos: tuple) -> Future:
+    """
+    Parse no próprio processo, embrulhado em um Future já resolvido. Os lotes
+    são gerados sob demanda, pela gravação: o arquivo não fica inteiro na
+    memória (os erros do parse aparecem durante a gravação).
+    """
+    futuro = Future()
+    futuro.set_result((_lotes_do_arquivo(caminho, *argumentos), 0.0))
+    return futuro
@@ -0,0 +1,459 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List
+
+from domain.extrato_arquivado import ExtratoArquivado
+from domain.tarefa import Tarefa
+from use_cases.extratos_compactados import formato_compactado
+from use_cases.importacao_use_cases import (
+    TIPO_TAREFA_IMPORTACAO,
+    TIPO_TAREFA_REPROCESSAMENTO,
+    DesfazerImportacao,
+    ImportarExtratoBancario,
+)
+from use_cases.repository_interfaces import (
+    IExtratoArquivadoRepository,
+    ITarefaRepository,
+)
+from use_cases.storage_interface import IArquivoExtratosStorage, IImportacaoStorage
+
+
+class EnfileirarImportacaoExtrato:
+    """
+    Guarda o extrato enviado e cria a tarefa que vai importá-lo em segundo
+    plano. A validação do formato acontece aqui, antes de aceitar o arquivo.
+    """
+
+    def __init__(
+        self,
+        tarefa_repo: ITarefaRepository,
+        storage: IImportacaoStorage,
+        importador: ImportarExtratoBancario,
+    ):
+        self.tarefa_repo = tarefa_repo
+        self.storage = storage
+        self.importador = importador
+
+    def execute(
+        self,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        tolerante: bool = False,
+        id_importacao: str | None = None,
+    ) -> Tarefa:
+        """
+        Informar o 'id_importacao' de uma importação interrompida retoma-a:
+        as linhas já gravadas são puladas e as novas entram na mesma
+        importação (desfeita de uma vez por DesfazerImportacao).
+        """
+        self.importador.validar_arquivo(file_name, file_stream)
+
+        caminho = self.storage.save(file_stream, file_name)
+        tarefa = Tarefa(
+            id_usuario=id_usuario,
+            tipo=TIPO_TAREFA_IMPORTACAO,
+            payload={
+                "caminho": caminho,
+                "file_name": file_name,
+                "column_mapping": column_mapping,
+                "mapping_id": mapping_id,
+                "sem_cabecalho": sem_cabecalho,
+                "tolerante": tolerante,
+                "id_importacao": id_importacao,
+            },
+        )
+        return self.tarefa_repo.add(tarefa)
+
+
+class ProcessarImportacaoEnfileirada:
+    """Executa uma tarefa de importação criada por EnfileirarImportacaoExtrato."""
+
+    def __init__(
+        self,
+        importador: ImportarExtratoBancario,
+        storage: IImportacaoStorage,
+        arquivador: "ArquivarExtrato | None" = None,
+    ):
+        self.importador = importador
+        self.storage = storage
+        self.arquivador = arquivador
+
+    def execute(
+        self, tarefa: Tarefa, registrar_progresso: Callable[[float], None]
+    ) -> Dict[str, Any]:
+        """
+        'registrar_progresso' recebe a fração do arquivo já lida a cada lote
+        gravado. O arquivo salvo é removido quando não haverá nova tentativa.
+        Sem 'id_importacao' no payload, a importação usa o id da tarefa: as
+        novas tentativas continuam a mesma importação.
+
+        Com 'arquivador', o arquivo é guardado no arquivo de extratos antes
+        do parse (e confirmado, mesmo que o conteúdo se mostre inválido):
+        ele pode ser reprocessado depois, com outro mapeamento.
+        """
+        payload = tarefa.payload
+        id_importacao = payload.get("id_importacao") or tarefa.id
+        parametros = {
+            chave: payload.get(chave)
+            for chave in ("column_mapping", "mapping_id", "sem_cabecalho", "tolerante")
+        }
+        try:
+            with self.storage.open(payload["caminho"]) as arquivo:
+                if self.arquivador:
+                    self.arquivador.execute(
+                        tarefa.id_usuario,
+                        id_importacao,
+                        arquivo,
+                        payload["file_name"],
+                        parametros,
+                    )
+                    registrar_progresso(0.0)
+                tamanho = arquivo.seek(0, os.SEEK_END) or 1
+                arquivo.seek(0)
+                resultado = self.importador.execute(
+                    id_usuario=tarefa.id_usuario,
+                    file_bytes=None,
+                    file_name=payload["file_name"],
+                    column_mapping=payload.get("column_mapping"),
+                    mapping_id=payload.get("mapping_id"),
+                    sem_cabecalho=payload.get("sem_cabecalho", False),
+                    file_stream=arquivo,
+                    tolerante=payload.get("tolerante", False),
+                    id_importacao=id_importacao,
+                    ao_gravar_lote=lambda _: registrar_progresso(
+                        arquivo.tell() / tamanho
+                    ),
+                )
+        except ValueError:
+            # Erro no conteúdo do arquivo: repetir não muda o resultado
+            self.storage.delete(payload["caminho"])
+            raise
+        except Exception:
+            if tarefa.tentativas >= tarefa.max_tentativas:
+                self.storage.delete(payload["caminho"])
+            raise
+
+        self.storage.delete(payload["caminho"])
+        return {**resultado, "arquivo": payload["file_name"]}
+
+
+class ArquivarExtrato:
+    """
+    Guarda o extrato enviado no arquivo de extratos, ligado à importação.
+    O mesmo conteúdo enviado de novo na mesma importação (ex: a nova
+    tentativa da tarefa) não gera outro registro.
+    """
+
+    def __init__(
+        self,
+        arquivo_repo: IExtratoArquivadoRepository,
+        storage: IArquivoExtratosStorage,
+    ):
+        self.arquivo_repo = arquivo_repo
+        self.storage = storage
+
+    def execute(
+        self,
+        id_usuario: str,
+        id_importacao: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        parametros: Dict[str, Any] | None = None,
+    ) -> ExtratoArquivado:
+        # Um .gz/.zip/.zst já vem compactado: é guardado como veio
+        conteudo = self.storage.arquivar(
+            file_stream, compactar=formato_compactado(file_name) is None
+        )
+        for extrato in self.arquivo_repo.get_by_importacao(id_usuario, id_importacao):
+            if extrato.hash_conteudo == conteudo.hash_conteudo:
+                return extrato
+
+        return self.arquivo_repo.add(
+            ExtratoArquivado(
+                id_usuario=id_usuario,
+                id_importacao=id_importacao,
+                arquivo=file_name,
+                hash_conteudo=conteudo.hash_conteudo,
+                tamanho_bytes=conteudo.tamanho_bytes,
+                caminho_storage=conteudo.caminho_storage,
+                compressao=conteudo.compressao,
+                parametros=parametros or {},
+            )
+        )
+
+
+class ListarExtratosArquivados:
+    """Extratos guardados do usuário, do envio mais recente ao mais antigo."""
+
+    def __init__(self, arquivo_repo: IExtratoArquivadoRepository):
+        self.arquivo_repo = arquivo_repo
+
+    def execute(
+        self, id_usuario: str, id_importacao: str | None = None
+    ) -> List[ExtratoArquivado]:
+        if id_importacao:
+            return self.arquivo_repo.get_by_importacao(id_usuario, id_importacao)
+        return self.arquivo_repo.list_by_usuario(id_usuario)
+
+
+class EnfileirarReprocessamentoExtratos:
+    """
+    Cria a tarefa que importa de novo, em segundo plano, os extratos
+    arquivados de várias importações (todas do usuário, se nenhuma for
+    informada).
+    """
+
+    def __init__(
+        self,
+        tarefa_repo: ITarefaRepository,
+        arquivo_repo: IExtratoArquivadoRepository,
+        importador: ImportarExtratoBancario,
+    ):
+        self.tarefa_repo = tarefa_repo
+        self.arquivo_repo = arquivo_repo
+        self.importador = importador
+
+    def execute(
+        self,
+        id_usuario: str,
+        ids_importacao: List[str] | None = None,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        tolerante: bool | None = None,
+        substituir: bool = False,
+    ) -> Tarefa:
+        ids_importacao = resolver_importacoes_arquivadas(
+            self.arquivo_repo, id_usuario, ids_importacao
+        )
+        if mapping_id:
+            # Confere o mapeamento agora, e não só quando a tarefa rodar
+            self.importador.parser_do_formato("csv")._resolve_mapping_param(
+                id_usuario, mapping_id, None, False
+            )
+
+        tarefa = Tarefa(
+            id_usuario=id_usuario,
+            tipo=TIPO_TAREFA_REPROCESSAMENTO,
+            payload={
+                "ids_importacao": ids_importacao,
+                "column_mapping": column_mapping,
+                "mapping_id": mapping_id,
+                "tolerante": tolerante,
+                "substituir": substituir,
+            },
+        )
+        return self.tarefa_repo.add(tarefa)
+
+
+def resolver_importacoes_arquivadas(
+    arquivo_repo: IExtratoArquivadoRepository,
+    id_usuario: str,
+    ids_importacao: List[str] | None,
+) -> List[str]:
+    """
+    Importações a reprocessar: as informadas, que precisam ter extratos
+    arquivados, ou todas as do usuário, da mais antiga à mais recente.
+    """
+    if not ids_importacao:
+        extratos = reversed(arquivo_repo.list_by_usuario(id_usuario))
+        ids_importacao = list(dict.fromkeys(e.id_importacao for e in extratos))
+        if not ids_importacao:
+            raise ValueError("Nenhum extrato arquivado para reprocessar.")
+        return ids_importacao
+
+    ids_importacao = list(dict.fromkeys(ids_importacao))
+    for id_importacao in ids_importacao:
+        if not arquivo_repo.get_by_importacao(id_usuario, id_importacao):
+            raise ValueError(
+                f"Nenhum extrato arquivado para a importação {id_importacao}."
+            )
+    return ids_importacao
+
+
+@dataclass
+class ResultadoReprocessamento:
+    id_importacao: str
+    arquivos: List[str] = field(default_factory=list)
+    total_importadas: int = 0
+    total_ignoradas: int = 0
+    total_categorizadas: int = 0
+    total_rejeitadas: int = 0
+    # Transações da importação anterior removidas (com 'substituir')
+    total_removidas: int = 0
+    erro: str | None = None
+
+
+class ReprocessarExtratosArquivados:
+    """
+    Importa de novo os extratos arquivados de cada importação, com o
+    mapeamento informado (ou o da importação original), sem reenvio. A
+    quarentena da importação é refeita a partir dos arquivos. Com
+    'substituir', as transações da importação são removidas antes (ex:
+    foram gravadas com o mapeamento errado), inclusive as que o usuário já
+    revisou ou categorizou (PROCESSADAS): voltam como PENDENTES, com as
+    regras de categorização aplicadas de novo. A remoção só acontece depois
+    que o começo de cada arquivo passa pelo parse com o novo mapeamento.
+    Sem 'substituir', as já gravadas são puladas pelo fingerprint e só
+    entram as que faltavam.
+    """
+
+    def __init__(
+        self,
+        importador: ImportarExtratoBancario,
+        arquivo_repo: IExtratoArquivadoRepository,
+        storage: IArquivoExtratosStorage,
+        tarefa_repo: ITarefaRepository | None = None,
+    ):
+        self.importador = importador
+        self.arquivo_repo = arquivo_repo
+        self.storage = storage
+        self.desfazer = DesfazerImportacao(
+            importador.transacao_repo,
+            importador.quarentena_repo,
+            tarefa_repo,
+            tamanho_lote=importador.tamanho_lote,
+        )
+
+    def execute(
+        self,
+        id_usuario: str,
+        ids_importacao: List[str],
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        tolerante: bool | None = None,
+        substituir: bool = False,
+        registrar_progresso: Callable[[float], None] | None = None,
+        id_tarefa: str | None = None,
+    ) -> Iterator[ResultadoReprocessamento]:
+        """
+        Entrega um resultado por importação. 'registrar_progresso' recebe a
+        fração já reprocessada (de todas as importações) a cada lote gravado
+        ou removido, e é onde quem chama faz o commit, como na importação;
+        se uma importação falhar no meio, os arquivos continuam guardados e
+        basta reprocessá-la de novo. Quem consome decide o commit (ou
+        rollback, se 'erro') do resto antes da próxima. 'id_tarefa' é a
+        tarefa que executa o reprocessamento, quando há uma.
+        """
+        registrar_progresso = registrar_progresso or (lambda _: None)
+        total = len(ids_importacao)
+        for indice, id_importacao in enumerate(ids_importacao):
+            yield self._reprocessar(
+                id_usuario,
+                id_importacao,
+                column_mapping,
+                mapping_id,
+                tolerante,
+                substituir,
+                lambda fracao: registrar_progresso((indice + fracao) / total),
+                id_tarefa,
+            )
+
+    def _reprocessar(
+        self,
+        id_usuario: str,
+        id_importacao: str,
+        column_mapping: Dict[str, str] | None,
+        mapping_id: str | None,
+        tolerante: bool | None,
+        substituir: bool,
+        registrar_progresso: Callable[[float], None],
+        id_tarefa: str | None,
+    ) -> ResultadoReprocessamento:
+        resultado = ResultadoReprocessamento(id_importacao=id_importacao)
+        try:
+            extratos = self.arquivo_repo.get_by_importacao(id_usuario, id_importacao)
+            if not extratos:
+                raise ValueError("Nenhum extrato arquivado para esta importação.")
+            resultado.arquivos = [extrato.arquivo for extrato in extratos]
+
+            self.desfazer.exigir_finalizada(id_usuario, id_importacao, id_tarefa)
+            if substituir:
+                # Um mapeamento que não serve falha aqui, com as transações
+                # da importação ainda intactas
+                for extrato in extratos:
+                    self._validar(extrato, column_mapping, mapping_id, tolerante)
+                resultado.total_removidas = self.desfazer.remover_transacoes(
+                    id_usuario, id_importacao, lambda _: registrar_progresso(0.0)
+                )
+            self.desfazer.remover_quarentena(id_usuario, id_importacao)
+
+            for posicao, extrato in enumerate(extratos):
+                gravado = self._importar(
+                    extrato,
+                    column_mapping,
+                    mapping_id,
+                    tolerante,
+                    lambda fracao: registrar_progresso(
+                        (posicao + fracao) / len(extratos)
+                    ),
+                )
+                resultado.total_importadas += gravado["total_importadas"]
+                resultado.total_ignoradas += gravado["total_ignoradas"]
+                resultado.total_categorizadas += gravado["total_categorizadas"]
+                resultado.total_rejeitadas += gravado["total_rejeitadas"]
+        except Exception as e:
+            resultado.erro = str(e)
+        return resultado
+
+    def _validar(
+        self,
+        extrato: ExtratoArquivado,
+        column_mapping: Dict[str, str] | None,
+        mapping_id: str | None,
+        tolerante: bool | None,
+    ) -> None:
+        with self.storage.open(extrato.caminho_storage) as arquivo:
+            self.importador.validar_amostra(
+                file_stream=arquivo,
+                **self._parametros(extrato, column_mapping, mapping_id, tolerante),
+            )
+
+    def _importar(
+        self,
+        extrato: ExtratoArquivado,
+        column_mapping: Dict[str, str] | None,
+        mapping_id: str | None,
+        tolerante: bool | None,
+        registrar_progresso: Callable[[float], None],
+    ) -> Dict[str, Any]:
+        with self.storage.open(extrato.caminho_storage) as arquivo:
+            tamanho = arquivo.seek(0, os.SEEK_END) or 1
+            arquivo.seek(0)
+            return self.importador.execute(
+                file_bytes=None,
+                file_stream=arquivo,
+                id_importacao=extrato.id_importacao,
+                ao_gravar_lote=lambda _: registrar_progresso(
+                    arquivo.tell() / tamanho
+                ),
+                **self._parametros(extrato, column_mapping, mapping_id, tolerante),
+            )
+
+    @staticmethod
+    def _parametros(
+        extrato: ExtratoArquivado,
+        column_mapping: Dict[str, str] | None,
+        mapping_id: str | None,
+        tolerante: bool | None,
+    ) -> Dict[str, Any]:
+        """Parâmetros do parse: os informados ou os do envio original."""
+        parametros = extrato.parametros
+        if not column_mapping and not mapping_id:
+            column_mapping = parametros.get("column_mapping")
+            mapping_id = parametros.get("mapping_id")
+        if tolerante is None:
+            tolerante = bool(parametros.get("tolerante"))
+        # O nome com a compactação do arquivo ('extrato.csv.zst') faz o
+        # importador descompactar o conteúdo em stream, como num envio
+        return {
+            "id_usuario": extrato.id_usuario,
+            "file_name": extrato.nome_arquivado,
+            "column_mapping": column_mapping,
+            "mapping_id": mapping_id,
+            "sem_cabecalho": bool(parametros.get("sem_cabecalho")),
+            "tolerante": tolerante,
+        }
@@ -1,439 +1,656 @@
-import csv
+import hashlib
 import io
 import os
-import re
-from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Any, Dict, List
-
-from domain.mapeamento_csv import MapeamentoCSV
-from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+import uuid
+from contextlib import closing, nullcontext
+from typing import Any, BinaryIO, Callable, Dict, Iterable, List
+
+from domain.linha_quarentena import LinhaQuarentena
+from domain.tarefa import Tarefa
+from domain.transacao import StatusTransacao, Transacao
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+from use_cases.classificador_transacoes import ClassificadorTransacoes
+from use_cases.extratos_compactados import (
+    EXTENSOES_COMPACTADAS,
+    LIMITE_DESCOMPACTADO,
+    exigir_zstd,
+    extratos_do_arquivo,
+    formato_compactado,
+    nome_descompactado,
+)
+from use_cases.parsers.base import ExtratoParser, LinhaRejeitada
+from use_cases.registro_parsers import (
+    FORMATOS_PADRAO,
+    TAMANHO_AMOSTRA,
+    FormatoExtrato,
+    RegistroParsers,
+)
 from use_cases.repository_interfaces import (
+    ILinhaQuarentenaRepository,
     IMapeamentoCSVRepository,
+    IRegraCategorizacaoRepository,
+    ITarefaRepository,
     ITransacaoRepository,
+    IUnidadeTrabalho,
 )
+from use_cases.texto import normalizar_texto
+
+
+class ResumoRejeicoes:
+    """
+    Resumo compacto das linhas rejeitadas: quantidade por motivo e as
+    primeiras linhas de cada um, sem guardar todas na memória.
+    """
+
+    MAX_MOTIVOS = 10
+    MAX_LINHAS_POR_MOTIVO = 5
+
+    def __init__(self):
+        self.total = 0
+        self._motivos: Dict[str, Dict[str, Any]] = {}
+        self._outros = 0
+
+    def registrar(self, numero_linha: int, motivo: str) -> None:
+        self.total += 1
+        item = self._motivos.get(motivo)
+        if item is None:
+            if len(self._motivos) >= self.MAX_MOTIVOS:
+                self._outros += 1
+                return
+            item = {"motivo": motivo, "quantidade": 0, "linhas": []}
+            self._motivos[motivo] = item
+        item["quantidade"] += 1
+        if len(item["linhas"]) < self.MAX_LINHAS_POR_MOTIVO:
+            item["linhas"].append(numero_linha)
+
+    def como_lista(self) -> List[Dict[str, Any]]:
+        erros = sorted(self._motivos.values(), key=lambda e: -e["quantidade"])
+        if self._outros:
+            erros.append(
+                {"motivo": "Outros motivos", "quantidade": self._outros, "linhas": []}
+            )
+        return erros
+
+
+def _espiar(stream: BinaryIO, tamanho: int) -> tuple[bytes, BinaryIO]:
+    """
+    Primeiros bytes do stream sem consumi-los. Um stream sem seek (ex: um
+    extrato descompactado) é embrulhado num BufferedReader, que passa a ser
+    o stream a ler.
+    """
+    if stream.seekable():
+        posicao = stream.tell()
+        amostra = stream.read(tamanho)
+        stream.seek(posicao)
+        return amostra, stream
+    leitor = io.BufferedReader(stream, max(tamanho, io.DEFAULT_BUFFER_SIZE))
+    return leitor.peek(tamanho)[:tamanho], leitor
+
+
+def fingerprint_importacao(
+    dados: Dict[str, Any], ocorrencias: Dict[str, int] | None = None
+) -> str:
+    """
+    Hash estável de uma linha de extrato: (data, valor, tipo, descrição
+    normalizada) ou, no OFX, o FITID do banco junto com data e valor.
+
+    'ocorrencias' conta linhas idênticas dentro do mesmo arquivo (ex: dois
+    cafés iguais no mesmo dia): a n-ésima repetição recebe um fingerprint
+    próprio, então reimportar o arquivo ignora as duas sem fundi-las.
+    """
+    data = dados["data"].date().isoformat()
+    valor = f"{dados['valor']:.2f}"
+    tipo = dados["tipo"].value
+    if dados.get("fitid"):
+        partes = ["fitid", dados["fitid"].strip(), data, valor, tipo]
+    else:
+        descricao = normalizar_texto(dados.get("descricao"))
+        partes = ["linha", data, valor, tipo, descricao]
+
+    base = hashlib.sha256("\x1f".join(partes).encode("utf-8")).hexdigest()[:32]
+    if ocorrencias is None:
+        return base
+
+    repeticao = ocorrencias.get(base, 0)
+    ocorrencias[base] = repeticao + 1
+    return base if repeticao == 0 else f"{base}#{repeticao}"
+
+
+# Tipo da tarefa em segundo plano que importa um extrato enviado
+TIPO_TAREFA_IMPORTACAO = "importacao_extrato"
+
+
+# Tipo da tarefa que importa de novo extratos do arquivo (sem reenvio)
+TIPO_TAREFA_REPROCESSAMENTO = "reprocessamento_extratos"
+
+
+def _somar_resultados(
+    resultados: List[Dict[str, Any]], id_importacao: str
+) -> Dict[str, Any]:
+    """Resultado de um .zip: os totais de todos os extratos e os de cada um."""
+    totais = (
+        "total_importadas",
+        "total_ignoradas",
+        "total_categorizadas",
+        "total_rejeitadas",
+    )
+    return {
+        **{total: sum(r[total] for r in resultados) for total in totais},
+        "id_importacao": id_importacao,
+        "arquivos": resultados,
+    }
 
 
-class ExtratoParser(ABC):
-    """Contrato para parsers de extratos (permite plugar novos formatos)."""
+class ImportarExtratoBancario:
+    """
+    Caso de uso responsável por importar arquivos com parsers pluggáveis. Os
+    formatos vêm do 'registro' (CSV e OFX por padrão); o parser de cada um
+    é importado e criado na primeira vez que um arquivo dele chega.
+    """
+
+    # Transações por lote: cada lote é uma chamada ao add_many e um savepoint
+    TAMANHO_LOTE = 5000
+    # Um lote que falha volta ao savepoint e é gravado de novo uma vez (ex:
+    # outra importação gravou as mesmas linhas entre a consulta e o INSERT)
+    TENTATIVAS_LOTE = 2
+    # Bytes descompactados aceitos por extrato de um .gz/.zst/.zip
+    LIMITE_DESCOMPACTADO = LIMITE_DESCOMPACTADO
+    # Linhas parseadas por extrato em validar_amostra
+    LINHAS_AMOSTRA = 200
 
-    @abstractmethod
-    def parse(
+    def __init__(
+        self,
+        transacao_repo: ITransacaoRepository,
+        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+        indice_mapeamentos: IIndiceMapeamentosCSV | None = None,
+        regra_repo: IRegraCategorizacaoRepository | None = None,
+        quarentena_repo: ILinhaQuarentenaRepository | None = None,
+        unidade_trabalho: IUnidadeTrabalho | None = None,
+        tamanho_lote: int | None = None,
+        processos_parse: int = 1,
+        registro: RegistroParsers | None = None,
+        limite_descompactado: int | None = None,
+    ):
+        self.transacao_repo = transacao_repo
+        self.mapeamento_repo = mapeamento_repo
+        self.indice_mapeamentos = indice_mapeamentos
+        self.regra_repo = regra_repo
+        self.quarentena_repo = quarentena_repo
+        self.unidade_trabalho = unidade_trabalho
+        self.tamanho_lote = tamanho_lote or self.TAMANHO_LOTE
+        # Processos para o parse de um arquivo grande (1: sem pool)
+        self.processos_parse = processos_parse
+        self.registro = registro or RegistroParsers(FORMATOS_PADRAO)
+        self.limite_descompactado = limite_descompactado or self.LIMITE_DESCOMPACTADO
+        self._parsers: Dict[str, ExtratoParser] = {}
+
+    def execute(
         self,
-        *,
         id_usuario: str,
-        file_bytes: bytes,
+        file_bytes: bytes | None,
         file_name: str,
         column_mapping: Dict[str, str] | None = None,
         mapping_id: str | None = None,
         sem_cabecalho: bool = False,
-    ) -> List[Dict[str, Any]]:
-        pass
-
-
-class _BaseParser:
-    DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y"]
-
-    def _parse_valor(self, raw: str) -> tuple[float, TipoTransacao]:
-        if raw is None:
-            raise ValueError("Valor ausente.")
-
-        if isinstance(raw, (int, float)):
-            valor_float = float(raw)
-        else:
-            texto = raw.strip().replace("R$", "")
-            texto = texto.replace(" ", "")
-            if "," in texto and "." in texto:
-                texto = texto.replace(".", "").replace(",", ".")
-            elif "," in texto:
-                texto = texto.replace(",", ".")
-            if not texto:
-                raise ValueError("Valor vazio.")
-            valor_float = float(texto)
-
-        tipo = TipoTransacao.RECEITA if valor_float >= 0 else TipoTransacao.DESPESA
-        return abs(valor_float), tipo
-
-    def _parse_date(self, raw: str) -> datetime:
-        if not raw:
-            raise ValueError("Coluna de data vazia.")
-
-        for fmt in self.DATE_FORMATS:
-            try:
-                return datetime.strptime(raw, fmt)
-            except ValueError:
-                continue
-
-        raise ValueError(f"Formato de data inválido: {raw}")
-
-
-class CsvExtratoParser(_BaseParser, ExtratoParser):
-    CSV_DEFAULT_MAP = {
-        "data": {"data", "date", "dt", "transaction date"},
-        "valor": {"valor", "value", "amount", "vl"},
-        "descricao": {"descricao", "description", "memo", "history"},
-    }
-
-    def __init__(self, mapeamento_repo: IMapeamentoCSVRepository | None):
-        self.mapeamento_repo = mapeamento_repo
-
-    def parse(
+        file_stream: BinaryIO | None = None,
+        ao_gravar_lote: Callable[[Dict[str, Any]], None] | None = None,
+        tolerante: bool = False,
+        id_importacao: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Importa o extrato. Com 'file_stream' (ex: o upload do Flask) o arquivo
+        é processado em lotes, sem ser carregado inteiro na memória. No modo
+        'tolerante' as linhas inválidas vão para a quarentena e as demais são
+        importadas; sem ele, a primeira linha inválida interrompe o arquivo.
+        Repetir um 'id_importacao' retoma a importação interrompida.
+
+        Arquivos .gz e .zst são descompactados em stream, direto para o
+        parser. Os extratos de um .zip são gravados um a um, na mesma
+        importação, e o resultado traz os totais somados e os de cada um.
+        """
+        if file_stream is None:
+            if not file_bytes:
+                raise ValueError("Arquivo vazio. Nenhuma transação encontrada.")
+            file_stream = io.BytesIO(file_bytes)
+        self.validar_arquivo(file_name, file_stream)
+
+        id_importacao = id_importacao or str(uuid.uuid4())
+        resultados = []
+        extratos = extratos_do_arquivo(
+            file_stream, file_name, self.registro.extensoes, self.limite_descompactado
+        )
+        with closing(extratos):
+            for nome, stream in extratos:
+                parser, stream = self.parser_do_extrato(nome, stream)
+                lotes = parser.parse_stream(
+                    id_usuario=id_usuario,
+                    file_stream=stream,
+                    file_name=nome,
+                    column_mapping=column_mapping,
+                    mapping_id=mapping_id,
+                    sem_cabecalho=sem_cabecalho,
+                    tamanho_lote=self.tamanho_lote,
+                    tolerante=tolerante,
+                    processos=self.processos_parse,
+                )
+                if formato_compactado(file_name) != ".zip":
+                    return self.gravar_lotes(
+                        id_usuario, lotes, ao_gravar_lote, nome, id_importacao
+                    )
+                try:
+                    resultado = self.gravar_lotes(
+                        id_usuario, lotes, ao_gravar_lote, nome, id_importacao
+                    )
+                except ValueError as e:
+                    # Os extratos anteriores já foram gravados: reenviar com
+                    # o mesmo 'id_importacao' pula as linhas deles
+                    raise ValueError(f"{nome}: {e}") from e
+                resultados.append({"arquivo": nome, **resultado})
+        return _somar_resultados(resultados, id_importacao)
+
+    def validar_amostra(
         self,
         *,
         id_usuario: str,
-        file_bytes: bytes,
+        file_stream: BinaryIO,
         file_name: str,
         column_mapping: Dict[str, str] | None = None,
         mapping_id: str | None = None,
         sem_cabecalho: bool = False,
-    ) -> List[Dict[str, Any]]:
-        resolved_mapping, resolved_sem_cabecalho = self._resolve_mapping_param(
-            id_usuario=id_usuario,
-            mapping_id=mapping_id,
-            column_mapping=column_mapping,
-            sem_cabecalho_flag=sem_cabecalho,
+        tolerante: bool = False,
+    ) -> None:
+        """
+        Faz o parse só do começo de cada extrato do arquivo, sem gravar nada,
+        antes de uma operação sem volta. Um mapeamento que não serve (colunas
+        ausentes, datas ou valores que não convertem) vira o mesmo ValueError
+        da importação; com 'tolerante', a amostra precisa de uma linha válida.
+        """
+        self.validar_arquivo(file_name, file_stream)
+        extratos = extratos_do_arquivo(
+            file_stream, file_name, self.registro.extensoes, self.limite_descompactado
         )
-        return self._parse_csv(
-            file_bytes=file_bytes,
-            column_mapping=resolved_mapping,
-            sem_cabecalho=resolved_sem_cabecalho,
-        )
-
-    def _parse_csv(
-        self,
-        file_bytes: bytes,
-        column_mapping: Dict[str, str] | None,
-        sem_cabecalho: bool = False,
-    ) -> List[Dict[str, Any]]:
-        texto = file_bytes.decode("utf-8-sig")
-
-        try:
-            sample = texto[:1024]
-            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
-        except csv.Error:
-            dialect = csv.excel
-
-        linhas = []
-        reader = csv.reader(io.StringIO(texto), dialect=dialect)
-        for row in reader:
-            normalizada = [col.strip() for col in row]
-            if not any(normalizada):
-                continue
-            linhas.append(normalizada)
-
-        if not linhas:
-            raise ValueError("Arquivo CSV sem dados.")
-
-        if sem_cabecalho:
-            fieldnames = [f"__col_{i}" for i in range(len(linhas[0]))]
-            data_rows = linhas
-        else:
-            raw_headers = linhas[0]
-            fieldnames = [
-                (header.strip() or f"col_{idx}")
-                for idx, header in enumerate(raw_headers)
-            ]
-            data_rows = linhas[1:]
-
-        if not data_rows:
+        with closing(extratos):
+            for nome, stream in extratos:
+                parser, stream = self.parser_do_extrato(nome, stream)
+                lotes = parser.parse_stream(
+                    id_usuario=id_usuario,
+                    file_stream=stream,
+                    file_name=nome,
+                    column_mapping=column_mapping,
+                    mapping_id=mapping_id,
+                    sem_cabecalho=sem_cabecalho,
+                    tamanho_lote=self.LINHAS_AMOSTRA,
+                    tolerante=tolerante,
+                )
+                try:
+                    with closing(lotes):
+                        amostra = next(lotes, [])
+                    if amostra and all(
+                        isinstance(dados, LinhaRejeitada) for dados in amostra
+                    ):
+                        primeira = amostra[0]
+                        raise ValueError(
+                            "Nenhuma linha válida no início do arquivo. Linha "
+                            f"{primeira.numero_linha}: {primeira.motivo}"
+                        )
+                except ValueError as e:
+                    if formato_compactado(file_name) != ".zip":
+                        raise
+                    raise ValueError(f"{nome}: {e}") from e
+
+    def validar_arquivo(
+        self, file_name: str, file_stream: BinaryIO | None = None
+    ) -> None:
+        """
+        Confere o formato antes de aceitar o arquivo (puro ou em .gz/.zst):
+        pela extensão ou, se ela não identifica o formato, pelo início do
+        'file_stream', que volta à posição em que estava. Os extratos de um
+        .zip são escolhidos pela extensão de cada um, e o conteúdo de um
+        .gz/.zst sem extensão conhecida só é examinado na importação.
+        """
+        if not file_name:
+            raise ValueError("Arquivo não enviado.")
+        formato = formato_compactado(file_name)
+        if formato == ".zst":
+            exigir_zstd()
+        if formato == ".zip" or self._formato_pela_extensao(file_name):
+            return
+        if formato is None:
+            amostra = None
+            if file_stream is not None and file_stream.seekable():
+                amostra, _ = _espiar(file_stream, TAMANHO_AMOSTRA)
+            self.formato_do_arquivo(file_name, amostra)
+
+    def get_parser(self, file_name: str, amostra: bytes | None = None) -> ExtratoParser:
+        if not file_name:
+            raise ValueError("Arquivo não enviado.")
+        return self.parser_do_formato(self.formato_do_arquivo(file_name, amostra).nome)
+
+    def formato_do_arquivo(
+        self, file_name: str, amostra: bytes | None = None
+    ) -> FormatoExtrato:
+        """Formato pela extensão; sem extensão conhecida, pela 'amostra'."""
+        formato = self._formato_pela_extensao(file_name)
+        if formato is None and amostra:
+            formato = self.registro.reconhecer(amostra)
+        if formato is None:
+            nomes = [f.nome.upper() for f in reversed(self.registro.formatos)]
+            aceitos = " ou ".join(
+                filter(None, [", ".join(nomes[:-1])] + nomes[-1:])
+            )
             raise ValueError(
-                "Nenhuma transação válida encontrada no arquivo enviado."
+                f"Formato de arquivo inválido. Use {aceitos}, puros ou "
+                f"compactados ({', '.join(EXTENSOES_COMPACTADAS)})."
             )
-
-        mapping = self._resolve_mapping(
-            fieldnames, column_mapping, sem_cabecalho
+        return formato
+
+    def parser_do_formato(self, nome: str) -> ExtratoParser:
+        """Parser do formato ('csv', 'ofx'...), criado no primeiro uso."""
+        parser = self._parsers.get(nome)
+        if parser is None:
+            formato = self.registro.por_nome(nome)
+            if formato is None:
+                raise ValueError(f"Formato de extrato desconhecido: {nome}.")
+            parser = self._parsers[nome] = self.registro.classe(formato).criar(
+                self.mapeamento_repo, self.indice_mapeamentos
+            )
+        return parser
+
+    def parser_do_extrato(
+        self, nome: str, stream: BinaryIO
+    ) -> tuple[ExtratoParser, BinaryIO]:
+        """
+        Parser de um extrato já descompactado. Sem extensão conhecida, o
+        formato é reconhecido pelo início do conteúdo; o stream devolvido é
+        o que deve ser lido (o original, se ele aceita seek).
+        """
+        if self._formato_pela_extensao(nome):
+            return self.get_parser(nome), stream
+        amostra, stream = _espiar(stream, TAMANHO_AMOSTRA)
+        return self.get_parser(nome, amostra), stream
+
+    def _formato_pela_extensao(self, file_name: str) -> FormatoExtrato | None:
+        extensao = os.path.splitext(nome_descompactado(file_name))[1]
+        return self.registro.por_extensao(extensao) if extensao else None
+
+    def assinatura_do_arquivo(
+        self,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None,
+    ) -> str | None:
+        """
+        Assinatura do cabeçalho do primeiro CSV do arquivo (puro ou
+        compactado), salva junto com o mapeamento. None sem CSV com cabeçalho.
+        """
+        extratos = extratos_do_arquivo(
+            file_stream, file_name, self.registro.extensoes, self.limite_descompactado
         )
+        with closing(extratos):
+            for nome, stream in extratos:
+                parser, stream = self.parser_do_extrato(nome, stream)
+                # Só o parser CSV tem cabeçalho; testar o tipo carregaria o módulo
+                if hasattr(parser, "assinatura_do_arquivo"):
+                    return parser.assinatura_do_arquivo(stream, column_mapping)
+        return None
+
+    def gravar_lotes(
+        self,
+        id_usuario: str,
+        lotes: Iterable[List[Dict[str, Any] | LinhaRejeitada]],
+        ao_gravar_lote: Callable[[Dict[str, Any]], None] | None = None,
+        file_name: str | None = None,
+        id_importacao: str | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Grava lotes já parseados como transações PENDENTES (via add_many),
+        ignorando as linhas cujo fingerprint o usuário já importou antes.
+        As regras de categorização do usuário são aplicadas antes da
+        gravação: linhas com categoria e perfil entram já PROCESSADAS.
+        Transações e linhas rejeitadas (quarentena) levam o 'id_importacao'
+        devolvido no resultado, que permite desfazer a importação.
+
+        Cada lote é gravado dentro de um savepoint: se falhar, só ele é
+        desfeito e gravado de novo; na segunda falha o erro segue adiante,
+        com os lotes anteriores intactos. 'ao_gravar_lote' recebe os totais
+        parciais depois de cada lote e é o ponto de commit de quem chama, o
+        que limita o tempo de lock de escrita do SQLite a um lote.
+        """
+        importadas = ignoradas = categorizadas = 0
+        ocorrencias: Dict[str, int] = {}
+        classificador = self._compilar_regras(id_usuario)
+        id_importacao = id_importacao or str(uuid.uuid4())
+        rejeicoes = ResumoRejeicoes()
+
+        for lote in lotes:
+            transacoes = {}
+            rejeitadas = []
+            for dados in lote:
+                if isinstance(dados, LinhaRejeitada):
+                    rejeitadas.append(dados)
+                    continue
+                fingerprint = fingerprint_importacao(dados, ocorrencias)
+                transacoes[fingerprint] = Transacao(
+                    id_usuario=id_usuario,
+                    valor=dados["valor"],
+                    tipo=dados["tipo"],
+                    data=dados["data"],
+                    descricao=dados.get("descricao"),
+                    status=StatusTransacao.PENDENTE,
+                    fingerprint_importacao=fingerprint,
+                    id_importacao=id_importacao,
+                )
 
-        transacoes = []
-        for row in data_rows:
-            row_dict = {
-                fieldnames[idx]: row[idx].strip() if idx < len(row) else ""
-                for idx in range(len(fieldnames))
-            }
-
-            try:
-                data_str = (row_dict.get(mapping["data"]) or "").strip()
-                valor_raw = (row_dict.get(mapping["valor"]) or "").strip()
-                descricao = (row_dict.get(mapping["descricao"]) or "").strip()
-
-                data = self._parse_date(data_str)
-                valor, tipo = self._parse_valor(valor_raw)
+            if rejeitadas and not (transacoes or importadas or ignoradas):
+                # Nenhuma linha válida desde o início: o mapeamento (ou o
+                # formato) está errado para o arquivo todo, e a quarentena
+                # receberia o arquivo inteiro
+                primeira = rejeitadas[0]
+                raise ValueError(
+                    "Nenhuma linha válida no início do arquivo. Linha "
+                    f"{primeira.numero_linha}: {primeira.motivo}"
+                )
 
-                transacoes.append(
+            for tentativa in range(self.TENTATIVAS_LOTE):
+                try:
+                    with self._savepoint():
+                        gravadas, repetidas, processadas = self._gravar_lote(
+                            id_usuario,
+                            id_importacao,
+                            file_name,
+                            transacoes,
+                            rejeitadas,
+                            classificador,
+                        )
+                    break
+                except Exception:
+                    # Sem savepoint o lote pode ter ficado pela metade
+                    ultima = tentativa + 1 == self.TENTATIVAS_LOTE
+                    if ultima or not self.unidade_trabalho:
+                        raise
+            importadas += gravadas
+            ignoradas += repetidas
+            categorizadas += processadas
+            for linha in rejeitadas:
+                rejeicoes.registrar(linha.numero_linha, linha.motivo)
+            if ao_gravar_lote:
+                ao_gravar_lote(
                     {
-                        "data": data,
-                        "valor": valor,
-                        "tipo": tipo,
-                        "descricao": descricao or None,
+                        "total_importadas": importadas,
+                        "total_ignoradas": ignoradas,
+                        "total_categorizadas": categorizadas,
+                        "total_rejeitadas": rejeicoes.total,
                     }
                 )
-            except ValueError as exc:
-                raise ValueError(
-                    f"Arquivo CSV inválido: {exc}. Linha: {row_dict}"
-                ) from exc
-
-        return transacoes
 
-    def _resolve_mapping(
-        self,
-        header: List[str],
-        column_mapping: Dict[str, str] | None,
-        sem_cabecalho: bool = False,
-    ) -> Dict[str, str]:
-        normalized_header = [col.strip() for col in header]
-
-        if column_mapping:
-            mapping = {}
-            valores_utilizados = set()
-            for campo, nome_coluna in column_mapping.items():
-                if nome_coluna not in normalized_header:
-                    raise ValueError(
-                        f"Coluna '{nome_coluna}' não encontrada no CSV para o campo '{campo}'."
-                    )
-                if nome_coluna in valores_utilizados:
-                    raise ValueError(
-                        "Cada campo (Data, Valor, Descrição) deve usar colunas diferentes no CSV."
-                    )
-                valores_utilizados.add(nome_coluna)
-                mapping[campo] = nome_coluna
-            return mapping
-
-        if sem_cabecalho:
+        if not importadas and not ignoradas:
             raise ValueError(
-                "Mapeie manualmente as colunas (Data, Valor e Descrição) para arquivos sem cabeçalho."
+                "Nenhuma transação válida encontrada no arquivo enviado."
             )
 
-        mapping = {}
-        lower_header = {col.lower(): col for col in normalized_header}
-        for campo, candidatos in self.CSV_DEFAULT_MAP.items():
-            encontrado = None
-            for candidato in candidatos:
-                if candidato in lower_header:
-                    encontrado = lower_header[candidato]
-                    break
-            if not encontrado:
-                raise ValueError(
-                    "CSV sem as colunas esperadas (Data, Valor, Descrição)."
-                )
-            mapping[campo] = encontrado
-        return mapping
+        resultado = {
+            "total_importadas": importadas,
+            "total_ignoradas": ignoradas,
+            "total_categorizadas": categorizadas,
+            "total_rejeitadas": rejeicoes.total,
+            "id_importacao": id_importacao,
+        }
+        if rejeicoes.total:
+            resultado["erros"] = rejeicoes.como_lista()
+        return resultado
 
-    def _resolve_mapping_param(
+    def _gravar_lote(
         self,
         id_usuario: str,
-        mapping_id: str | None,
-        column_mapping: Dict[str, str] | None,
-        sem_cabecalho_flag: bool,
-    ) -> tuple[Dict[str, str] | None, bool]:
-        sem_cabecalho = sem_cabecalho_flag
-
-        if mapping_id:
-            if not self.mapeamento_repo:
-                raise ValueError("Repositório de mapeamentos indisponível.")
-            mapeamento = self.mapeamento_repo.get_by_id(mapping_id)
-            if not mapeamento or mapeamento.id_usuario != id_usuario:
-                raise ValueError(
-                    "Mapeamento não encontrado para este usuário."
-                )
-            sem_cabecalho = all(
-                coluna.startswith("__col_")
-                for coluna in [
-                    mapeamento.coluna_data,
-                    mapeamento.coluna_valor,
-                    mapeamento.coluna_descricao,
-                ]
-            )
-            return (
-                {
-                    "data": mapeamento.coluna_data,
-                    "valor": mapeamento.coluna_valor,
-                    "descricao": mapeamento.coluna_descricao,
-                },
-                sem_cabecalho,
-            )
-
-        return column_mapping, sem_cabecalho
-
-
-class OfxExtratoParser(_BaseParser, ExtratoParser):
-    def parse(
+        id_importacao: str,
+        file_name: str | None,
+        transacoes: Dict[str, Transacao],
+        rejeitadas: List[LinhaRejeitada],
+        classificador: ClassificadorTransacoes | None,
+    ) -> tuple[int, int, int]:
+        """Grava um lote. Retorna (importadas, ignoradas, categorizadas)."""
+        # Uma consulta por lote; o filtro é feito com lookups no set. Dentro
+        # do savepoint: uma nova tentativa enxerga o que outra importação
+        # gravou enquanto isso
+        existentes = self.transacao_repo.get_fingerprints_existentes(
+            id_usuario, transacoes.keys()
+        )
+        novas = [t for f, t in transacoes.items() if f not in existentes]
+        importadas = categorizadas = 0
+        if novas:
+            if classificador:
+                categorizadas = classificador.classificar_lote(novas)
+            importadas = self.transacao_repo.add_many(novas)
+        if rejeitadas:
+            self._quarentenar(id_usuario, id_importacao, file_name, rejeitadas)
+        return importadas, len(transacoes) - len(novas), categorizadas
+
+    def _savepoint(self):
+        if not self.unidade_trabalho:
+            return nullcontext()
+        return self.unidade_trabalho.savepoint()
+
+    def _quarentenar(
         self,
-        *,
         id_usuario: str,
-        file_bytes: bytes,
-        file_name: str,
-        column_mapping: Dict[str, str] | None = None,
-        mapping_id: str | None = None,
-        sem_cabecalho: bool = False,
-    ) -> List[Dict[str, Any]]:
-        texto = file_bytes.decode("latin-1")
-        transacoes = []
-        atual: Dict[str, str] | None = None
-
-        for line in texto.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-
-            upper = line.upper()
-            if upper.startswith("<STMTTRN>"):
-                atual = {}
-                continue
-
-            if upper.startswith("</STMTTRN>"):
-                if atual:
-                    transacoes.append(self._build_ofx_transacao(atual))
-                atual = None
-                continue
-
-            if atual is None:
-                continue
-
-            match = re.match(r"<([^>]+)>(.*)", line)
-            if not match:
-                continue
-
-            tag, value = match.groups()
-            atual[tag.upper()] = value.strip()
-
-        return [t for t in transacoes if t]
+        id_importacao: str,
+        file_name: str | None,
+        rejeitadas: List[LinhaRejeitada],
+    ) -> None:
+        if not self.quarentena_repo:
+            return
+        self.quarentena_repo.add_many(
+            [
+                LinhaQuarentena(
+                    id_usuario=id_usuario,
+                    id_importacao=id_importacao,
+                    arquivo=file_name or "",
+                    numero_linha=linha.numero_linha,
+                    motivo=linha.motivo,
+                    conteudo=linha.conteudo,
+                    formato=linha.formato,
+                )
+                for linha in rejeitadas
+            ]
+        )
 
-    def _build_ofx_transacao(self, dados: Dict[str, str]) -> Dict[str, Any] | None:
-        try:
-            data = self._parse_ofx_date(dados.get("DTPOSTED", ""))
-            valor, tipo = self._parse_valor(dados.get("TRNAMT", ""))
-            descricao = dados.get("MEMO") or dados.get("NAME")
-        except ValueError:
+    def _compilar_regras(self, id_usuario: str) -> ClassificadorTransacoes | None:
+        """Uma consulta e uma compilação por importação, não por lote."""
+        if not self.regra_repo:
             return None
+        regras = self.regra_repo.get_by_usuario(id_usuario, somente_ativas=True)
+        return ClassificadorTransacoes(regras) if regras else None
 
-        return {
-            "data": data,
-            "valor": valor,
-            "tipo": tipo,
-            "descricao": descricao,
-        }
-
-    def _parse_ofx_date(self, raw: str) -> datetime:
-        if not raw:
-            raise ValueError("Registro OFX sem data.")
-        numeros = re.findall(r"\d+", raw)
-        if not numeros:
-            raise ValueError(f"Data OFX inválida: {raw}")
-        data_str = numeros[0]
-        return datetime.strptime(data_str[:8], "%Y%m%d")
 
+def _importacoes_da_tarefa(tarefa: Tarefa) -> set[str]:
+    """Importações em que a tarefa grava transações."""
+    if tarefa.tipo == TIPO_TAREFA_IMPORTACAO:
+        return {tarefa.payload.get("id_importacao") or tarefa.id}
+    if tarefa.tipo == TIPO_TAREFA_REPROCESSAMENTO:
+        return set(tarefa.payload.get("ids_importacao") or ())
+    return set()
 
-class ImportarExtratoBancario:
-    """Caso de uso responsável por importar arquivos com parsers pluggáveis."""
 
-    SUPPORTED_EXTENSIONS = {".csv", ".ofx"}
+class DesfazerImportacao:
+    """
+    Remove tudo o que uma importação gravou: as transações e as linhas em
+    quarentena. Serve para descartar uma importação interrompida no meio ou
+    feita com o mapeamento errado.
+    """
 
     def __init__(
         self,
         transacao_repo: ITransacaoRepository,
-        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+        quarentena_repo: ILinhaQuarentenaRepository | None = None,
+        tarefa_repo: ITarefaRepository | None = None,
+        tamanho_lote: int = ImportarExtratoBancario.TAMANHO_LOTE,
     ):
         self.transacao_repo = transacao_repo
-        self.parsers = {
-            ".csv": CsvExtratoParser(mapeamento_repo),
-            ".ofx": OfxExtratoParser(),
-        }
+        self.quarentena_repo = quarentena_repo
+        self.tarefa_repo = tarefa_repo
+        self.tamanho_lote = tamanho_lote
 
     def execute(
         self,
         id_usuario: str,
-        file_bytes: bytes,
-        file_name: str,
-        column_mapping: Dict[str, str] | None = None,
-        mapping_id: str | None = None,
-        sem_cabecalho: bool = False,
-    ) -> Dict[str, Any]:
-        if not file_name:
-            raise ValueError("Arquivo não enviado.")
-
-        extension = os.path.splitext(file_name)[1].lower()
-        parser = self.parsers.get(extension)
-        if not parser:
-            raise ValueError("Formato de arquivo inválido. Use CSV ou OFX.")
-
-        if not file_bytes:
-            raise ValueError("Arquivo vazio. Nenhuma transação encontrada.")
-
-        transacoes = parser.parse(
-            id_usuario=id_usuario,
-            file_bytes=file_bytes,
-            file_name=file_name,
-            column_mapping=column_mapping,
-            mapping_id=mapping_id,
-            sem_cabecalho=sem_cabecalho,
-        )
-
-        if not transacoes:
-            raise ValueError(
-                "Nenhuma transação válida encontrada no arquivo enviado."
-            )
-
-        for dados in transacoes:
-            transacao = Transacao(
-                id_usuario=id_usuario,
-                valor=dados["valor"],
-                tipo=dados["tipo"],
-                data=dados["data"],
-                descricao=dados.get("descricao"),
-                status=StatusTransacao.PENDENTE,
-            )
-            self.transacao_repo.add(transacao)
-
-        return {"total_importadas": len(transacoes)}
-
+        id_importacao: str,
+        ao_remover_lote: Callable[[int], None] | None = None,
+    ) -> Dict[str, int]:
+        """
+        Remove as transações em lotes; 'ao_remover_lote' recebe o total já
+        removido depois de cada um (e é onde quem chama faz o commit).
+        """
+        self.exigir_finalizada(id_usuario, id_importacao)
+        removidas = self.remover_transacoes(id_usuario, id_importacao, ao_remover_lote)
+        quarentena = self.remover_quarentena(id_usuario, id_importacao)
+
+        if not removidas and not quarentena:
+            raise ValueError("Importação não encontrada.")
+        return {
+            "total_removidas": removidas,
+            "total_quarentena_removidas": quarentena,
+        }
 
-class SalvarMapeamentoCSV:
-    def __init__(self, repo: IMapeamentoCSVRepository):
-        self.repo = repo
+    def exigir_finalizada(
+        self, id_usuario: str, id_importacao: str, id_tarefa_atual: str | None = None
+    ) -> None:
+        """
+        Recusa uma importação em que alguma tarefa na fila ou rodando ainda
+        vai gravar: a que a criou, uma retomada (outro id de tarefa, com o
+        'id_importacao' no payload) ou um reprocessamento do arquivo. A
+        'id_tarefa_atual' (a que está chamando) não conta.
+        """
+        if not self.tarefa_repo:
+            return
+        for tarefa in self.tarefa_repo.list_ativas(id_usuario):
+            if tarefa.id == id_tarefa_atual:
+                continue
+            if id_importacao in _importacoes_da_tarefa(tarefa):
+                raise ValueError(
+                    "A importação ainda está em andamento. Aguarde o fim da tarefa."
+                )
 
-    def execute(
+    def remover_transacoes(
         self,
         id_usuario: str,
-        nome: str,
-        coluna_data: str,
-        coluna_valor: str,
-        coluna_descricao: str,
-    ) -> MapeamentoCSV:
-        nome = (nome or "").strip()
-        if not nome:
-            raise ValueError("Informe um nome para o mapeamento.")
-
-        colunas = {
-            "data": (coluna_data or "").strip(),
-            "valor": (coluna_valor or "").strip(),
-            "descricao": (coluna_descricao or "").strip(),
-        }
-
-        if not all(colunas.values()):
-            raise ValueError(
-                "Mapeamento inválido: Data, Valor e Descrição são obrigatórios."
+        id_importacao: str,
+        ao_remover_lote: Callable[[int], None] | None = None,
+    ) -> int:
+        removidas = 0
+        while True:
+            lote = self.transacao_repo.delete_por_importacao(
+                id_usuario, id_importacao, self.tamanho_lote
             )
-
-        if len(set(colunas.values())) < 3:
-            raise ValueError("Cada coluna essencial deve ser única.")
-
-        if self.repo.exists_nome(id_usuario, nome):
-            raise ValueError("Já existe um mapeamento com este nome.")
-
-        entidade = MapeamentoCSV(
-            id_usuario=id_usuario,
-            nome=nome,
-            coluna_data=colunas["data"],
-            coluna_valor=colunas["valor"],
-            coluna_descricao=colunas["descricao"],
-        )
-
-        return self.repo.add(entidade)
-
-
-class ListarMapeamentosCSV:
-    def __init__(self, repo: IMapeamentoCSVRepository):
-        self.repo = repo
-
-    def execute(self, id_usuario: str) -> List[MapeamentoCSV]:
-        return self.repo.get_by_usuario(id_usuario)
+            if not lote:
+                break
+            removidas += lote
+            if ao_remover_lote:
+                ao_remover_lote(removidas)
+        return removidas
+
+    def remover_quarentena(self, id_usuario: str, id_importacao: str) -> int:
+        if not self.quarentena_repo:
+            return 0
+        quarentena = self.quarentena_repo.get_by_importacao(id_usuario, id_importacao)
+        self.quarentena_repo.delete_many([linha.id for linha in quarentena])
+        return len(quarentena)
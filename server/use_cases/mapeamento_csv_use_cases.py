@@ -0,0 +1,108 @@
+import os
+from typing import Any, BinaryIO, Dict, List
+
+from domain.mapeamento_csv import MapeamentoCSV
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+from use_cases.repository_interfaces import IMapeamentoCSVRepository
+
+
+class SalvarMapeamentoCSV:
+    def __init__(self, repo: IMapeamentoCSVRepository):
+        self.repo = repo
+
+    def execute(
+        self,
+        id_usuario: str,
+        nome: str,
+        coluna_data: str,
+        coluna_valor: str,
+        coluna_descricao: str,
+        assinatura_cabecalho: str | None = None,
+    ) -> MapeamentoCSV:
+        nome = (nome or "").strip()
+        if not nome:
+            raise ValueError("Informe um nome para o mapeamento.")
+
+        colunas = {
+            "data": (coluna_data or "").strip(),
+            "valor": (coluna_valor or "").strip(),
+            "descricao": (coluna_descricao or "").strip(),
+        }
+
+        if not all(colunas.values()):
+            raise ValueError(
+                "Mapeamento inválido: Data, Valor e Descrição são obrigatórios."
+            )
+
+        if len(set(colunas.values())) < 3:
+            raise ValueError("Cada coluna essencial deve ser única.")
+
+        if self.repo.exists_nome(id_usuario, nome):
+            raise ValueError("Já existe um mapeamento com este nome.")
+
+        entidade = MapeamentoCSV(
+            id_usuario=id_usuario,
+            nome=nome,
+            coluna_data=colunas["data"],
+            coluna_valor=colunas["valor"],
+            coluna_descricao=colunas["descricao"],
+            assinatura_cabecalho=assinatura_cabecalho,
+        )
+
+        return self.repo.add(entidade)
+
+
+class ListarMapeamentosCSV:
+    def __init__(self, repo: IMapeamentoCSVRepository):
+        self.repo = repo
+
+    def execute(self, id_usuario: str) -> List[MapeamentoCSV]:
+        return self.repo.get_by_usuario(id_usuario)
+
+
+class PreviewImportacaoCSV:
+    """
+    Pré-visualização do CSV para a tela de mapeamento: lê só as primeiras
+    linhas do upload, sem gravar nada.
+    """
+
+    LINHAS_PADRAO = 20
+    LINHAS_MAXIMO = 200
+
+    def __init__(
+        self,
+        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+        indice_mapeamentos: IIndiceMapeamentosCSV | None = None,
+    ):
+        # Importado aqui: o parser de CSV só carrega na primeira pré-visualização
+        from use_cases.parsers.csv import CsvExtratoParser
+
+        self.parser = CsvExtratoParser(mapeamento_repo, indice_mapeamentos)
+
+    def execute(
+        self,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        linhas: int | None = None,
+    ) -> Dict[str, Any]:
+        if os.path.splitext(file_name or "")[1].lower() != ".csv":
+            raise ValueError("A pré-visualização está disponível apenas para CSV.")
+
+        linhas = self.LINHAS_PADRAO if linhas is None else linhas
+        if not 1 <= linhas <= self.LINHAS_MAXIMO:
+            raise ValueError(
+                f"O número de linhas deve estar entre 1 e {self.LINHAS_MAXIMO}."
+            )
+
+        return self.parser.preview(
+            id_usuario=id_usuario,
+            file_stream=file_stream,
+            column_mapping=column_mapping,
+            mapping_id=mapping_id,
+            sem_cabecalho=sem_cabecalho,
+            linhas=linhas,
+        )
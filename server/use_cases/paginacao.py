@@ -0,0 +1,78 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List
+
+from domain.transacao import StatusTransacao, Transacao
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+
+
+@dataclass(frozen=True)
+class CursorTransacao:
+    """
+    Posição da última transação entregue, na ordenação (status, data desc, id desc).
+    Trafega para o cliente como um token opaco (base64 de um JSON).
+    """
+
+    status: StatusTransacao
+    data: datetime
+    id: str
+
+    @classmethod
+    def from_transacao(cls, transacao: Transacao) -> "CursorTransacao":
+        return cls(status=transacao.status, data=transacao.data, id=transacao.id)
+
+    def encode(self) -> str:
+        payload = json.dumps(
+            {"s": self.status.value, "d": self.data.isoformat(), "i": self.id},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "CursorTransacao":
+        try:
+            padding = "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(token + padding))
+            return cls(
+                status=StatusTransacao(payload["s"]),
+                data=datetime.fromisoformat(payload["d"]),
+                id=str(payload["i"]),
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError("Cursor de paginação inválido.") from exc
+
+
+@dataclass
+class PaginaTransacoes:
+    itens: List[Transacao] = field(default_factory=list)
+    proximo_cursor: str | None = None
+
+
+def paginar(
+    buscar: Callable[[CursorTransacao | None, int], List[Transacao]],
+    cursor: str | None = None,
+    limite: int | None = None,
+) -> PaginaTransacoes:
+    """
+    Executa uma busca keyset: pede 'limite + 1' linhas ao repositório a partir
+    do cursor e usa a linha extra apenas para saber se existe próxima página.
+    """
+    limite = LIMITE_PADRAO if limite is None else limite
+    if limite <= 0 or limite > LIMITE_MAXIMO:
+        raise ValueError(f"O limite deve estar entre 1 e {LIMITE_MAXIMO}.")
+
+    posicao = CursorTransacao.decode(cursor) if cursor else None
+    itens = buscar(posicao, limite + 1)
+
+    if len(itens) <= limite:
+        return PaginaTransacoes(itens=itens)
+
+    itens = itens[:limite]
+    return PaginaTransacoes(
+        itens=itens,
+        proximo_cursor=CursorTransacao.from_transacao(itens[-1]).encode(),
+    )
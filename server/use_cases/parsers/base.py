@@ -0,0 +1,295 @@
+import codecs
+import multiprocessing
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List
+
+from domain.transacao import TipoTransacao
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+from use_cases.repository_interfaces import IMapeamentoCSVRepository
+
+
+class ExtratoParser(ABC):
+    """
+    Contrato para parsers de extratos. Novos formatos são plugados pelo
+    RegistroParsers (ver use_cases/registro_parsers.py).
+    """
+
+    @classmethod
+    def criar(
+        cls,
+        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+        indice_mapeamentos: IIndiceMapeamentosCSV | None = None,
+    ) -> "ExtratoParser":
+        """Instância usada pelo importador; recebe as dependências que usa."""
+        return cls()
+
+    @abstractmethod
+    def parse(
+        self,
+        *,
+        id_usuario: str,
+        file_bytes: bytes,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+    ) -> List[Dict[str, Any]]:
+        pass
+
+    def parse_stream(
+        self,
+        *,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        tamanho_lote: int = 5000,
+        tolerante: bool = False,
+        processos: int = 1,
+    ) -> Iterator[List[Dict[str, Any] | "LinhaRejeitada"]]:
+        """
+        Entrega as transações em lotes de até 'tamanho_lote'. A implementação
+        padrão lê o arquivo inteiro; parsers de formatos grandes a sobrescrevem.
+        Com 'tolerante', linhas inválidas saem nos lotes como LinhaRejeitada
+        em vez de interromper o arquivo (a implementação padrão não rejeita
+        linhas: o erro de parse continua valendo para o arquivo todo).
+        'processos' > 1 autoriza o parse paralelo de um mesmo arquivo, nos
+        formatos que o suportam; os demais o ignoram.
+        """
+        transacoes = self.parse(
+            id_usuario=id_usuario,
+            file_bytes=file_stream.read(),
+            file_name=file_name,
+            column_mapping=column_mapping,
+            mapping_id=mapping_id,
+            sem_cabecalho=sem_cabecalho,
+        )
+        yield from em_lotes(transacoes, tamanho_lote)
+
+
+@dataclass
+class LinhaRejeitada:
+    """Linha que o parser tolerante não conseguiu converter em transação."""
+
+    # Linha do arquivo (CSV) ou posição do registro STMTTRN (OFX)
+    numero_linha: int
+    motivo: str
+    conteudo: Dict[str, Any]
+    formato: str = "csv"
+
+
+# Os processos dos pools de parse partem de um servidor limpo (forkserver), e
+# não de um fork do processo atual, que pode ter threads (executor de tarefas,
+# Flask) e conexões SQLite abertas. Onde não há forkserver (Windows), spawn.
+CONTEXTO_PROCESSOS = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def em_lotes(itens: Iterable[Any], tamanho_lote: int) -> Iterator[List[Any]]:
+    iterador = iter(itens)
+    while lote := list(islice(iterador, tamanho_lote)):
+        yield lote
+
+
+def _ler_linhas_utf8(stream: BinaryIO, tamanho_bloco: int) -> Iterator[str]:
+    """
+    Lê o stream em blocos e decodifica com um decoder incremental utf-8-sig
+    (um caractere multibyte pode ficar dividido entre dois blocos). Entrega
+    linhas terminadas em '\n', como o csv.reader espera.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    while True:
+        bloco = stream.read(tamanho_bloco)
+        texto = decoder.decode(bloco or b"", final=not bloco)
+        if texto:
+            partes = (resto + texto).split("\n")
+            resto = partes.pop()
+            for parte in partes:
+                yield parte + "\n"
+        if not bloco:
+            break
+    if resto:
+        yield resto
+
+
+# Formato -> (fatias de ano, mês e dia, posições dos separadores) para datas
+# de largura fixa, decodificadas sem passar pelo strptime
+_LAYOUT_DATAS = {
+    "%Y-%m-%d": ((0, 4), (5, 7), (8, 10), ((4, "-"), (7, "-"))),
+    "%d/%m/%Y": ((6, 10), (3, 5), (0, 2), ((2, "/"), (5, "/"))),
+    "%d-%m-%Y": ((6, 10), (3, 5), (0, 2), ((2, "-"), (5, "-"))),
+    "%m/%d/%Y": ((6, 10), (0, 2), (3, 5), ((2, "/"), (5, "/"))),
+}
+
+
+class _BaseParser:
+    DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%m/%d/%Y"]
+
+    def _parse_valor(self, raw: str) -> tuple[float, TipoTransacao]:
+        if raw is None:
+            raise ValueError("Valor ausente.")
+
+        if isinstance(raw, (int, float)):
+            valor_float = float(raw)
+        else:
+            texto = raw.strip().replace("R$", "")
+            texto = texto.replace(" ", "")
+            if "," in texto and "." in texto:
+                texto = texto.replace(".", "").replace(",", ".")
+            elif "," in texto:
+                texto = texto.replace(",", ".")
+            if not texto:
+                raise ValueError("Valor vazio.")
+            try:
+                valor_float = float(texto)
+            except ValueError:
+                raise ValueError(f"Valor inválido: {raw}") from None
+
+        tipo = TipoTransacao.RECEITA if valor_float >= 0 else TipoTransacao.DESPESA
+        return abs(valor_float), tipo
+
+    def _parse_date(self, raw: str) -> datetime:
+        if not raw:
+            raise ValueError("Coluna de data vazia.")
+
+        for fmt in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(raw, fmt)
+            except ValueError:
+                continue
+
+        raise ValueError(f"Formato de data inválido: {raw}")
+
+    def _detectar_formato_data(self, amostras: List[str]) -> str | None:
+        """
+        Primeiro formato de DATE_FORMATS que aceita todas as datas válidas da
+        amostra (datas que nenhum formato aceita não influenciam a escolha).
+        """
+        aceitos_por_data = []
+        for raw in amostras:
+            if not raw:
+                continue
+            aceitos = set()
+            for fmt in self.DATE_FORMATS:
+                try:
+                    datetime.strptime(raw, fmt)
+                    aceitos.add(fmt)
+                except ValueError:
+                    continue
+            if aceitos:
+                aceitos_por_data.append(aceitos)
+
+        if not aceitos_por_data:
+            return None
+        comuns = set.intersection(*aceitos_por_data)
+        return next((fmt for fmt in self.DATE_FORMATS if fmt in comuns), None)
+
+    def _compilar_data(self, amostras: List[str]) -> Callable[[str], datetime]:
+        """
+        Decoder de datas especializado no formato detectado na amostra. Datas
+        fora do layout esperado caem no _parse_date, que tenta todos os formatos.
+        """
+        fmt = self._detectar_formato_data(amostras)
+        parse_generico = self._parse_date
+        if fmt is None:
+            return parse_generico
+
+        layout = _LAYOUT_DATAS.get(fmt)
+        if layout is None:
+
+            def parse_formato(raw: str) -> datetime:
+                try:
+                    return datetime.strptime(raw, fmt)
+                except ValueError:
+                    return parse_generico(raw)
+
+            return parse_formato
+
+        (a0, a1), (m0, m1), (d0, d1), ((p1, s1), (p2, s2)) = layout
+
+        def parse_layout(raw: str) -> datetime:
+            if len(raw) == 10 and raw[p1] == s1 and raw[p2] == s2:
+                try:
+                    return datetime(int(raw[a0:a1]), int(raw[m0:m1]), int(raw[d0:d1]))
+                except ValueError:
+                    pass
+            return parse_generico(raw)
+
+        return parse_layout
+
+    def _detectar_separador_decimal(self, amostras: List[str]) -> str | None:
+        """
+        Separador decimal da amostra. Com vírgula e ponto no mesmo valor, o
+        último é o decimal. Com um só, ele é o decimal quando não vem seguido
+        de exatamente três dígitos ("12,50"); "1.500" tanto pode ser milhar
+        quanto decimal e só decide na falta de outro indício. None quando
+        nenhum valor da amostra tem separador.
+        """
+        decisivo = candidato = None
+        for raw in amostras:
+            texto = raw.strip()
+            virgula, ponto = texto.rfind(","), texto.rfind(".")
+            if virgula >= 0 and ponto >= 0:
+                return "," if virgula > ponto else "."
+            posicao = max(virgula, ponto)
+            if posicao < 0:
+                continue
+            if len(texto) - posicao - 1 != 3:
+                decisivo = decisivo or texto[posicao]
+            else:
+                candidato = candidato or texto[posicao]
+        return decisivo or candidato
+
+    def _compilar_valor(
+        self, amostras: List[str]
+    ) -> Callable[[str], tuple[float, TipoTransacao]]:
+        """
+        Decoder de valores especializado na convenção detectada na amostra:
+        vírgula decimal ("1.234,56") ou ponto decimal ("1,234.56"). O separador
+        de milhar só é removido em grupos de três dígitos ("1.500" num arquivo
+        com vírgula decimal vale 1500); valores que não seguem a convenção
+        caem no _parse_valor.
+        """
+        parse_generico = self._parse_valor
+        receita, despesa = TipoTransacao.RECEITA, TipoTransacao.DESPESA
+        limpar = any("R$" in raw or " " in raw for raw in amostras)
+        decimal = self._detectar_separador_decimal(amostras)
+        milhar = {",": ".", ".": ","}.get(decimal)
+        # Inteiro com separador de milhar: "1.500", "-1.234.567"
+        separador = re.escape(milhar or ",")
+        agrupado = re.compile(rf"[-+]?\d{{1,3}}(?:{separador}\d{{3}})+")
+
+        def parse_valor(raw: str) -> tuple[float, TipoTransacao]:
+            texto = raw.replace("R$", "").replace(" ", "") if limpar else raw
+            virgula, ponto = texto.rfind(","), texto.rfind(".")
+            if virgula >= 0 and ponto >= 0:
+                # Com os dois separadores, o último é o decimal
+                if virgula > ponto:
+                    texto = texto.replace(".", "").replace(",", ".")
+                else:
+                    texto = texto.replace(",", "")
+            elif milhar and milhar in texto:
+                if not agrupado.fullmatch(texto):
+                    return parse_generico(raw)
+                texto = texto.replace(milhar, "")
+            elif virgula >= 0:
+                if decimal != ",":
+                    return parse_generico(raw)
+                texto = texto.replace(",", ".")
+            try:
+                valor = float(texto)
+            except ValueError:
+                return parse_generico(raw)
+            if valor >= 0:
+                return valor, receita
+            return -valor, despesa
+
+        return parse_valor
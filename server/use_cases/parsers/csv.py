@@ -0,0 +1,866 @@
+import csv
+import hashlib
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain, islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List
+
+from domain.linha_quarentena import LinhaQuarentena
+from domain.mapeamento_csv import MapeamentoCSV
+from use_cases.cache_interface import IIndiceMapeamentosCSV
+from use_cases.parsers.base import (
+    CONTEXTO_PROCESSOS,
+    ExtratoParser,
+    LinhaRejeitada,
+    _BaseParser,
+    _ler_linhas_utf8,
+    em_lotes,
+)
+from use_cases.repository_interfaces import IMapeamentoCSVRepository
+from use_cases.texto import normalizar_texto
+
+
+class CsvExtratoParser(_BaseParser, ExtratoParser):
+    CSV_DEFAULT_MAP = {
+        "data": {"data", "date", "dt", "transaction date"},
+        "valor": {"valor", "value", "amount", "vl"},
+        "descricao": {"descricao", "description", "memo", "history"},
+    }
+
+    # Bytes lidos do upload por vez no parse incremental
+    TAMANHO_BLOCO = 64 * 1024
+    # Linhas iniciais usadas para compilar o decodificador do arquivo
+    AMOSTRA_DECODIFICADOR = 50
+    # Bytes por tarefa do parse paralelo; arquivos com menos de dois trechos
+    # não compensam o pool e são lidos em sequência
+    TAMANHO_TRECHO = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        mapeamento_repo: IMapeamentoCSVRepository | None,
+        indice_mapeamentos: IIndiceMapeamentosCSV | None = None,
+    ):
+        self.mapeamento_repo = mapeamento_repo
+        self.indice_mapeamentos = indice_mapeamentos
+
+    @classmethod
+    def criar(
+        cls,
+        mapeamento_repo: IMapeamentoCSVRepository | None = None,
+        indice_mapeamentos: IIndiceMapeamentosCSV | None = None,
+    ) -> "CsvExtratoParser":
+        return cls(mapeamento_repo, indice_mapeamentos)
+
+    def parse(
+        self,
+        *,
+        id_usuario: str,
+        file_bytes: bytes,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+    ) -> List[Dict[str, Any]]:
+        resolved_mapping, resolved_sem_cabecalho = self._resolve_mapping_param(
+            id_usuario=id_usuario,
+            mapping_id=mapping_id,
+            column_mapping=column_mapping,
+            sem_cabecalho_flag=sem_cabecalho,
+        )
+        return self._parse_csv(
+            file_bytes=file_bytes,
+            column_mapping=resolved_mapping,
+            sem_cabecalho=resolved_sem_cabecalho,
+            id_usuario=id_usuario,
+        )
+
+    def parse_stream(
+        self,
+        *,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        tamanho_lote: int = 5000,
+        tolerante: bool = False,
+        processos: int = 1,
+    ) -> Iterator[List[Dict[str, Any] | LinhaRejeitada]]:
+        """
+        Parse incremental: o arquivo é lido em blocos de TAMANHO_BLOCO bytes
+        e as transações saem em lotes, então o pico de memória depende do
+        tamanho do lote e não do tamanho do arquivo. Com 'processos' > 1 e um
+        arquivo em disco de pelo menos dois trechos, o parse é dividido entre
+        processos (_iter_csv_paralelo).
+        """
+        resolved_mapping, resolved_sem_cabecalho = self._resolve_mapping_param(
+            id_usuario=id_usuario,
+            mapping_id=mapping_id,
+            column_mapping=column_mapping,
+            sem_cabecalho_flag=sem_cabecalho,
+        )
+        caminho = _caminho_em_disco(file_stream) if processos > 1 else None
+        if caminho and os.path.getsize(caminho) >= 2 * self.TAMANHO_TRECHO:
+            return em_lotes(
+                self._iter_csv_paralelo(
+                    file_stream=file_stream,
+                    caminho=caminho,
+                    column_mapping=resolved_mapping,
+                    sem_cabecalho=resolved_sem_cabecalho,
+                    id_usuario=id_usuario,
+                    tolerante=tolerante,
+                    processos=processos,
+                ),
+                tamanho_lote,
+            )
+        return em_lotes(
+            self._iter_csv(
+                file_stream=file_stream,
+                column_mapping=resolved_mapping,
+                sem_cabecalho=resolved_sem_cabecalho,
+                id_usuario=id_usuario,
+                tolerante=tolerante,
+            ),
+            tamanho_lote,
+        )
+
+    def _parse_csv(
+        self,
+        file_bytes: bytes,
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho: bool = False,
+        id_usuario: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        return list(
+            self._iter_csv(
+                io.BytesIO(file_bytes), column_mapping, sem_cabecalho, id_usuario
+            )
+        )
+
+    def _abrir_csv(
+        self, file_stream: BinaryIO
+    ) -> tuple[Any, List[str], Iterator[List[str]], Any]:
+        """
+        Detecta o dialeto e lê a primeira linha não vazia. Retorna (dialeto,
+        primeira linha, iterador das demais linhas ainda não lidas, leitor).
+        O 'line_num' do leitor é a linha do arquivo da última linha lida.
+        """
+        linhas_texto = _ler_linhas_utf8(file_stream, self.TAMANHO_BLOCO)
+
+        # O Sniffer só precisa do começo do arquivo
+        amostra = []
+        tamanho_amostra = 0
+        for linha in linhas_texto:
+            amostra.append(linha)
+            tamanho_amostra += len(linha)
+            if tamanho_amostra >= 1024:
+                break
+
+        sample = "".join(amostra)[:1024]
+        try:
+            # Vírgula só se ';' e tab não servirem: nos extratos com decimal
+            # brasileiro ela aparece uma vez por linha, como um delimitador
+            dialect = csv.Sniffer().sniff(sample, delimiters=";\t")
+        except csv.Error:
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+
+        reader = csv.reader(chain(amostra, linhas_texto), dialect=dialect)
+        linhas = _linhas_preenchidas(reader)
+
+        primeira = next(linhas, None)
+        if primeira is None:
+            raise ValueError("Arquivo CSV sem dados.")
+        return dialect, primeira, linhas, reader
+
+    def _ler_csv(
+        self,
+        file_stream: BinaryIO,
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho: bool,
+        id_usuario: str | None,
+    ) -> "_ArquivoCSV":
+        """
+        Abre o CSV e decide o que é cabeçalho. Sem mapeamento informado, usa
+        o mapeamento salvo cuja assinatura bate com a primeira linha.
+        """
+        dialect, primeira, linhas, leitor = self._abrir_csv(file_stream)
+
+        detectado = None
+        if not column_mapping and id_usuario is not None:
+            detectado = self.mapeamentos_por_assinatura(id_usuario).get(
+                assinatura_cabecalho(primeira)
+            )
+            if detectado:
+                column_mapping = detectado.column_mapping()
+                sem_cabecalho = detectado.sem_cabecalho
+
+        cabecalho = True
+        if sem_cabecalho:
+            fieldnames = [f"__col_{i}" for i in range(len(primeira))]
+            # Mapeamento por posição em arquivo que tem cabeçalho: a primeira
+            # linha é descartada em vez de ser lida como transação
+            if not (detectado or self._e_cabecalho(primeira, column_mapping)):
+                linhas = chain([primeira], linhas)
+                cabecalho = False
+        else:
+            fieldnames = [
+                (header.strip() or f"col_{idx}")
+                for idx, header in enumerate(primeira)
+            ]
+
+        return _ArquivoCSV(
+            dialeto=dialect,
+            fieldnames=fieldnames,
+            linhas=linhas,
+            column_mapping=column_mapping,
+            sem_cabecalho=sem_cabecalho,
+            leitor=leitor,
+            cabecalho=cabecalho,
+            mapeamento_detectado=detectado,
+        )
+
+    def _e_cabecalho(
+        self, primeira: List[str], column_mapping: Dict[str, str] | None
+    ) -> bool:
+        """
+        Num mapeamento por posição, a primeira linha é cabeçalho quando a
+        coluna mapeada como data não contém uma data.
+        """
+        coluna = (column_mapping or {}).get("data") or ""
+        if not coluna.startswith("__col_") or not coluna[6:].isdigit():
+            return False
+        idx = int(coluna[6:])
+        if idx >= len(primeira):
+            return False
+        try:
+            self._parse_date(primeira[idx])
+        except ValueError:
+            return True
+        return False
+
+    def mapeamentos_por_assinatura(self, id_usuario: str) -> Dict[str, MapeamentoCSV]:
+        """Mapeamentos salvos do usuário, indexados pela assinatura do cabeçalho."""
+        carregar = partial(self._carregar_mapeamentos, id_usuario)
+        if self.indice_mapeamentos:
+            return self.indice_mapeamentos.indice(id_usuario, carregar)
+        return carregar()
+
+    def _carregar_mapeamentos(self, id_usuario: str) -> Dict[str, MapeamentoCSV]:
+        if not self.mapeamento_repo:
+            return {}
+        indice: Dict[str, MapeamentoCSV] = {}
+        # Assinaturas repetidas: vale o primeiro mapeamento pelo nome
+        for mapeamento in self.mapeamento_repo.get_by_usuario(id_usuario):
+            if mapeamento.assinatura_cabecalho:
+                indice.setdefault(mapeamento.assinatura_cabecalho, mapeamento)
+        return indice
+
+    def assinatura_do_arquivo(
+        self, file_stream: BinaryIO, column_mapping: Dict[str, str] | None
+    ) -> str | None:
+        """
+        Assinatura do cabeçalho do arquivo, para salvar junto com o mapeamento.
+        None quando o arquivo não tem cabeçalho (a primeira linha é transação).
+        """
+        _, primeira, _, _ = self._abrir_csv(file_stream)
+        posicional = all(
+            coluna.startswith("__col_") for coluna in (column_mapping or {}).values()
+        )
+        if posicional and not self._e_cabecalho(primeira, column_mapping):
+            return None
+        return assinatura_cabecalho(primeira)
+
+    def _iter_csv(
+        self,
+        file_stream: BinaryIO,
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho: bool = False,
+        id_usuario: str | None = None,
+        tolerante: bool = False,
+    ) -> Iterator[Dict[str, Any] | LinhaRejeitada]:
+        arquivo = self._ler_csv(
+            file_stream, column_mapping, sem_cabecalho, id_usuario
+        )
+        fieldnames, data_rows = arquivo.fieldnames, arquivo.linhas
+        mapping = self._resolve_mapping(
+            fieldnames, arquivo.column_mapping, arquivo.sem_cabecalho
+        )
+        amostra_linhas, numeros = self._amostrar(arquivo)
+        decodificar = self._compilar_decodificador(fieldnames, mapping, amostra_linhas)
+
+        if tolerante:
+            # O leitor é consumido sob demanda: depois da amostra, line_num é
+            # a linha de quem acabou de ser lido
+            leitor = arquivo.leitor
+            linhas_numeradas = chain(
+                zip(numeros, amostra_linhas),
+                ((leitor.line_num, row) for row in data_rows),
+            )
+            yield from _decodificar_tolerante(
+                decodificar, linhas_numeradas, fieldnames, mapping
+            )
+            return
+
+        for row in chain(amostra_linhas, data_rows):
+            try:
+                yield decodificar(row)
+            except ValueError as exc:
+                raise _erro_linha_csv(exc, row, fieldnames) from exc
+
+    def _amostrar(self, arquivo: "_ArquivoCSV") -> tuple[List[List[str]], List[int]]:
+        """
+        Lê as primeiras linhas de dados (e os números delas no arquivo). A
+        amostra define o formato da data e a convenção do valor do arquivo.
+        """
+        amostra_linhas, numeros = [], []
+        for row in islice(arquivo.linhas, self.AMOSTRA_DECODIFICADOR):
+            amostra_linhas.append(row)
+            numeros.append(arquivo.leitor.line_num)
+        if not amostra_linhas:
+            raise ValueError(
+                "Nenhuma transação válida encontrada no arquivo enviado."
+            )
+        return amostra_linhas, numeros
+
+    def _iter_csv_paralelo(
+        self,
+        file_stream: BinaryIO,
+        caminho: str,
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho: bool,
+        id_usuario: str | None,
+        tolerante: bool,
+        processos: int,
+    ) -> Iterator[Dict[str, Any] | LinhaRejeitada]:
+        """
+        Parse de um arquivo grande em um pool de processos. Cabeçalho,
+        mapeamento e amostra do decodificador são resolvidos aqui, uma vez;
+        o arquivo é dividido em trechos pela contagem de aspas e cada
+        processo decodifica um trecho. Os resultados saem na ordem do
+        arquivo, idênticos aos do parse sequencial (_iter_csv): um trecho
+        que não terminou em fim de registro (aspas soltas no meio de um
+        campo enganam a contagem) é descartado, e dali em diante o parse
+        segue sequencial, neste processo.
+        """
+        arquivo = self._ler_csv(
+            file_stream, column_mapping, sem_cabecalho, id_usuario
+        )
+        mapping = self._resolve_mapping(
+            arquivo.fieldnames, arquivo.column_mapping, arquivo.sem_cabecalho
+        )
+        amostra, _ = self._amostrar(arquivo)
+
+        dialeto = arquivo.dialeto
+        aspas = None
+        if dialeto.quoting != csv.QUOTE_NONE and dialeto.quotechar:
+            aspas = dialeto.quotechar.encode("utf-8")
+        trechos = _trechos_csv(file_stream, self.TAMANHO_TRECHO, aspas)
+        espec = _EspecCSV(
+            dialeto=_parametros_dialeto(dialeto),
+            fieldnames=arquivo.fieldnames,
+            mapping=mapping,
+            amostra=amostra,
+            cabecalho=arquivo.cabecalho,
+            tolerante=tolerante,
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=processos, mp_context=CONTEXTO_PROCESSOS
+        ) as pool:
+
+            def enviar(trecho: tuple[int, int, int]) -> tuple[tuple, Future]:
+                return trecho, pool.submit(_parsear_trecho_csv, caminho, *trecho, espec)
+
+            # Janela limitada: no máximo 2 trechos por processo decodificados
+            # e aguardando a vez, para a memória não crescer com o arquivo
+            fila = iter(trechos)
+            pendentes = deque(
+                enviar(trecho) for trecho in islice(fila, 2 * processos)
+            )
+            try:
+                while pendentes:
+                    (inicio, fim, linhas_antes), futuro = pendentes.popleft()
+                    resultado = futuro.result()
+                    if resultado is None:
+                        break
+                    pendentes.extend(enviar(trecho) for trecho in islice(fila, 1))
+                    # Posição do stream = quanto do arquivo já foi entregue
+                    # (é o que o progresso da tarefa de importação lê)
+                    file_stream.seek(fim)
+                    yield from resultado
+                else:
+                    return
+            finally:
+                for _, futuro in pendentes:
+                    futuro.cancel()
+
+        # O trecho anterior terminou em fim de registro: daqui até o fim do
+        # arquivo, parse sequencial a partir do início deste trecho
+        file_stream.seek(inicio)
+        leitor = csv.reader(
+            _ler_linhas_utf8(file_stream, self.TAMANHO_BLOCO), **espec.dialeto
+        )
+        yield from _registros_trecho(leitor, leitor, inicio, linhas_antes, espec)
+
+    def _compilar_decodificador(
+        self,
+        fieldnames: List[str],
+        mapping: Dict[str, str],
+        amostra: List[List[str]],
+    ) -> Callable[[List[str]], Dict[str, Any]]:
+        """
+        Monta, uma vez por arquivo, a função que converte uma linha do CSV
+        (lista de colunas) em transação, acessando as colunas por posição.
+        """
+        idx_data, idx_valor, idx_descricao = _posicoes_mapeadas(fieldnames, mapping)
+        minimo = max(idx_data, idx_valor, idx_descricao) + 1
+
+        parse_data = self._compilar_data(_coluna(amostra, idx_data))
+        parse_valor = self._compilar_valor(_coluna(amostra, idx_valor))
+
+        def decodificar(row: List[str]) -> Dict[str, Any]:
+            if len(row) < minimo:
+                row = row + [""] * (minimo - len(row))
+            data = parse_data(row[idx_data])
+            valor, tipo = parse_valor(row[idx_valor])
+            return {
+                "data": data,
+                "valor": valor,
+                "tipo": tipo,
+                "descricao": row[idx_descricao] or None,
+            }
+
+        return decodificar
+
+    def preview(
+        self,
+        *,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        linhas: int = 20,
+    ) -> Dict[str, Any]:
+        """
+        Lê só as primeiras 'linhas' do arquivo e mostra como ele seria
+        importado: dialeto, cabeçalho, mapeamento resolvido, formatos
+        detectados e cada linha convertida (ou o erro dela). Um mapeamento
+        inválido é devolvido em 'erro_mapeamento', junto com as linhas brutas.
+        """
+        resolved_mapping, resolved_sem_cabecalho = self._resolve_mapping_param(
+            id_usuario=id_usuario,
+            mapping_id=mapping_id,
+            column_mapping=column_mapping,
+            sem_cabecalho_flag=sem_cabecalho,
+        )
+        arquivo = self._ler_csv(
+            file_stream, resolved_mapping, resolved_sem_cabecalho, id_usuario
+        )
+        fieldnames = arquivo.fieldnames
+        amostra = list(islice(arquivo.linhas, linhas))
+        detectado = arquivo.mapeamento_detectado
+
+        resultado: Dict[str, Any] = {
+            "dialeto": {
+                "delimitador": arquivo.dialeto.delimiter,
+                "aspas": arquivo.dialeto.quotechar,
+            },
+            "sem_cabecalho": arquivo.sem_cabecalho,
+            "cabecalho": fieldnames,
+            "linhas": amostra,
+            "mapeamento_detectado": (
+                {"id": detectado.id, "nome": detectado.nome} if detectado else None
+            ),
+            "mapeamento": None,
+            "erro_mapeamento": None,
+            "formatos": None,
+            "transacoes": [],
+        }
+        try:
+            mapping = self._resolve_mapping(
+                fieldnames, arquivo.column_mapping, arquivo.sem_cabecalho
+            )
+        except ValueError as exc:
+            resultado["erro_mapeamento"] = str(exc)
+            return resultado
+
+        idx_data, idx_valor, _ = _posicoes_mapeadas(fieldnames, mapping)
+        datas = _coluna(amostra, idx_data)
+        valores = _coluna(amostra, idx_valor)
+        resultado["mapeamento"] = mapping
+        resultado["formatos"] = {
+            "data": self._detectar_formato_data(datas),
+            "separador_decimal": self._detectar_separador_decimal(valores) or ".",
+        }
+
+        decodificar = self._compilar_decodificador(fieldnames, mapping, amostra)
+        for numero, row in enumerate(amostra, start=1):
+            try:
+                dados = decodificar(row)
+            except ValueError as exc:
+                resultado["transacoes"].append({"linha": numero, "erro": str(exc)})
+                continue
+            resultado["transacoes"].append(
+                {
+                    "linha": numero,
+                    "data": dados["data"].date().isoformat(),
+                    "valor": dados["valor"],
+                    "tipo": dados["tipo"].value,
+                    "descricao": dados["descricao"],
+                }
+            )
+        return resultado
+
+    def reprocessar_linhas(
+        self,
+        linhas: List[LinhaQuarentena],
+        column_mapping: Dict[str, str] | None = None,
+    ) -> Iterator[tuple[LinhaQuarentena, Dict[str, Any] | LinhaRejeitada]]:
+        """
+        Converte de novo linhas da quarentena, com o mapeamento informado ou
+        com o que estava em uso na importação original.
+        """
+        grupos: Dict[tuple, List[LinhaQuarentena]] = {}
+        for linha in linhas:
+            grupos.setdefault(tuple(linha.conteudo["cabecalho"]), []).append(linha)
+
+        for cabecalho, grupo in grupos.items():
+            fieldnames = list(cabecalho)
+            sem_cabecalho = all(nome.startswith("__col_") for nome in fieldnames)
+            mapping = self._resolve_mapping(
+                fieldnames,
+                column_mapping or grupo[0].conteudo.get("mapeamento"),
+                sem_cabecalho,
+            )
+            colunas = [linha.conteudo["colunas"] for linha in grupo]
+            decodificar = self._compilar_decodificador(fieldnames, mapping, colunas)
+            resultados = _decodificar_tolerante(
+                decodificar,
+                ((linha.numero_linha, linha.conteudo["colunas"]) for linha in grupo),
+                fieldnames,
+                mapping,
+            )
+            yield from zip(grupo, resultados)
+
+    def _resolve_mapping(
+        self,
+        header: List[str],
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho: bool = False,
+    ) -> Dict[str, str]:
+        normalized_header = [col.strip() for col in header]
+
+        if column_mapping:
+            mapping = {}
+            valores_utilizados = set()
+            for campo, nome_coluna in column_mapping.items():
+                if nome_coluna not in normalized_header:
+                    raise ValueError(
+                        f"Coluna '{nome_coluna}' não encontrada no CSV para o campo '{campo}'."
+                    )
+                if nome_coluna in valores_utilizados:
+                    raise ValueError(
+                        "Cada campo (Data, Valor, Descrição) deve usar colunas diferentes no CSV."
+                    )
+                valores_utilizados.add(nome_coluna)
+                mapping[campo] = nome_coluna
+            return mapping
+
+        if sem_cabecalho:
+            raise ValueError(
+                "Mapeie manualmente as colunas (Data, Valor e Descrição) para arquivos sem cabeçalho."
+            )
+
+        mapping = {}
+        # "Descrição" e "descricao" são a mesma coluna
+        lower_header = {normalizar_texto(col): col for col in normalized_header}
+        for campo, candidatos in self.CSV_DEFAULT_MAP.items():
+            encontrado = None
+            for candidato in candidatos:
+                if candidato in lower_header:
+                    encontrado = lower_header[candidato]
+                    break
+            if not encontrado:
+                raise ValueError(
+                    "CSV sem as colunas esperadas (Data, Valor, Descrição)."
+                )
+            mapping[campo] = encontrado
+        return mapping
+
+    def _resolve_mapping_param(
+        self,
+        id_usuario: str,
+        mapping_id: str | None,
+        column_mapping: Dict[str, str] | None,
+        sem_cabecalho_flag: bool,
+    ) -> tuple[Dict[str, str] | None, bool]:
+        sem_cabecalho = sem_cabecalho_flag
+
+        if mapping_id:
+            if not self.mapeamento_repo:
+                raise ValueError("Repositório de mapeamentos indisponível.")
+            mapeamento = self.mapeamento_repo.get_by_id(mapping_id)
+            if not mapeamento or mapeamento.id_usuario != id_usuario:
+                raise ValueError(
+                    "Mapeamento não encontrado para este usuário."
+                )
+            return mapeamento.column_mapping(), mapeamento.sem_cabecalho
+
+        return column_mapping, sem_cabecalho
+
+
+@dataclass
+class _ArquivoCSV:
+    """CSV aberto: dialeto, colunas e linhas de dados ainda não lidas."""
+
+    dialeto: Any
+    fieldnames: List[str]
+    linhas: Iterator[List[str]]
+    column_mapping: Dict[str, str] | None
+    sem_cabecalho: bool
+    # csv.reader de origem das linhas (line_num: linha atual no arquivo)
+    leitor: Any = None
+    # A primeira linha preenchida do arquivo é cabeçalho (já foi consumida)
+    cabecalho: bool = True
+    mapeamento_detectado: MapeamentoCSV | None = None
+
+
+def assinatura_cabecalho(colunas: List[str]) -> str:
+    """
+    Hash dos nomes das colunas normalizados (caixa, acentos e espaços), na
+    ordem do arquivo: os extratos de um mesmo banco repetem a assinatura.
+    """
+    nomes = "\x1f".join(normalizar_texto(coluna) for coluna in colunas)
+    return hashlib.sha256(nomes.encode("utf-8")).hexdigest()[:32]
+
+
+def _posicoes_mapeadas(
+    fieldnames: List[str], mapping: Dict[str, str]
+) -> tuple[int, int, int]:
+    """Posições das colunas de data, valor e descrição no CSV."""
+    # Com nomes de coluna repetidos vale a última, como no dict por linha
+    posicoes = {nome: idx for idx, nome in enumerate(fieldnames)}
+    return (
+        posicoes[mapping["data"]],
+        posicoes[mapping["valor"]],
+        posicoes[mapping["descricao"]],
+    )
+
+
+def _coluna(linhas: List[List[str]], idx: int) -> List[str]:
+    return [row[idx] if idx < len(row) else "" for row in linhas]
+
+
+def _decodificar_tolerante(
+    decodificar: Callable[[List[str]], Dict[str, Any]],
+    linhas_numeradas: Iterable[tuple[int, List[str]]],
+    fieldnames: List[str],
+    mapping: Dict[str, str],
+) -> Iterator[Dict[str, Any] | LinhaRejeitada]:
+    """Converte as linhas; as inválidas saem como LinhaRejeitada."""
+    for numero, row in linhas_numeradas:
+        try:
+            dados = decodificar(row)
+            if dados["valor"] <= 0:
+                raise ValueError("O valor da transação deve ser positivo.")
+        except ValueError as exc:
+            conteudo = {"cabecalho": fieldnames, "colunas": row, "mapeamento": mapping}
+            yield LinhaRejeitada(numero, str(exc), conteudo)
+            continue
+        yield dados
+
+
+def _linhas_preenchidas(leitor: Iterable[List[str]]) -> Iterator[List[str]]:
+    """Linhas do csv.reader com as colunas sem espaços, pulando as vazias."""
+    return (
+        normalizada
+        for normalizada in ([col.strip() for col in row] for row in leitor)
+        if any(normalizada)
+    )
+
+
+def _erro_linha_csv(
+    exc: ValueError, row: List[str], fieldnames: List[str]
+) -> ValueError:
+    row_dict = {
+        fieldnames[idx]: row[idx] if idx < len(row) else ""
+        for idx in range(len(fieldnames))
+    }
+    return ValueError(f"Arquivo CSV inválido: {exc}. Linha: {row_dict}")
+
+
+def _caminho_em_disco(file_stream: BinaryIO) -> str | None:
+    """Caminho do arquivo, se for um arquivo comum (os processos o reabrem)."""
+    nome = getattr(file_stream, "name", None)
+    if isinstance(nome, str) and os.path.isfile(nome):
+        return nome
+    return None
+
+
+@dataclass(frozen=True)
+class _EspecCSV:
+    """
+    O que um processo do pool precisa para decodificar um trecho do CSV como
+    o parse sequencial: dialeto, colunas, mapeamento já resolvido e a amostra
+    da qual o decodificador (formato da data e do valor) é compilado.
+    """
+
+    dialeto: Dict[str, Any]
+    fieldnames: List[str]
+    mapping: Dict[str, str]
+    amostra: List[List[str]]
+    # A primeira linha preenchida do arquivo é cabeçalho (pulada no 1º trecho)
+    cabecalho: bool
+    tolerante: bool
+
+
+def _parametros_dialeto(dialeto: Any) -> Dict[str, Any]:
+    # O dialeto do Sniffer é uma classe criada na hora: não vai para outro
+    # processo, os parâmetros dele vão (os que ele define)
+    nomes = (
+        "delimiter",
+        "quotechar",
+        "escapechar",
+        "doublequote",
+        "skipinitialspace",
+        "quoting",
+        "strict",
+    )
+    return {nome: getattr(dialeto, nome) for nome in nomes if hasattr(dialeto, nome)}
+
+
+def _trechos_csv(
+    arquivo: BinaryIO,
+    tamanho_trecho: int,
+    aspas: bytes | None,
+    tamanho_bloco: int = 1024 * 1024,
+) -> List[tuple[int, int, int]]:
+    """
+    Divide o arquivo em trechos de ~'tamanho_trecho' bytes que terminam em
+    fim de registro. Retorna (início, fim, linhas antes do início).
+
+    Uma quebra de linha só encerra o registro se estiver fora de um campo
+    entre aspas, ou seja, com um número par de aspas antes dela (as aspas
+    duplicadas de um campo somam duas). A contagem de aspas e de quebras é
+    feita com bytes.count, em uma leitura sequencial do arquivo. Em utf-8,
+    os bytes de '\n' e '"' nunca fazem parte de um caractere multibyte.
+    Aspas soltas em um campo sem aspas enganam a contagem: cada trecho
+    confere o próprio fim (_parsear_trecho_csv).
+    """
+    tamanho = arquivo.seek(0, os.SEEK_END)
+    arquivo.seek(0)
+    alvos = deque(range(tamanho_trecho, tamanho, tamanho_trecho))
+    inicios = [(0, 0)]
+    posicao = aspas_antes = linhas_antes = 0
+
+    while alvos and (bloco := arquivo.read(tamanho_bloco)):
+        cursor = 0
+        while alvos:
+            busca = max(alvos[0] - posicao, cursor)
+            quebra = bloco.find(b"\n", busca)
+            if quebra < 0:
+                break
+            if aspas:
+                aspas_antes += bloco.count(aspas, cursor, quebra)
+            linhas_antes += bloco.count(b"\n", cursor, quebra) + 1
+            cursor = quebra + 1
+            if aspas_antes % 2 == 0:
+                inicios.append((posicao + cursor, linhas_antes))
+                while alvos and alvos[0] < posicao + cursor:
+                    alvos.popleft()
+        if aspas:
+            aspas_antes += bloco.count(aspas, cursor)
+        linhas_antes += bloco.count(b"\n", cursor)
+        posicao += len(bloco)
+
+    fins = [inicio for inicio, _ in inicios[1:]] + [tamanho]
+    return [
+        (inicio, fim, linhas)
+        for (inicio, linhas), fim in zip(inicios, fins)
+        if fim > inicio
+    ]
+
+
+def _registros_trecho(
+    leitor: Any,
+    linhas: Iterable[List[str]],
+    inicio: int,
+    linhas_antes: int,
+    espec: _EspecCSV,
+) -> Iterator[Dict[str, Any] | LinhaRejeitada]:
+    """
+    Decodifica as linhas de um trecho do CSV que começa em fim de registro
+    (byte 'inicio', depois de 'linhas_antes' quebras de linha), como o parse
+    sequencial. Os números de linha contam a partir do arquivo todo.
+    """
+    linhas = _linhas_preenchidas(linhas)
+    if inicio == 0 and espec.cabecalho:
+        next(linhas, None)
+    decodificar = CsvExtratoParser(None)._compilar_decodificador(
+        espec.fieldnames, espec.mapping, espec.amostra
+    )
+
+    if espec.tolerante:
+        linhas_numeradas = ((linhas_antes + leitor.line_num, row) for row in linhas)
+        yield from _decodificar_tolerante(
+            decodificar, linhas_numeradas, espec.fieldnames, espec.mapping
+        )
+        return
+
+    for row in linhas:
+        try:
+            yield decodificar(row)
+        except ValueError as exc:
+            raise _erro_linha_csv(exc, row, espec.fieldnames) from exc
+
+
+# Linha acrescentada ao fim de um trecho: o csv.reader só a devolve como um
+# registro próprio se o trecho terminou mesmo em fim de registro
+_SENTINELA_TRECHO = "\x1e\x1f\x1e"
+
+
+def _parsear_trecho_csv(
+    caminho: str, inicio: int, fim: int, linhas_antes: int, espec: _EspecCSV
+) -> List[Dict[str, Any] | LinhaRejeitada] | None:
+    """
+    Executado nos processos do pool: decodifica um trecho (ver _trechos_csv).
+    Retorna None se a contagem de aspas errou e o trecho acaba no meio de um
+    campo; o último trecho vai até o fim do arquivo e não precisa conferir.
+    """
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(inicio)
+        dados = arquivo.read(fim - inicio)
+        ultimo = not arquivo.read(1)
+
+    texto = _ler_linhas_utf8(io.BytesIO(dados), CsvExtratoParser.TAMANHO_BLOCO)
+    if not ultimo:
+        texto = chain(texto, [_SENTINELA_TRECHO + "\n"])
+    leitor = csv.reader(texto, **espec.dialeto)
+    fechado = ultimo
+
+    def ate_sentinela() -> Iterator[List[str]]:
+        nonlocal fechado
+        for row in leitor:
+            if row == [_SENTINELA_TRECHO]:
+                fechado = True
+                return
+            yield row
+
+    try:
+        registros = list(
+            _registros_trecho(leitor, ate_sentinela(), inicio, linhas_antes, espec)
+        )
+    except ValueError:
+        # Linha inválida no modo estrito: o parse sequencial refeito a partir
+        # deste trecho confere o limite e levanta o mesmo erro
+        return None
+    return registros if fechado else None
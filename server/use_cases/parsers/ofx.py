@@ -0,0 +1,202 @@
+import codecs
+import html
+import io
+import re
+from datetime import datetime
+from functools import partial
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List
+from xml.etree import ElementTree
+
+from domain.linha_quarentena import LinhaQuarentena
+from use_cases.parsers.base import ExtratoParser, LinhaRejeitada, _BaseParser, em_lotes
+
+
+# Tag SGML seguida do texto até a próxima tag
+_TOKEN_OFX = re.compile(r"<([^>]*)>([^<]*)")
+
+
+class OfxExtratoParser(_BaseParser, ExtratoParser):
+    """
+    Lê OFX 1.x (SGML, com ou sem quebras de linha e com tags de elemento sem
+    fechamento) e OFX 2.x (XML). O arquivo é consumido em blocos e cada
+    STMTTRN é entregue assim que fechado, com memória limitada ao bloco.
+    """
+
+    # Bytes lidos do upload por vez
+    TAMANHO_BLOCO = 64 * 1024
+
+    def parse(
+        self,
+        *,
+        id_usuario: str,
+        file_bytes: bytes,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+    ) -> List[Dict[str, Any]]:
+        return list(self._iter_ofx(io.BytesIO(file_bytes)))
+
+    def parse_stream(
+        self,
+        *,
+        id_usuario: str,
+        file_stream: BinaryIO,
+        file_name: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+        sem_cabecalho: bool = False,
+        tamanho_lote: int = 5000,
+        tolerante: bool = False,
+        processos: int = 1,
+    ) -> Iterator[List[Dict[str, Any] | LinhaRejeitada]]:
+        # Os registros OFX são lidos em sequência: 'processos' não se aplica
+        return em_lotes(self._iter_ofx(file_stream, tolerante), tamanho_lote)
+
+    def _iter_ofx(
+        self, file_stream: BinaryIO, tolerante: bool = False
+    ) -> Iterator[Dict[str, Any] | LinhaRejeitada]:
+        """
+        Registros STMTTRN sem data ou valor válidos são descartados ou, no
+        modo tolerante, entregues como LinhaRejeitada.
+        """
+        ler_bloco = partial(file_stream.read, self.TAMANHO_BLOCO)
+        primeiro = ler_bloco()
+        blocos = chain([primeiro], iter(ler_bloco, b""))
+
+        if primeiro.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"<?xml"):
+            registros = self._iter_stmttrn_xml(blocos)
+        else:
+            registros = self._iter_stmttrn_sgml(blocos, _codificacao_ofx(primeiro))
+
+        for numero, dados in enumerate(registros, start=1):
+            try:
+                yield self._decodificar_stmttrn(dados)
+            except ValueError as exc:
+                if tolerante:
+                    yield LinhaRejeitada(numero, str(exc), dados, formato="ofx")
+
+    def _iter_stmttrn_sgml(
+        self, blocos: Iterable[bytes], codificacao: str
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Tokenizador incremental do OFX 1.x. Só o trecho depois do último '<'
+        do bloco fica pendente: o texto de um elemento vai até a próxima tag.
+        """
+        decoder = codecs.getincrementaldecoder(codificacao)(errors="replace")
+        pendente = ""
+        atual: Dict[str, str] | None = None
+
+        def tokens(texto: str) -> Iterator[Dict[str, str]]:
+            nonlocal atual
+            for tag, valor in _TOKEN_OFX.findall(texto):
+                tag = tag.strip().upper()
+                if tag == "STMTTRN":
+                    # Um STMTTRN sem fechamento termina no próximo
+                    if atual:
+                        yield atual
+                    atual = {}
+                elif tag == "/STMTTRN":
+                    if atual:
+                        yield atual
+                    atual = None
+                elif atual is not None and not tag.startswith("/"):
+                    valor = valor.strip()
+                    if valor:
+                        atual[tag] = html.unescape(valor) if "&" in valor else valor
+
+        for bloco in blocos:
+            pendente += decoder.decode(bloco)
+            corte = pendente.rfind("<")
+            if corte > 0:
+                yield from tokens(pendente[:corte])
+                pendente = pendente[corte:]
+
+        yield from tokens(pendente + decoder.decode(b"", final=True))
+        if atual:
+            yield atual
+
+    def _iter_stmttrn_xml(self, blocos: Iterable[bytes]) -> Iterator[Dict[str, str]]:
+        """
+        OFX 2.x com o parser incremental do ElementTree (o mesmo do
+        iterparse). Cada STMTTRN é removido da árvore depois de lido.
+        """
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+        pilha: List[ElementTree.Element] = []
+
+        try:
+            for bloco in chain(blocos, [None]):
+                if bloco is None:
+                    parser.close()
+                else:
+                    parser.feed(bloco)
+                for evento, elemento in parser.read_events():
+                    if evento == "start":
+                        pilha.append(elemento)
+                        continue
+                    pilha.pop()
+                    if _nome_local(elemento.tag) != "STMTTRN":
+                        continue
+                    yield {
+                        _nome_local(filho.tag): (filho.text or "").strip()
+                        for filho in elemento.iter()
+                        if filho is not elemento and len(filho) == 0
+                    }
+                    if pilha:
+                        pilha[-1].remove(elemento)
+        except ElementTree.ParseError as exc:
+            raise ValueError(f"Arquivo OFX inválido: {exc}") from exc
+
+    def reprocessar_linhas(
+        self,
+        linhas: List[LinhaQuarentena],
+        column_mapping: Dict[str, str] | None = None,
+    ) -> Iterator[tuple[LinhaQuarentena, Dict[str, Any] | LinhaRejeitada]]:
+        """Converte de novo registros STMTTRN da quarentena (sem mapeamento)."""
+        for linha in linhas:
+            try:
+                yield linha, self._decodificar_stmttrn(linha.conteudo)
+            except ValueError as exc:
+                rejeitada = LinhaRejeitada(
+                    linha.numero_linha, str(exc), linha.conteudo, formato="ofx"
+                )
+                yield linha, rejeitada
+
+    def _decodificar_stmttrn(self, dados: Dict[str, str]) -> Dict[str, Any]:
+        data = self._parse_ofx_date(dados.get("DTPOSTED", ""))
+        valor, tipo = self._parse_valor(dados.get("TRNAMT", ""))
+        if valor <= 0:
+            raise ValueError("O valor da transação deve ser positivo.")
+        descricao = dados.get("MEMO") or dados.get("NAME")
+        return {
+            "data": data,
+            "valor": valor,
+            "tipo": tipo,
+            "descricao": descricao,
+            # Identificador da transação atribuído pelo banco
+            "fitid": dados.get("FITID") or None,
+        }
+
+    def _parse_ofx_date(self, raw: str) -> datetime:
+        if not raw:
+            raise ValueError("Registro OFX sem data.")
+        numeros = re.findall(r"\d+", raw)
+        if not numeros:
+            raise ValueError(f"Data OFX inválida: {raw}")
+        data_str = numeros[0]
+        return datetime.strptime(data_str[:8], "%Y%m%d")
+
+
+def _codificacao_ofx(cabecalho: bytes) -> str:
+    """Codificação declarada no cabeçalho do OFX 1.x (padrão: latin-1)."""
+    texto = cabecalho[:1024].decode("latin-1").upper()
+    if re.search(r"ENCODING:\s*UTF-?8", texto):
+        return "utf-8-sig"
+    if re.search(r"CHARSET:\s*(WINDOWS-)?1252", texto):
+        return "cp1252"
+    return "latin-1"
+
+
+def _nome_local(tag: str) -> str:
+    return tag.rpartition("}")[2].upper()
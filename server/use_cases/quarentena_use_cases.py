@@ -0,0 +1,103 @@
+from typing import Any, Dict, List
+
+from domain.linha_quarentena import LinhaQuarentena
+from use_cases.importacao_use_cases import ImportarExtratoBancario, ResumoRejeicoes
+from use_cases.parsers.base import LinhaRejeitada, em_lotes
+from use_cases.repository_interfaces import ILinhaQuarentenaRepository
+
+
+class ListarQuarentena:
+    """Linhas rejeitadas de uma importação tolerante, na ordem do arquivo."""
+
+    def __init__(self, quarentena_repo: ILinhaQuarentenaRepository):
+        self.quarentena_repo = quarentena_repo
+
+    def execute(self, id_usuario: str, id_importacao: str) -> List[LinhaQuarentena]:
+        linhas = self.quarentena_repo.get_by_importacao(id_usuario, id_importacao)
+        if not linhas:
+            raise ValueError("Nenhuma linha em quarentena para esta importação.")
+        return linhas
+
+
+class ReprocessarQuarentena:
+    """
+    Tenta importar de novo as linhas da quarentena (ex: depois de corrigir o
+    mapeamento), sem reenviar o arquivo. As que passam são gravadas como numa
+    importação normal e saem da quarentena; as demais ficam com o novo motivo.
+    """
+
+    def __init__(
+        self,
+        importador: ImportarExtratoBancario,
+        quarentena_repo: ILinhaQuarentenaRepository,
+    ):
+        self.importador = importador
+        self.quarentena_repo = quarentena_repo
+
+    def execute(
+        self,
+        id_usuario: str,
+        id_importacao: str,
+        column_mapping: Dict[str, str] | None = None,
+        mapping_id: str | None = None,
+    ) -> Dict[str, Any]:
+        linhas = ListarQuarentena(self.quarentena_repo).execute(
+            id_usuario, id_importacao
+        )
+        csv_parser = self.importador.parser_do_formato("csv")
+        if mapping_id:
+            column_mapping, _ = csv_parser._resolve_mapping_param(
+                id_usuario, mapping_id, None, False
+            )
+
+        por_formato: Dict[str, List[LinhaQuarentena]] = {}
+        for linha in linhas:
+            por_formato.setdefault(linha.formato, []).append(linha)
+
+        validas: List[Dict[str, Any]] = []
+        resolvidas: List[str] = []
+        motivos: Dict[str, str] = {}
+        rejeicoes = ResumoRejeicoes()
+        for formato, grupo in por_formato.items():
+            parser = self.importador.parser_do_formato(formato)
+            for linha, resultado in parser.reprocessar_linhas(grupo, column_mapping):
+                if isinstance(resultado, LinhaRejeitada):
+                    motivos[linha.id] = resultado.motivo
+                    rejeicoes.registrar(linha.numero_linha, resultado.motivo)
+                else:
+                    validas.append(resultado)
+                    resolvidas.append(linha.id)
+
+        gravado: Dict[str, Any] = {}
+        if validas:
+            gravado = self.importador.gravar_lotes(
+                id_usuario,
+                em_lotes(validas, self.importador.tamanho_lote),
+                file_name=linhas[0].arquivo,
+                id_importacao=id_importacao,
+            )
+        resultado = {
+            chave: gravado.get(chave, 0)
+            for chave in ("total_importadas", "total_ignoradas", "total_categorizadas")
+        }
+        self.quarentena_repo.delete_many(resolvidas)
+        self.quarentena_repo.atualizar_motivos(motivos)
+
+        resultado["total_rejeitadas"] = rejeicoes.total
+        resultado["id_importacao"] = id_importacao
+        resultado["erros"] = rejeicoes.como_lista()
+        return resultado
+
+
+class DescartarQuarentena:
+    """Remove as linhas em quarentena de uma importação (o usuário desistiu)."""
+
+    def __init__(self, quarentena_repo: ILinhaQuarentenaRepository):
+        self.quarentena_repo = quarentena_repo
+
+    def execute(self, id_usuario: str, id_importacao: str) -> int:
+        linhas = ListarQuarentena(self.quarentena_repo).execute(
+            id_usuario, id_importacao
+        )
+        self.quarentena_repo.delete_many([linha.id for linha in linhas])
+        return len(linhas)
@@ -0,0 +1,166 @@
+import csv
+import importlib
+import re
+from dataclasses import dataclass
+from functools import partial
+from importlib.metadata import entry_points
+from typing import Callable, Dict, Iterable, List
+
+# Bytes do início do arquivo usados para reconhecer o formato pelo conteúdo
+TAMANHO_AMOSTRA = 4096
+
+
+@dataclass(frozen=True)
+class FormatoExtrato:
+    """
+    Descrição leve de um formato de extrato. O parser é indicado pelo
+    caminho ('pacote.modulo:Classe', uma subclasse de ExtratoParser) e só é
+    importado quando chega o primeiro arquivo do formato: formatos pesados
+    não atrasam o início da aplicação.
+    """
+
+    # Também é o 'formato' das linhas em quarentena (ex: 'csv')
+    nome: str
+    extensoes: tuple[str, ...]
+    parser: str
+    # Reconhece o formato pelo início do arquivo, sem importar o parser.
+    # Usado quando a extensão não identifica o formato (ex: '.txt'); precisa
+    # ser uma função de módulo (o registro vai para os processos do pool)
+    reconhecer: Callable[[bytes], bool] | None = None
+
+
+class RegistroParsers:
+    """
+    Formatos de extrato aceitos na importação. Além dos informados, carrega
+    os publicados por pacotes instalados no grupo de entry points e os da
+    lista 'plugins' ('pacote.modulo:FORMATO'), ambos apontando para um
+    FormatoExtrato. A descoberta acontece na primeira consulta. Quando dois
+    formatos disputam uma extensão ou um conteúdo, vence o registrado por
+    último (um plugin pode substituir o parser de CSV).
+    """
+
+    def __init__(
+        self,
+        formatos: Iterable[FormatoExtrato] = (),
+        grupo_entry_points: str | None = None,
+        plugins: Iterable[str] = (),
+    ):
+        self._formatos: Dict[str, FormatoExtrato] = {}
+        self._classes: Dict[str, type] = {}
+        self._grupo_entry_points = grupo_entry_points
+        self._plugins = list(plugins)
+        for formato in formatos:
+            self.registrar(formato)
+
+    def registrar(self, formato: FormatoExtrato) -> None:
+        self._formatos.pop(formato.nome, None)
+        self._formatos[formato.nome] = formato
+        self._classes.pop(formato.nome, None)
+
+    @property
+    def formatos(self) -> List[FormatoExtrato]:
+        """Do registrado por último ao primeiro (a ordem das buscas)."""
+        self._descobrir()
+        return list(reversed(self._formatos.values()))
+
+    @property
+    def extensoes(self) -> tuple[str, ...]:
+        return tuple(
+            sorted({extensao for f in self.formatos for extensao in f.extensoes})
+        )
+
+    def por_nome(self, nome: str) -> FormatoExtrato | None:
+        self._descobrir()
+        return self._formatos.get(nome)
+
+    def por_extensao(self, extensao: str) -> FormatoExtrato | None:
+        extensao = extensao.lower()
+        for formato in self.formatos:
+            if extensao in formato.extensoes:
+                return formato
+        return None
+
+    def reconhecer(self, amostra: bytes) -> FormatoExtrato | None:
+        for formato in self.formatos:
+            if formato.reconhecer and formato.reconhecer(amostra):
+                return formato
+        return None
+
+    def classe(self, formato: FormatoExtrato) -> type:
+        """Classe do parser do formato, importada no primeiro uso."""
+        classe = self._classes.get(formato.nome)
+        if classe is None:
+            classe = self._classes[formato.nome] = _importar(formato.parser)
+        return classe
+
+    def _descobrir(self) -> None:
+        if self._grupo_entry_points is None and not self._plugins:
+            return
+        grupo, plugins = self._grupo_entry_points, self._plugins
+        self._grupo_entry_points, self._plugins = None, []
+
+        carregadores = [(plugin, partial(_importar, plugin)) for plugin in plugins]
+        if grupo:
+            carregadores += [(ep.value, ep.load) for ep in entry_points(group=grupo)]
+        for origem, carregar in carregadores:
+            # Um plugin quebrado não pode derrubar a importação de CSV/OFX
+            try:
+                formato = carregar()
+                if not isinstance(formato, FormatoExtrato):
+                    raise TypeError("não é um FormatoExtrato")
+            except Exception as e:
+                print(f"Formato de extrato ignorado ({origem}): {e}")
+                continue
+            self.registrar(formato)
+
+
+def _importar(caminho: str) -> object:
+    """'pacote.modulo:Atributo' -> o atributo (importando o módulo)."""
+    modulo, _, atributo = caminho.partition(":")
+    if not atributo:
+        raise ValueError(f"Caminho inválido '{caminho}'. Use 'pacote.modulo:Nome'.")
+    return getattr(importlib.import_module(modulo), atributo)
+
+
+def parece_ofx(amostra: bytes) -> bool:
+    """Cabeçalho OFX 1.x (SGML) ou 2.x (XML), ou a tag raiz <OFX>."""
+    inicio = amostra.lstrip(b"\xef\xbb\xbf \t\r\n").upper()
+    return inicio.startswith(b"OFXHEADER") or b"<?OFX" in inicio or b"<OFX>" in inicio
+
+
+# Texto sem caracteres de controle (fora tab e quebras de linha)
+_CONTROLE = re.compile(rb"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def parece_csv(amostra: bytes) -> bool:
+    """Texto em que o csv.Sniffer encontra um separador usual."""
+    if _CONTROLE.search(amostra):
+        return False
+    linhas = amostra.decode("latin-1").splitlines()
+    if len(linhas) > 1 and not amostra.endswith((b"\n", b"\r")):
+        # A última linha da amostra pode estar cortada no meio
+        linhas.pop()
+    linhas = [linha for linha in linhas if linha.strip()]
+    if len(linhas) < 2:
+        return False
+    try:
+        csv.Sniffer().sniff("\n".join(linhas), delimiters=";,\t|")
+    except csv.Error:
+        return False
+    return True
+
+
+FORMATO_CSV = FormatoExtrato(
+    nome="csv",
+    extensoes=(".csv",),
+    parser="use_cases.parsers.csv:CsvExtratoParser",
+    reconhecer=parece_csv,
+)
+FORMATO_OFX = FormatoExtrato(
+    nome="ofx",
+    extensoes=(".ofx",),
+    parser="use_cases.parsers.ofx:OfxExtratoParser",
+    reconhecer=parece_ofx,
+)
+# O OFX é registrado depois: o reconhecimento dele, mais específico, vem antes
+FORMATOS_PADRAO = (FORMATO_CSV, FORMATO_OFX)
@@ -0,0 +1,122 @@
+import re
+from typing import Any, List
+
+from domain.regra_categorizacao import RegraCategorizacao
+from domain.transacao import TipoTransacao
+from use_cases.repository_interfaces import IRegraCategorizacaoRepository
+
+
+class CriarRegraCategorizacao:
+    def __init__(self, repo: IRegraCategorizacaoRepository):
+        self.repo = repo
+
+    def execute(
+        self,
+        id_usuario: str,
+        nome: str | None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        palavras_chave: List[str] | None = None,
+        padrao_regex: str | None = None,
+        valor_minimo: Any = None,
+        valor_maximo: Any = None,
+        tipo: str | None = None,
+        prioridade: Any = 0,
+        ativa: bool = True,
+    ) -> RegraCategorizacao:
+        if not nome or not nome.strip():
+            raise ValueError("Informe um nome para a regra.")
+        if not id_categoria and not id_perfil:
+            raise ValueError("A regra precisa definir uma categoria ou um perfil.")
+
+        if palavras_chave is None:
+            palavras_chave = []
+        if not isinstance(palavras_chave, list) or not all(
+            isinstance(palavra, str) for palavra in palavras_chave
+        ):
+            raise ValueError("Palavras-chave devem ser uma lista de textos.")
+        palavras_chave = [p.strip() for p in palavras_chave if p and p.strip()]
+
+        padrao_regex = padrao_regex or None
+        if padrao_regex:
+            try:
+                re.compile(padrao_regex)
+            except re.error as e:
+                raise ValueError(f"Expressão regular inválida: {e}")
+
+        valor_minimo = self._converter_valor(valor_minimo, "mínimo")
+        valor_maximo = self._converter_valor(valor_maximo, "máximo")
+        if (
+            valor_minimo is not None
+            and valor_maximo is not None
+            and valor_minimo > valor_maximo
+        ):
+            raise ValueError("O valor mínimo não pode ser maior que o máximo.")
+
+        tipo_enum = None
+        if tipo:
+            try:
+                tipo_enum = TipoTransacao(tipo)
+            except ValueError:
+                raise ValueError("Tipo inválido. Use RECEITA ou DESPESA.")
+
+        if not (
+            palavras_chave
+            or padrao_regex
+            or valor_minimo is not None
+            or valor_maximo is not None
+            or tipo_enum
+        ):
+            raise ValueError("Informe ao menos uma condição para a regra.")
+
+        try:
+            prioridade = int(prioridade or 0)
+        except (TypeError, ValueError):
+            raise ValueError("A prioridade deve ser um número inteiro.")
+
+        regra = RegraCategorizacao(
+            id_usuario=id_usuario,
+            nome=nome.strip(),
+            id_categoria=id_categoria or None,
+            id_perfil=id_perfil or None,
+            palavras_chave=palavras_chave,
+            padrao_regex=padrao_regex,
+            valor_minimo=valor_minimo,
+            valor_maximo=valor_maximo,
+            tipo=tipo_enum,
+            prioridade=prioridade,
+            ativa=bool(ativa),
+        )
+        return self.repo.add(regra)
+
+    def _converter_valor(self, valor: Any, limite: str) -> float | None:
+        if valor is None or valor == "":
+            return None
+        try:
+            valor_float = float(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"Informe um valor {limite} numérico.")
+        if valor_float < 0:
+            raise ValueError(f"O valor {limite} não pode ser negativo.")
+        return valor_float
+
+
+class ListarRegrasCategorizacao:
+    def __init__(self, repo: IRegraCategorizacaoRepository):
+        self.repo = repo
+
+    def execute(self, id_usuario: str) -> List[RegraCategorizacao]:
+        return self.repo.get_by_usuario(id_usuario)
+
+
+class DeletarRegraCategorizacao:
+    def __init__(self, repo: IRegraCategorizacaoRepository):
+        self.repo = repo
+
+    def execute(self, id_usuario: str, id_regra: str) -> None:
+        regra = self.repo.get_by_id(id_regra)
+        if not regra:
+            raise ValueError("Regra não encontrada.")
+        if regra.id_usuario != id_usuario:
+            raise PermissionError("Usuário não autorizado a remover esta regra.")
+        self.repo.delete(id_regra)
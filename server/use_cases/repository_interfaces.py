@@ -1,12 +1,17 @@
 from abc import ABC, abstractmethod
-from datetime import date
-from typing import Any, Dict, List
+from datetime import date, datetime
+from typing import Any, ContextManager, Dict, Iterable, Iterator, List, Set
 
 from domain.anexo import Anexo
+from domain.extrato_arquivado import ExtratoArquivado
+from domain.linha_quarentena import LinhaQuarentena
 from domain.mapeamento_csv import MapeamentoCSV
 from domain.meta import Meta
+from domain.regra_categorizacao import RegraCategorizacao
 from domain.reserva import Reserva
-from domain.transacao import StatusTransacao, Transacao
+from domain.tarefa import Tarefa
+from domain.transacao import StatusTransacao, TipoTransacao, Transacao
+from use_cases.paginacao import CursorTransacao
 
 # Os Casos de Uso dependem destas abstrações, não de implementações concretas.
 
@@ -16,6 +21,28 @@ class ITransacaoRepository(ABC):
     def add(self, transacao: Transacao) -> None:
         pass
 
+    @abstractmethod
+    def add_many(self, transacoes: List[Transacao]) -> int:
+        """Insere várias transações de uma vez (importações). Retorna o total."""
+        pass
+
+    @abstractmethod
+    def get_fingerprints_existentes(
+        self, id_usuario: str, fingerprints: Iterable[str]
+    ) -> Set[str]:
+        """Retorna o subconjunto de fingerprints já importados pelo usuário."""
+        pass
+
+    @abstractmethod
+    def delete_por_importacao(
+        self, id_usuario: str, id_importacao: str, limite: int
+    ) -> int:
+        """
+        Remove até 'limite' transações gravadas pela importação (chamadas
+        repetidas esvaziam a importação em lotes). Retorna quantas removeu.
+        """
+        pass
+
     @abstractmethod
     def update(self, transacao: Transacao) -> None:
         """Atualiza uma transação existente."""
@@ -27,7 +54,16 @@ class ITransacaoRepository(ABC):
         pass
 
     @abstractmethod
-    def get_pendentes_by_usuario(self, id_usuario: str) -> List[Transacao]:
+    def get_pendentes_by_usuario(
+        self,
+        id_usuario: str,
+        cursor: CursorTransacao | None = None,
+        limite: int | None = None,
+    ) -> List[Transacao]:
+        """
+        Lista as pendentes (data desc, id desc). Com 'cursor', retorna apenas
+        as linhas posteriores a ele; 'limite' restringe a quantidade.
+        """
         pass
 
     @abstractmethod
@@ -61,8 +97,77 @@ class ITransacaoRepository(ABC):
         id_perfil: str | None = None,  # NOVO
         sem_categoria: bool = False,  # NOVO
         sem_perfil: bool = False,  # NOVO
+        cursor: CursorTransacao | None = None,
+        limite: int | None = None,
+    ) -> List[Transacao]:
+        """
+        Busca transações com base em filtros dinâmicos, ordenadas por
+        (status, data desc, id desc) e paginadas por cursor (keyset).
+        """
+        pass
+
+    @abstractmethod
+    def iter_by_filters(
+        self,
+        id_usuario: str,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        descricao: str | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+        tamanho_lote: int = 500,
+    ) -> Iterator[List[Transacao]]:
+        """Mesmos filtros de get_by_filters, entregues em lotes (gerador)."""
+        pass
+
+    @abstractmethod
+    def search_by_descricao(
+        self,
+        id_usuario: str,
+        descricao: str,
+        limite: int,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
     ) -> List[Transacao]:
-        """Busca transações com base em filtros dinâmicos."""
+        """
+        Busca textual na descrição, ordenada por relevância (mais relevantes
+        primeiro), com os mesmos filtros de get_by_filters.
+        """
+        pass
+
+
+class IResumoMensalRepository(ABC):
+    """Rollup mensal (usuário, mês, categoria, perfil, tipo) das transações."""
+
+    @abstractmethod
+    def get_resumo(
+        self,
+        id_usuario: str,
+        agrupar_por: List[str],
+        mes_de: str | None = None,
+        mes_ate: str | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        tipo: TipoTransacao | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Totais e quantidades agrupados pelas dimensões informadas."""
+        pass
+
+    @abstractmethod
+    def rebuild(self, id_usuario: str | None = None) -> int:
+        """Recalcula o rollup a partir das transações. Retorna as linhas geradas."""
         pass
 
 
@@ -153,6 +258,71 @@ class IMapeamentoCSVRepository(ABC):
     def exists_nome(self, id_usuario: str, nome: str) -> bool:
         pass
 
+    @abstractmethod
+    def get_by_nome(self, id_usuario: str, nome: str) -> MapeamentoCSV | None:
+        pass
+
+
+class IRegraCategorizacaoRepository(ABC):
+    @abstractmethod
+    def add(self, regra: RegraCategorizacao) -> RegraCategorizacao:
+        pass
+
+    @abstractmethod
+    def get_by_usuario(
+        self, id_usuario: str, somente_ativas: bool = False
+    ) -> List[RegraCategorizacao]:
+        """Regras do usuário, da maior para a menor prioridade."""
+        pass
+
+    @abstractmethod
+    def get_by_id(self, id_regra: str) -> RegraCategorizacao | None:
+        pass
+
+    @abstractmethod
+    def delete(self, id_regra: str) -> None:
+        pass
+
+
+class ILinhaQuarentenaRepository(ABC):
+    @abstractmethod
+    def add_many(self, linhas: List[LinhaQuarentena]) -> int:
+        pass
+
+    @abstractmethod
+    def get_by_importacao(
+        self, id_usuario: str, id_importacao: str
+    ) -> List[LinhaQuarentena]:
+        """Linhas da importação, na ordem do arquivo."""
+        pass
+
+    @abstractmethod
+    def atualizar_motivos(self, motivos: Dict[str, str]) -> None:
+        """Grava o novo motivo (id da linha -> motivo) de linhas reprocessadas."""
+        pass
+
+    @abstractmethod
+    def delete_many(self, ids_linha: List[str]) -> None:
+        pass
+
+
+class IExtratoArquivadoRepository(ABC):
+    @abstractmethod
+    def add(self, extrato: ExtratoArquivado) -> ExtratoArquivado:
+        pass
+
+    @abstractmethod
+    def get_by_importacao(
+        self, id_usuario: str, id_importacao: str
+    ) -> List[ExtratoArquivado]:
+        """Arquivos da importação, na ordem em que foram enviados."""
+        pass
+
+    @abstractmethod
+    def list_by_usuario(self, id_usuario: str) -> List[ExtratoArquivado]:
+        """Todos os arquivos do usuário, do mais recente ao mais antigo."""
+        pass
+
 
 class IMetaUsoRepository(ABC):
     @abstractmethod
@@ -169,3 +339,69 @@ class IMetaUsoRepository(ABC):
     def get_usos_por_meta(self, id_meta: str) -> List[Any]:
         """Lista todos os usos associados a uma meta."""
         pass
+
+
+class ITarefaRepository(ABC):
+    @abstractmethod
+    def add(self, tarefa: Tarefa) -> Tarefa:
+        pass
+
+    @abstractmethod
+    def get_by_id(self, id_tarefa: str) -> Tarefa | None:
+        pass
+
+    @abstractmethod
+    def list_ativas(self, id_usuario: str) -> List[Tarefa]:
+        """Tarefas do usuário ainda na fila (PENDENTE) ou rodando (EXECUTANDO)."""
+        pass
+
+    @abstractmethod
+    def reservar_proxima(self, tipos: Iterable[str]) -> Tarefa | None:
+        """
+        Marca como EXECUTANDO, de forma atômica, a PENDENTE mais antiga entre
+        os tipos informados e a retorna (None se a fila estiver vazia).
+        """
+        pass
+
+    @abstractmethod
+    def registrar_progresso(self, id_tarefa: str, progresso: float) -> None:
+        """Atualiza o progresso (0 a 1) e o heartbeat da tarefa."""
+        pass
+
+    @abstractmethod
+    def registrar_heartbeat(self, id_tarefa: str) -> None:
+        """Atualiza só o heartbeat, se a tarefa ainda estiver EXECUTANDO."""
+        pass
+
+    @abstractmethod
+    def concluir(self, id_tarefa: str, resultado: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def falhar(self, id_tarefa: str, erro: str, repetir: bool) -> None:
+        """
+        Registra o erro. Com 'repetir', a tarefa volta para PENDENTE enquanto
+        houver tentativas; sem tentativas restantes, fica como FALHOU.
+        """
+        pass
+
+    @abstractmethod
+    def recuperar_expiradas(self, limite_heartbeat: datetime) -> int:
+        """
+        Devolve à fila as tarefas EXECUTANDO sem heartbeat desde
+        'limite_heartbeat' (o processo que as executava morreu).
+        Retorna quantas foram recuperadas.
+        """
+        pass
+
+
+class IUnidadeTrabalho(ABC):
+    """Controle da transação do banco para casos de uso que gravam em etapas."""
+
+    @abstractmethod
+    def savepoint(self) -> ContextManager[None]:
+        """
+        Bloco protegido por um savepoint: se ele lançar uma exceção, só o que
+        foi gravado dentro dele é desfeito, e a exceção segue adiante.
+        """
+        pass
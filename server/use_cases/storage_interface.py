@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO
 
 
 class IAnexoStorage(ABC):
@@ -11,3 +13,52 @@ class IAnexoStorage(ABC):
     def delete(self, caminho_storage: str) -> None:
         """Remove o arquivo físico do storage."""
         pass
+
+
+class IImportacaoStorage(ABC):
+    """Guarda o extrato enviado até a tarefa de importação processá-lo."""
+
+    @abstractmethod
+    def save(self, file_stream: BinaryIO, file_name: str) -> str:
+        """Copia o stream para o storage e retorna o caminho."""
+        pass
+
+    @abstractmethod
+    def open(self, caminho_storage: str) -> BinaryIO:
+        """Abre o arquivo salvo para leitura binária."""
+        pass
+
+    @abstractmethod
+    def delete(self, caminho_storage: str) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class ConteudoArquivado:
+    """Onde o arquivo de extratos guardou um conteúdo."""
+
+    hash_conteudo: str
+    tamanho_bytes: int
+    caminho_storage: str
+    # Extensão da compactação aplicada ('' se guardado como veio)
+    compressao: str
+
+
+class IArquivoExtratosStorage(ABC):
+    """
+    Arquivo permanente dos extratos enviados, endereçado pelo conteúdo: o
+    mesmo arquivo enviado de novo reaproveita o que já está guardado.
+    """
+
+    @abstractmethod
+    def arquivar(self, file_stream: BinaryIO, compactar: bool) -> ConteudoArquivado:
+        """
+        Copia o stream (lido até o fim) para o arquivo. Com 'compactar', o
+        conteúdo é guardado compactado.
+        """
+        pass
+
+    @abstractmethod
+    def open(self, caminho_storage: str) -> BinaryIO:
+        """Abre o conteúdo guardado, como está em disco (compactado ou não)."""
+        pass
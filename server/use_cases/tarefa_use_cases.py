@@ -0,0 +1,19 @@
+from domain.tarefa import Tarefa
+from use_cases.repository_interfaces import ITarefaRepository
+
+
+class ObterTarefa:
+    """Consulta o status/progresso de uma tarefa em segundo plano do usuário."""
+
+    def __init__(self, tarefa_repo: ITarefaRepository):
+        self.tarefa_repo = tarefa_repo
+
+    def execute(self, id_usuario: str, id_tarefa: str) -> Tarefa:
+        tarefa = self.tarefa_repo.get_by_id(id_tarefa)
+        if not tarefa:
+            raise ValueError("Tarefa não encontrada.")
+
+        if tarefa.id_usuario != id_usuario:
+            raise PermissionError("Usuário não autorizado a consultar esta tarefa.")
+
+        return tarefa
@@ -0,0 +1,8 @@
+import unicodedata
+
+
+def normalizar_texto(texto: str | None) -> str:
+    """Caixa, acentos e espaços variam entre exportações do mesmo banco."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split())
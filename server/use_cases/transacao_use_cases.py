@@ -1,9 +1,16 @@
 from datetime import date, datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 from domain.anexo import Anexo
 from domain.transacao import StatusTransacao, TipoTransacao, Transacao
 
+from use_cases.cache_interface import IDashboardCache
+from use_cases.paginacao import (
+    LIMITE_MAXIMO,
+    LIMITE_PADRAO,
+    PaginaTransacoes,
+    paginar,
+)
 from use_cases.repository_interfaces import IAnexoRepository, ITransacaoRepository
 from use_cases.storage_interface import IAnexoStorage
 
@@ -260,13 +267,7 @@ class FiltrarTransacoes:
         sem_categoria: bool = False,
         sem_perfil: bool = False,
     ) -> List[Transacao]:
-        if data_de and data_ate and data_ate < data_de:
-            raise ValueError(
-                "A data 'Até' deve ser maior ou igual à data 'De'.")
-        if valor_min is not None and valor_max is not None and valor_max < valor_min:
-            raise ValueError(
-                "O valor 'Máximo' deve ser maior ou igual ao valor 'Mínimo'."
-            )
+        self._validar(data_de, data_ate, valor_min, valor_max)
 
         return self.transacao_repo.get_by_filters(
             id_usuario=id_usuario,
@@ -282,16 +283,167 @@ class FiltrarTransacoes:
             sem_perfil=sem_perfil,
         )
 
+    def execute_paginado(
+        self,
+        id_usuario: str,
+        cursor: str | None = None,
+        limite: int | None = None,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        descricao: str | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+    ) -> PaginaTransacoes:
+        """Mesmos filtros de 'execute', mas devolvendo uma página por cursor."""
+        self._validar(data_de, data_ate, valor_min, valor_max)
+
+        return paginar(
+            lambda posicao, qtd: self.transacao_repo.get_by_filters(
+                id_usuario=id_usuario,
+                data_de=data_de,
+                data_ate=data_ate,
+                valor_min=valor_min,
+                valor_max=valor_max,
+                descricao=descricao,
+                status=status,
+                id_categoria=id_categoria,
+                id_perfil=id_perfil,
+                sem_categoria=sem_categoria,
+                sem_perfil=sem_perfil,
+                cursor=posicao,
+                limite=qtd,
+            ),
+            cursor=cursor,
+            limite=limite,
+        )
+
+    def execute_stream(
+        self,
+        id_usuario: str,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        descricao: str | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+        tamanho_lote: int = 500,
+    ) -> Iterator[List[Transacao]]:
+        """
+        Mesmos filtros de 'execute', mas devolvendo um gerador de lotes.
+        A validação acontece aqui (antes do primeiro lote), e não no consumo.
+        """
+        self._validar(data_de, data_ate, valor_min, valor_max)
+
+        return self.transacao_repo.iter_by_filters(
+            id_usuario=id_usuario,
+            data_de=data_de,
+            data_ate=data_ate,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            descricao=descricao,
+            status=status,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            sem_categoria=sem_categoria,
+            sem_perfil=sem_perfil,
+            tamanho_lote=tamanho_lote,
+        )
+
+    def execute_por_relevancia(
+        self,
+        id_usuario: str,
+        descricao: str | None,
+        limite: int | None = None,
+        data_de: date | None = None,
+        data_ate: date | None = None,
+        valor_min: float | None = None,
+        valor_max: float | None = None,
+        status: StatusTransacao | None = None,
+        id_categoria: str | None = None,
+        id_perfil: str | None = None,
+        sem_categoria: bool = False,
+        sem_perfil: bool = False,
+    ) -> List[Transacao]:
+        """
+        Modo de busca ranqueado: as transações cuja descrição contém o termo,
+        das mais relevantes para as menos relevantes (até 'limite').
+        """
+        self._validar(data_de, data_ate, valor_min, valor_max)
+
+        descricao = (descricao or "").strip()
+        if len(descricao) < 3:
+            raise ValueError(
+                "A busca por relevância exige ao menos 3 caracteres na descrição."
+            )
+        limite = LIMITE_PADRAO if limite is None else limite
+        if limite <= 0 or limite > LIMITE_MAXIMO:
+            raise ValueError(f"O limite deve estar entre 1 e {LIMITE_MAXIMO}.")
+
+        return self.transacao_repo.search_by_descricao(
+            id_usuario=id_usuario,
+            descricao=descricao,
+            limite=limite,
+            data_de=data_de,
+            data_ate=data_ate,
+            valor_min=valor_min,
+            valor_max=valor_max,
+            status=status,
+            id_categoria=id_categoria,
+            id_perfil=id_perfil,
+            sem_categoria=sem_categoria,
+            sem_perfil=sem_perfil,
+        )
+
+    def _validar(
+        self,
+        data_de: date | None,
+        data_ate: date | None,
+        valor_min: float | None,
+        valor_max: float | None,
+    ) -> None:
+        if data_de and data_ate and data_ate < data_de:
+            raise ValueError(
+                "A data 'Até' deve ser maior ou igual à data 'De'.")
+        if valor_min is not None and valor_max is not None and valor_max < valor_min:
+            raise ValueError(
+                "O valor 'Máximo' deve ser maior ou igual ao valor 'Mínimo'."
+            )
+
 
 class ObterEstatisticasDashboard:
     """
     Caso de Uso para os cards do Dashboard (Wireframe image_c7f9e7.png).
     Busca Saldo Atual, Receitas (mês) e Despesas (mês).
+    Com um cache, visitas repetidas sem escritas não consultam o repositório.
     """
 
-    def __init__(self, transacao_repo: ITransacaoRepository):
+    def __init__(
+        self,
+        transacao_repo: ITransacaoRepository,
+        cache: IDashboardCache | None = None,
+    ):
         self.transacao_repo = transacao_repo
+        self.cache = cache
 
     def execute(self, id_usuario: str) -> Dict[str, Any]:
-        # Delega a lógica de agregação para o repositório
-        return self.transacao_repo.get_dashboard_stats(id_usuario)
+        if not self.cache:
+            # Delega a lógica de agregação para o repositório
+            return self.transacao_repo.get_dashboard_stats(id_usuario)
+
+        # A versão é lida antes da consulta: se uma escrita acontecer no meio,
+        # o cache descarta o valor em vez de servi-lo como atual
+        versao = self.cache.versao(id_usuario)
+        estatisticas = self.cache.get(id_usuario)
+        if estatisticas is None:
+            estatisticas = self.transacao_repo.get_dashboard_stats(id_usuario)
+            self.cache.set(id_usuario, estatisticas, versao)
+        return estatisticas